@@ -7,13 +7,9 @@ from typing import Any, Iterator, Optional
 
 from capyc.core.i18n import translation
 from capyc.rest_framework.exceptions import ValidationException
-from django.db.models import Max, Min
-from django.db.models.functions import Coalesce
 from django.db.models.query_utils import Q
 
 from breathecode.authenticate.models import User
-from breathecode.certificate.actions import get_assets_from_syllabus
-from breathecode.certificate.models import UserSpecialty
 from breathecode.assignments.models import Task
 from breathecode.services.google_cloud import Storage
 
@@ -24,6 +20,7 @@ BUCKET_NAME = "admissions-breathecode"
 logger = logging.getLogger(__name__)
 ASSET_LIST_KEYS = ("lessons", "quizzes", "replits", "assignments")
 REFERENCE_KEY_PATTERN = re.compile(r"^(?:(\d+):)?(.+)\.v(\d+)$")
+REPORT_CHUNK_SIZE = 500
 
 
 def _normalize_syllabus_json(data: dict | str | None) -> dict:
@@ -863,96 +860,6 @@ def _get_enrollments(academy, cohort: Optional[Cohort] = None):
     return queryset
 
 
-def _extract_syllabus_slugs(
-    cohorts: list[Cohort],
-    *,
-    include_lessons: bool = True,
-    include_exercises: bool = True,
-    include_projects: bool = True,
-) -> tuple[
-    dict[int, set[str]],
-    dict[int, set[str]],
-    dict[int, set[str]],
-]:
-    """
-    Extrae slugs del syllabus agrupados por cohort.
-    
-    Args:
-        cohorts: Lista de cohorts
-        include_lessons: Si True, incluye lesson slugs
-        include_exercises: Si True, incluye exercise slugs
-        include_projects: Si True, incluye mandatory project slugs
-    
-    Returns:
-        Tuple con:
-        - lesson_slugs_by_cohort: dict[cohort_id, set[slugs]]
-        - exercise_slugs_by_cohort: dict[cohort_id, set[slugs]]
-        - mandatory_project_slugs_by_cohort: dict[cohort_id, set[slugs]]
-    """
-    lesson_slugs_by_cohort: dict[int, set[str]] = {}
-    exercise_slugs_by_cohort: dict[int, set[str]] = {}
-    mandatory_project_slugs_by_cohort: dict[int, set[str]] = {}
-
-    for cohort in cohorts:
-        if cohort is None:
-            continue
-        
-        if cohort.syllabus_version is None:
-            if include_lessons:
-                lesson_slugs_by_cohort[cohort.id] = set()
-            if include_exercises:
-                exercise_slugs_by_cohort[cohort.id] = set()
-            if include_projects:
-                mandatory_project_slugs_by_cohort[cohort.id] = set()
-            continue
-
-        if include_lessons:
-            lesson_slugs = (
-                get_assets_from_syllabus(cohort.syllabus_version, task_types=["LESSON"], only_mandatory=False) or []
-            )
-            lesson_slugs_by_cohort[cohort.id] = set(lesson_slugs)
-        
-        if include_exercises:
-            exercise_slugs = get_assets_from_syllabus(cohort.syllabus_version, task_types=["EXERCISE"], only_mandatory=False) or []
-            exercise_slugs_by_cohort[cohort.id] = set(exercise_slugs)
-        
-        if include_projects:
-            mandatory_project_slugs = (
-                get_assets_from_syllabus(cohort.syllabus_version, task_types=["PROJECT"], only_mandatory=True) or []
-            )
-            mandatory_project_slugs_by_cohort[cohort.id] = set(mandatory_project_slugs)
-
-    return (
-        lesson_slugs_by_cohort,
-        exercise_slugs_by_cohort,
-        mandatory_project_slugs_by_cohort,
-    )
-
-
-def _get_started_by_enrollment(enrollments: list[CohortUser]) -> dict[tuple[int, int], bool]:
-    """
-    Determina si un estudiante ha empezado basándose en el history_log.
-    
-    Un estudiante ha empezado si el history_log tiene keys (no está vacío).
-    El history_log siempre tiene las keys delivered_assignments y pending_assignments
-    cuando el estudiante ha comenzado.
-    
-    Args:
-        enrollments: Lista de CohortUser
-    
-    Returns:
-        dict[tuple[int, int], bool]: Flag de inicio por (user_id, cohort_id)
-    """
-    started_by_enrollment: dict[tuple[int, int], bool] = {}
-
-    for cohort_user in enrollments:
-        history_log = cohort_user.history_log or {}
-        enrollment_key = (cohort_user.user_id, cohort_user.cohort_id)
-        started_by_enrollment[enrollment_key] = bool(history_log)
-
-    return started_by_enrollment
-
-
 def _get_delivered_tasks_by_id(task_ids: list[int], user_ids: list[int], cohort_ids: list[int]) -> dict[int, dict]:
     if not task_ids:
         return {}
@@ -1002,241 +909,6 @@ def _filter_delivered_slugs_by_syllabus(
     return delivered_slugs_by_enrollment
 
 
-def _get_completed_task_slugs(
-    user_ids: list[int],
-    cohort_ids: list[int],
-    task_type: Task.TaskType,
-    slugs_by_cohort: dict[int, set[str]],
-) -> dict[tuple[int, int], set[str]]:
-    """
-    Obtiene los slugs de tareas completadas por tipo de tarea.
-    
-    Para LESSON: solo verifica task_status == DONE
-    Para EXERCISE: verifica:
-        1. revision_status == APPROVED → completo
-        2. task_status == DONE → completo
-    Para PROJECT: verifica:
-        1. revision_status == APPROVED o IGNORED → completo
-    
-    Args:
-        user_ids: Lista de user IDs
-        cohort_ids: Lista de cohort IDs
-        task_type: Tipo de tarea (LESSON, EXERCISE o PROJECT)
-        slugs_by_cohort: Slugs válidos del syllabus agrupados por cohort_id
-    
-    Returns:
-        dict[tuple[int, int], set[str]]: Slugs completados agrupados por (user_id, cohort_id)
-    """
-    all_slugs: set[str] = set()
-    for slugs in slugs_by_cohort.values():
-        all_slugs.update(slugs)
-
-    completed_slugs_by_pair: dict[tuple[int, int], set[str]] = {}
-    if not all_slugs:
-        return completed_slugs_by_pair
-
-    # Para EXERCISE: verificar revision_status == APPROVED
-    if task_type == Task.TaskType.EXERCISE:
-        approved_exercises = Task.objects.filter(
-            user_id__in=user_ids,
-            cohort_id__in=cohort_ids,
-            task_type=Task.TaskType.EXERCISE,
-            revision_status=Task.RevisionStatus.APPROVED,
-            associated_slug__in=list(all_slugs),
-        ).values("user_id", "cohort_id", "associated_slug")
-
-        for r in approved_exercises:
-            pair = (r["user_id"], r["cohort_id"])
-            if pair not in completed_slugs_by_pair:
-                completed_slugs_by_pair[pair] = set()
-            completed_slugs_by_pair[pair].add(r["associated_slug"])
-
-    # Para PROJECT: verificar revision_status == APPROVED o IGNORED
-    if task_type == Task.TaskType.PROJECT:
-        approved_projects = Task.objects.filter(
-            user_id__in=user_ids,
-            cohort_id__in=cohort_ids,
-            task_type=Task.TaskType.PROJECT,
-            revision_status__in=[Task.RevisionStatus.APPROVED, Task.RevisionStatus.IGNORED],
-            associated_slug__in=list(all_slugs),
-        ).values("user_id", "cohort_id", "associated_slug")
-
-        for r in approved_projects:
-            pair = (r["user_id"], r["cohort_id"])
-            if pair not in completed_slugs_by_pair:
-                completed_slugs_by_pair[pair] = set()
-            completed_slugs_by_pair[pair].add(r["associated_slug"])
-
-    # Para LESSON y EXERCISE: verificar task_status == DONE
-    if task_type in [Task.TaskType.LESSON, Task.TaskType.EXERCISE]:
-        done_tasks = Task.objects.filter(
-            user_id__in=user_ids,
-            cohort_id__in=cohort_ids,
-            task_type=task_type,
-            task_status=Task.TaskStatus.DONE,
-            associated_slug__in=list(all_slugs),
-        ).values("user_id", "cohort_id", "associated_slug")
-
-        for r in done_tasks:
-            pair = (r["user_id"], r["cohort_id"])
-            slug = r["associated_slug"]
-            if pair not in completed_slugs_by_pair:
-                completed_slugs_by_pair[pair] = set()
-            completed_slugs_by_pair[pair].add(slug)
-
-    return completed_slugs_by_pair
-
-
-def _get_exercise_telemetry_steps(
-    user_ids: list[int],
-    cohort_ids: list[int],
-    exercise_slugs_by_cohort: dict[int, set[str]],
-) -> dict[tuple[int, int, str], tuple[int, int]]:
-    """
-    Obtiene los pasos completados y totales de ejercicios PENDING con telemetría.
-    
-    Solo consulta ejercicios que:
-    - Tienen revision_status == PENDING
-    - Tienen telemetría disponible
-    - Están en el syllabus actual
-    
-    Esto se usa para el cálculo fraccionario de progreso (ej: 5/6 pasos completados).
-    
-    Args:
-        user_ids: Lista de user IDs
-        cohort_ids: Lista de cohort IDs
-        exercise_slugs_by_cohort: Slugs de ejercicios válidos del syllabus por cohort_id
-    
-    Returns:
-        dict[tuple[int, int, str], tuple[int, int]]: 
-        Key: (user_id, cohort_id, slug)
-        Value: (completed_steps, total_steps)
-    """
-    all_exercise_slugs: set[str] = set()
-    for slugs in exercise_slugs_by_cohort.values():
-        all_exercise_slugs.update(slugs)
-
-    telemetry_steps_by_key: dict[tuple[int, int, str], tuple[int, int]] = {}
-    if not all_exercise_slugs:
-        return telemetry_steps_by_key
-
-    pending_exercises_with_telemetry = Task.objects.filter(
-        user_id__in=user_ids,
-        cohort_id__in=cohort_ids,
-        task_type=Task.TaskType.EXERCISE,
-        revision_status=Task.RevisionStatus.PENDING,
-        associated_slug__in=list(all_exercise_slugs),
-        telemetry__isnull=False,
-    ).values("user_id", "cohort_id", "associated_slug", "telemetry__telemetry")
-
-    for task in pending_exercises_with_telemetry:
-        key = (task["user_id"], task["cohort_id"], task["associated_slug"])
-        telemetry = task.get("telemetry__telemetry")
-        
-        if isinstance(telemetry, dict):
-            total_steps, completed_steps = _telemetry_to_steps(telemetry)
-            if total_steps > 0:
-                telemetry_steps_by_key[key] = (completed_steps, total_steps)
-
-    return telemetry_steps_by_key
-
-
-def _get_student_start_dates(
-    user_ids: list[int],
-    cohort_ids: list[int],
-    lesson_slugs_by_cohort: dict[int, set[str]],
-    exercise_slugs_by_cohort: dict[int, set[str]],
-) -> dict[tuple[int, int], object]:
-    relevant_slugs: set[str] = set()
-    for cid in cohort_ids:
-        relevant_slugs.update(lesson_slugs_by_cohort.get(cid, set()))
-        relevant_slugs.update(exercise_slugs_by_cohort.get(cid, set()))
-
-    if not relevant_slugs:
-        return {}
-
-    started_rows = (
-        Task.objects.filter(
-            user_id__in=user_ids,
-            cohort_id__in=cohort_ids,
-            associated_slug__in=list(relevant_slugs),
-            task_type__in=[Task.TaskType.LESSON, Task.TaskType.EXERCISE],
-        )
-        .values("user_id", "cohort_id")
-        .annotate(started_at=Min(Coalesce("opened_at", "delivered_at", "created_at")))
-    )
-    return {(r["user_id"], r["cohort_id"]): r["started_at"] for r in started_rows}
-
-
-def _telemetry_to_steps(telemetry: dict) -> tuple[int, int]:
-    if not isinstance(telemetry, dict):
-        return 0, 0
-
-    global_metrics = telemetry.get("global_metrics")
-    if isinstance(global_metrics, dict):
-        total_steps = int(global_metrics.get("total_steps") or 0)
-        if total_steps > 0:
-            completion_rate = global_metrics.get("completion_rate")
-            if completion_rate is not None:
-                try:
-                    cr = float(completion_rate)
-                    completed = int(round((cr / 100.0) * total_steps))
-                    completed = 0 if completed < 0 else completed
-                    completed = total_steps if completed > total_steps else completed
-                    return total_steps, completed
-                except Exception:
-                    pass
-
-            steps_not_completed = int(global_metrics.get("steps_not_completed") or 0)
-            completed = total_steps - steps_not_completed
-            completed = 0 if completed < 0 else completed
-            completed = total_steps if completed > total_steps else completed
-            return total_steps, completed
-
-    return 0, 0
-
-
-
-
-def _get_cert_by_pair(academy, user_ids: list[int], cohort_ids: list[int]) -> dict[tuple[int, int], dict]:
-    cert_rows = (
-        UserSpecialty.objects.filter(user_id__in=user_ids, cohort_id__in=cohort_ids, academy=academy)
-        .exclude(status="ERROR")
-        .values("user_id", "cohort_id", "token", "issued_at", "preview_url", "status")
-    )
-    return {(r["user_id"], r["cohort_id"]): r for r in cert_rows}
-
-
-
-
-def _get_completion_date_by_pair(
-    user_ids: list[int],
-    cohort_ids: list[int],
-    lesson_slugs_by_cohort: dict[int, set[str]],
-    exercise_slugs_by_cohort: dict[int, set[str]],
-) -> dict[tuple[int, int], object]:
-    relevant_slugs: set[str] = set()
-    for cid in cohort_ids:
-        relevant_slugs.update(lesson_slugs_by_cohort.get(cid, set()))
-        relevant_slugs.update(exercise_slugs_by_cohort.get(cid, set()))
-
-    if not relevant_slugs:
-        return {}
-
-    completion_rows = (
-        Task.objects.filter(
-            user_id__in=user_ids,
-            cohort_id__in=cohort_ids,
-            task_type__in=[Task.TaskType.LESSON, Task.TaskType.EXERCISE],
-            task_status=Task.TaskStatus.DONE,
-            associated_slug__in=list(relevant_slugs),
-        )
-        .values("user_id", "cohort_id")
-        .annotate(completion_date=Max("updated_at"))
-    )
-    return {(r["user_id"], r["cohort_id"]): r["completion_date"] for r in completion_rows}
-
-
 def _map_status_for_student_progress(cu: CohortUser, *, started: bool, is_completed: bool) -> str:
     edu = (cu.educational_status or "").upper()
     if edu in ("DROPPED", "NOT_COMPLETING", "SUSPENDED"):
@@ -1248,241 +920,37 @@ def _map_status_for_student_progress(cu: CohortUser, *, started: bool, is_comple
     return "in_progress"
 
 
-def _progress_percent(total_units: int, completed_units: int) -> tuple[int, bool]:
-    if total_units <= 0:
-        return 0, False
-
-    ratio = (completed_units / total_units) * 100.0
-    is_completed = ratio >= 99.99
-    progress = int(round(ratio))
-    progress = 0 if progress < 0 else progress
-    progress = 100 if progress > 100 else progress
-    if is_completed:
-        progress = 100
-    return progress, is_completed
-
-
-def academy_student_progress_report_rows(
-    academy, lang: str, cohort: Optional[Cohort] = None, include_micro_cohorts: bool = True
-) -> Iterator[list]:
-    """
-    Build rows for the Academy student progress report (CSV).
+def _student_progress_rows(enrollments: list[CohortUser], lang: str, include_micro_cohorts: bool) -> Iterator[list]:
+    from .services.student_progress import get_student_progress, progress_percent
 
-    Output columns:
-    - course_name
-    - student_full_name
-    - student_email
-    - enrollment_date
-    - student_start_date
-    - status (not_started / in_progress / completed / withdrawn)
-    - progress_percentage (0-100)
-    - completion_date
-    - certificate_url
-    - comments
-    
-    Args:
-        academy: Academy instance
-        lang: Language code
-        cohort: Optional Cohort instance
-        include_micro_cohorts: If False and cohort is a macrocohort, exclude microcohort enrollments from CSV.
-                              Default is True to maintain backward compatibility.
-    """
+    micro_ids_by_cohort: dict[int, list[int]] = {}
+    for cu in enrollments:
+        if cu.cohort_id not in micro_ids_by_cohort:
+            micro_ids_by_cohort[cu.cohort_id] = [c.id for c in cu.cohort.micro_cohorts.all()] if cu.cohort else []
 
-    if academy is None:
-        raise ValidationException(
-            translation(
-                lang,
-                en="Academy not found",
-                es="Academia no encontrada",
-                slug="academy-not-found",
-            ),
-            slug="academy-not-found",
-        )
+    user_ids = {cu.user_id for cu in enrollments}
+    all_micro_ids = {micro_id for micro_ids in micro_ids_by_cohort.values() for micro_id in micro_ids}
 
-    enrollments_qs = _get_enrollments(academy, cohort=cohort)
-    
-    is_macro = bool(cohort and hasattr(cohort, "micro_cohorts") and cohort.micro_cohorts.exists())
-    micro_cohort_ids = set()
-    if is_macro:
-        micro_cohort_ids = set(cohort.micro_cohorts.values_list("id", flat=True))
-        if not include_micro_cohorts:
-            enrollments_qs = enrollments_qs.exclude(cohort_id__in=micro_cohort_ids)
-        else:
-            micro_enrollments_qs = CohortUser.objects.filter(
-                cohort_id__in=micro_cohort_ids,
-                cohort__academy=academy,
-                role="STUDENT"
-            ).select_related("user", "cohort", "cohort__syllabus_version", "cohort__syllabus_version__syllabus")
-            enrollments_qs = enrollments_qs | micro_enrollments_qs
-    
-    if not enrollments_qs.exists():
-        return iter([])
-
-    enrollments = list(enrollments_qs.order_by("cohort_id", "created_at"))
-    user_ids = list({cu.user_id for cu in enrollments})
-    cohort_ids = list({cu.cohort_id for cu in enrollments})
-    
-    if is_macro:
-        cohort_ids.extend(micro_cohort_ids)
-        cohort_ids = list(set(cohort_ids))  # Eliminar duplicados
+    cohort_ids_by_user: dict[int, set[int]] = {}
+    for cu in enrollments:
+        cohort_ids_by_user.setdefault(cu.user_id, set()).add(cu.cohort_id)
 
-    cohorts_by_id = {cu.cohort_id: cu.cohort for cu in enrollments if cu.cohort is not None}
-    
-    if is_macro:
-        micro_cohorts = Cohort.objects.filter(id__in=micro_cohort_ids)
-        for micro_cohort in micro_cohorts:
-            cohorts_by_id[micro_cohort.id] = micro_cohort
-
-    (
-        lesson_slugs_by_cohort,
-        exercise_slugs_by_cohort,
-        mandatory_project_slugs_by_cohort,
-    ) = _extract_syllabus_slugs(list(cohorts_by_id.values()))
-
-    # Get the flag of start by enrollment
-    enrollments_for_calculation = list(enrollments)
-    if is_macro and micro_cohort_ids:
+    if all_micro_ids:
         micro_enrollments = CohortUser.objects.filter(
-            cohort_id__in=micro_cohort_ids,
-            user_id__in=user_ids,
-            role="STUDENT"
-        ).select_related("user", "cohort")
-        enrollments_for_calculation.extend(micro_enrollments)
-    started_by_enrollment = _get_started_by_enrollment(enrollments_for_calculation)
-
-    # Get the lessons that the student has completed
-    lesson_done_slugs_by_pair = _get_completed_task_slugs(
-        user_ids, cohort_ids, Task.TaskType.LESSON, lesson_slugs_by_cohort
-    )
-
-    # Get the exercises that the student has completed
-    completed_exercise_slugs_by_pair = _get_completed_task_slugs(
-        user_ids, cohort_ids, Task.TaskType.EXERCISE, exercise_slugs_by_cohort
-    )
-
-    # Get the mandatory projects that the student has approved
-    approved_project_slugs_by_pair = _get_completed_task_slugs(
-        user_ids, cohort_ids, Task.TaskType.PROJECT, mandatory_project_slugs_by_cohort
-    )
-    
-    # Get the exercise telemetry steps
-    exercise_telemetry_steps_by_key = _get_exercise_telemetry_steps(
-        user_ids, cohort_ids, exercise_slugs_by_cohort
-    )
-
-    # Get the start date of the student in the cohort
-    started_at_by_pair = _get_student_start_dates(user_ids, cohort_ids, lesson_slugs_by_cohort, exercise_slugs_by_cohort)
-
-    # Get the certificates that the student has received by cohort and user
-    cert_by_pair = _get_cert_by_pair(academy, user_ids, cohort_ids)
-
-    # Get the completion date of the student in the cohort
-    completion_date_by_pair = _get_completion_date_by_pair(user_ids, cohort_ids, lesson_slugs_by_cohort, exercise_slugs_by_cohort)
-
-    def _get_units_for(
-        user_id: int,
-        cohort_id: int,
-        *,
-        include_lessons: bool = True,
-        include_exercises: bool = True,
-        include_projects: bool = False,
-    ) -> tuple[int, int]:
-        """
-        Calcula unidades totales y completadas para un estudiante en un cohort.
-        
-        Args:
-            user_id: ID del usuario
-            cohort_id: ID del cohort
-            include_lessons: Si True, incluye lessons en el cálculo
-            include_exercises: Si True, incluye exercises en el cálculo
-            include_projects: Si True, incluye projects en el cálculo
-        
-        Returns:
-            tuple[int, int]: (total_units, completed_units)
-        """
-        total_units = 0
-        completed_units = 0
-
-        if include_lessons:
-            total_lessons = len(lesson_slugs_by_cohort.get(cohort_id, set()))
-            completed_lessons = len(
-                (lesson_done_slugs_by_pair.get((user_id, cohort_id), set()) or set())
-                & (lesson_slugs_by_cohort.get(cohort_id, set()) or set())
-            )
-            total_units += total_lessons
-            completed_units += completed_lessons
-
-        if include_exercises:
-            total_exercises = len(exercise_slugs_by_cohort.get(cohort_id, set()))
-            completed_exercises = len(
-                (completed_exercise_slugs_by_pair.get((user_id, cohort_id), set()) or set())
-                & (exercise_slugs_by_cohort.get(cohort_id, set()) or set())
-            )
-            total_units += total_exercises
-            completed_units += completed_exercises
-
-        if include_projects:
-            total_projects = len(mandatory_project_slugs_by_cohort.get(cohort_id, set()))
-            completed_projects = len(
-                (approved_project_slugs_by_pair.get((user_id, cohort_id), set()) or set())
-                & (mandatory_project_slugs_by_cohort.get(cohort_id, set()) or set())
-            )
-            total_units += total_projects
-            completed_units += completed_projects
-
-        if total_units and completed_units > total_units:
-            completed_units = total_units
-        if completed_units < 0:
-            completed_units = 0
-
-        return total_units, completed_units
-
-    def _build_task_slugs_union(
-        include_lessons: bool = True,
-        include_exercises: bool = True,
-        include_projects: bool = True,
-    ) -> set[str]:
-        """Build union of slugs for the specified task types."""
-        slugs: set[str] = set()
-        for cid in cohort_ids:
-            if include_lessons:
-                slugs.update(lesson_slugs_by_cohort.get(cid, set()))
-            if include_exercises:
-                slugs.update(exercise_slugs_by_cohort.get(cid, set()))
-            if include_projects:
-                slugs.update(mandatory_project_slugs_by_cohort.get(cid, set()))
-        return slugs
-    
-    rows_to_write: list[dict[str, Any]] = []
-
-    all_task_slugs = _build_task_slugs_union(include_lessons=True, include_exercises=True, include_projects=False)
+            cohort_id__in=all_micro_ids, user_id__in=user_ids, role="STUDENT"
+        ).values_list("user_id", "cohort_id")
 
-    enrollments_with_tasks: set[tuple[int, int]] = set()
-    if all_task_slugs:
-        task_rows = Task.objects.filter(
-            user_id__in=user_ids,
-            cohort_id__in=cohort_ids,
-            associated_slug__in=list(all_task_slugs),
-        ).values("user_id", "cohort_id")
-        enrollments_with_tasks = {(r["user_id"], r["cohort_id"]) for r in task_rows}
+        for user_id, micro_cohort_id in micro_enrollments:
+            cohort_ids_by_user.setdefault(user_id, set()).add(micro_cohort_id)
 
-    cohort_ids_by_user: dict[int, set[int]] = {}
+    pairs: set[tuple[int, int]] = set()
     for cu in enrollments:
-        if cu.user_id not in cohort_ids_by_user:
-            cohort_ids_by_user[cu.user_id] = set()
-        cohort_ids_by_user[cu.user_id].add(cu.cohort_id)
-    
-    if is_macro and micro_cohort_ids:
-        micro_enrollments_for_user_cohorts = CohortUser.objects.filter(
-            cohort_id__in=micro_cohort_ids,
-            user_id__in=user_ids,
-            role="STUDENT"
-        ).values_list("user_id", "cohort_id")
-        
-        for user_id, micro_cohort_id in micro_enrollments_for_user_cohorts:
-            if user_id not in cohort_ids_by_user:
-                cohort_ids_by_user[user_id] = set()
-            cohort_ids_by_user[user_id].add(micro_cohort_id)
+        pairs.add((cu.user_id, cu.cohort_id))
+        for micro_id in micro_ids_by_cohort[cu.cohort_id]:
+            if micro_id in cohort_ids_by_user[cu.user_id]:
+                pairs.add((cu.user_id, micro_id))
+
+    progress_by_pair = get_student_progress(pairs)
 
     for cu in enrollments:
         user = cu.user
@@ -1493,65 +961,57 @@ def academy_student_progress_report_rows(
         email = getattr(user, "email", "") if user else ""
 
         pair = (cu.user_id, cu.cohort_id)
+        progress = progress_by_pair[pair]
 
-        student_start_date = started_at_by_pair.get(pair)
+        student_start_date = progress.started_at
         edu = (cu.educational_status or "").upper()
 
-        is_macro = bool(cohort and hasattr(cohort, "micro_cohorts") and cohort.micro_cohorts.exists())
+        is_macro = bool(micro_ids_by_cohort[cu.cohort_id])
         if is_macro:
             course_name = f"{course_name} (Macro cohort)"
 
             user_cohorts = cohort_ids_by_user.get(cu.user_id, set())
-            micro_ids = [c.id for c in cohort.micro_cohorts.all() if c.id in user_cohorts]
-
-            total_units = 0
-            completed_units = 0
-            macro_started = False
-            macro_started_at = None
+            micro_ids = [micro_id for micro_id in micro_ids_by_cohort[cu.cohort_id] if micro_id in user_cohorts]
+            micro_progress = [progress_by_pair[(cu.user_id, micro_id)] for micro_id in micro_ids]
 
-            for micro_id in micro_ids:
-                micro_total, micro_completed = _get_units_for(cu.user_id, micro_id)
-                total_units += micro_total
-                completed_units += micro_completed
+            total_units = sum(x.total_units for x in micro_progress)
+            completed_units = sum(x.completed_units for x in micro_progress)
+            started = any(x.started for x in micro_progress)
 
-                if (cu.user_id, micro_id) in enrollments_with_tasks or started_by_enrollment.get((cu.user_id, micro_id), False):
-                    macro_started = True
+            micro_started_at = [x.started_at for x in micro_progress if x.started_at]
+            student_start_date = min(micro_started_at) if micro_started_at else student_start_date
 
-                micro_started_at = started_at_by_pair.get((cu.user_id, micro_id))
-                if micro_started_at and (macro_started_at is None or micro_started_at < macro_started_at):
-                    macro_started_at = micro_started_at
+            micro_completion_dates = [x.completion_date for x in micro_progress if x.completion_date]
+            completion_date = max(micro_completion_dates) if micro_completion_dates else None
 
-            student_start_date = macro_started_at or student_start_date
-            progress, is_completed = _progress_percent(total_units, completed_units)
-            started = macro_started
+            is_certificate_eligible = any(x.mandatory_projects > 0 for x in micro_progress)
+            pending_mandatory = sum(x.pending_projects for x in micro_progress)
 
-            is_certificate_eligible = (
-                any(len(mandatory_project_slugs_by_cohort.get(mid, set())) > 0 for mid in micro_ids) if micro_ids else False
-            )
         else:
-            total_units, completed_units = _get_units_for(cu.user_id, cu.cohort_id)
-            progress, is_completed = _progress_percent(total_units, completed_units)
-            started = bool((pair in enrollments_with_tasks) or started_by_enrollment.get(pair, False))
-            is_certificate_eligible = bool(len(mandatory_project_slugs_by_cohort.get(cu.cohort_id, set())) > 0)
+            total_units = progress.total_units
+            completed_units = progress.completed_units
+            started = progress.started
+            completion_date = progress.completion_date
+            is_certificate_eligible = progress.mandatory_projects > 0
+            pending_mandatory = progress.pending_projects
+
+        percentage, is_completed = progress_percent(total_units, completed_units)
 
         if edu == "GRADUATED":
-            progress = 100
+            percentage = 100
             is_completed = True
 
         status_value = _map_status_for_student_progress(cu, started=started, is_completed=is_completed)
 
-        cert = cert_by_pair.get(pair)
-        completion_date = None
         certificate_url = None
-        if cert and cert.get("token"):
-            certificate_url = f"https://certificate.4geeks.com/{cert.get('token')}"
+        if progress.certificate_token:
+            certificate_url = f"https://certificate.4geeks.com/{progress.certificate_token}"
 
         comments = ""
         # No incluir comentarios si es una macrocohorte y no estamos incluyendo microcohortes
         # (la macrocohorte no tiene syllabus propio, solo las microcohortes)
-        is_macro_enrollment = is_macro and cu.cohort_id == cohort.id if cohort else False
-        should_skip_comments = is_macro_enrollment and not include_micro_cohorts
-        
+        should_skip_comments = is_macro and not include_micro_cohorts
+
         if not should_skip_comments:
             if total_units == 0 and status_value != "completed":
                 comments = translation(
@@ -1570,20 +1030,7 @@ def academy_student_progress_report_rows(
                 )
                 comments = (comments + " | " if comments else "") + no_cert_msg
         else:
-            if progress >= 100 and cert is None and not should_skip_comments:
-                pending_mandatory = 0
-                if is_macro:
-                    for micro_id in micro_ids:
-                        required = mandatory_project_slugs_by_cohort.get(micro_id, set())
-                        if not required:
-                            continue
-                        approved = approved_project_slugs_by_pair.get((cu.user_id, micro_id), set())
-                        pending_mandatory += len(required - approved)
-                else:
-                    required = mandatory_project_slugs_by_cohort.get(cu.cohort_id, set())
-                    approved = approved_project_slugs_by_pair.get(pair, set())
-                    pending_mandatory = len(required - approved) if required else 0
-
+            if percentage >= 100 and progress.certificate_token is None and not should_skip_comments:
                 if pending_mandatory > 0:
                     proj_msg = translation(
                         lang,
@@ -1593,52 +1040,84 @@ def academy_student_progress_report_rows(
                     )
                     comments = (comments + " | " if comments else "") + proj_msg
 
-        rows_to_write.append(
-            {
-                "pair": pair,
-                "course_name": course_name,
-                "full_name": full_name,
-                "email": email,
-                "enrollment_date": cu.created_at,
-                "student_start_date": student_start_date,
-                "status": status_value,
-                "progress": progress,
-                "completion_date": completion_date,
-                "certificate_url": certificate_url,
-                "comments": comments,
-                "edu": edu,
-            }
+        yield [
+            course_name,
+            full_name,
+            email,
+            cu.created_at,
+            student_start_date,
+            status_value,
+            percentage,
+            completion_date if percentage >= 100 else None,
+            certificate_url,
+            comments,
+        ]
+
+
+def academy_student_progress_report_rows(
+    academy, lang: str, cohort: Optional[Cohort] = None, include_micro_cohorts: bool = True
+) -> Iterator[list]:
+    """
+    Build rows for the Academy student progress report (CSV).
+
+    The progress is read from `StudentProgress`, the enrollments without it are computed on the fly, and the
+    rows are yielded in chunks so the report can be streamed.
+
+    Output columns:
+    - course_name
+    - student_full_name
+    - student_email
+    - enrollment_date
+    - student_start_date
+    - status (not_started / in_progress / completed / withdrawn)
+    - progress_percentage (0-100)
+    - completion_date
+    - certificate_url
+    - comments
+
+    Args:
+        academy: Academy instance
+        lang: Language code
+        cohort: Optional Cohort instance
+        include_micro_cohorts: If False and cohort is a macrocohort, exclude microcohort enrollments from CSV.
+                              Default is True to maintain backward compatibility.
+    """
+
+    if academy is None:
+        raise ValidationException(
+            translation(
+                lang,
+                en="Academy not found",
+                es="Academia no encontrada",
+                slug="academy-not-found",
+            ),
+            slug="academy-not-found",
         )
 
-    for item in rows_to_write:
-        if item["progress"] >= 100:
-            user_id, cohort_id = item["pair"]
-            cohort = cohorts_by_id.get(cohort_id)
-            is_macro = bool(cohort and hasattr(cohort, "micro_cohorts") and cohort.micro_cohorts.exists())
-            if is_macro:
-                user_cohorts = cohort_ids_by_user.get(user_id, set())
-                micro_ids = [c.id for c in cohort.micro_cohorts.all() if c.id in user_cohorts]
-                best = None
-                for micro_id in micro_ids:
-                    d = completion_date_by_pair.get((user_id, micro_id))
-                    if d and (best is None or d > best):
-                        best = d
-                item["completion_date"] = best
-            else:
-                item["completion_date"] = completion_date_by_pair.get((user_id, cohort_id))
+    enrollments_qs = _get_enrollments(academy, cohort=cohort)
 
-        yield [
-            item["course_name"],
-            item["full_name"],
-            item["email"],
-            item["enrollment_date"],
-            item["student_start_date"],
-            item["status"],
-            item["progress"],
-            item["completion_date"],
-            item["certificate_url"],
-            item["comments"],
-        ]
+    is_macro = bool(cohort and hasattr(cohort, "micro_cohorts") and cohort.micro_cohorts.exists())
+    if is_macro:
+        micro_cohort_ids = set(cohort.micro_cohorts.values_list("id", flat=True))
+        if not include_micro_cohorts:
+            enrollments_qs = enrollments_qs.exclude(cohort_id__in=micro_cohort_ids)
+        else:
+            micro_enrollments_qs = CohortUser.objects.filter(
+                cohort_id__in=micro_cohort_ids,
+                cohort__academy=academy,
+                role="STUDENT"
+            ).select_related("user", "cohort", "cohort__syllabus_version", "cohort__syllabus_version__syllabus")
+            enrollments_qs = enrollments_qs | micro_enrollments_qs
+
+    enrollments: list[CohortUser] = []
+    for cu in enrollments_qs.order_by("cohort_id", "created_at").iterator(chunk_size=REPORT_CHUNK_SIZE):
+        enrollments.append(cu)
+        if len(enrollments) == REPORT_CHUNK_SIZE:
+            yield from _student_progress_rows(enrollments, lang, include_micro_cohorts)
+            enrollments = []
+
+    if enrollments:
+        yield from _student_progress_rows(enrollments, lang, include_micro_cohorts)
 
 
 def is_no_saas_student_up_to_date_in_any_cohort(
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+
+from breathecode.admissions.models import StudentProgress
+from breathecode.admissions.services.student_progress import (
+    compute_student_progress,
+    get_progress_difference,
+    save_student_progress,
+)
+
+
+class Command(BaseCommand):
+    help = "Rebuild a random sample of the student progress and compare it against the stored values"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sample",
+            type=int,
+            default=200,
+            help="How many rows to check",
+        )
+        parser.add_argument(
+            "--academy-id",
+            type=int,
+            help="Only check the rows of this academy",
+        )
+        parser.add_argument(
+            "--cohort-id",
+            type=int,
+            help="Only check the rows of this cohort",
+        )
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Store the rebuilt values of the rows that differ",
+        )
+
+    def handle(self, *args, **options):
+        rows = StudentProgress.objects.all()
+
+        if options.get("academy_id"):
+            rows = rows.filter(cohort__academy__id=options["academy_id"])
+
+        if options.get("cohort_id"):
+            rows = rows.filter(cohort__id=options["cohort_id"])
+
+        sample = {(x.user_id, x.cohort_id): x for x in rows.order_by("?")[: options["sample"]]}
+        expected = compute_student_progress(sample.keys())
+
+        mismatches = []
+        for pair, stored in sample.items():
+            if difference := get_progress_difference(stored, expected[pair]):
+                mismatches.append(pair)
+                self.stdout.write(f"User {pair[0]} in cohort {pair[1]}: {difference}")
+
+        self.stdout.write(f"{len(mismatches)} of {len(sample)} rows differ from a fresh computation")
+
+        if mismatches and options["fix"]:
+            save_student_progress(mismatches)
+            self.stdout.write(self.style.SUCCESS(f"{len(mismatches)} rows fixed"))
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("admissions", "0020_cohortuser_source_macro_cohort"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StudentProgress",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "total_units",
+                    models.PositiveIntegerField(default=0, help_text="Lessons and exercises in the syllabus"),
+                ),
+                (
+                    "completed_units",
+                    models.PositiveIntegerField(default=0, help_text="Lessons and exercises completed"),
+                ),
+                (
+                    "mandatory_projects",
+                    models.PositiveIntegerField(default=0, help_text="Mandatory projects in the syllabus"),
+                ),
+                (
+                    "pending_projects",
+                    models.PositiveIntegerField(default=0, help_text="Mandatory projects not approved yet"),
+                ),
+                ("started", models.BooleanField(default=False)),
+                ("started_at", models.DateTimeField(blank=True, default=None, null=True)),
+                (
+                    "completion_date",
+                    models.DateTimeField(
+                        blank=True, default=None, help_text="Last time a lesson or exercise was completed", null=True
+                    ),
+                ),
+                ("certificate_token", models.CharField(blank=True, default=None, max_length=40, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("cohort", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="admissions.cohort")),
+                ("user", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "unique_together": {("user", "cohort")},
+            },
+        ),
+    ]
@@ -606,6 +606,7 @@ class Cohort(models.Model):
         super().__init__(*args, **kwargs)
         self._current_history_log = self.history_log
         self._old_stage = self.stage
+        self._old_syllabus_version_id = self.syllabus_version_id
 
     def clean(self):
         if self.stage:
@@ -642,6 +643,8 @@ class Cohort(models.Model):
         if self.pk is None or self._old_stage != self.stage:
             stage_updated = True
 
+        syllabus_version_updated = not created and self._old_syllabus_version_id != self.syllabus_version_id
+
         super().save(*args, **kwargs)
 
         signals.cohort_saved.send_robust(instance=self, sender=self.__class__, created=created)
@@ -652,7 +655,11 @@ class Cohort(models.Model):
         if stage_updated:
             signals.cohort_stage_updated.send_robust(instance=self, sender=self.__class__)
 
+        if syllabus_version_updated:
+            signals.cohort_syllabus_version_updated.send_robust(instance=self, sender=self.__class__)
+
         self._current_history_log = self.history_log
+        self._old_syllabus_version_id = self.syllabus_version_id
 
     def __str__(self):
         return f"{self.name} ({self.slug} - {self.id})"
@@ -814,6 +821,39 @@ class CohortUser(models.Model):
         return result
 
 
+class StudentProgress(models.Model):
+    """
+    Precomputed progress of a student in a cohort, used by the academy student progress report.
+
+    It is refreshed by the task, certificate, cohort user and syllabus signals, use the `check_student_progress`
+    command to compare it against a fresh computation.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    cohort = models.ForeignKey(Cohort, on_delete=models.CASCADE)
+
+    total_units = models.PositiveIntegerField(default=0, help_text="Lessons and exercises in the syllabus")
+    completed_units = models.PositiveIntegerField(default=0, help_text="Lessons and exercises completed")
+    mandatory_projects = models.PositiveIntegerField(default=0, help_text="Mandatory projects in the syllabus")
+    pending_projects = models.PositiveIntegerField(default=0, help_text="Mandatory projects not approved yet")
+
+    started = models.BooleanField(default=False)
+    started_at = models.DateTimeField(null=True, blank=True, default=None)
+    completion_date = models.DateTimeField(
+        null=True, blank=True, default=None, help_text="Last time a lesson or exercise was completed"
+    )
+    certificate_token = models.CharField(max_length=40, null=True, blank=True, default=None)
+
+    created_at = models.DateTimeField(auto_now_add=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True, editable=False)
+
+    class Meta:
+        unique_together = ("user", "cohort")
+
+    def __str__(self):
+        return f"{self.user_id} - {self.cohort_id}: {self.completed_units}/{self.total_units}"
+
+
 DAILY = "DAILY"
 WEEKLY = "WEEKLY"
 MONTHLY = "MONTHLY"
@@ -4,7 +4,7 @@ import re
 from typing import Any, Type
 
 from asgiref.sync import sync_to_async
-from django.db.models.signals import m2m_changed, post_migrate
+from django.db.models.signals import m2m_changed, post_delete, post_migrate
 from django.dispatch import receiver
 from django.utils import timezone
 
@@ -12,13 +12,23 @@ import breathecode.authenticate.tasks as auth_tasks
 from breathecode.admissions import tasks
 from breathecode.admissions.services.completion import graduate_cohort_user_if_complete
 from breathecode.assignments.models import Task
-from breathecode.assignments.signals import assignment_status_updated, revision_status_updated
+from breathecode.assignments.signals import assignment_created, assignment_status_updated, revision_status_updated
 from breathecode.authenticate.models import CredentialsDiscord
 from breathecode.certificate.actions import get_assets_from_syllabus
+from breathecode.certificate.models import UserSpecialty
+from breathecode.certificate.signals import user_specialty_saved
 
 from ..activity import tasks as activity_tasks
-from .models import Academy, Cohort, CohortUser, Syllabus, SyllabusVersion
-from .signals import academy_saved, cohort_log_saved, cohort_user_created, student_edu_status_updated, syllabus_created
+from .models import Academy, Cohort, CohortUser, StudentProgress, Syllabus, SyllabusVersion
+from .signals import (
+    academy_saved,
+    cohort_log_saved,
+    cohort_syllabus_version_updated,
+    cohort_user_created,
+    student_edu_status_updated,
+    syllabus_created,
+    syllabus_version_json_updated,
+)
 
 # add your receives here
 logger = logging.getLogger(__name__)
@@ -511,6 +521,51 @@ def trigger_module_survey_on_completion(sender: Type[Task], instance: Task, **kw
         logger.error("[module-completion] Error triggering survey: %s", str(e), exc_info=True)
 
 
+@receiver(assignment_created, sender=Task, weak=False)
+@receiver(assignment_status_updated, sender=Task, weak=False)
+@receiver(revision_status_updated, sender=Task, weak=False)
+@receiver(post_delete, sender=Task, weak=False)
+def refresh_student_progress_on_task_update(sender: Type[Task], instance: Task, **kwargs: Any):
+    if instance.cohort_id is None:
+        return
+
+    tasks.update_student_progress.delay(instance.user_id, instance.cohort_id)
+
+
+@receiver(user_specialty_saved, sender=UserSpecialty, weak=False)
+def refresh_student_progress_on_certificate_update(
+    sender: Type[UserSpecialty], instance: UserSpecialty, **kwargs: Any
+):
+    if instance.cohort_id is None:
+        return
+
+    tasks.update_student_progress.delay(instance.user_id, instance.cohort_id)
+
+
+@receiver(cohort_log_saved, sender=CohortUser, weak=False)
+def refresh_student_progress_on_cohort_user_update(sender: Type[CohortUser], instance: CohortUser, **kwargs: Any):
+    # the history log is saved after every class, it only matters until the student has started
+    if instance.role != "STUDENT" or (
+        StudentProgress.objects.filter(user_id=instance.user_id, cohort_id=instance.cohort_id, started=True).exists()
+    ):
+        return
+
+    tasks.update_student_progress.delay(instance.user_id, instance.cohort_id)
+
+
+@receiver(cohort_syllabus_version_updated, sender=Cohort, weak=False)
+def refresh_student_progress_on_cohort_syllabus_update(sender: Type[Cohort], instance: Cohort, **kwargs: Any):
+    tasks.update_cohort_student_progress.delay(instance.id)
+
+
+@receiver(syllabus_version_json_updated, sender=SyllabusVersion, weak=False)
+def refresh_student_progress_on_syllabus_update(
+    sender: Type[SyllabusVersion], instance: SyllabusVersion, **kwargs: Any
+):
+    for cohort_id in Cohort.objects.filter(syllabus_version=instance).values_list("id", flat=True):
+        tasks.update_cohort_student_progress.delay(cohort_id)
+
+
 @receiver(syllabus_created, sender=Syllabus)
 def create_initial_syllabus_version(sender: Type[Syllabus], instance: Syllabus, **kwargs: Any):
     """Create an initial SyllabusVersion when a new Syllabus is created."""
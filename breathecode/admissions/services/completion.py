@@ -8,7 +8,7 @@ from typing import Any
 from django.core.cache import cache
 
 from breathecode.admissions.actions import resolve_syllabus_json
-from breathecode.admissions.models import CohortUser, SyllabusVersion
+from breathecode.admissions.models import Cohort, CohortUser, SyllabusVersion
 from breathecode.assignments.models import Task
 
 FULL_COMPLETION = "FULL_COMPLETION"
@@ -169,9 +169,7 @@ def get_completion_strategy(
             return {
                 "type": FULL_COMPLETION,
                 "source": "syllabus",
-                "requirements": {
-                    task_type: {"min_percent": 100, "only_mandatory": False} for task_type in TASK_TYPES
-                },
+                "requirements": {task_type: {"min_percent": 100, "only_mandatory": False} for task_type in TASK_TYPES},
             }
 
         if strategy_type == PARTIAL_COMPLETION:
@@ -247,38 +245,31 @@ def _is_task_complete(task: Task) -> bool:
     return False
 
 
-def _evaluate_cohort_user_completion(cohort_user: CohortUser, *, apply_macro_override: bool) -> dict:
-    cohort = cohort_user.cohort
-    override_kwargs = _override_kwargs_from_cohort_user(cohort_user) if apply_macro_override else None
-    override_kwargs = override_kwargs or {}
-    strategy = get_completion_strategy(cohort.syllabus_version if cohort else None, **override_kwargs)
+def _get_requirement_assets(
+    syllabus_version: SyllabusVersion | None, override_kwargs: dict
+) -> tuple[dict, list[CompletionRequirement], dict[str, set[str]]]:
+    strategy = get_completion_strategy(syllabus_version, **override_kwargs)
     requirements = _requirements_from_strategy(strategy)
 
     assets_by_requirement: dict[str, set[str]] = {}
     for requirement in requirements:
         assets_by_requirement[requirement.task_type] = get_syllabus_assets_by_type(
-            cohort.syllabus_version if cohort else None,
+            syllabus_version,
             task_types=[requirement.task_type],
             only_mandatory=requirement.only_mandatory,
             **override_kwargs,
         ).get(requirement.task_type, set())
 
-    all_required_slugs = set()
-    for slugs in assets_by_requirement.values():
-        all_required_slugs.update(slugs)
+    return strategy, requirements, assets_by_requirement
 
-    completed_by_type: dict[str, set[str]] = {task_type: set() for task_type in TASK_TYPES}
-    if all_required_slugs:
-        tasks = Task.objects.filter(
-            user=cohort_user.user,
-            cohort=cohort,
-            associated_slug__in=list(all_required_slugs),
-            task_type__in=[requirement.task_type for requirement in requirements],
-        )
-        for task in tasks:
-            if task.associated_slug in assets_by_requirement.get(task.task_type, set()) and _is_task_complete(task):
-                completed_by_type.setdefault(task.task_type, set()).add(task.associated_slug)
 
+def _build_completion(
+    strategy: dict,
+    requirements: list[CompletionRequirement],
+    assets_by_requirement: dict[str, set[str]],
+    completed_by_type: dict[str, set[str]],
+    used_macro_override: bool,
+) -> dict:
     required_breakdown = {}
     pending_required_slugs: dict[str, list[str]] = {}
     total_required = 0
@@ -318,7 +309,7 @@ def _evaluate_cohort_user_completion(cohort_user: CohortUser, *, apply_macro_ove
     return {
         "strategy": strategy,
         "is_complete": requirements_met,
-        "used_macro_override": bool(apply_macro_override and override_kwargs),
+        "used_macro_override": used_macro_override,
         "overall": {
             "total": total_required,
             "completed": completed_required,
@@ -330,6 +321,90 @@ def _evaluate_cohort_user_completion(cohort_user: CohortUser, *, apply_macro_ove
     }
 
 
+def _evaluate_cohort_user_completion(cohort_user: CohortUser, *, apply_macro_override: bool) -> dict:
+    cohort = cohort_user.cohort
+    override_kwargs = _override_kwargs_from_cohort_user(cohort_user) if apply_macro_override else None
+    override_kwargs = override_kwargs or {}
+    strategy, requirements, assets_by_requirement = _get_requirement_assets(
+        cohort.syllabus_version if cohort else None, override_kwargs
+    )
+
+    all_required_slugs = set()
+    for slugs in assets_by_requirement.values():
+        all_required_slugs.update(slugs)
+
+    completed_by_type: dict[str, set[str]] = {task_type: set() for task_type in TASK_TYPES}
+    if all_required_slugs:
+        tasks = Task.objects.filter(
+            user=cohort_user.user,
+            cohort=cohort,
+            associated_slug__in=list(all_required_slugs),
+            task_type__in=[requirement.task_type for requirement in requirements],
+        )
+        for task in tasks:
+            if task.associated_slug in assets_by_requirement.get(task.task_type, set()) and _is_task_complete(task):
+                completed_by_type.setdefault(task.task_type, set()).add(task.associated_slug)
+
+    return _build_completion(
+        strategy,
+        requirements,
+        assets_by_requirement,
+        completed_by_type,
+        used_macro_override=bool(apply_macro_override and override_kwargs),
+    )
+
+
+def evaluate_cohort_completion(cohort: Cohort, cohort_users: list[CohortUser]) -> dict[int, dict]:
+    """
+    Evaluate the completion of many students of the same cohort, keyed by cohort user id.
+
+    The syllabus is resolved once and the tasks of all the students are loaded with a single query, the students
+    that are not complete and came from a macro cohort are evaluated again one by one with the macro override.
+    """
+
+    if not cohort_users:
+        return {}
+
+    strategy, requirements, assets_by_requirement = _get_requirement_assets(cohort.syllabus_version, {})
+
+    all_required_slugs = set()
+    for slugs in assets_by_requirement.values():
+        all_required_slugs.update(slugs)
+
+    completed_by_user: dict[int, dict[str, set[str]]] = {x.user_id: {} for x in cohort_users}
+    if all_required_slugs:
+        tasks = (
+            Task.objects.filter(
+                user_id__in=completed_by_user.keys(),
+                cohort=cohort,
+                associated_slug__in=list(all_required_slugs),
+                task_type__in=[requirement.task_type for requirement in requirements],
+            )
+            .only("user_id", "associated_slug", "task_type", "task_status", "revision_status")
+            .iterator()
+        )
+        for task in tasks:
+            if task.associated_slug in assets_by_requirement.get(task.task_type, set()) and _is_task_complete(task):
+                completed_by_user[task.user_id].setdefault(task.task_type, set()).add(task.associated_slug)
+
+    result = {}
+    for cohort_user in cohort_users:
+        completion = _build_completion(
+            strategy,
+            requirements,
+            assets_by_requirement,
+            completed_by_user[cohort_user.user_id],
+            used_macro_override=False,
+        )
+
+        if not completion["is_complete"] and _override_kwargs_from_cohort_user(cohort_user) is not None:
+            completion = _evaluate_cohort_user_completion(cohort_user, apply_macro_override=True)
+
+        result[cohort_user.id] = completion
+
+    return result
+
+
 def evaluate_cohort_user_completion(cohort_user: CohortUser) -> dict:
     logger.info(
         "Evaluating completion cohort_user_id=%s user_id=%s cohort_id=%s source_macro_cohort_id=%s",
@@ -410,6 +485,32 @@ def get_cached_or_evaluate_cohort_user_completion(cohort_user: CohortUser) -> di
     return evaluate_cohort_user_completion(cohort_user)
 
 
+def get_cached_or_evaluate_cohort_completion(cohort: Cohort, cohort_users: list[CohortUser]) -> dict[int, dict]:
+    """
+    Batched `get_cached_or_evaluate_cohort_user_completion`, keyed by cohort user id.
+
+    The cached completions are read with a single cache call and only the students without one are evaluated,
+    together, with `evaluate_cohort_completion`.
+    """
+
+    cache_keys = {}
+    for cohort_user in cohort_users:
+        cache_key = get_completion_cache_key(cohort_user)
+        if cache_key is not None:
+            cache_keys[cache_key] = cohort_user.id
+
+    cached = cache.get_many(list(cache_keys)) if cache_keys else {}
+
+    result = {}
+    for cache_key, completion in cached.items():
+        if isinstance(completion, dict) and completion.get("is_complete"):
+            result[cache_keys[cache_key]] = completion
+
+    missing = [x for x in cohort_users if x.id not in result]
+    result.update(evaluate_cohort_completion(cohort, missing))
+    return result
+
+
 def graduate_cohort_user_if_complete(cohort_user: CohortUser) -> tuple[bool, dict]:
     if cohort_user.educational_status == "GRADUATED":
         return False, get_cached_or_evaluate_cohort_user_completion(cohort_user)
@@ -0,0 +1,257 @@
+"""
+Precomputed student progress.
+
+The progress of an enrollment is computed from its tasks, its certificate and the syllabus of its cohort, it is
+stored in `StudentProgress` and refreshed one enrollment at a time when any of them changes, so the academy
+report only has to read it.
+"""
+
+from __future__ import annotations
+
+from logging import getLogger
+from typing import Any, Iterable, Optional
+
+from breathecode.admissions.models import Cohort, CohortUser, StudentProgress
+from breathecode.assignments.models import Task
+from breathecode.certificate.models import UserSpecialty
+
+__all__ = [
+    "PROGRESS_FIELDS",
+    "compute_student_progress",
+    "save_student_progress",
+    "get_student_progress",
+    "get_progress_difference",
+    "progress_percent",
+]
+
+logger = getLogger(__name__)
+
+Pair = tuple[int, int]
+
+PROGRESS_FIELDS = (
+    "total_units",
+    "completed_units",
+    "mandatory_projects",
+    "pending_projects",
+    "started",
+    "started_at",
+    "completion_date",
+    "certificate_token",
+)
+
+
+def get_syllabus_slugs(cohort: Cohort) -> tuple[set[str], set[str], set[str]]:
+    """Get the lessons, the exercises and the mandatory projects of the syllabus of a cohort."""
+
+    from .completion import get_syllabus_assets_by_type
+
+    if cohort.syllabus_version_id is None:
+        return set(), set(), set()
+
+    assets = get_syllabus_assets_by_type(cohort.syllabus_version, task_types=["LESSON", "EXERCISE"])
+    projects = get_syllabus_assets_by_type(cohort.syllabus_version, task_types=["PROJECT"], only_mandatory=True)
+
+    return assets["LESSON"], assets["EXERCISE"], projects["PROJECT"]
+
+
+def _is_completed(task: dict[str, Any]) -> bool:
+    if task["task_type"] == Task.TaskType.LESSON:
+        return task["task_status"] == Task.TaskStatus.DONE
+
+    if task["task_type"] == Task.TaskType.EXERCISE:
+        return task["revision_status"] == Task.RevisionStatus.APPROVED or task["task_status"] == Task.TaskStatus.DONE
+
+    if task["task_type"] == Task.TaskType.PROJECT:
+        return task["revision_status"] in [Task.RevisionStatus.APPROVED, Task.RevisionStatus.IGNORED]
+
+    return False
+
+
+def compute_student_progress(pairs: Iterable[Pair]) -> dict[Pair, dict[str, Any]]:
+    """
+    Compute the progress of a set of (user_id, cohort_id) enrollments from scratch.
+
+    The result of an enrollment only depends on its own tasks, certificate and cohort syllabus, it is the same no
+    matter which other enrollments are computed with it.
+    """
+
+    pairs = set(pairs)
+    if not pairs:
+        return {}
+
+    user_ids = {user_id for user_id, _ in pairs}
+    cohort_ids = {cohort_id for _, cohort_id in pairs}
+
+    slugs_by_cohort: dict[int, tuple[set[str], set[str], set[str]]] = {}
+    for cohort in Cohort.objects.filter(id__in=cohort_ids).select_related("syllabus_version"):
+        slugs_by_cohort[cohort.id] = get_syllabus_slugs(cohort)
+
+    empty = (set(), set(), set())
+    all_slugs: set[str] = set()
+    for lessons, exercises, projects in slugs_by_cohort.values():
+        all_slugs |= lessons | exercises | projects
+
+    # the history log only gets keys once the student has started
+    history_started: set[Pair] = set()
+    enrollments = CohortUser.objects.filter(user_id__in=user_ids, cohort_id__in=cohort_ids).values_list(
+        "user_id", "cohort_id", "history_log"
+    )
+    for user_id, cohort_id, history_log in enrollments:
+        if history_log:
+            history_started.add((user_id, cohort_id))
+
+    certificate_by_pair: dict[Pair, str] = {}
+    certificates = (
+        UserSpecialty.objects.filter(user_id__in=user_ids, cohort_id__in=cohort_ids)
+        .exclude(status="ERROR")
+        .order_by("id")
+        .values_list("user_id", "cohort_id", "token")
+    )
+    for user_id, cohort_id, token in certificates:
+        certificate_by_pair[(user_id, cohort_id)] = token
+
+    completed_by_pair: dict[Pair, dict[str, set[str]]] = {}
+    has_tasks: set[Pair] = set()
+    started_at_by_pair: dict[Pair, Any] = {}
+    completion_date_by_pair: dict[Pair, Any] = {}
+
+    tasks = []
+    if all_slugs:
+        tasks = (
+            Task.objects.filter(user_id__in=user_ids, cohort_id__in=cohort_ids, associated_slug__in=list(all_slugs))
+            .values(
+                "user_id",
+                "cohort_id",
+                "associated_slug",
+                "task_type",
+                "task_status",
+                "revision_status",
+                "opened_at",
+                "delivered_at",
+                "created_at",
+                "updated_at",
+            )
+            .iterator()
+        )
+
+    for task in tasks:
+        pair = (task["user_id"], task["cohort_id"])
+        if pair not in pairs:
+            continue
+
+        lessons, exercises, projects = slugs_by_cohort.get(pair[1], empty)
+        slug = task["associated_slug"]
+        is_unit = slug in lessons or slug in exercises
+
+        if is_unit:
+            has_tasks.add(pair)
+
+        if is_unit and task["task_type"] in [Task.TaskType.LESSON, Task.TaskType.EXERCISE]:
+            started_at = task["opened_at"] or task["delivered_at"] or task["created_at"]
+            if pair not in started_at_by_pair or started_at < started_at_by_pair[pair]:
+                started_at_by_pair[pair] = started_at
+
+            if task["task_status"] == Task.TaskStatus.DONE:
+                if pair not in completion_date_by_pair or task["updated_at"] > completion_date_by_pair[pair]:
+                    completion_date_by_pair[pair] = task["updated_at"]
+
+        if not _is_completed(task):
+            continue
+
+        expected = {
+            Task.TaskType.LESSON: lessons,
+            Task.TaskType.EXERCISE: exercises,
+            Task.TaskType.PROJECT: projects,
+        }.get(task["task_type"], set())
+
+        if slug in expected:
+            completed_by_pair.setdefault(pair, {}).setdefault(task["task_type"], set()).add(slug)
+
+    result: dict[Pair, dict[str, Any]] = {}
+    for pair in pairs:
+        lessons, exercises, projects = slugs_by_cohort.get(pair[1], empty)
+        completed = completed_by_pair.get(pair, {})
+
+        total_units = len(lessons) + len(exercises)
+        completed_units = len(completed.get(Task.TaskType.LESSON, set())) + len(
+            completed.get(Task.TaskType.EXERCISE, set())
+        )
+
+        result[pair] = {
+            "total_units": total_units,
+            "completed_units": min(completed_units, total_units),
+            "mandatory_projects": len(projects),
+            "pending_projects": len(projects - completed.get(Task.TaskType.PROJECT, set())),
+            "started": pair in has_tasks or pair in history_started,
+            "started_at": started_at_by_pair.get(pair),
+            "completion_date": completion_date_by_pair.get(pair),
+            "certificate_token": certificate_by_pair.get(pair),
+        }
+
+    return result
+
+
+def save_student_progress(pairs: Iterable[Pair]) -> dict[Pair, StudentProgress]:
+    """Compute the progress of the enrollments and store it, return the stored rows."""
+
+    progress = compute_student_progress(pairs)
+    if not progress:
+        return {}
+
+    instances = [
+        StudentProgress(user_id=user_id, cohort_id=cohort_id, **values)
+        for (user_id, cohort_id), values in progress.items()
+    ]
+
+    StudentProgress.objects.bulk_create(
+        instances,
+        update_conflicts=True,
+        unique_fields=["user", "cohort"],
+        update_fields=[*PROGRESS_FIELDS, "updated_at"],
+    )
+
+    logger.debug(f"{len(instances)} student progress rows saved")
+    return {(x.user_id, x.cohort_id): x for x in instances}
+
+
+def get_student_progress(pairs: Iterable[Pair]) -> dict[Pair, StudentProgress]:
+    """Get the stored progress of the enrollments, the missing ones are computed and stored on the fly."""
+
+    pairs = set(pairs)
+    if not pairs:
+        return {}
+
+    rows = StudentProgress.objects.filter(
+        user_id__in={user_id for user_id, _ in pairs}, cohort_id__in={cohort_id for _, cohort_id in pairs}
+    )
+    found = {(x.user_id, x.cohort_id): x for x in rows if (x.user_id, x.cohort_id) in pairs}
+
+    if missing := pairs - found.keys():
+        found.update(save_student_progress(missing))
+
+    return found
+
+
+def progress_percent(total_units: int, completed_units: int) -> tuple[int, bool]:
+    if total_units <= 0:
+        return 0, False
+
+    ratio = (completed_units / total_units) * 100.0
+    is_completed = ratio >= 99.99
+    progress = int(round(ratio))
+    progress = 0 if progress < 0 else progress
+    progress = 100 if progress > 100 else progress
+    if is_completed:
+        progress = 100
+    return progress, is_completed
+
+
+def get_progress_difference(stored: StudentProgress, expected: dict[str, Any]) -> Optional[dict[str, tuple]]:
+    """Compare a stored row with a fresh computation, return the fields that differ."""
+
+    difference = {}
+    for field in PROGRESS_FIELDS:
+        if getattr(stored, field) != expected[field]:
+            difference[field] = (getattr(stored, field), expected[field])
+
+    return difference or None
@@ -8,6 +8,7 @@ cohort_saved = emisor.signal("cohort_saved")
 cohort_log_saved = emisor.signal("cohort_log_saved")
 cohort_user_created = emisor.signal("cohort_user_created")
 cohort_stage_updated = emisor.signal("cohort_stage_updated")
+cohort_syllabus_version_updated = emisor.signal("cohort_syllabus_version_updated")
 
 academy_saved = emisor.signal("academy_saved")
 academy_reseller_changed = emisor.signal("academy_reseller_changed")
@@ -146,3 +146,27 @@ def build_profile_academy(academy_id: int, user_id: int, role: str = "student",
         logger.info("ProfileAcademy added")
     else:
         logger.info("ProfileAcademy already exists and is active")
+
+
+@task(priority=TaskPriority.STUDENT.value)
+def update_student_progress(user_id: int, cohort_id: int, **_: Any) -> None:
+    from .services.student_progress import save_student_progress
+
+    logger.info(f"Updating the progress of user {user_id} in cohort {cohort_id}")
+
+    if not CohortUser.objects.filter(user_id=user_id, cohort_id=cohort_id, role="STUDENT").exists():
+        raise AbortTask(f"User {user_id} is not a student of cohort {cohort_id}")
+
+    save_student_progress([(user_id, cohort_id)])
+
+
+@task(priority=TaskPriority.ACADEMY.value)
+def update_cohort_student_progress(cohort_id: int, **_: Any) -> None:
+    from .actions import REPORT_CHUNK_SIZE
+    from .services.student_progress import save_student_progress
+
+    logger.info(f"Updating the progress of the students of cohort {cohort_id}")
+
+    user_ids = list(CohortUser.objects.filter(cohort_id=cohort_id, role="STUDENT").values_list("user_id", flat=True))
+    for i in range(0, len(user_ids), REPORT_CHUNK_SIZE):
+        save_student_progress([(user_id, cohort_id) for user_id in user_ids[i : i + REPORT_CHUNK_SIZE]])
@@ -0,0 +1,132 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from breathecode.admissions.models import StudentProgress
+from breathecode.admissions.services.student_progress import (
+    compute_student_progress,
+    get_student_progress,
+    save_student_progress,
+)
+from breathecode.tests.mixins.breathecode_mixin.breathecode import Breathecode
+
+SYLLABUS = {
+    "days": [
+        {
+            "lessons": [{"slug": "lesson-1"}, {"slug": "lesson-2"}],
+            "replits": [{"slug": "exercise-1"}],
+        },
+        {
+            "assignments": [{"slug": "project-1", "mandatory": True}, {"slug": "project-2", "mandatory": False}],
+        },
+    ],
+}
+
+
+@pytest.fixture(autouse=True)
+def setup(db, bc: Breathecode):
+    def wrapper(tasks=None, **kwargs):
+        return bc.database.create(
+            cohort=1,
+            cohort_user={"role": "STUDENT"},
+            syllabus_version={"json": SYLLABUS},
+            task=tasks or [],
+            **kwargs,
+        )
+
+    yield wrapper
+
+
+def test_compute__without_tasks(setup):
+    model = setup()
+    pair = (model.user.id, model.cohort.id)
+
+    assert compute_student_progress([pair]) == {
+        pair: {
+            "total_units": 3,
+            "completed_units": 0,
+            "mandatory_projects": 1,
+            "pending_projects": 1,
+            "started": False,
+            "started_at": None,
+            "completion_date": None,
+            "certificate_token": None,
+        },
+    }
+
+
+def test_compute__with_tasks(setup):
+    model = setup(
+        tasks=[
+            {"associated_slug": "lesson-1", "task_type": "LESSON", "task_status": "DONE"},
+            {"associated_slug": "lesson-2", "task_type": "LESSON", "task_status": "PENDING"},
+            {"associated_slug": "exercise-1", "task_type": "EXERCISE", "revision_status": "APPROVED"},
+            {"associated_slug": "project-1", "task_type": "PROJECT", "revision_status": "APPROVED"},
+            {"associated_slug": "not-in-syllabus", "task_type": "LESSON", "task_status": "DONE"},
+        ]
+    )
+    pair = (model.user.id, model.cohort.id)
+
+    progress = compute_student_progress([pair])[pair]
+
+    assert progress["total_units"] == 3
+    assert progress["completed_units"] == 2
+    assert progress["pending_projects"] == 0
+    assert progress["started"] is True
+    assert progress["started_at"] == min(x.created_at for x in model.task[:3])
+    assert progress["completion_date"] == model.task[0].updated_at
+
+
+def test_save__updates_the_stored_row(setup, bc: Breathecode):
+    model = setup(tasks=[{"associated_slug": "lesson-1", "task_type": "LESSON", "task_status": "PENDING"}])
+    pair = (model.user.id, model.cohort.id)
+
+    save_student_progress([pair])
+
+    model.task.task_status = "DONE"
+    model.task.save()
+
+    save_student_progress([pair])
+
+    assert bc.database.list_of("admissions.StudentProgress") == [
+        {
+            "id": 1,
+            "user_id": model.user.id,
+            "cohort_id": model.cohort.id,
+            "total_units": 3,
+            "completed_units": 1,
+            "mandatory_projects": 1,
+            "pending_projects": 1,
+            "started": True,
+            "started_at": model.task.created_at,
+            "completion_date": model.task.updated_at,
+            "certificate_token": None,
+        },
+    ]
+
+
+def test_get__computes_the_missing_rows(setup):
+    model = setup()
+    pair = (model.user.id, model.cohort.id)
+
+    assert StudentProgress.objects.count() == 0
+
+    progress = get_student_progress([pair])
+
+    assert list(progress.keys()) == [pair]
+    assert StudentProgress.objects.count() == 1
+
+
+def test_check_command__fixes_stale_rows(setup):
+    model = setup()
+    pair = (model.user.id, model.cohort.id)
+
+    save_student_progress([pair])
+    StudentProgress.objects.update(completed_units=3)
+
+    out = StringIO()
+    call_command("check_student_progress", "--fix", stdout=out)
+
+    assert "1 of 1 rows differ from a fresh computation" in out.getvalue()
+    assert StudentProgress.objects.get().completed_units == 0
@@ -25,7 +25,7 @@ def _setup_reporting_role(database):
 
 
 def test_progress_report_is_filtered_by_cohort(database, client):
-    from breathecode.admissions.models import Cohort, CohortUser
+    from breathecode.admissions.models import Cohort, CohortUser, StudentProgress
     from breathecode.authenticate.models import ProfileAcademy
 
     role = _setup_reporting_role(database)
@@ -62,7 +62,7 @@ def test_progress_report_is_filtered_by_cohort(database, client):
     assert response["Content-Type"].startswith("text/csv")
     assert f'filename="cohort_{cohort_1.slug}_report.csv"' in response["Content-Disposition"]
 
-    content = response.content.decode("utf-8")
+    content = b"".join(response.streaming_content).decode("utf-8")
     rows = list(csv.reader(StringIO(content)))
 
     assert rows[0] == [
@@ -82,6 +82,11 @@ def test_progress_report_is_filtered_by_cohort(database, client):
     assert len(rows[1:]) == 2
     assert all(r[0] == cohort_1.name for r in rows[1:])
 
+    # the progress of the enrollments gets stored the first time it is requested
+    assert sorted(StudentProgress.objects.values_list("user_id", "cohort_id")) == sorted(
+        [(student_a.id, cohort_1.id), (student_b.id, cohort_1.id)]
+    )
+
 
 def test_progress_report_returns_404_if_cohort_not_in_academy(database, client):
     from breathecode.admissions.models import Cohort
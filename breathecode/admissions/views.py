@@ -2,6 +2,7 @@ import csv
 import json
 import logging
 import math
+from typing import Iterator
 
 import pytz
 from adrf.decorators import api_view
@@ -9,7 +10,7 @@ from capyc.core.i18n import translation
 from capyc.rest_framework.exceptions import ValidationException
 from django.contrib.auth.models import AnonymousUser, User
 from django.db.models import F, FloatField, Max, Q, Value
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import render
 from django.utils import timezone
 from rest_framework import status
@@ -33,6 +34,7 @@ from breathecode.utils import (
     capable_of,
     localize_query,
 )
+from breathecode.utils.admin_export_csv_mixin import Echo
 from breathecode.utils.decorators import has_permission
 from breathecode.utils.find_by_full_name import query_like_by_full_name
 from breathecode.utils.views import render_message
@@ -475,6 +477,35 @@ class AcademyReportView(APIView):
         return Response(users.data)
 
 
+PROGRESS_REPORT_HEADER = [
+    "course_name",
+    "student_full_name",
+    "student_email",
+    "enrollment_date",
+    "student_start_date",
+    "status",
+    "progress_percentage",
+    "completion_date",
+    "certificate_url",
+    "comments",
+]
+
+
+def progress_report_response(rows: Iterator[list], filename: str) -> StreamingHttpResponse:
+    writer = csv.writer(Echo())
+
+    def stream():
+        yield writer.writerow(PROGRESS_REPORT_HEADER)
+        for row in rows:
+            yield writer.writerow(row)
+
+    return StreamingHttpResponse(
+        stream(),
+        content_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 class AcademyReportCSVView(APIView):
     """
     Academy student progress report in CSV format.
@@ -508,28 +539,8 @@ class AcademyReportCSVView(APIView):
                 slug="academy-not-found",
             )
 
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = 'attachment; filename="academy_report.csv"'
-        writer = csv.writer(response)
-        writer.writerow(
-            [
-                "course_name",
-                "student_full_name",
-                "student_email",
-                "enrollment_date",
-                "student_start_date",
-                "status",
-                "progress_percentage",
-                "completion_date",
-                "certificate_url",
-                "comments",
-            ]
-        )
-
-        for row in academy_student_progress_report_rows(academy, lang=lang):
-            writer.writerow(row)
-
-        return response
+        rows = academy_student_progress_report_rows(academy, lang=lang)
+        return progress_report_response(rows, "academy_report.csv")
 
 
 class AcademyCohortReportCSVView(APIView):
@@ -570,31 +581,10 @@ class AcademyCohortReportCSVView(APIView):
 
         include_micro_cohorts = request.query_params.get("include_micro_cohorts", "false").lower() == "true"
 
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = f'attachment; filename="cohort_{cohort.slug}_report.csv"'
-
-        writer = csv.writer(response)
-        writer.writerow(
-            [
-                "course_name",
-                "student_full_name",
-                "student_email",
-                "enrollment_date",
-                "student_start_date",
-                "status",
-                "progress_percentage",
-                "completion_date",
-                "certificate_url",
-                "comments",
-            ]
-        )
-
-        for row in academy_student_progress_report_rows(
+        rows = academy_student_progress_report_rows(
             academy, lang=lang, cohort=cohort, include_micro_cohorts=include_micro_cohorts
-        ):
-            writer.writerow(row)
-
-        return response
+        )
+        return progress_report_response(rows, f"cohort_{cohort.slug}_report.csv")
 
 
 class AcademyActivateView(APIView):
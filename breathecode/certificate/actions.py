@@ -13,7 +13,14 @@ from django.contrib.auth.models import User
 from django.db.models import Q
 from django.utils import timezone
 
-from breathecode.admissions.models import CERTIFICATE_RECIPIENT_ROLES, FULLY_PAID, UP_TO_DATE, CohortUser, Syllabus, SyllabusVersion
+from breathecode.admissions.models import (
+    CERTIFICATE_RECIPIENT_ROLES,
+    FULLY_PAID,
+    UP_TO_DATE,
+    CohortUser,
+    Syllabus,
+    SyllabusVersion,
+)
 
 if TYPE_CHECKING:
     from breathecode.admissions.models import Cohort
@@ -140,6 +147,49 @@ def get_syllabus_specialty_bucket_conflict(specialty: Specialty, syllabus: Sylla
     )
 
 
+def get_certificate_layout(cohort: "Cohort", slug: Optional[str] = None) -> Optional[LayoutDesign]:
+    """Get the requested layout, falling back to the default layout of the academy and the global default."""
+
+    layout = LayoutDesign.objects.filter(slug=slug).first() if slug else None
+
+    if layout is None:
+        layout = LayoutDesign.objects.filter(is_default=True, academy=cohort.academy).first()
+
+    if layout is None:
+        layout = LayoutDesign.objects.filter(slug="default").first()
+
+    return layout
+
+
+def _validate_certificate_requirements(cohort: "Cohort", cohort_user: CohortUser, completion: dict) -> None:
+    pending_tasks = completion["pending_required_count"]
+    if completion["strategy"]["type"] != "NO_COMPLETION_STRATEGY" and not completion["is_complete"]:
+        raise ValidationException(
+            f"The student has {pending_tasks} pending tasks", slug=f"with-pending-tasks-{pending_tasks}"
+        )
+
+    if not (cohort_user.finantial_status == FULLY_PAID or cohort_user.finantial_status == UP_TO_DATE):
+        message = "The student must have finantial status FULLY_PAID or UP_TO_DATE"
+        raise ValidationException(message, slug="bad-finantial-status")
+
+    if cohort_user.educational_status != "GRADUATED":
+        raise ValidationException(
+            "The student must have educational " "status GRADUATED", slug="bad-educational-status"
+        )
+
+    if not cohort.never_ends and cohort.current_day != cohort.syllabus_version.syllabus.duration_in_days:
+        raise ValidationException(
+            "Cohort current day should be " f"{cohort.syllabus_version.syllabus.duration_in_days}",
+            slug="cohort-not-finished",
+        )
+
+    if not cohort.never_ends and cohort.stage != "ENDED":
+        raise ValidationException(
+            "The student cohort stage has to be 'ENDED' before you can issue any certificates",
+            slug="cohort-without-status-ended",
+        )
+
+
 def generate_certificate(user, cohort=None, layout=None):
     cohort_id = cohort.id if cohort else None
     logger.info(
@@ -245,13 +295,7 @@ def generate_certificate(user, cohort=None, layout=None):
             bool(uspe.preview_url),
         )
 
-    layout = LayoutDesign.objects.filter(slug=layout).first()
-
-    if layout is None:
-        layout = LayoutDesign.objects.filter(is_default=True, academy=cohort.academy).first()
-
-    if layout is None:
-        layout = LayoutDesign.objects.filter(slug="default").first()
+    layout = get_certificate_layout(cohort, layout)
 
     if layout is None:
         logger.warning(
@@ -303,31 +347,7 @@ def generate_certificate(user, cohort=None, layout=None):
             pending_tasks,
         )
 
-        if completion["strategy"]["type"] != "NO_COMPLETION_STRATEGY" and not completion["is_complete"]:
-            raise ValidationException(
-                f"The student has {pending_tasks} pending tasks", slug=f"with-pending-tasks-{pending_tasks}"
-            )
-
-        if not (cohort_user.finantial_status == FULLY_PAID or cohort_user.finantial_status == UP_TO_DATE):
-            message = "The student must have finantial status FULLY_PAID or UP_TO_DATE"
-            raise ValidationException(message, slug="bad-finantial-status")
-
-        if cohort_user.educational_status != "GRADUATED":
-            raise ValidationException(
-                "The student must have educational " "status GRADUATED", slug="bad-educational-status"
-            )
-
-        if not cohort.never_ends and cohort.current_day != cohort.syllabus_version.syllabus.duration_in_days:
-            raise ValidationException(
-                "Cohort current day should be " f"{cohort.syllabus_version.syllabus.duration_in_days}",
-                slug="cohort-not-finished",
-            )
-
-        if not cohort.never_ends and cohort.stage != "ENDED":
-            raise ValidationException(
-                "The student cohort stage has to be 'ENDED' before you can issue any certificates",
-                slug="cohort-without-status-ended",
-            )
+        _validate_certificate_requirements(cohort, cohort_user, completion)
 
         if not uspe.issued_at:
             uspe.issued_at = timezone.now()
@@ -413,13 +433,7 @@ def generate_certificate_ignoring_tasks(user, cohort=None, layout=None):
         if specialty.expiration_day_delta is not None:
             uspe.expires_at = utc_now + timezone.timedelta(days=specialty.expiration_day_delta)
 
-    layout = LayoutDesign.objects.filter(slug=layout).first()
-
-    if layout is None:
-        layout = LayoutDesign.objects.filter(is_default=True, academy=cohort.academy).first()
-
-    if layout is None:
-        layout = LayoutDesign.objects.filter(slug="default").first()
+    layout = get_certificate_layout(cohort, layout)
 
     if layout is None:
         raise ValidationException(
@@ -489,6 +503,161 @@ def generate_certificate_ignoring_tasks(user, cohort=None, layout=None):
     return uspe
 
 
+def queue_certificate_screenshots(certificates: list[UserSpecialty]) -> None:
+    """Queue the screenshot of the persisted certificates whose content changed."""
+
+    from .tasks import reset_screenshot, take_screenshot
+
+    for certificate in certificates:
+        if not certificate._hash_was_updated or certificate.status != PERSISTED:
+            continue
+
+        if certificate.preview_url:
+            logger.info("[CERT_SCREENSHOT] enqueue reset_screenshot user_specialty_id=%s", certificate.id)
+            reset_screenshot.delay(certificate.id)
+
+        else:
+            logger.info("[CERT_SCREENSHOT] enqueue take_screenshot user_specialty_id=%s", certificate.id)
+            take_screenshot.delay(certificate.id)
+
+
+def generate_certificates_for_cohort(cohort: "Cohort", layout: Optional[str] = None) -> list[UserSpecialty]:
+    """
+    Issue the certificates of all the students of a cohort at once.
+
+    It applies the same rules as `generate_certificate`, but the syllabus, the specialty, the layout and the main
+    teacher are resolved once, the completion of every student is read from the cache or computed from a single
+    task query and the certificates are written in bulk, so `user_specialty_saved` is not emitted, the screenshots
+    are queued in a single task after all the certificates were stored. Students that already have a certificate
+    with a screenshot are skipped.
+    """
+
+    from breathecode.admissions.services.completion import get_cached_or_evaluate_cohort_completion
+    from breathecode.admissions.tasks import update_cohort_student_progress
+
+    from .tasks import take_screenshots
+
+    if cohort.syllabus_version is None:
+        raise ValidationException(
+            f"The cohort has no syllabus assigned, please set a syllabus for cohort: {cohort.name}",
+            slug="missing-syllabus-version",
+        )
+
+    specialty = resolve_specialty_for_cohort(cohort)
+    if not specialty:
+        raise ValidationException("Specialty has no Syllabus assigned", slug="missing-specialty")
+
+    layout = get_certificate_layout(cohort, layout)
+    if layout is None:
+        raise ValidationException(
+            "No layout was specified and there is no default layout for this academy", slug="no-default-layout"
+        )
+
+    main_teacher = CohortUser.objects.filter(cohort__id=cohort.id, role="TEACHER").select_related("user").first()
+    if main_teacher is None or main_teacher.user is None:
+        raise ValidationException(
+            "This cohort does not have a main teacher, please assign it first", slug="without-main-teacher"
+        )
+
+    signed_by = main_teacher.user.first_name + " " + main_teacher.user.last_name
+
+    cohort_users = list(
+        CohortUser.objects.filter(cohort=cohort, role__in=CERTIFICATE_RECIPIENT_ROLES).select_related(
+            "cohort__syllabus_version__syllabus", "source_macro_cohort__syllabus_version"
+        )
+    )
+    existing = {x.user_id: x for x in UserSpecialty.objects.filter(cohort=cohort)}
+
+    cohort_users = [
+        x
+        for x in cohort_users
+        if not (x.user_id in existing and existing[x.user_id].status == PERSISTED and existing[x.user_id].preview_url)
+    ]
+    completions = get_cached_or_evaluate_cohort_completion(cohort, cohort_users)
+
+    utc_now = timezone.now()
+    expires_at = None
+    if specialty.expiration_day_delta is not None:
+        expires_at = utc_now + timezone.timedelta(days=specialty.expiration_day_delta)
+
+    to_create: list[UserSpecialty] = []
+    to_update: list[UserSpecialty] = []
+    for cohort_user in cohort_users:
+        uspe = existing.get(cohort_user.user_id)
+        if uspe is None:
+            uspe = UserSpecialty(
+                user_id=cohort_user.user_id,
+                cohort=cohort,
+                token=hashlib.sha1((str(cohort_user.user_id) + str(utc_now)).encode("UTF-8")).hexdigest(),
+                specialty=specialty,
+                signed_by_role=strings[cohort.language.lower()]["Main Instructor"],
+                expires_at=expires_at,
+            )
+            to_create.append(uspe)
+
+        else:
+            uspe.updated_at = utc_now
+            to_update.append(uspe)
+
+        uspe.layout = layout
+        uspe.signed_by = signed_by
+        uspe.academy_id = cohort.academy_id
+
+        try:
+            _validate_certificate_requirements(cohort, cohort_user, completions[cohort_user.id])
+
+            if not uspe.issued_at:
+                uspe.issued_at = utc_now
+
+            if expires_at:
+                uspe.expires_at = expires_at
+
+            uspe.status = PERSISTED
+            uspe.status_text = "Certificate successfully queued for PDF generation"
+
+        except ValidationException as e:
+            uspe.status = ERROR
+            uspe.status_text = str(e)
+
+        update_hash = uspe.generate_update_hash()
+        uspe._hash_was_updated = uspe.update_hash != update_hash
+        uspe.update_hash = update_hash
+
+    UserSpecialty.objects.bulk_create(to_create)
+    UserSpecialty.objects.bulk_update(
+        to_update,
+        [
+            "layout",
+            "signed_by",
+            "academy",
+            "issued_at",
+            "expires_at",
+            "status",
+            "status_text",
+            "update_hash",
+            "updated_at",
+        ],
+    )
+
+    certificates = to_create + to_update
+    logger.info(
+        "[GENERATE_CERTIFICATE] cohort batch cohort_id=%s created=%s updated=%s persisted=%s",
+        cohort.id,
+        len(to_create),
+        len(to_update),
+        len([x for x in certificates if x.status == PERSISTED]),
+    )
+
+    screenshots = [x.id for x in certificates if x._hash_was_updated and x.status == PERSISTED]
+    if screenshots:
+        logger.info("[CERT_SCREENSHOT] enqueue take_screenshots user_specialty_ids=%s", screenshots)
+        take_screenshots.delay(screenshots)
+
+    update_cohort_student_progress.delay(cohort.id)
+
+    return certificates
+
+
 def certificate_screenshot(certificate_id: int):
 
     certificate = UserSpecialty.objects.get(id=certificate_id)
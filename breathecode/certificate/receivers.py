@@ -8,7 +8,7 @@ import breathecode.certificate.tasks as tasks
 from breathecode.admissions.models import CohortUser, Syllabus
 from breathecode.admissions.signals import student_edu_status_updated
 
-from .actions import get_syllabus_specialty_bucket_conflict
+from .actions import get_syllabus_specialty_bucket_conflict, queue_certificate_screenshots
 from .models import Specialty, UserSpecialty
 from .signals import user_specialty_saved
 
@@ -24,19 +24,7 @@ def post_save_user_specialty(sender, instance: UserSpecialty, **kwargs):
         )
         return
 
-    if instance._hash_was_updated and instance.status == "PERSISTED" and instance.preview_url:
-        logger.info(
-            "[CERT_SCREENSHOT] enqueue reset_screenshot user_specialty_id=%s",
-            instance.id,
-        )
-        tasks.reset_screenshot.delay(instance.id)
-
-    elif instance._hash_was_updated and instance.status == "PERSISTED" and not instance.preview_url:
-        logger.info(
-            "[CERT_SCREENSHOT] enqueue take_screenshot user_specialty_id=%s",
-            instance.id,
-        )
-        tasks.take_screenshot.delay(instance.id)
+    queue_certificate_screenshots([instance])
 
 
 @receiver(student_edu_status_updated, sender=CohortUser)
@@ -1,3 +1,4 @@
+from capyc.rest_framework.exceptions import ValidationException
 from task_manager.core.exceptions import AbortTask, RetryTask
 from task_manager.django.decorators import task
 
@@ -48,18 +49,40 @@ def reset_screenshot(self, certificate_id, **_):
 
 
 @task(bind=True, priority=TaskPriority.CERTIFICATE.value)
-def generate_cohort_certificates(self, cohort_id, **_):
-    logger.debug("Starting generate_cohort_certificates")
-    from .actions import generate_certificate
-
-    cohort_users = CohortUser.objects.filter(cohort__id=cohort_id, role__in=CERTIFICATE_RECIPIENT_ROLES)
+@limit_per_dyno(1)
+def take_screenshots(self, certificate_ids, **_):
+    logger.debug("Starting take_screenshots")
+    # unittest.mock.patch is poor applying mocks
+    from .actions import certificate_screenshot, remove_certificate_screenshot
 
-    logger.debug(f"Generating certificate for {str(cohort_users.count())} students that GRADUATED")
-    for cu in cohort_users:
+    for certificate_id in certificate_ids:
         try:
-            generate_certificate(cu.user, cu.cohort)
+            # a certificate that changed its content replaces its previous screenshot
+            remove_certificate_screenshot(certificate_id)
+            certificate_screenshot(certificate_id)
+
         except Exception:
-            logger.exception(f"Error generating certificate for {str(cu.user.id)} cohort {str(cu.cohort.id)}")
+            logger.exception(f"Cannot take the screenshot of the certificate {certificate_id}")
+
+
+@task(bind=True, priority=TaskPriority.CERTIFICATE.value)
+def generate_cohort_certificates(self, cohort_id, layout=None, **_):
+    logger.debug("Starting generate_cohort_certificates")
+    from breathecode.admissions.models import Cohort
+
+    from .actions import generate_certificates_for_cohort
+
+    cohort = Cohort.objects.filter(id=cohort_id).exclude(stage="DELETED").select_related("academy").first()
+    if cohort is None:
+        raise AbortTask(f"Cohort {cohort_id} not found")
+
+    try:
+        certificates = generate_certificates_for_cohort(cohort, layout)
+
+    except ValidationException as e:
+        raise AbortTask(f"Cannot generate the certificates of cohort {cohort_id}: {e}")
+
+    logger.debug(f"{len(certificates)} certificates generated for cohort {cohort_id}")
 
 
 @task(bind=True, priority=TaskPriority.CERTIFICATE.value)
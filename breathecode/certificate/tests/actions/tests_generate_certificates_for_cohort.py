@@ -0,0 +1,163 @@
+from unittest.mock import MagicMock, call
+
+import pytest
+from capyc.rest_framework.exceptions import ValidationException
+
+import breathecode.admissions.tasks as admissions_tasks
+import breathecode.certificate.tasks as tasks
+from breathecode.admissions.models import CohortUser
+from breathecode.admissions.services.completion import cache_cohort_user_completion, evaluate_cohort_user_completion
+from breathecode.certificate.actions import generate_certificates_for_cohort
+from breathecode.tests.mixins.breathecode_mixin.breathecode import Breathecode
+
+SYLLABUS = {"days": [{"assignments": [{"slug": "project-1", "mandatory": True}]}]}
+
+
+@pytest.fixture(autouse=True)
+def setup(db, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(tasks.take_screenshot, "delay", MagicMock())
+    monkeypatch.setattr(tasks.reset_screenshot, "delay", MagicMock())
+    monkeypatch.setattr(tasks.take_screenshots, "delay", MagicMock())
+    monkeypatch.setattr(admissions_tasks.update_cohort_student_progress, "delay", MagicMock())
+    yield
+
+
+def cohort_users(n):
+    return [
+        {
+            "role": "STUDENT",
+            "user_id": i + 1,
+            "educational_status": "GRADUATED",
+            "finantial_status": "FULLY_PAID",
+        }
+        for i in range(n)
+    ] + [{"role": "TEACHER", "user_id": n + 1}]
+
+
+def create(bc: Breathecode, students=3, tasks=None, specialty=None):
+    return bc.database.create(
+        user=students + 1,
+        cohort={"stage": "ENDED", "never_ends": True, "language": "en"},
+        cohort_user=cohort_users(students),
+        syllabus={"duration_in_days": 1},
+        syllabus_version={"json": SYLLABUS},
+        specialty={"syllabuses": [1], **(specialty or {})},
+        layout_design={"slug": "default"},
+        task=tasks or [],
+    )
+
+
+def test_without_specialty(bc: Breathecode):
+    model = bc.database.create(
+        user=2,
+        cohort={"stage": "ENDED"},
+        cohort_user=cohort_users(1),
+        syllabus=1,
+        syllabus_version={"json": SYLLABUS},
+    )
+
+    with pytest.raises(ValidationException, match="missing-specialty"):
+        generate_certificates_for_cohort(model.cohort)
+
+    assert bc.database.list_of("certificate.UserSpecialty") == []
+
+
+def test_issue_in_bulk(bc: Breathecode, django_assert_max_num_queries):
+    model = create(
+        bc,
+        tasks=[
+            {"user_id": 1, "associated_slug": "project-1", "task_type": "PROJECT", "revision_status": "APPROVED"},
+            {"user_id": 2, "associated_slug": "project-1", "task_type": "PROJECT", "revision_status": "APPROVED"},
+            {"user_id": 3, "associated_slug": "project-1", "task_type": "PROJECT", "revision_status": "PENDING"},
+        ],
+    )
+
+    with django_assert_max_num_queries(12):
+        certificates = generate_certificates_for_cohort(model.cohort)
+
+    # the teachers are certificate recipients as well
+    assert sorted((x.user_id, x.status, x.status_text) for x in certificates) == [
+        (1, "PERSISTED", "Certificate successfully queued for PDF generation"),
+        (2, "PERSISTED", "Certificate successfully queued for PDF generation"),
+        (3, "ERROR", "with-pending-tasks-1"),
+        (4, "ERROR", "with-pending-tasks-1"),
+    ]
+
+    rows = bc.database.list_of("certificate.UserSpecialty")
+    assert len(rows) == 4
+    assert {x["signed_by"] for x in rows} == {f"{model.user[3].first_name} {model.user[3].last_name}"}
+    assert all(x["update_hash"] for x in rows)
+
+    persisted = sorted(x.id for x in certificates if x.status == "PERSISTED")
+    assert tasks.take_screenshots.delay.call_args_list == [call(persisted)]
+    assert tasks.take_screenshot.delay.call_args_list == []
+    assert admissions_tasks.update_cohort_student_progress.delay.call_args_list == [call(model.cohort.id)]
+
+
+def test_update_and_skip_issued(bc: Breathecode):
+    model = create(
+        bc,
+        students=2,
+        tasks=[{"user_id": 2, "associated_slug": "project-1", "task_type": "PROJECT", "revision_status": "APPROVED"}],
+    )
+    model2 = bc.database.create(
+        user_specialty=[
+            {
+                "user_id": 1,
+                "cohort": model.cohort,
+                "academy": model.academy,
+                "specialty": model.specialty,
+                "status": "PERSISTED",
+                "preview_url": "https://example.com/1.png",
+                "token": "1",
+            },
+            {
+                "user_id": 2,
+                "cohort": model.cohort,
+                "academy": model.academy,
+                "specialty": model.specialty,
+                "status": "ERROR",
+                "preview_url": None,
+                "token": "2",
+            },
+        ]
+    )
+
+    certificates = generate_certificates_for_cohort(model.cohort)
+
+    assert sorted(x.user_id for x in certificates) == [2, 3]
+    assert bc.database.get("certificate.UserSpecialty", model2.user_specialty[1].id, dict=False).status == "PERSISTED"
+    assert tasks.take_screenshots.delay.call_args_list == [call([model2.user_specialty[1].id])]
+    assert tasks.take_screenshot.delay.call_args_list == []
+    assert tasks.reset_screenshot.delay.call_args_list == []
+
+
+def test_expiration_of_the_errored_certificates(bc: Breathecode):
+    model = create(
+        bc,
+        students=2,
+        tasks=[{"user_id": 1, "associated_slug": "project-1", "task_type": "PROJECT", "revision_status": "APPROVED"}],
+        specialty={"expiration_day_delta": 30},
+    )
+
+    certificates = generate_certificates_for_cohort(model.cohort)
+
+    assert sorted((x.user_id, x.status) for x in certificates) == [(1, "PERSISTED"), (2, "ERROR"), (3, "ERROR")]
+    assert len({x.expires_at for x in certificates}) == 1
+    assert all(x["expires_at"] for x in bc.database.list_of("certificate.UserSpecialty"))
+
+
+def test_cached_completion(bc: Breathecode):
+    model = create(
+        bc,
+        students=2,
+        tasks=[{"user_id": 1, "associated_slug": "project-1", "task_type": "PROJECT", "revision_status": "APPROVED"}],
+    )
+
+    # the completion of the second student was cached when it graduated
+    cohort_users = CohortUser.objects.select_related("cohort__syllabus_version").order_by("id")
+    cache_cohort_user_completion(cohort_users[1], evaluate_cohort_user_completion(cohort_users[0]))
+
+    certificates = generate_certificates_for_cohort(model.cohort)
+
+    assert sorted((x.user_id, x.status) for x in certificates) == [(1, "PERSISTED"), (2, "PERSISTED"), (3, "ERROR")]
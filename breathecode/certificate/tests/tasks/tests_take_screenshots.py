@@ -0,0 +1,34 @@
+"""
+Tasks tests
+"""
+
+from unittest.mock import MagicMock, call, patch
+
+import breathecode.certificate.actions as actions
+
+from ...tasks import take_screenshots
+from ..mixins import CertificateTestCase
+
+
+class ActionCertificateScreenshotTestCase(CertificateTestCase):
+    """Tests action take_screenshots"""
+
+    @patch("breathecode.certificate.actions.certificate_screenshot", MagicMock())
+    @patch("breathecode.certificate.actions.remove_certificate_screenshot", MagicMock())
+    def test_take_screenshots__call_all_properly(self):
+        """take_screenshots replaces the screenshot of every certificate"""
+
+        take_screenshots.delay([1, 2])
+
+        self.assertEqual(actions.remove_certificate_screenshot.call_args_list, [call(1), call(2)])
+        self.assertEqual(actions.certificate_screenshot.call_args_list, [call(1), call(2)])
+
+    @patch("breathecode.certificate.actions.certificate_screenshot", MagicMock(side_effect=[Exception(), None]))
+    @patch("breathecode.certificate.actions.remove_certificate_screenshot", MagicMock())
+    def test_take_screenshots__certificate_screenshot_raise_a_exception(self):
+        """a failed screenshot does not stop the rest of the batch"""
+
+        take_screenshots.delay([1, 2])
+
+        self.assertEqual(actions.remove_certificate_screenshot.call_args_list, [call(1), call(2)])
+        self.assertEqual(actions.certificate_screenshot.call_args_list, [call(1), call(2)])
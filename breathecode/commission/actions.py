@@ -1,18 +1,19 @@
 from __future__ import annotations
 
 import logging
+import os
 from collections import defaultdict
-from datetime import datetime
+from datetime import date, datetime
 from typing import Any
 
 from django.contrib.auth.models import User
-from django.db.models import Sum
+from google.cloud import bigquery
 
 from breathecode.activity.actions import get_engagement_points, ENGAGEMENT_POINTS
 from breathecode.activity.models import ACTIVITY_TABLE_NAME
 from breathecode.admissions.models import Cohort
 from breathecode.assignments.models import Task
-from .models import GeekCreatorCohort
+from .models import GeekCreatorCohort, UserUsageCommission
 from breathecode.authenticate.models import ProfileAcademy
 from breathecode.payments.models import Invoice
 from breathecode.services.google_cloud.big_query import BigQuery
@@ -110,45 +111,31 @@ def filter_invoices_by_plans_and_cohorts(
     return filtered_invoices.distinct()
 
 
-def compute_usage_rows_and_total(
-    influencer: User,
-    start_dt: datetime,
-    end_dt: datetime,
-    usage_invoices,
-    eligible_cohort_ids: list[int],
-) -> tuple[list[dict[str, Any]], float, dict[int, dict[int, dict[str, float]]]]:
-    rows: list[dict[str, Any]] = []
-    total = 0.0
-    user_breakdown_by_cohort: dict[int, dict[int, dict[str, float]]] = defaultdict(lambda: defaultdict(dict))
+def get_engagement_kinds() -> tuple[list[str], list[str], list[str]]:
+    """Get the related types and kinds that earn points, and the kinds whose points depend on the task type."""
 
-    candidate_user_ids = list(usage_invoices.values_list("user_id", flat=True).distinct())
-
-    if not candidate_user_ids or not eligible_cohort_ids:
-        return rows, total, user_breakdown_by_cohort
+    related_types, kinds, task_kinds = set(), set(), set()
+    for (related_type, kind), points in ENGAGEMENT_POINTS.items():
+        if not any(x > 0 for x in points.values()):
+            continue
 
-    try:
-        client, project_id, dataset = BigQuery.client()
-    except Exception as e:
-        logger.warning(f"BigQuery not available: {e}. Skipping usage commission calculation.")
-        return rows, total, user_breakdown_by_cohort
+        related_types.add(related_type)
+        kinds.add(kind)
+        if len(points) > 1:
+            task_kinds.add(kind)
 
-    allowed = []
-    for (rt, k), v in ENGAGEMENT_POINTS.items():
-        if isinstance(v, dict):
-            if any(points > 0 for points in v.values()):
-                allowed.append((rt, k))
-        elif isinstance(v, (int, float)) and v > 0:
-            allowed.append((rt, k))
+    return sorted(related_types), sorted(kinds), sorted(task_kinds)
 
-    task_kinds = [kind for (_, kind) in allowed]
-    related_types = list({related_type for (related_type, _) in allowed})
 
-    kinds_in = ",".join([f"'{k}'" for k in task_kinds]) if task_kinds else "''"
-    rtypes_in = ",".join([f"'{t}'" for t in related_types]) if related_types else "''"
+def build_engagement_query(project_id: str, dataset: str) -> str:
+    """
+    Engagement of a set of users in a month, grouped by (user, cohort, related type, kind).
 
-    user_ids_in = ",".join(str(x) for x in set(candidate_user_ids))
+    Only the first event of each (user, related object, kind) earns points, the objects whose points depend on the
+    task type are returned in `related_ids`.
+    """
 
-    sql = f"""
+    return f"""
         WITH task_events AS (
           SELECT
             CAST(user_id AS INT64) AS user_id,
@@ -158,101 +145,180 @@ def compute_usage_rows_and_total(
             SAFE_CAST(meta.cohort AS INT64) AS cohort_id,
             TIMESTAMP(timestamp) AS ts
           FROM `{project_id}.{dataset}.{ACTIVITY_TABLE_NAME}`
-          WHERE related.type IN ({rtypes_in})
-            AND TIMESTAMP(timestamp) >= TIMESTAMP('{start_dt.isoformat()}')
-            AND TIMESTAMP(timestamp) <  TIMESTAMP('{end_dt.isoformat()}')
-            AND user_id IN ({user_ids_in})
-            AND kind IN ({kinds_in})
+          WHERE related.type IN UNNEST(@related_types)
+            AND TIMESTAMP(timestamp) >= @start
+            AND TIMESTAMP(timestamp) <  @end
+            AND user_id IN UNNEST(@user_ids)
+            AND kind IN UNNEST(@kinds)
+        ),
+        first_events AS (
+          SELECT AS VALUE ARRAY_AGG(t ORDER BY ts ASC LIMIT 1)[OFFSET(0)]
+          FROM task_events t
+          WHERE cohort_id IS NOT NULL
+          GROUP BY user_id, related_id, kind
         )
-        SELECT AS VALUE ARRAY_AGG(t ORDER BY ts ASC LIMIT 1)[OFFSET(0)]
-        FROM task_events t
-        WHERE cohort_id IS NOT NULL
-        GROUP BY user_id, related_id, kind
+        SELECT
+          user_id,
+          cohort_id,
+          related_type,
+          kind,
+          COUNT(*) AS events,
+          ARRAY_AGG(IF(kind IN UNNEST(@task_kinds), related_id, NULL) IGNORE NULLS) AS related_ids
+        FROM first_events
+        GROUP BY user_id, cohort_id, related_type, kind
     """
 
-    try:
-        bq_rows = list(client.query(sql).result())
-        logger.info(f"BigQuery returned {len(bq_rows)} rows")
 
-    except Exception:
-        logger.warning("BigQuery query failed. Skipping usage commission calculation.")
-        return rows, total, user_breakdown_by_cohort
+def get_engagement_points_by_user(
+    client,
+    project_id: str,
+    dataset: str,
+    start_dt: datetime,
+    end_dt: datetime,
+    user_ids: list[int],
+    eligible_cohort_ids: list[int],
+) -> tuple[dict[int, float], dict[int, dict[int, float]], dict[int, dict[int, dict[str, float]]]]:
+    """
+    Compute the engagement points of all the users with a single BigQuery job.
+
+    Returns the total points of each user, the points of each user in each eligible cohort and the points of each
+    user in each cohort by kind.
+    """
 
     user_total_points: dict[int, float] = defaultdict(float)
     user_cohort_points: dict[int, dict[int, float]] = defaultdict(dict)
+    user_breakdown_by_cohort: dict[int, dict[int, dict[str, float]]] = defaultdict(lambda: defaultdict(dict))
 
-    task_details = {}
-    assignment_review_related_ids = set()
-    processed_events = []
+    related_types, kinds, task_kinds = get_engagement_kinds()
+    if not user_ids or not kinds:
+        return user_total_points, user_cohort_points, user_breakdown_by_cohort
+
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ArrayQueryParameter("related_types", "STRING", related_types),
+            bigquery.ArrayQueryParameter("kinds", "STRING", kinds),
+            bigquery.ArrayQueryParameter("task_kinds", "STRING", task_kinds),
+            bigquery.ArrayQueryParameter("user_ids", "INT64", sorted(set(user_ids))),
+            bigquery.ScalarQueryParameter("start", "TIMESTAMP", start_dt),
+            bigquery.ScalarQueryParameter("end", "TIMESTAMP", end_dt),
+        ]
+    )
+
+    bq_rows = list(client.query(build_engagement_query(project_id, dataset), job_config=job_config).result())
+    logger.info(f"BigQuery returned {len(bq_rows)} grouped rows for {len(user_ids)} users")
 
+    related_ids = set()
     for r in bq_rows:
-        try:
-            user_id = int(r[0]) if len(r) > 0 else 0
-            related_type = str(r[1]) if len(r) > 1 else ""
-            related_id = int(r[2]) if len(r) > 2 else 0
-            kind = str(r[3]) if len(r) > 3 else ""
-            cohort_id = int(r[4]) if len(r) > 4 else 0
+        related_ids.update(r["related_ids"] or [])
 
-        except Exception:
-            continue
+    tasks = {}
+    if related_ids:
+        tasks = {
+            x["id"]: x
+            for x in Task.objects.filter(id__in=related_ids).values("id", "task_type", "revision_status").iterator()
+        }
+
+    eligible = set(eligible_cohort_ids)
 
-        if user_id <= 0 or not related_type or not kind or cohort_id <= 0:
+    def add(user_id: int, cohort_id: int, key: str, pts: float) -> None:
+        user_total_points[user_id] += pts
+        if cohort_id in eligible:
+            user_cohort_points[user_id][cohort_id] = user_cohort_points[user_id].get(cohort_id, 0.0) + pts
+
+        breakdown = user_breakdown_by_cohort[user_id][cohort_id]
+        breakdown[key] = breakdown.get(key, 0.0) + pts
+
+    for r in bq_rows:
+        user_id, cohort_id, related_type, kind = r["user_id"], r["cohort_id"], r["related_type"], r["kind"]
+        if not user_id or not cohort_id or not related_type or not kind:
             continue
 
-        if related_type == "assignments.Task" and kind == "assignment_review_status_updated":
-            assignment_review_related_ids.add(related_id)
-            processed_events.append((user_id, related_type, related_id, kind, cohort_id))
-        else:
-            pts = get_engagement_points(related_type, kind, related_id)
+        config = ENGAGEMENT_POINTS.get((related_type, kind), {})
+        if kind not in task_kinds:
+            pts = get_engagement_points(related_type, kind)
             if pts > 0:
-                breakdown_key = kind
-                user_total_points[user_id] += pts
-                if cohort_id in eligible_cohort_ids:
-                    user_cohort_points.setdefault(user_id, {})[cohort_id] = (
-                        user_cohort_points.get(user_id, {}).get(cohort_id, 0.0) + pts
-                    )
-                user_breakdown_by_cohort[user_id][cohort_id][breakdown_key] = (
-                    user_breakdown_by_cohort[user_id][cohort_id].get(breakdown_key, 0.0) + pts
-                )
-
-    if assignment_review_related_ids:
-        tasks = Task.objects.filter(id__in=assignment_review_related_ids).values("id", "task_type", "revision_status")
-        task_details = {task["id"]: task for task in tasks}
-
-    for user_id, related_type, related_id, kind, cohort_id in processed_events:
-        pts = get_engagement_points(related_type, kind, related_id)
-        if pts <= 0:
+                add(user_id, cohort_id, kind, pts * r["events"])
             continue
 
-        task = task_details.get(related_id)
-        if task and task["revision_status"] == Task.RevisionStatus.APPROVED:
-            breakdown_key = f"{kind}_{task['task_type']}"
-        else:
-            continue
+        # only the approved tasks earn points, depending on their type
+        for related_id in r["related_ids"] or []:
+            task = tasks.get(related_id)
+            if not task or task["revision_status"] != Task.RevisionStatus.APPROVED:
+                continue
 
-        user_total_points[user_id] += pts
-        if cohort_id in eligible_cohort_ids:
-            user_cohort_points.setdefault(user_id, {})[cohort_id] = (
-                user_cohort_points.get(user_id, {}).get(cohort_id, 0.0) + pts
-            )
-        user_breakdown_by_cohort[user_id][cohort_id][breakdown_key] = (
-            user_breakdown_by_cohort[user_id][cohort_id].get(breakdown_key, 0.0) + pts
+            pts = config.get(task["task_type"], config.get("base", 0.0))
+            if pts > 0:
+                add(user_id, cohort_id, f"{kind}_{task['task_type']}", pts)
+
+    return user_total_points, user_cohort_points, user_breakdown_by_cohort
+
+
+def get_paid_by_user_currency(usage_invoices) -> tuple[dict[tuple[int, int], float], dict[int, str]]:
+    """Load the invoices once, return the amount paid by each (user, currency) and the code of each currency."""
+
+    paid: dict[tuple[int, int], float] = defaultdict(float)
+    currency_map: dict[int, str] = {}
+
+    invoices = usage_invoices.values_list("id", "user_id", "currency_id", "currency__code", "amount")
+    for _, user_id, currency_id, currency_code, amount in invoices.iterator():
+        paid[(user_id, currency_id)] += float(amount or 0)
+        currency_map[currency_id] = currency_code
+
+    return paid, currency_map
+
+
+def compute_usage_rows_and_total(
+    influencer: User,
+    start_dt: datetime,
+    end_dt: datetime,
+    usage_invoices,
+    eligible_cohort_ids: list[int],
+    client=None,
+    strict: bool = False,
+) -> tuple[list[dict[str, Any]], float, dict[int, dict[int, dict[str, float]]]]:
+    """
+    Compute the usage commission of every (user, cohort, currency) of an influencer in a month.
+
+    All the users are computed with a single BigQuery job and a single pass over their invoices, `client` replaces
+    the BigQuery client, see `breathecode.commission.fake_big_query`. With `strict` the BigQuery errors are raised
+    instead of skipping the usage commissions.
+    """
+
+    rows: list[dict[str, Any]] = []
+    total = 0.0
+
+    paid_by_user_currency, currency_map = get_paid_by_user_currency(usage_invoices)
+    candidate_user_ids = sorted({user_id for user_id, _ in paid_by_user_currency.keys()})
+
+    if not candidate_user_ids or not eligible_cohort_ids:
+        return rows, total, defaultdict(lambda: defaultdict(dict))
+
+    project_id, dataset = os.getenv("GOOGLE_PROJECT_ID", "test"), os.getenv("BIGQUERY_DATASET", "")
+    if client is None:
+        try:
+            client, project_id, dataset = BigQuery.client()
+        except Exception as e:
+            if strict:
+                raise
+
+            logger.warning(f"BigQuery not available: {e}. Skipping usage commission calculation.")
+            return rows, total, defaultdict(lambda: defaultdict(dict))
+
+    try:
+        user_total_points, user_cohort_points, user_breakdown_by_cohort = get_engagement_points_by_user(
+            client, project_id, dataset, start_dt, end_dt, candidate_user_ids, eligible_cohort_ids
         )
 
-    paid_by_user_currency = (
-        usage_invoices.values("user_id", "currency_id")
-        .annotate(total_amount=Sum("amount"))
-        .values_list("user_id", "currency_id", "total_amount")
-    )
+    except Exception as e:
+        if strict:
+            raise
 
-    currency_map = {inv.currency_id: inv.currency.code for inv in usage_invoices}
+        logger.warning(f"BigQuery query failed: {e}. Skipping usage commission calculation.")
+        return rows, total, defaultdict(lambda: defaultdict(dict))
 
-    for user_id, currency_id, total_amount in paid_by_user_currency:
-        total_amount = float(total_amount or 0)
+    for (user_id, currency_id), total_amount in paid_by_user_currency.items():
         if total_amount <= 0:
             continue
-        if user_id not in user_total_points:
-            continue
 
         total_pts = user_total_points.get(user_id, 0.0)
         if total_pts <= 0:
@@ -260,8 +326,7 @@ def compute_usage_rows_and_total(
 
         pool = round(total_amount * 0.3, 2)
         cohort_points = user_cohort_points.get(user_id, {})
-        inf_pts = sum(cohort_points.values())
-        if inf_pts <= 0:
+        if sum(cohort_points.values()) <= 0:
             continue
 
         for cid, pts in cohort_points.items():
@@ -271,6 +336,7 @@ def compute_usage_rows_and_total(
                     "type": "usage",
                     "user_id": user_id,
                     "cohort_id": cid,
+                    "currency_id": currency_id,
                     "currency": currency_map.get(currency_id, ""),
                     "paid_amount": round(total_amount, 2),
                     "total_points": round(total_pts, 2),
@@ -281,3 +347,54 @@ def compute_usage_rows_and_total(
             total += round(cohort_commission, 2)
 
     return rows, total, user_breakdown_by_cohort
+
+
+def save_usage_commissions(
+    influencer_id: int,
+    month: date,
+    rows: list[dict[str, Any]],
+    user_breakdown_by_cohort: dict[int, dict[int, dict[str, float]]],
+) -> list[UserUsageCommission]:
+    """Upsert the `UserUsageCommission` of the usage rows of an influencer in a month."""
+
+    if not rows:
+        return []
+
+    cohort_academy_map = dict(
+        Cohort.objects.filter(id__in={row["cohort_id"] for row in rows}).values_list("id", "academy_id")
+    )
+
+    instances = [
+        UserUsageCommission(
+            influencer_id=influencer_id,
+            user_id=row["user_id"],
+            cohort_id=row["cohort_id"],
+            month=month,
+            currency_id=row["currency_id"],
+            academy_id=cohort_academy_map.get(row["cohort_id"]),
+            user_total_points=float(row["total_points"]),
+            cohort_points=float(row["cohort_points"]),
+            paid_amount=float(row["paid_amount"]),
+            commission_amount=float(row["commission"]),
+            details={"breakdown": user_breakdown_by_cohort.get(row["user_id"], {})},
+        )
+        for row in rows
+    ]
+
+    UserUsageCommission.objects.bulk_create(
+        instances,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["influencer", "user", "cohort", "month", "currency"],
+        update_fields=[
+            "academy",
+            "user_total_points",
+            "cohort_points",
+            "paid_amount",
+            "commission_amount",
+            "details",
+            "updated_at",
+        ],
+    )
+
+    return instances
@@ -0,0 +1,109 @@
+"""
+Stand-in for the BigQuery client used by the usage commissions.
+
+It evaluates the engagement query of `build_engagement_query` over a list of activities kept in memory, reading
+the same query parameters, so the usage commissions can be computed and benchmarked without a BigQuery project.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Optional
+
+__all__ = ["FakeBigQueryClient", "generate_activities"]
+
+
+class FakeQueryJob:
+    def __init__(self, rows: list[dict[str, Any]]):
+        self._rows = rows
+
+    def result(self) -> list[dict[str, Any]]:
+        return self._rows
+
+
+class FakeBigQueryClient:
+    """
+    Evaluate the engagement query over in-memory activities.
+
+    Each activity is a dict with `user_id`, `related_type`, `related_id`, `kind`, `cohort_id` and `timestamp`,
+    `latency` is the number of seconds each job takes, like the time a real job spends queued and scanning.
+    """
+
+    def __init__(self, activities: Iterable[dict[str, Any]] = (), latency: float = 0.0):
+        self.activities = list(activities)
+        self.latency = latency
+        self.jobs: list[str] = []
+
+    def query(self, sql: str, job_config=None) -> FakeQueryJob:
+        self.jobs.append(sql)
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        params = {x.name: x.values if hasattr(x, "values") else x.value for x in job_config.query_parameters}
+        related_types, kinds, task_kinds = set(params["related_types"]), set(params["kinds"]), set(params["task_kinds"])
+        user_ids = set(params["user_ids"])
+
+        # first event of each (user, related object, kind)
+        first: dict[tuple[int, int, str], dict[str, Any]] = {}
+        for activity in self.activities:
+            if (
+                activity["user_id"] not in user_ids
+                or activity["related_type"] not in related_types
+                or activity["kind"] not in kinds
+                or not params["start"] <= activity["timestamp"] < params["end"]
+                or activity["cohort_id"] is None
+            ):
+                continue
+
+            key = (activity["user_id"], activity["related_id"], activity["kind"])
+            if key not in first or activity["timestamp"] < first[key]["timestamp"]:
+                first[key] = activity
+
+        groups: dict[tuple[int, int, str, str], dict[str, Any]] = defaultdict(lambda: {"events": 0, "related_ids": []})
+        for activity in first.values():
+            key = (activity["user_id"], activity["cohort_id"], activity["related_type"], activity["kind"])
+            groups[key]["events"] += 1
+            if activity["kind"] in task_kinds:
+                groups[key]["related_ids"].append(activity["related_id"])
+
+        return FakeQueryJob(
+            [
+                {"user_id": user_id, "cohort_id": cohort_id, "related_type": related_type, "kind": kind, **group}
+                for (user_id, cohort_id, related_type, kind), group in groups.items()
+            ]
+        )
+
+
+def generate_activities(
+    user_ids: list[int],
+    cohort_ids: list[int],
+    task_ids: list[int],
+    start_dt: datetime,
+    end_dt: datetime,
+    per_user: int = 20,
+    seed: Optional[int] = None,
+) -> list[dict[str, Any]]:
+    """Generate random task activities of the users in the month."""
+
+    from .actions import get_engagement_kinds
+
+    rand = random.Random(seed)
+    related_types, kinds, _ = get_engagement_kinds()
+    seconds = int((end_dt - start_dt).total_seconds())
+
+    return [
+        {
+            "user_id": user_id,
+            "related_type": rand.choice(related_types),
+            "related_id": rand.choice(task_ids),
+            "kind": rand.choice(kinds),
+            "cohort_id": rand.choice(cohort_ids),
+            "timestamp": start_dt + timedelta(seconds=rand.randrange(seconds)),
+        }
+        for user_id in user_ids
+        for _ in range(per_user)
+    ]
@@ -0,0 +1,55 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from breathecode.commission.actions import get_engagement_points_by_user
+from breathecode.commission.fake_big_query import FakeBigQueryClient, generate_activities
+
+
+class Command(BaseCommand):
+    help = "Benchmark the usage commission engagement computation against a fake BigQuery client"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10000, help="How many users paid in the month")
+        parser.add_argument("--per-user", type=int, default=20, help="How many activities each user has")
+        parser.add_argument("--cohorts", type=int, default=5, help="How many eligible cohorts the influencer has")
+        parser.add_argument("--tasks", type=int, default=500, help="How many different tasks the activities use")
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.0,
+            help="Seconds that each BigQuery job takes, used to estimate the cost of one job per user",
+        )
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        tz = timezone.get_current_timezone()
+        start_dt = datetime(2025, 1, 1, tzinfo=tz)
+        end_dt = datetime(2025, 2, 1, tzinfo=tz)
+
+        user_ids = list(range(1, options["users"] + 1))
+        cohort_ids = list(range(1, options["cohorts"] + 1))
+        task_ids = list(range(1, options["tasks"] + 1))
+
+        activities = generate_activities(
+            user_ids, cohort_ids, task_ids, start_dt, end_dt, per_user=options["per_user"], seed=options["seed"]
+        )
+        client = FakeBigQueryClient(activities, latency=options["latency"])
+
+        started = time.perf_counter()
+        user_total_points, _, _ = get_engagement_points_by_user(
+            client, "test", "test", start_dt, end_dt, user_ids, cohort_ids
+        )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{len(activities)} activities of {len(user_ids)} users computed in {elapsed:.2f}s with "
+            f"{len(client.jobs)} BigQuery job(s), {len(user_total_points)} users earned points"
+        )
+
+        if options["latency"]:
+            self.stdout.write(
+                f"One job per user would have taken at least {len(user_ids) * options['latency']:.0f}s in latency"
+            )
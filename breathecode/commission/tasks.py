@@ -1,6 +1,6 @@
 import calendar
 import logging
-from typing import Any
+from typing import Any, Optional
 
 from task_manager.django.decorators import task
 from task_manager.core.exceptions import AbortTask, RetryTask
@@ -25,6 +25,7 @@ from .actions import (
     get_eligible_cohort_ids,
     filter_invoices_by_plans_and_cohorts,
     compute_usage_rows_and_total,
+    save_usage_commissions,
 )
 
 
@@ -77,199 +78,97 @@ def register_referral_from_invoice(invoice_id: int, **_: Any) -> None:
     )
 
 
-@task(priority=TaskPriority.BACKGROUND.value)
-def build_user_engagement_for_user_month(influencer_id: int, user_id: int, year: int, month: int, **_: Any) -> None:
-    influencer = User.objects.filter(id=influencer_id).first()
-    if not influencer:
-        raise AbortTask(f"Influencer with id {influencer_id} not found")
-
+def get_month_range(year: int, month: int) -> tuple[datetime, datetime]:
     tz = timezone.get_current_timezone()
     start_dt = datetime(year, month, 1, 0, 0, 0, tzinfo=tz)
-    next_year = year + (month // 12)
-    next_mon = 1 if month == 12 else month + 1
-    end_dt = datetime(next_year if month == 12 else year, next_mon, 1, 0, 0, 0, tzinfo=tz)
-
-    # Exclude users that used referral for this influencer in the same month
-    has_referral = GeekCreatorReferralCommission.objects.filter(
-        geek_creator_id=influencer_id,
-        buyer_id=user_id,
-        created_at__gte=start_dt,
-        created_at__lt=end_dt,
-    ).exists()
-    if has_referral:
-        raise AbortTask(
-            f"User {user_id} already has referral commission for influencer {influencer_id} in {year}-{month:02d}"
-        )
+    end_dt = datetime(year + (month // 12), 1 if month == 12 else month + 1, 1, 0, 0, 0, tzinfo=tz)
+    return start_dt, end_dt
+
+
+def build_usage_commissions(
+    influencer_id: int, year: int, month: int, user_ids: Optional[list[int]] = None
+) -> list[UserUsageCommission]:
+    """Compute and store the usage commissions of an influencer in a month with a single BigQuery job."""
+
+    start_dt, end_dt = get_month_range(year, month)
+
+    influencer = User.objects.filter(id=influencer_id).first()
+    if not influencer:
+        raise AbortTask(f"Couldn't find influencer with id {influencer_id}")
 
     academy_ids = get_geek_creator_academy_ids(influencer)
     eligible_cohort_ids = get_eligible_cohort_ids(influencer, academy_ids)
     if not eligible_cohort_ids:
         raise AbortTask(f"No eligible cohorts found for influencer {influencer_id}")
 
-    usage_invoices = Invoice.objects.select_related("bag", "currency", "academy", "user").filter(
-        user_id=user_id,
+    # users that used a referral of this influencer in the same month are excluded
+    usage_invoices = Invoice.objects.filter(
         status=Invoice.Status.FULFILLED,
+        amount__gt=0,
         refunded_at__isnull=True,
         paid_at__gte=start_dt,
         paid_at__lt=end_dt,
+    ).exclude(
+        user_id__in=GeekCreatorReferralCommission.objects.filter(
+            geek_creator_id=influencer_id, created_at__gte=start_dt, created_at__lt=end_dt
+        ).values_list("buyer_id", flat=True)
     )
-    if not usage_invoices.exists():
-        raise AbortTask(f"No usage invoices found for user {user_id} in {year}-{month:02d}")
+
+    if user_ids is not None:
+        usage_invoices = usage_invoices.filter(user_id__in=user_ids)
+
+    usage_invoices = filter_invoices_by_plans_and_cohorts(usage_invoices, None, None, eligible_cohort_ids)
 
     try:
         rows, _total, user_breakdown_by_cohort = compute_usage_rows_and_total(
-            influencer, start_dt, end_dt, usage_invoices, eligible_cohort_ids
+            influencer, start_dt, end_dt, usage_invoices, eligible_cohort_ids, strict=True
         )
     except Exception as e:
-        logger.error(f"BigQuery computation failed for user {user_id}, influencer {influencer_id}: {e}")
+        logger.error(f"BigQuery computation failed for influencer {influencer_id}: {e}")
         raise RetryTask("BigQuery computation failed, retrying in 300 seconds", countdown=300)
 
-    for row in rows:
-        if row["user_id"] != user_id:
-            continue
-        currency_obj = next((inv.currency for inv in usage_invoices if inv.currency.code == row["currency"]), None)
-        if not currency_obj:
-            logger.warning(f"No currency found for user {user_id}, currency code: {row['currency']}")
-            continue
-        user_breakdown = user_breakdown_by_cohort.get(user_id, {})
-
-        usage_commission, created = UserUsageCommission.objects.update_or_create(
-            influencer_id=influencer_id,
-            user_id=user_id,
-            cohort_id=row["cohort_id"],
-            month=start_dt.date().replace(day=1),
-            currency=currency_obj,
-            defaults={
-                "academy_id": Invoice.objects.filter(user_id=user_id).values_list("academy_id", flat=True).first(),
-                "user_total_points": float(row["total_points"]),
-                "cohort_points": float(row["cohort_points"]),
-                "paid_amount": float(row["paid_amount"]),
-                "commission_amount": float(row["commission"]),
-                "details": {"breakdown": user_breakdown},
-            },
-        )
+    return save_usage_commissions(influencer_id, start_dt.date(), rows, user_breakdown_by_cohort)
 
-        geek_creator_commission = GeekCreatorCommission.objects.filter(
-            influencer_id=influencer_id,
-            cohort_id=row["cohort_id"],
-            month=start_dt.date().replace(day=1),
-            currency=currency_obj,
-            commission_type=GeekCreatorCommission.CommissionType.USAGE,
-        ).first()
 
-        if geek_creator_commission:
-            usage_commission.geek_creator_commission = geek_creator_commission
-            usage_commission.save()
+@task(priority=TaskPriority.BACKGROUND.value)
+def build_user_engagement_for_user_month(influencer_id: int, user_id: int, year: int, month: int, **_: Any) -> None:
+    """Recompute the usage commissions of a single user, the monthly build computes all the users at once."""
 
-        logger.info(
-            f"Successfully processed commission for user {user_id}, influencer {influencer_id}, cohort {row['cohort_id']}"
-        )
+    commissions = build_usage_commissions(influencer_id, year, month, user_ids=[user_id])
+    logger.info(f"{len(commissions)} usage commissions stored for user {user_id}, influencer {influencer_id}")
 
 
 @task(priority=TaskPriority.BACKGROUND.value)
 def build_commissions_for_month(influencer_id: int, year: int, month: int, **_: Any) -> None:
-    print(
-        f"\033[33m[COMMISSION PROCESS] 🚀 Starting commission build for influencer {influencer_id}, month {year}-{month:02d}\033[0m"
-    )
-
-    tz = timezone.get_current_timezone()
-    start_dt = datetime(year, month, 1, 0, 0, 0, tzinfo=tz)
-    end_dt = datetime(year + (month // 12), 1 if month == 12 else month + 1, 1, 0, 0, 0, tzinfo=tz)
-
-    usage_invoices = Invoice.objects.filter(
-        status=Invoice.Status.FULFILLED,
-        amount__gt=0,
-        refunded_at__isnull=True,
-        paid_at__gte=start_dt,
-        paid_at__lt=end_dt,
-    ).exclude(
-        user_id__in=GeekCreatorReferralCommission.objects.filter(
-            geek_creator_id=influencer_id, created_at__gte=start_dt, created_at__lt=end_dt
-        ).values_list("buyer_id", flat=True)
-    )
+    logger.info(f"Starting commission build for influencer {influencer_id}, month {year}-{month:02d}")
 
-    influencer = User.objects.filter(id=influencer_id).first()
-    if not influencer:
-        raise AbortTask(f"Couldn't find influencer with id {influencer_id}")
+    commissions = build_usage_commissions(influencer_id, year, month)
+    logger.info(f"{len(commissions)} usage commissions stored for influencer {influencer_id}, month {year}-{month:02d}")
 
-    academy_ids = get_geek_creator_academy_ids(influencer)
-    eligible_cohort_ids = get_eligible_cohort_ids(influencer, academy_ids)
-    if not eligible_cohort_ids:
-        raise AbortTask(f"No eligible cohorts found for influencer {influencer_id}")
-
-    usage_invoices = filter_invoices_by_plans_and_cohorts(usage_invoices, None, None, eligible_cohort_ids)
-
-    user_ids = list(usage_invoices.values_list("user_id", flat=True).distinct())
-
-    if not user_ids:
-        raise AbortTask(
-            f"No users found for commission processing for influencer {influencer_id} in {year}-{month:02d}"
-        )
-
-    batch_size = 100
-    for i in range(0, len(user_ids), batch_size):
-        batch_user_ids = user_ids[i : i + batch_size]
-
-        process_user_batch.delay(
-            influencer_id=influencer_id,
-            user_ids=batch_user_ids,
-            year=year,
-            month=month,
-            batch_number=i // batch_size + 1,
-            total_batches=(len(user_ids) + batch_size - 1) // batch_size,
-        )
-
-    final_aggregation_delay = max(300, len(user_ids) // 10)
-    aggregate_commissions_for_month.apply_async(args=[influencer_id, year, month], countdown=final_aggregation_delay)
-
-    print(
-        f"\033[33m[COMMISSION PROCESS] 📋 Scheduled {len(user_ids)} users in {(len(user_ids) + batch_size - 1) // batch_size} batches for influencer {influencer_id}, final aggregation in {final_aggregation_delay}s\033[0m"
-    )
+    aggregate_commissions_for_month.delay(influencer_id, year, month)
 
 
 @task(priority=TaskPriority.BACKGROUND.value)
 def process_user_batch(
     influencer_id: int, user_ids: list[int], year: int, month: int, batch_number: int, total_batches: int, **_: Any
 ) -> None:
-    """Process a batch of users for commission calculation."""
+    """Recompute the usage commissions of a batch of users with a single BigQuery job."""
+
     if not user_ids:
         raise AbortTask(f"Empty user batch {batch_number}/{total_batches} for influencer {influencer_id}")
 
-    print(
-        f"\033[33m[COMMISSION BATCH] 🚀 Starting batch {batch_number}/{total_batches} for influencer {influencer_id} - {len(user_ids)} users\033[0m"
-    )
-
+    commissions = build_usage_commissions(influencer_id, year, month, user_ids=user_ids)
     logger.info(
-        f"Processing batch {batch_number}/{total_batches} for influencer {influencer_id}, users: {len(user_ids)}"
-    )
-
-    failed_users = []
-    for user_id in user_ids:
-        try:
-            build_user_engagement_for_user_month.delay(influencer_id, user_id, year, month)
-        except Exception as e:
-            logger.error(f"Failed to schedule user {user_id} for influencer {influencer_id}: {e}")
-            failed_users.append(user_id)
-
-    if failed_users:
-        logger.warning(
-            f"Batch {batch_number}/{total_batches} completed with {len(failed_users)} failed users: {failed_users}"
-        )
-    else:
-        logger.info(f"Batch {batch_number}/{total_batches} completed successfully for all {len(user_ids)} users")
-
-    print(
-        f"\033[33m[COMMISSION BATCH] ✅ Batch {batch_number}/{total_batches} completed for influencer {influencer_id} - {len(user_ids)} users processed\033[0m"
+        f"Batch {batch_number}/{total_batches} for influencer {influencer_id} stored {len(commissions)} usage "
+        "commissions"
     )
 
 
 @task(priority=TaskPriority.BACKGROUND.value)
 def aggregate_commissions_for_month(influencer_id: int, year: int, month: int, **_: Any) -> None:
     """Aggregate all user commissions into TeacherInfluencerCommission records."""
-    tz = timezone.get_current_timezone()
-    start_dt = datetime(year, month, 1, 0, 0, 0, tzinfo=tz)
-    month_date = start_dt.date().replace(day=1)
-    end_dt = datetime(year + (month // 12), 1 if month == 12 else month + 1, 1, 0, 0, 0, tzinfo=tz)
+    start_dt, end_dt = get_month_range(year, month)
+    month_date = start_dt.date()
 
     usage_agg = (
         UserUsageCommission.objects.filter(influencer_id=influencer_id, month=month_date)
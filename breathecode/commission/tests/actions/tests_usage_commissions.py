@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from breathecode.commission.actions import (
+    compute_usage_rows_and_total,
+    get_engagement_points_by_user,
+    save_usage_commissions,
+)
+from breathecode.commission.fake_big_query import FakeBigQueryClient
+from breathecode.commission.models import UserUsageCommission
+from breathecode.payments.models import Invoice
+from breathecode.tests.mixins.breathecode_mixin.breathecode import Breathecode
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+END = datetime(2025, 2, 1, tzinfo=timezone.utc)
+
+
+def activity(user_id, kind, related_id, cohort_id, days=1):
+    return {
+        "user_id": user_id,
+        "related_type": "assignments.Task",
+        "related_id": related_id,
+        "kind": kind,
+        "cohort_id": cohort_id,
+        "timestamp": START + timedelta(days=days),
+    }
+
+
+@pytest.fixture
+def client():
+    return FakeBigQueryClient(
+        [
+            activity(1, "read_assignment", 10, 1),
+            # only the first event of each task counts
+            activity(1, "read_assignment", 10, 1, days=2),
+            activity(1, "assignment_status_updated", 10, 2),
+            activity(1, "assignment_review_status_updated", 10, 1),
+            activity(1, "assignment_review_status_updated", 11, 1),
+            activity(2, "open_syllabus_module", 12, 1),
+            # out of the month
+            activity(2, "open_syllabus_module", 13, 1, days=40),
+        ]
+    )
+
+
+def test_engagement__single_job(db, bc: Breathecode, client):
+    bc.database.create(
+        task=[
+            {"id": 10, "task_type": "PROJECT", "revision_status": "APPROVED"},
+            {"id": 11, "task_type": "EXERCISE", "revision_status": "PENDING"},
+        ]
+    )
+
+    total, by_cohort, breakdown = get_engagement_points_by_user(client, "test", "test", START, END, [1, 2], [1])
+
+    assert len(client.jobs) == 1
+    assert dict(total) == {1: 5.5, 2: 0.5}
+    assert dict(by_cohort) == {1: {1: 4.5}, 2: {1: 0.5}}
+    assert breakdown[1] == {
+        1: {"read_assignment": 0.5, "assignment_review_status_updated_PROJECT": 4.0},
+        2: {"assignment_status_updated": 1.0},
+    }
+
+
+def test_compute_and_save(db, bc: Breathecode, client):
+    model = bc.database.create(
+        user=2,
+        cohort=1,
+        currency=1,
+        invoice=[
+            {"user_id": 1, "amount": 100, "status": "FULFILLED", "paid_at": START + timedelta(days=1)},
+            {"user_id": 1, "amount": 50, "status": "FULFILLED", "paid_at": START + timedelta(days=1)},
+        ],
+    )
+    influencer = model.user[1]
+
+    rows, total, breakdown = compute_usage_rows_and_total(
+        influencer, START, END, Invoice.objects.all(), [model.cohort.id], client=client
+    )
+
+    assert rows == [
+        {
+            "type": "usage",
+            "user_id": 1,
+            "cohort_id": model.cohort.id,
+            "currency_id": model.currency.id,
+            "currency": model.currency.code,
+            "paid_amount": 150.0,
+            "total_points": 1.5,
+            "cohort_points": 0.5,
+            "commission": 15.0,
+        }
+    ]
+    assert total == 15.0
+
+    save_usage_commissions(influencer.id, START.date(), rows, breakdown)
+    rows[0]["commission"] = 20.0
+    save_usage_commissions(influencer.id, START.date(), rows, breakdown)
+
+    assert UserUsageCommission.objects.count() == 1
+    commission = UserUsageCommission.objects.get()
+    assert commission.commission_amount == 20.0
+    assert commission.academy_id == model.cohort.academy_id
@@ -7,7 +7,6 @@ import pandas as pd
 from capyc.core.i18n import translation
 from capyc.rest_framework.exceptions import ValidationException
 from django.contrib.auth.models import User
-from django.db import transaction
 from django.db.models import Sum, Count, Q
 from django.http import HttpResponse
 from django.utils import timezone
@@ -15,7 +14,6 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from breathecode.authenticate.actions import get_user_language
-from breathecode.admissions.models import Cohort
 from breathecode.commission.models import (
     GeekCreatorReferralCommission,
     GeekCreatorCommission,
@@ -29,6 +27,7 @@ from .actions import (
     get_eligible_cohort_ids,
     filter_invoices_by_plans_and_cohorts,
     compute_usage_rows_and_total,
+    save_usage_commissions,
 )
 from .serializers import (
     CommissionReportResponseSerializer,
@@ -139,9 +138,7 @@ class InfluencerPayoutReportView(APIView):
         )
 
         # Create/update UserUsageCommission records
-        self._create_usage_commissions(
-            influencer, usage_rows, user_breakdown_by_cohort, start_dt, usage_data["currency_map"]
-        )
+        save_usage_commissions(influencer.id, month_date, usage_rows, user_breakdown_by_cohort)
 
         # Build TeacherInfluencerCommission records
         usage_commissions = self._build_usage_teacher_commissions(influencer, month_date)
@@ -307,67 +304,13 @@ class InfluencerPayoutReportView(APIView):
             influencer, start_dt, end_dt, usage_invoices, eligible_cohort_ids
         )
 
-        # Create currency map
-        currency_map = {inv.currency_id: inv.currency for inv in usage_invoices}
-
         return {
             "rows": usage_rows,
             "total": usage_total,
             "breakdown": user_breakdown_by_cohort,
-            "currency_map": currency_map,
             "invoices": usage_invoices,
         }
 
-    def _create_usage_commissions(
-        self, influencer: User, usage_rows: list, user_breakdown_by_cohort: dict, start_dt: datetime, currency_map: dict
-    ) -> None:
-        """Create or update UserUsageCommission records."""
-        cohort_ids = {row["cohort_id"] for row in usage_rows}
-        cohort_academy_map = {
-            cohort["id"]: cohort["academy_id"]
-            for cohort in Cohort.objects.filter(id__in=cohort_ids).values("id", "academy_id")
-        }
-
-        with transaction.atomic():
-            for row in usage_rows:
-                uid = row["user_id"]
-                cid = row["cohort_id"]
-                currency_code = row["currency"]
-                currency_obj = next((c for c in currency_map.values() if c.code == currency_code), None)
-                if not currency_obj:
-                    continue
-
-                user_breakdown = user_breakdown_by_cohort.get(uid, {})
-                academy_id = cohort_academy_map.get(cid)
-
-                obj, created = UserUsageCommission.objects.get_or_create(
-                    influencer=influencer,
-                    user_id=uid,
-                    cohort_id=cid,
-                    month=start_dt.date().replace(day=1),
-                    currency=currency_obj,
-                    defaults={
-                        "academy_id": academy_id,
-                        "user_total_points": float(row["total_points"]),
-                        "cohort_points": float(row["cohort_points"]),
-                        "paid_amount": float(row["paid_amount"]),
-                        "commission_amount": float(row["commission"]),
-                        "details": {"breakdown": user_breakdown},
-                    },
-                )
-
-                if not created:
-                    current_total = float(row["total_points"])
-                    current_paid = float(row["paid_amount"])
-
-                    if abs(obj.user_total_points - current_total) > 0.01 or abs(obj.paid_amount - current_paid) > 0.01:
-                        obj.user_total_points = current_total
-                        obj.cohort_points = float(row["cohort_points"])
-                        obj.paid_amount = current_paid
-                        obj.commission_amount = float(row["commission"])
-                        obj.details = {"breakdown": user_breakdown}
-                        obj.save()
-
     def _build_usage_teacher_commissions(self, influencer: User, month_date: datetime) -> list:
         """Build TeacherInfluencerCommission records for usage."""
         usage_agg = (
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from breathecode.commons import tasks
+from breathecode.utils import COUNTERS
+
+
+class Command(BaseCommand):
+    help = "Flush the counters buffered in Redis to the database"
+
+    def handle(self, *args, **options):
+        tasks.load_counters()
+
+        for key in COUNTERS:
+            tasks.flush_counter.delay(key)
+
+        self.stdout.write(self.style.SUCCESS(f"{len(COUNTERS)} counters scheduled to be flushed"))
@@ -5,7 +5,7 @@ from task_manager.core.exceptions import AbortTask, RetryTask
 from task_manager.django.decorators import task
 
 from breathecode.commons import actions
-from breathecode.utils import CACHE_DESCRIPTORS
+from breathecode.utils import CACHE_DESCRIPTORS, COUNTERS
 from breathecode.utils.decorators import TaskPriority
 
 logger = logging.getLogger(__name__)
@@ -56,3 +56,24 @@ def clean_task(self, key: str, task_manager_id: int):
 
     except Exception:
         raise RetryTask(f"Could not clean the cache {key}", log=actions.is_output_enable())
+
+
+def load_counters():
+    # make sure all the counters are registered
+    from breathecode.marketing import counters as _  # noqa: F811, F401
+    from breathecode.media import counters as _  # noqa: F811, F401
+
+
+@task(bind=True, priority=TaskPriority.CACHE.value)
+def flush_counter(self, key: str, task_manager_id: int):
+    load_counters()
+
+    if key not in COUNTERS:
+        raise AbortTask(f"Counter {key} not found")
+
+    try:
+        updated = COUNTERS[key].flush()
+        logger.info(f"{updated} rows updated from the counter {key}")
+
+    except Exception:
+        raise RetryTask(f"Could not flush the counter {key}")
@@ -11,6 +11,7 @@ from django.utils import timezone
 
 from breathecode.events.caches import EventCache
 from breathecode.payments import tasks
+from breathecode.payments.models import ConsumptionSession
 from breathecode.tests.mixins.breathecode_mixin.breathecode import Breathecode
 
 from ..mixins.new_events_tests_case import EventTestCase
@@ -24,6 +25,14 @@ def setup(db):
 
 
 def consumption_session(event, event_type_set, user, consumable, data={}):
+    request = {
+        "args": [],
+        "headers": {"academy": None},
+        "kwargs": {
+            "event_id": event.id,
+        },
+        "user": user.id,
+    }
     return {
         "consumable_id": consumable.id,
         "duration": timedelta(),
@@ -34,14 +43,8 @@ def consumption_session(event, event_type_set, user, consumable, data={}):
         "path": "payments.EventTypeSet",
         "related_id": event_type_set.id,
         "related_slug": event_type_set.slug,
-        "request": {
-            "args": [],
-            "headers": {"academy": None},
-            "kwargs": {
-                "event_id": event.id,
-            },
-            "user": user.id,
-        },
+        "request": request,
+        "request_hash": ConsumptionSession.hash_request(request),
         "status": "PENDING",
         "user_id": user.id,
         "was_discounted": False,
@@ -10,6 +10,7 @@ from django.utils import timezone
 from breathecode.events import tasks as tasks_events
 from breathecode.events.caches import EventCache
 from breathecode.payments import tasks
+from breathecode.payments.models import ConsumptionSession
 
 from ..mixins.new_events_tests_case import EventTestCase
 
@@ -22,6 +23,14 @@ def setup(db):
 
 
 def consumption_session(live_class, cohort_set, user, consumable, data={}):
+    request = {
+        "args": [],
+        "headers": {"academy": None},
+        "kwargs": {
+            "hash": live_class.hash,
+        },
+        "user": user.id,
+    }
     return {
         "consumable_id": consumable.id,
         "duration": timedelta(),
@@ -32,14 +41,8 @@ def consumption_session(live_class, cohort_set, user, consumable, data={}):
         "path": "payments.CohortSet",
         "related_id": cohort_set.id,
         "related_slug": cohort_set.slug,
-        "request": {
-            "args": [],
-            "headers": {"academy": None},
-            "kwargs": {
-                "hash": live_class.hash,
-            },
-            "user": user.id,
-        },
+        "request": request,
+        "request_hash": ConsumptionSession.hash_request(request),
         "status": "PENDING",
         "user_id": user.id,
         "was_discounted": False,
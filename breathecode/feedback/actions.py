@@ -1,11 +1,13 @@
 import datetime
 import json
 import logging
+import uuid
 
 from capyc.rest_framework.exceptions import ValidationException
 from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
 from django.db import models as django_models
-from django.db.models import Avg, Q, QuerySet
+from django.db.models import Avg, Count, F, Q
 from django.utils import timezone
 
 import breathecode.notify.actions as notify_actions
@@ -24,6 +26,7 @@ from .models import (
     Survey,
     SurveyConfiguration,
     SurveyResponse,
+    SurveyScoreAggregate,
     SurveyStudy,
 )
 from .services.pusher_service import send_survey_event
@@ -44,14 +47,28 @@ def _update_stats_for_survey_study(survey_study) -> None:
         SurveyResponse.Status.PARTIAL,
         SurveyResponse.Status.ANSWERED,
     ]
-    stats = {
-        "sent": qs.count(),
-        "opened": qs.filter(Q(opened_at__isnull=False) | Q(status__in=opened_statuses)).count(),
-        "partial_responses": qs.filter(status=SurveyResponse.Status.PARTIAL).count(),
-        "responses": qs.filter(status=SurveyResponse.Status.ANSWERED).count(),
-        "email_opened": qs.filter(email_opened_at__isnull=False).count(),
-        "updated_at": timezone.now().isoformat(),
+    stats = qs.aggregate(
+        sent=Count("id"),
+        opened=Count("id", filter=Q(opened_at__isnull=False) | Q(status__in=opened_statuses)),
+        partial_responses=Count("id", filter=Q(status=SurveyResponse.Status.PARTIAL)),
+        responses=Count("id", filter=Q(status=SurveyResponse.Status.ANSWERED)),
+        email_opened=Count("id", filter=Q(email_opened_at__isnull=False)),
+    )
+
+    aggregates = SurveyScoreAggregate.objects.filter(survey_study=survey_study)
+    stats["scores"] = {
+        "average": next((x.average for x in aggregates if x.scope == SurveyScoreAggregate.Scope.TOTAL), None),
+        "questions": {
+            x.key: {"count": x.count, "average": x.average, "histogram": x.histogram}
+            for x in aggregates
+            if x.scope == SurveyScoreAggregate.Scope.QUESTION
+        },
     }
+    stats["updated_at"] = timezone.now().isoformat()
+
+    # progress of the emails sent by send_survey_response_emails
+    if isinstance(survey_study.stats, dict) and "dispatch" in survey_study.stats:
+        stats["dispatch"] = survey_study.stats["dispatch"]
 
     survey_study.stats = stats
     survey_study.save(update_fields=["stats", "updated_at"])
@@ -108,9 +125,10 @@ def send_cohort_survey_group(survey=None, cohort=None):
                 slug="no-cohort-survey",
             )
 
+        user_ids = []
         for uc in ucs:
             if uc.educational_status in ["ACTIVE", "GRADUATED"]:
-                tasks.send_cohort_survey.delay(uc.user.id, survey.id, template_slug)
+                user_ids.append(uc.user.id)
 
                 logger.debug(f"Survey scheduled to send for {uc.user.email}")
                 result["success"].append(f"Survey scheduled to send for {uc.user.email}")
@@ -135,6 +153,9 @@ def send_cohort_survey_group(survey=None, cohort=None):
         survey.status_json = json.dumps(result)
         survey.save()
 
+        if user_ids:
+            tasks.send_cohort_survey_batch.delay(survey.id, user_ids, template_slug)
+
     except Exception as e:
 
         survey.status = "FATAL"
@@ -277,73 +298,294 @@ def create_user_graduation_reviews(user, cohort) -> bool:
     return False
 
 
-def calculate_survey_response_rate(survey_id: int) -> float:
-    total_responses = Answer.objects.filter(survey__id=survey_id).count()
-    answered_responses = Answer.objects.filter(survey__id=survey_id, status="ANSWERED").count()
-    response_rate = (answered_responses / total_responses) * 100
+def _get_score_values(score: int | None, nps: bool = True) -> dict[str, int]:
+    """Get how much each column of a score aggregate grows when a score is received."""
 
-    return response_rate
+    if score is None:
+        return {}
 
+    values = {"count": 1, "total": score}
+    if 1 <= score <= 10:
+        values[f"score_{score}"] = 1
 
-def calculate_survey_scores(survey_id: int) -> dict:
+        if nps:
+            bucket = "promoters" if score >= 9 else "passives" if score >= 7 else "detractors"
+            values[bucket] = 1
 
-    def get_average(answers: QuerySet[Answer]) -> float:
-        result = answers.aggregate(Avg("score"))
-        return result["score__avg"]
+    return values
 
-    survey = Survey.objects.filter(id=survey_id).first()
-    if not survey:
-        raise ValidationException("Survey not found", code=404, slug="not-found")
 
-    answers = Answer.objects.filter(survey=survey, status="ANSWERED")
-    total = get_average(answers)
-
-    # Get academy answers - answers that have academy field set but no mentor, cohort, or live_class
-    academy = get_average(
-        answers.filter(
-            academy__isnull=False,
-            mentor__isnull=True,
-            cohort__isnull=True,
-            live_class__isnull=True,
-            mentorship_session__isnull=True,
-        )
+def _increment_score_aggregate(owner: dict, scope: str, key: str = "", **values: int) -> int:
+    """Add the values to the columns of an aggregate row with F() expressions, it returns the rows updated."""
+
+    values = {k: v for k, v in values.items() if v}
+    if not values:
+        return 1
+
+    return SurveyScoreAggregate.objects.filter(**owner, scope=scope, key=key).update(
+        **{k: F(k) + v for k, v in values.items()}, updated_at=timezone.now()
     )
 
-    # Get cohort answers - answers that have cohort field set but no mentor or live_class
-    cohort = get_average(
-        answers.filter(
-            cohort__isnull=False, mentor__isnull=True, live_class__isnull=True, mentorship_session__isnull=True
+
+def _upsert_score_aggregate(owner: dict, scope: str, key: str = "", **values: int) -> None:
+    if _increment_score_aggregate(owner, scope, key, **values):
+        return
+
+    try:
+        with transaction.atomic():
+            SurveyScoreAggregate.objects.create(**owner, scope=scope, key=key, **values)
+
+    except IntegrityError:
+        _increment_score_aggregate(owner, scope, key, **values)
+
+
+def _build_score_aggregates(owner: dict, scope: str, rows, key_field: str | None = None) -> list[SurveyScoreAggregate]:
+    """Build the aggregate rows of a scope from rows grouped by key and score."""
+
+    aggregates: dict[str, SurveyScoreAggregate] = {}
+    nps = "survey_id" in owner
+    for row in rows:
+        key = str(row[key_field]) if key_field else ""
+        if key_field and row[key_field] is None:
+            continue
+
+        aggregate = aggregates.setdefault(key, SurveyScoreAggregate(**owner, scope=scope, key=key))
+        for field, value in _get_score_values(row["score"], nps=nps).items():
+            setattr(aggregate, field, getattr(aggregate, field) + value * row["n"])
+
+    return list(aggregates.values())
+
+
+def rebuild_survey_score_aggregates(survey_id: int) -> list[SurveyScoreAggregate]:
+    """Compute the score aggregates of a survey from its answers, replacing the stored ones."""
+
+    owner = {"survey_id": survey_id}
+    answers = Answer.objects.filter(survey__id=survey_id)
+    scores = answers.filter(status="ANSWERED", score__isnull=False)
+
+    def group(qs, *fields):
+        return qs.values(*fields, "score").annotate(n=Count("id")).order_by()
+
+    counters = answers.aggregate(sent=Count("id"), answered=Count("id", filter=Q(status="ANSWERED")))
+    total = SurveyScoreAggregate(**owner, scope=SurveyScoreAggregate.Scope.TOTAL, **counters)
+    for row in group(scores):
+        for field, value in _get_score_values(row["score"]).items():
+            setattr(total, field, getattr(total, field) + value * row["n"])
+
+    mentor_answers = scores.filter(Q(mentor__isnull=False) | Q(mentorship_session__isnull=False))
+    mentor_rows = list(group(mentor_answers.filter(mentor__isnull=False), "mentor_id")) + [
+        {"mentor_id": x["mentorship_session__mentor__user_id"], "score": x["score"], "n": x["n"]}
+        for x in group(
+            mentor_answers.filter(mentorship_session__mentor__user__isnull=False).exclude(
+                mentor_id=F("mentorship_session__mentor__user_id")
+            ),
+            "mentorship_session__mentor__user_id",
         )
-    )
+    ]
 
-    # Get live class answers - answers that have live_class field set
-    live_class = get_average(answers.filter(live_class__isnull=False))
+    aggregates = [
+        total,
+        *_build_score_aggregates(
+            owner,
+            SurveyScoreAggregate.Scope.ACADEMY,
+            group(
+                scores.filter(
+                    academy__isnull=False,
+                    mentor__isnull=True,
+                    cohort__isnull=True,
+                    live_class__isnull=True,
+                    mentorship_session__isnull=True,
+                )
+            ),
+        ),
+        *_build_score_aggregates(
+            owner,
+            SurveyScoreAggregate.Scope.COHORT,
+            group(
+                scores.filter(
+                    cohort__isnull=False, mentor__isnull=True, live_class__isnull=True, mentorship_session__isnull=True
+                )
+            ),
+        ),
+        *_build_score_aggregates(
+            owner, SurveyScoreAggregate.Scope.LIVE_CLASS, group(scores.filter(live_class__isnull=False))
+        ),
+        *_build_score_aggregates(owner, SurveyScoreAggregate.Scope.MENTOR, mentor_rows, key_field="mentor_id"),
+    ]
+
+    with transaction.atomic():
+        SurveyScoreAggregate.objects.filter(**owner).delete()
+        SurveyScoreAggregate.objects.bulk_create(aggregates)
 
-    # Get mentor answers - combining both direct assignments and mentorship sessions
-    mentor_answers = answers.filter(Q(mentor__isnull=False) | Q(mentorship_session__isnull=False))
+    return aggregates
 
-    # Get unique mentors from both direct assignments and mentorship sessions
-    mentor_ids = set()
-    mentor_ids.update(mentor_answers.values_list("mentor_id", flat=True).distinct())
-    mentor_ids.update(
-        mentor_answers.filter(mentorship_session__isnull=False)
-        .values_list("mentorship_session__mentor__user_id", flat=True)
-        .distinct()
+
+def rebuild_survey_study_score_aggregates(survey_study_id: int) -> list[SurveyScoreAggregate]:
+    """Compute the score aggregates of a survey study from its responses, replacing the stored ones."""
+
+    owner = {"survey_study_id": survey_study_id}
+    responses = SurveyResponse.objects.filter(survey_study__id=survey_study_id)
+    counters = responses.aggregate(
+        sent=Count("id"), answered=Count("id", filter=Q(status=SurveyResponse.Status.ANSWERED))
     )
-    mentor_ids.discard(None)  # Remove None values if any
 
-    mentors = []
-    for mentor in User.objects.filter(id__in=mentor_ids):
-        # Calculate average score for this mentor combining both types of answers
-        mentor_score = get_average(mentor_answers.filter(Q(mentor=mentor) | Q(mentorship_session__mentor__user=mentor)))
-        if mentor_score is not None:
-            mentors.append({"name": f"{mentor.first_name} {mentor.last_name}", "score": mentor_score})
+    total = SurveyScoreAggregate(**owner, scope=SurveyScoreAggregate.Scope.TOTAL, **counters)
+    questions: dict[str, SurveyScoreAggregate] = {}
+
+    answered = responses.filter(status=SurveyResponse.Status.ANSWERED).values_list("answers", flat=True)
+    for answers in answered.iterator():
+        for question_id, score in _get_response_scores(answers):
+            aggregate = questions.setdefault(
+                question_id,
+                SurveyScoreAggregate(**owner, scope=SurveyScoreAggregate.Scope.QUESTION, key=question_id),
+            )
+            for field, value in _get_score_values(score, nps=False).items():
+                setattr(aggregate, field, getattr(aggregate, field) + value)
+                setattr(total, field, getattr(total, field) + value)
+
+    aggregates = [total, *questions.values()]
+    with transaction.atomic():
+        SurveyScoreAggregate.objects.filter(**owner).delete()
+        SurveyScoreAggregate.objects.bulk_create(aggregates)
+
+    return aggregates
+
+
+def _get_response_scores(answers: dict | None) -> list[tuple[str, int]]:
+    """The scores of a survey response are its integer answers, like the likert scale ones."""
+
+    if not isinstance(answers, dict):
+        return []
+
+    return [
+        (str(question_id)[:100], value)
+        for question_id, value in answers.items()
+        if isinstance(value, int) and not isinstance(value, bool)
+    ]
+
+
+def add_answer_to_score_aggregates(answer: Answer, sent: bool = False, answered: bool = False) -> None:
+    """
+    Add an answer to the score aggregates of its survey.
+
+    The aggregates of a survey that does not have them yet are rebuilt from its answers, so the surveys created
+    before the aggregates existed are never counted partially.
+    """
+
+    if answer.survey_id is None:
+        return
+
+    owner = {"survey_id": answer.survey_id}
+    score = answer.score if answered else None
+    values = _get_score_values(score)
+
+    if not _increment_score_aggregate(
+        owner, SurveyScoreAggregate.Scope.TOTAL, sent=int(sent), answered=int(answered), **values
+    ):
+        rebuild_survey_score_aggregates(answer.survey_id)
+        return
+
+    if not values:
+        return
+
+    if answer.live_class_id:
+        _upsert_score_aggregate(owner, SurveyScoreAggregate.Scope.LIVE_CLASS, **values)
+
+    if not answer.mentor_id and not answer.live_class_id and not answer.mentorship_session_id:
+        if answer.cohort_id:
+            _upsert_score_aggregate(owner, SurveyScoreAggregate.Scope.COHORT, **values)
+
+        elif answer.academy_id:
+            _upsert_score_aggregate(owner, SurveyScoreAggregate.Scope.ACADEMY, **values)
+
+    mentor_ids = {answer.mentor_id}
+    if answer.mentorship_session_id:
+        mentor_ids.add(answer.mentorship_session.mentor.user_id if answer.mentorship_session.mentor else None)
+
+    mentor_ids.discard(None)
+    for mentor_id in mentor_ids:
+        _upsert_score_aggregate(owner, SurveyScoreAggregate.Scope.MENTOR, str(mentor_id), **values)
+
+
+def add_sent_answers_to_score_aggregates(survey_id: int, how_many: int) -> None:
+    """Count the answers created in bulk, they skip `Answer.save`."""
+
+    if how_many and not _increment_score_aggregate(
+        {"survey_id": survey_id}, SurveyScoreAggregate.Scope.TOTAL, sent=how_many
+    ):
+        rebuild_survey_score_aggregates(survey_id)
+
+
+def add_survey_response_to_score_aggregates(
+    survey_response: SurveyResponse, sent: bool = False, answered: bool = False
+) -> None:
+    """Add a survey response to the score aggregates of its study, each integer answer is a question score."""
+
+    if survey_response.survey_study_id is None:
+        return
+
+    owner = {"survey_study_id": survey_response.survey_study_id}
+    scores = _get_response_scores(survey_response.answers) if answered else []
+
+    values: dict[str, int] = {}
+    for _, score in scores:
+        for field, value in _get_score_values(score, nps=False).items():
+            values[field] = values.get(field, 0) + value
+
+    if not _increment_score_aggregate(
+        owner, SurveyScoreAggregate.Scope.TOTAL, sent=int(sent), answered=int(answered), **values
+    ):
+        rebuild_survey_study_score_aggregates(survey_response.survey_study_id)
+        return
+
+    for question_id, score in scores:
+        _upsert_score_aggregate(
+            owner, SurveyScoreAggregate.Scope.QUESTION, question_id, **_get_score_values(score, nps=False)
+        )
+
+
+def get_survey_score_aggregates(survey_id: int) -> list[SurveyScoreAggregate]:
+    aggregates = list(SurveyScoreAggregate.objects.filter(survey__id=survey_id))
+    if not any(x.scope == SurveyScoreAggregate.Scope.TOTAL for x in aggregates):
+        aggregates = rebuild_survey_score_aggregates(survey_id)
+
+    return aggregates
+
+
+def calculate_survey_response_rate(survey_id: int) -> float:
+    total = next(x for x in get_survey_score_aggregates(survey_id) if x.scope == SurveyScoreAggregate.Scope.TOTAL)
+    response_rate = (total.answered / total.sent) * 100
+
+    return response_rate
+
+
+def calculate_survey_scores(survey_id: int) -> dict:
+    survey = Survey.objects.filter(id=survey_id).first()
+    if not survey:
+        raise ValidationException("Survey not found", code=404, slug="not-found")
+
+    aggregates = get_survey_score_aggregates(survey.id)
+
+    def get_average(scope: str) -> float | None:
+        aggregate = next((x for x in aggregates if x.scope == scope), None)
+        return aggregate.average if aggregate else None
+
+    mentor_scores = {
+        int(x.key): x.average
+        for x in aggregates
+        if x.scope == SurveyScoreAggregate.Scope.MENTOR and x.average is not None
+    }
+
+    mentors = [
+        {"name": f"{mentor.first_name} {mentor.last_name}", "score": mentor_scores[mentor.id]}
+        for mentor in User.objects.filter(id__in=mentor_scores.keys())
+    ]
 
     return {
-        "total": total,
-        "academy": academy,
-        "cohort": cohort,
-        "live_class": live_class,
+        "total": get_average(SurveyScoreAggregate.Scope.TOTAL),
+        "academy": get_average(SurveyScoreAggregate.Scope.ACADEMY),
+        "cohort": get_average(SurveyScoreAggregate.Scope.COHORT),
+        "live_class": get_average(SurveyScoreAggregate.Scope.LIVE_CLASS),
         "mentors": sorted(mentors, key=lambda x: x["name"]),
     }
 
@@ -624,6 +866,7 @@ def create_survey_response(
 
         # Update aggregated stats (best-effort)
         try:
+            add_survey_response_to_score_aggregates(survey_response, sent=True)
             update_survey_stats(survey_response)
         except Exception:
             logger.exception("[survey-response] unable to update stats after create")
@@ -652,6 +895,41 @@ def create_survey_response(
         return None
 
 
+def create_survey_study_responses(
+    survey_study: SurveyStudy, assignments: list[tuple[User, SurveyConfiguration]], context: dict
+) -> list[SurveyResponse]:
+    """
+    Create the pending responses of many users of a study with a single insert.
+
+    Each assignment is a user and the configuration it gets asked, the context must be JSON serializable.
+    """
+
+    survey_responses = SurveyResponse.objects.bulk_create(
+        [
+            SurveyResponse(
+                survey_config=survey_config,
+                survey_study=survey_study,
+                user=user,
+                token=uuid.uuid4(),
+                trigger_context={"trigger_type": survey_config.trigger_type, **context},
+                questions_snapshot=survey_config.questions,
+                status=SurveyResponse.Status.PENDING,
+            )
+            for user, survey_config in assignments
+        ]
+    )
+
+    if survey_responses:
+        if not _increment_score_aggregate(
+            {"survey_study_id": survey_study.id}, SurveyScoreAggregate.Scope.TOTAL, sent=len(survey_responses)
+        ):
+            rebuild_survey_study_score_aggregates(survey_study.id)
+
+        _update_stats_for_survey_study(survey_study)
+
+    return survey_responses
+
+
 def save_survey_answers(response_id: int, answers: dict) -> SurveyResponse:
     """
     Save survey answers and update response status.
@@ -732,6 +1010,8 @@ def save_survey_answers(response_id: int, answers: dict) -> SurveyResponse:
         survey_response.answered_at = timezone.now()
         survey_response.save()
 
+        add_survey_response_to_score_aggregates(survey_response, answered=True)
+
     # Trigger signal for webhook
     from breathecode.feedback.signals import survey_response_answered
 
@@ -29,6 +29,7 @@ from .models import (
     SurveyConfiguration,
     SurveyQuestionTemplate,
     SurveyResponse,
+    SurveyScoreAggregate,
     SurveyStudy,
     SurveyTemplate,
     UserProxy,
@@ -682,3 +683,23 @@ class SurveyResponseAdmin(admin.ModelAdmin, AdminExportCsvMixin):
         return "-"
 
     answers_display.short_description = "Answers"
+
+
+@admin.register(SurveyScoreAggregate)
+class SurveyScoreAggregateAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "survey",
+        "survey_study",
+        "scope",
+        "key",
+        "sent",
+        "answered",
+        "count",
+        "average",
+        "updated_at",
+    )
+    list_filter = ("scope",)
+    search_fields = ("key", "survey__cohort__slug", "survey_study__slug")
+    raw_id_fields = ("survey", "survey_study")
+    readonly_fields = ("updated_at",)
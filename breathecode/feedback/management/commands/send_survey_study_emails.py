@@ -1,7 +1,7 @@
 from django.core.management.base import BaseCommand
 
 from breathecode.feedback.models import SurveyResponse, SurveyStudy
-from breathecode.feedback.tasks import send_survey_response_email
+from breathecode.feedback.tasks import send_survey_response_emails
 
 
 class Command(BaseCommand):
@@ -44,8 +44,7 @@ class Command(BaseCommand):
             return
 
         if commit:
-            for response_id in ids:
-                send_survey_response_email.delay(response_id)
+            send_survey_response_emails.delay(ids, survey_study_id=study.id)
 
         self.stdout.write(self.style.MIGRATE_HEADING("\n=== Summary ==="))
         self.stdout.write(f"study_id={study_id}")
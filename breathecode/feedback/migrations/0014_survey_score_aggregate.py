@@ -0,0 +1,109 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feedback", "0013_alter_surveytemplate_jsonfield_defaults"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SurveyScoreAggregate",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "scope",
+                    models.CharField(
+                        choices=[
+                            ("TOTAL", "Total"),
+                            ("ACADEMY", "Academy"),
+                            ("COHORT", "Cohort"),
+                            ("LIVE_CLASS", "Live class"),
+                            ("MENTOR", "Mentor"),
+                            ("QUESTION", "Question"),
+                        ],
+                        max_length=15,
+                    ),
+                ),
+                (
+                    "key",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="Mentor id or question id, empty for the other scopes",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "sent",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Answers or responses sent, only on the total scope"
+                    ),
+                ),
+                (
+                    "answered",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Answers or responses answered, only on the total scope"
+                    ),
+                ),
+                ("count", models.PositiveIntegerField(default=0, help_text="Scores received")),
+                ("total", models.IntegerField(default=0, help_text="Sum of the scores received")),
+                ("score_1", models.PositiveIntegerField(default=0)),
+                ("score_2", models.PositiveIntegerField(default=0)),
+                ("score_3", models.PositiveIntegerField(default=0)),
+                ("score_4", models.PositiveIntegerField(default=0)),
+                ("score_5", models.PositiveIntegerField(default=0)),
+                ("score_6", models.PositiveIntegerField(default=0)),
+                ("score_7", models.PositiveIntegerField(default=0)),
+                ("score_8", models.PositiveIntegerField(default=0)),
+                ("score_9", models.PositiveIntegerField(default=0)),
+                ("score_10", models.PositiveIntegerField(default=0)),
+                ("detractors", models.PositiveIntegerField(default=0)),
+                ("passives", models.PositiveIntegerField(default=0)),
+                ("promoters", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "survey",
+                    models.ForeignKey(
+                        blank=True,
+                        default=None,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="score_aggregates",
+                        to="feedback.survey",
+                    ),
+                ),
+                (
+                    "survey_study",
+                    models.ForeignKey(
+                        blank=True,
+                        default=None,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="score_aggregates",
+                        to="feedback.surveystudy",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Survey Score Aggregate",
+                "verbose_name_plural": "Survey Score Aggregates",
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("survey__isnull", False)),
+                        fields=("survey", "scope", "key"),
+                        name="unique_survey_score_aggregate",
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(("survey_study__isnull", False)),
+                        fields=("survey_study", "scope", "key"),
+                        name="unique_survey_study_score_aggregate",
+                    ),
+                ],
+            },
+        ),
+    ]
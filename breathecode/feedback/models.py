@@ -27,6 +27,7 @@ __all__ = [
     "SurveyStudy",
     "SurveyConfiguration",
     "SurveyResponse",
+    "SurveyScoreAggregate",
 ]
 
 
@@ -223,9 +224,16 @@ class Answer(models.Model):
     updated_at = models.DateTimeField(auto_now=True, editable=False)
 
     def save(self, *args, **kwargs):
+        from .actions import add_answer_to_score_aggregates
+
+        adding = self._state.adding
 
         super().save(*args, **kwargs)  # Call the "real" save() method.
 
+        answered = self.status == "ANSWERED" and (adding or self.__old_status != self.status)
+        if adding or answered:
+            add_answer_to_score_aggregates(self, sent=adding, answered=answered)
+
         if self.__old_status != self.status and self.status == "ANSWERED":
 
             # signal the updated answer
@@ -927,3 +935,85 @@ class SurveyStudy(models.Model):
     class Meta:
         verbose_name = "Survey Study"
         verbose_name_plural = "Survey Studies"
+
+
+class SurveyScoreAggregate(models.Model):
+    """
+    Running totals of the scores received by a survey or a survey study.
+
+    They are updated with F() expressions when an answer is saved, so the scores and the response rate are read
+    from a few rows instead of scanning every answer.
+    """
+
+    class Scope(models.TextChoices):
+        TOTAL = "TOTAL", "Total"
+        ACADEMY = "ACADEMY", "Academy"
+        COHORT = "COHORT", "Cohort"
+        LIVE_CLASS = "LIVE_CLASS", "Live class"
+        MENTOR = "MENTOR", "Mentor"
+        QUESTION = "QUESTION", "Question"
+
+    survey = models.ForeignKey(
+        Survey, on_delete=models.CASCADE, null=True, blank=True, default=None, related_name="score_aggregates"
+    )
+    survey_study = models.ForeignKey(
+        SurveyStudy, on_delete=models.CASCADE, null=True, blank=True, default=None, related_name="score_aggregates"
+    )
+    scope = models.CharField(max_length=15, choices=Scope.choices)
+    key = models.CharField(
+        max_length=100, blank=True, default="", help_text="Mentor id or question id, empty for the other scopes"
+    )
+
+    sent = models.PositiveIntegerField(default=0, help_text="Answers or responses sent, only on the total scope")
+    answered = models.PositiveIntegerField(
+        default=0, help_text="Answers or responses answered, only on the total scope"
+    )
+    count = models.PositiveIntegerField(default=0, help_text="Scores received")
+    total = models.IntegerField(default=0, help_text="Sum of the scores received")
+
+    # histogram of the scores
+    score_1 = models.PositiveIntegerField(default=0)
+    score_2 = models.PositiveIntegerField(default=0)
+    score_3 = models.PositiveIntegerField(default=0)
+    score_4 = models.PositiveIntegerField(default=0)
+    score_5 = models.PositiveIntegerField(default=0)
+    score_6 = models.PositiveIntegerField(default=0)
+    score_7 = models.PositiveIntegerField(default=0)
+    score_8 = models.PositiveIntegerField(default=0)
+    score_9 = models.PositiveIntegerField(default=0)
+    score_10 = models.PositiveIntegerField(default=0)
+
+    # NPS buckets, only for the 1 to 10 scores of the legacy surveys
+    detractors = models.PositiveIntegerField(default=0)
+    passives = models.PositiveIntegerField(default=0)
+    promoters = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True, editable=False)
+
+    @property
+    def average(self):
+        return self.total / self.count if self.count else None
+
+    @property
+    def histogram(self):
+        return {i: getattr(self, f"score_{i}") for i in range(1, 11)}
+
+    def __str__(self):
+        owner = f"survey {self.survey_id}" if self.survey_id else f"study {self.survey_study_id}"
+        return f"{self.scope} {self.key} of {owner}".replace("  ", " ")
+
+    class Meta:
+        verbose_name = "Survey Score Aggregate"
+        verbose_name_plural = "Survey Score Aggregates"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["survey", "scope", "key"],
+                condition=Q(survey__isnull=False),
+                name="unique_survey_score_aggregate",
+            ),
+            models.UniqueConstraint(
+                fields=["survey_study", "scope", "key"],
+                condition=Q(survey_study__isnull=False),
+                name="unique_survey_study_score_aggregate",
+            ),
+        ]
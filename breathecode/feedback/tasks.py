@@ -1,3 +1,4 @@
+import json
 import os
 from datetime import datetime, timedelta
 from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
@@ -20,7 +21,7 @@ from breathecode.utils import TaskPriority, getLogger
 from breathecode.utils.redis import Lock
 
 from . import actions
-from .models import AcademyFeedbackSettings, Answer, Survey, SurveyResponse, SurveyTemplate
+from .models import AcademyFeedbackSettings, Answer, Survey, SurveyResponse, SurveyStudy, SurveyTemplate
 from .utils import strings
 
 # Get an instance of a logger
@@ -162,6 +163,20 @@ def get_admin_url():
     return admin_url
 
 
+def get_cohort_survey_template_slug(survey, template_slug=None):
+    if template_slug is None:
+        template_slug = survey.template_slug
+
+    if template_slug is None:
+        settings = AcademyFeedbackSettings.objects.filter(academy=survey.cohort.academy).first()
+        template_slug = settings.cohort_survey_template.slug if settings and settings.cohort_survey_template else None
+
+    if template_slug is None:
+        raise ValidationException("Template slug must be specified before building the question", 500)
+
+    return template_slug
+
+
 def generate_user_cohort_survey_answers(user, survey, status="OPENED", template_slug=None):
 
     if not CohortUser.objects.filter(
@@ -175,63 +190,62 @@ def generate_user_cohort_survey_answers(user, survey, status="OPENED", template_
     if cohort_teacher.count() == 0:
         raise ValidationException("This cohort must have a teacher assigned to be able to survey it", 400)
 
-    if template_slug is None:
-        template_slug = survey.template_slug
-
-    if template_slug is None:
-        settings = AcademyFeedbackSettings.objects.filter(academy=survey.cohort.academy).first()
-        template_slug = settings.cohort_survey_template.slug if settings and settings.cohort_survey_template else None
-
-    if template_slug is None:
-        raise ValidationException("Template slug must be specified before building the question", 500)
-
-    def new_answer(answer: Answer):
-        answer = build_question(answer, template_slug)
-        answer.user = user
-        answer.status = status
-        answer.survey = survey
-        answer.opened_at = timezone.now()
-        answer.save()
-        return answer
+    template_slug = get_cohort_survey_template_slug(survey, template_slug)
 
     _answers = Answer.objects.filter(survey__id=survey.id, user=user)
     if _answers.count() == 0:
         _answers = []
 
-        # ask for the cohort in general
-        answer = Answer(cohort=survey.cohort, academy=survey.cohort.academy, lang=survey.lang)
-        _answers.append(new_answer(answer))
+        for answer in build_cohort_survey_questions(survey, cohort_teacher, template_slug):
+            answer.user = user
+            answer.status = status
+            answer.survey = survey
+            answer.opened_at = timezone.now()
+            answer.save()
+            _answers.append(answer)
 
-        # ask for each teacher, with a max of 2 teachers
-        count = 0
-        for ct in cohort_teacher:
-            if count >= survey.max_teachers_to_ask:
-                break
-            answer = Answer(mentor=ct.user, cohort=survey.cohort, academy=survey.cohort.academy, lang=survey.lang)
-            _answers.append(new_answer(answer))
-            count = count + 1
+    return _answers
 
-        # ask for the first TA
-        cohort_assistant = CohortUser.objects.filter(
-            cohort=survey.cohort, role="ASSISTANT", educational_status__in=["ACTIVE", "GRADUATED"]
-        )
-        count = 0
-        for ca in cohort_assistant:
-            if count >= survey.max_assistants_to_ask:
-                break
-            answer = Answer(mentor=ca.user, cohort=survey.cohort, academy=survey.cohort.academy, lang=survey.lang)
-            _answers.append(new_answer(answer))
-            count = count + 1
 
-        # ask for the whole academy
-        answer = Answer(academy=survey.cohort.academy, lang=survey.lang)
-        _answers.append(new_answer(answer))
+def build_cohort_survey_questions(survey, cohort_teacher, template_slug):
+    """Build the unsaved answers that a student of the cohort gets asked, their questions are the same for all."""
 
-        # ask for the platform and the content
-        answer = Answer(question_by_slug="PLATFORM", academy=survey.cohort.academy, lang=survey.lang)
-        _answers.append(new_answer(answer))
+    answers = []
 
-    return _answers
+    # ask for the cohort in general
+    answer = Answer(cohort=survey.cohort, academy=survey.cohort.academy, lang=survey.lang)
+    answers.append(build_question(answer, template_slug))
+
+    # ask for each teacher, with a max of 2 teachers
+    count = 0
+    for ct in cohort_teacher:
+        if count >= survey.max_teachers_to_ask:
+            break
+        answer = Answer(mentor=ct.user, cohort=survey.cohort, academy=survey.cohort.academy, lang=survey.lang)
+        answers.append(build_question(answer, template_slug))
+        count = count + 1
+
+    # ask for the first TA
+    cohort_assistant = CohortUser.objects.filter(
+        cohort=survey.cohort, role="ASSISTANT", educational_status__in=["ACTIVE", "GRADUATED"]
+    )
+    count = 0
+    for ca in cohort_assistant:
+        if count >= survey.max_assistants_to_ask:
+            break
+        answer = Answer(mentor=ca.user, cohort=survey.cohort, academy=survey.cohort.academy, lang=survey.lang)
+        answers.append(build_question(answer, template_slug))
+        count = count + 1
+
+    # ask for the whole academy
+    answer = Answer(academy=survey.cohort.academy, lang=survey.lang)
+    answers.append(build_question(answer, template_slug))
+
+    # ask for the platform and the content
+    answer = Answer(question_by_slug="PLATFORM", academy=survey.cohort.academy, lang=survey.lang)
+    answers.append(build_question(answer, template_slug))
+
+    return answers
 
 
 def api_url():
@@ -315,6 +329,178 @@ def send_cohort_survey(user_id, survey_id, template_slug=None, **_):
         )
 
 
+# how many recipients are handled between two progress updates
+SURVEY_BATCH_SIZE = 500
+
+
+def _chunks(items, size=SURVEY_BATCH_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def _save_survey_progress(survey: Survey, **progress):
+    status_json = survey.status_json
+    if isinstance(status_json, str):
+        try:
+            status_json = json.loads(status_json)
+
+        except ValueError:
+            status_json = {}
+
+    if not isinstance(status_json, dict):
+        status_json = {}
+
+    status_json["progress"] = progress
+    survey.status_json = json.dumps(status_json)
+    survey.save(update_fields=["status_json", "updated_at"])
+
+
+@task(bind=False, priority=TaskPriority.NOTIFICATION.value)
+def send_cohort_survey_batch(survey_id, user_ids, template_slug=None, **_):
+    """
+    Send a cohort survey to many students at once.
+
+    The answers and the tokens are created in bulk, the email is rendered once and handed to the email
+    provider in batches, and the progress is kept in the survey `status_json`.
+    """
+
+    logger.info("Starting send_cohort_survey_batch")
+    survey = Survey.objects.filter(id=survey_id).select_related("cohort__academy").first()
+    if survey is None:
+        raise RetryTask("Survey not found")
+
+    utc_now = timezone.now()
+    if utc_now > survey.created_at + survey.duration:
+        raise AbortTask("This survey has already expired")
+
+    students = list(
+        CohortUser.objects.filter(
+            cohort=survey.cohort,
+            role="STUDENT",
+            user__id__in=user_ids,
+            educational_status__in=["ACTIVE", "GRADUATED"],
+        ).select_related("user", "user__slackuser")
+    )
+    if not students:
+        raise AbortTask("None of the students belong to this cohort")
+
+    cohort_teacher = CohortUser.objects.filter(
+        cohort=survey.cohort, role="TEACHER", educational_status__in=["ACTIVE", "GRADUATED"]
+    )
+    if cohort_teacher.count() == 0:
+        raise AbortTask("This cohort must have a teacher assigned to be able to survey it")
+
+    try:
+        template_slug = get_cohort_survey_template_slug(survey, template_slug)
+        questions = build_cohort_survey_questions(survey, cohort_teacher, template_slug)
+
+    except Exception as e:
+        raise AbortTask(str(e))
+
+    academy = survey.cohort.academy
+    slack_team = getattr(academy, "slackteam", None)
+    data = {
+        "SUBJECT": strings[survey.lang]["survey_subject"],
+        "MESSAGE": strings[survey.lang]["survey_message"],
+        "TRACKER_URL": f"{api_url()}/v1/feedback/survey/{survey_id}/tracker.png",
+        "BUTTON": strings[survey.lang]["button_label"],
+    }
+
+    progress = {"total": len(students), "sent": 0, "failed": 0}
+    _save_survey_progress(survey, **progress)
+
+    for batch in _chunks(students):
+        surveyed = set(
+            Answer.objects.filter(survey=survey, user__id__in=[x.user_id for x in batch]).values_list(
+                "user_id", flat=True
+            )
+        )
+        answers = [
+            Answer(
+                title=question.title,
+                lowest=question.lowest,
+                highest=question.highest,
+                lang=question.lang,
+                question_by_slug=question.question_by_slug,
+                cohort=question.cohort,
+                mentor=question.mentor,
+                academy=question.academy,
+                user=cu.user,
+                status="SENT",
+                survey=survey,
+                opened_at=utc_now,
+            )
+            for cu in batch
+            if cu.user_id not in surveyed
+            for question in questions
+        ]
+        Answer.objects.bulk_create(answers)
+        actions.add_sent_answers_to_score_aggregates(survey.id, len(answers))
+
+        expires_at = timezone.now() + timedelta(hours=48)
+        tokens = Token.objects.bulk_create(
+            [
+                Token(user=cu.user, key=Token.generate_key(), token_type="temporal", expires_at=expires_at)
+                for cu in batch
+            ]
+        )
+        links = {
+            cu.user_id: f"https://nps.4geeks.com/survey/{survey_id}?token={token.key}"
+            for cu, token in zip(batch, tokens)
+        }
+
+        emailed = set(
+            notify_actions.send_email_batch(
+                "nps_survey",
+                [(cu.user.email, {"LINK": links[cu.user_id]}) for cu in batch],
+                data,
+                academy=academy,
+            )
+        )
+
+        for cu in batch:
+            delivered = bool(cu.user.email) and cu.user.email in emailed
+
+            if slack_team and hasattr(cu.user, "slackuser"):
+                try:
+                    notify_actions.send_slack(
+                        "nps_survey",
+                        cu.user.slackuser,
+                        slack_team,
+                        data={**data, "LINK": links[cu.user_id]},
+                        academy=academy,
+                    )
+                    delivered = True
+
+                except Exception as e:
+                    logger.error(f"Survey {survey_id} could not be sent by slack to user {cu.user_id}: {e}")
+
+            progress["sent" if delivered else "failed"] += 1
+
+        _save_survey_progress(survey, **progress)
+
+    logger.info(f"Survey {survey_id} sent to {progress['sent']} of {progress['total']} students")
+
+
+SURVEY_RESPONSE_EMAIL = {
+    "SUBJECT": "We'd love your feedback",
+    "MESSAGE": "Please take a minute to answer this survey.",
+    "BUTTON": "Open survey",
+}
+
+
+def _get_survey_response_links(survey_response: SurveyResponse, app_url: str) -> dict[str, str]:
+    link = _build_survey_response_link(app_url, str(survey_response.token))
+    callback = (survey_response.trigger_context or {}).get("callback")
+    if callback:
+        link = _append_query_params(link, {"callback": callback})
+
+    return {
+        "LINK": link,
+        "TRACKER_URL": f"{api_url()}/v1/feedback/survey/response/{survey_response.token}/tracker.png",
+    }
+
+
 @task(bind=False, priority=TaskPriority.NOTIFICATION.value)
 def send_survey_response_email(survey_response_id: int, **_):
     """
@@ -354,23 +540,77 @@ def send_survey_response_email(survey_response_id: int, **_):
     from breathecode.authenticate.actions import get_app_url
 
     app_url = get_app_url(academy=academy)
-    link = _build_survey_response_link(app_url, str(survey_response.token))
-    callback = (survey_response.trigger_context or {}).get("callback")
-    if callback:
-        link = _append_query_params(link, {"callback": callback})
-    tracker_url = f"{api_url()}/v1/feedback/survey/response/{survey_response.token}/tracker.png"
-
-    data = {
-        "SUBJECT": "We'd love your feedback",
-        "MESSAGE": "Please take a minute to answer this survey.",
-        "BUTTON": "Open survey",
-        "LINK": link,
-        "TRACKER_URL": tracker_url,
-    }
+    data = {**SURVEY_RESPONSE_EMAIL, **_get_survey_response_links(survey_response, app_url)}
 
     notify_actions.send_email_message("survey_response", user.email, data, academy=academy)
 
 
+def _save_survey_study_progress(survey_study_id: int, **progress):
+    stats = SurveyStudy.objects.filter(id=survey_study_id).values_list("stats", flat=True).first()
+    if stats is None:
+        return
+
+    stats = stats if isinstance(stats, dict) else {}
+    stats["dispatch"] = progress
+    SurveyStudy.objects.filter(id=survey_study_id).update(stats=stats)
+
+
+@task(bind=False, priority=TaskPriority.NOTIFICATION.value)
+def send_survey_response_emails(survey_response_ids: list[int], survey_study_id: int | None = None, **_):
+    """
+    Send the email invitations of many SurveyResponses.
+
+    The email is rendered once per academy and handed to the email provider in batches with the link of each
+    recipient, the progress is kept in the `dispatch` stats of the study.
+    """
+
+    logger.info("Starting send_survey_response_emails")
+
+    # Import here to avoid circular imports at module load time
+    from breathecode.authenticate.actions import get_app_url
+
+    utc_now = timezone.now()
+    survey_responses = (
+        SurveyResponse.objects.filter(id__in=survey_response_ids)
+        .exclude(status=SurveyResponse.Status.ANSWERED)
+        .select_related("user", "survey_config__academy", "survey_study")
+        .order_by("id")
+    )
+
+    by_academy = {}
+    for survey_response in survey_responses:
+        study = survey_response.survey_study
+        if study and ((study.starts_at and study.starts_at > utc_now) or (study.ends_at and study.ends_at < utc_now)):
+            continue
+
+        if not survey_response.user.email:
+            continue
+
+        academy = survey_response.survey_config.academy
+        by_academy.setdefault(academy.id, (academy, []))[1].append(survey_response)
+
+    progress = {"total": len(survey_response_ids), "sent": 0, "failed": 0}
+    progress["skipped"] = progress["total"] - sum(len(x) for _, x in by_academy.values())
+    if survey_study_id:
+        _save_survey_study_progress(survey_study_id, **progress)
+
+    for academy, responses in by_academy.values():
+        app_url = get_app_url(academy=academy)
+
+        for batch in _chunks(responses):
+            recipients = [(x.user.email, _get_survey_response_links(x, app_url)) for x in batch]
+            sent = notify_actions.send_email_batch(
+                "survey_response", recipients, SURVEY_RESPONSE_EMAIL, academy=academy
+            )
+
+            progress["sent"] += len(sent)
+            progress["failed"] += len(batch) - len(sent)
+            if survey_study_id:
+                _save_survey_study_progress(survey_study_id, **progress)
+
+    logger.info(f"Survey response emails sent to {progress['sent']} of {progress['total']} recipients")
+
+
 @task(bind=False, priority=TaskPriority.ACADEMY.value)
 def process_student_graduation(cohort_id, user_id, **_):
     from .actions import create_user_graduation_reviews
@@ -396,6 +636,8 @@ def recalculate_survey_scores(survey_id, **_):
     if survey is None:
         raise RetryTask("Survey not found")
 
+    actions.rebuild_survey_score_aggregates(survey.id)
+
     survey.response_rate = actions.calculate_survey_response_rate(survey.id)
     survey.scores = actions.calculate_survey_scores(survey.id)
     survey.save()
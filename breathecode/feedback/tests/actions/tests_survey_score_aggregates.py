@@ -0,0 +1,143 @@
+"""
+Test the survey score aggregates
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from breathecode.feedback import actions
+from breathecode.feedback.models import (
+    Answer,
+    SurveyConfiguration,
+    SurveyResponse,
+    SurveyScoreAggregate,
+    SurveyStudy,
+)
+from breathecode.tests.mixins.breathecode_mixin.breathecode import Breathecode
+
+
+@pytest.fixture(autouse=True)
+def setup(db, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("breathecode.feedback.signals.survey_answered.send_robust", MagicMock())
+    monkeypatch.setattr("breathecode.feedback.actions.send_survey_event", MagicMock())
+    yield
+
+
+def answer(survey, **kwargs):
+    instance = Answer(survey=survey, academy=survey.cohort.academy, status="SENT", **kwargs)
+    instance.save()
+    return instance
+
+
+def reply(instance, score):
+    instance.score = score
+    instance.status = "ANSWERED"
+    instance.save()
+
+
+def get_aggregates(**kwargs):
+    return {
+        (x.scope, x.key): (x.sent, x.answered, x.count, x.total, x.detractors, x.passives, x.promoters)
+        for x in SurveyScoreAggregate.objects.filter(**kwargs)
+    }
+
+
+def test_answers_are_aggregated_when_saved(bc: Breathecode):
+    model = bc.database.create(survey=1, user=2, cohort=1, mentorship_session=1, mentor_profile={"user_id": 2})
+
+    cohort = answer(model.survey, cohort=model.cohort)
+    mentor = answer(model.survey, cohort=model.cohort, mentor=model.user[0])
+    session = answer(model.survey, mentorship_session=model.mentorship_session)
+    answer(model.survey)
+
+    reply(cohort, 10)
+    reply(mentor, 8)
+    reply(session, 3)
+
+    # it does not count the same answer twice
+    mentor.comment = "Great"
+    mentor.save()
+
+    assert get_aggregates() == {
+        ("TOTAL", ""): (4, 3, 3, 21, 1, 1, 1),
+        ("COHORT", ""): (0, 0, 1, 10, 0, 0, 1),
+        ("MENTOR", str(model.user[0].id)): (0, 0, 1, 8, 0, 1, 0),
+        ("MENTOR", str(model.user[1].id)): (0, 0, 1, 3, 1, 0, 0),
+    }
+
+    incremental = get_aggregates()
+    actions.rebuild_survey_score_aggregates(model.survey.id)
+    assert get_aggregates() == incremental
+
+    assert actions.calculate_survey_response_rate(model.survey.id) == 75.0
+    scores = actions.calculate_survey_scores(model.survey.id)
+    assert scores["total"] == 7.0
+    assert scores["cohort"] == 10.0
+    assert scores["academy"] is None
+    assert sorted(x["score"] for x in scores["mentors"]) == [3.0, 8.0]
+
+
+def test_scores_are_read_from_the_aggregates(bc: Breathecode, django_assert_num_queries):
+    model = bc.database.create(survey=1, cohort=1)
+
+    for score in [6, 9, 10]:
+        reply(answer(model.survey), score)
+
+    with django_assert_num_queries(1):
+        assert actions.calculate_survey_response_rate(model.survey.id) == 100.0
+
+    # the mentors are not queried when there are not any
+    with django_assert_num_queries(2):
+        scores = actions.calculate_survey_scores(model.survey.id)
+
+    assert scores == {"total": 25 / 3, "academy": 25 / 3, "cohort": None, "live_class": None, "mentors": []}
+
+
+def test_survey_without_aggregates_is_rebuilt(bc: Breathecode):
+    model = bc.database.create(survey=1, cohort=1)
+
+    reply(answer(model.survey), 4)
+    answer(model.survey)
+    SurveyScoreAggregate.objects.all().delete()
+
+    # a new answer does not count a survey partially
+    reply(answer(model.survey), 8)
+
+    assert get_aggregates() == {
+        ("TOTAL", ""): (3, 2, 2, 12, 1, 1, 0),
+        ("ACADEMY", ""): (0, 0, 2, 12, 1, 1, 0),
+    }
+
+
+def test_survey_study_answers(bc: Breathecode):
+    questions = {
+        "questions": [
+            {"id": "q1", "type": "likert_scale", "config": {"scale": 5}},
+            {"id": "q2", "type": "open_question"},
+        ]
+    }
+    model = bc.database.create(user=2, academy=1, city=1, country=1)
+    survey_config = SurveyConfiguration.objects.create(
+        questions=questions, academy=model.academy, created_by=model.user[0]
+    )
+    survey_study = SurveyStudy.objects.create(slug="study", title="Study", academy=model.academy)
+
+    responses = [
+        actions.create_survey_response(survey_config, user, {}, survey_study=survey_study, send_pusher=False)
+        for user in model.user
+    ]
+    actions.save_survey_answers(responses[0].id, {"q1": 4, "q2": "Nice"})
+    actions.save_survey_answers(responses[1].id, {"q1": 2})
+
+    assert get_aggregates(survey_study=survey_study) == {
+        ("TOTAL", ""): (2, 2, 2, 6, 0, 0, 0),
+        ("QUESTION", "q1"): (0, 0, 2, 6, 0, 0, 0),
+    }
+
+    actions.update_survey_stats(SurveyResponse.objects.get(id=responses[0].id))
+    survey_study.refresh_from_db()
+
+    assert survey_study.stats["responses"] == 2
+    assert survey_study.stats["scores"]["average"] == 3.0
+    assert survey_study.stats["scores"]["questions"]["q1"]["count"] == 2
@@ -0,0 +1,92 @@
+"""
+Test send_cohort_survey_batch
+"""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+import breathecode.notify.actions as notify_actions
+from breathecode.authenticate.models import Token
+from breathecode.feedback import tasks
+from breathecode.feedback.models import Answer, SurveyScoreAggregate
+from breathecode.feedback.tasks import send_cohort_survey_batch
+from breathecode.tests.mixins.breathecode_mixin.breathecode import Breathecode
+
+
+def build_question(answer, template_slug):
+    answer.title = f"Question about {answer.question_by_slug or 'it'}"
+    return answer
+
+
+@pytest.fixture(autouse=True)
+def setup(db, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(
+        "breathecode.admissions.signals.student_edu_status_updated.send_robust", MagicMock(return_value=None)
+    )
+    monkeypatch.setattr("breathecode.feedback.signals.survey_answered.send_robust", MagicMock())
+    monkeypatch.setattr(tasks, "build_question", MagicMock(side_effect=build_question))
+    monkeypatch.setattr(
+        notify_actions,
+        "send_email_batch",
+        MagicMock(side_effect=lambda slug, recipients, *args, **kwargs: [x[0] for x in recipients]),
+    )
+    monkeypatch.setattr(notify_actions, "send_slack", MagicMock())
+    yield
+
+
+def create(bc: Breathecode, students: int):
+    cohort_users = [{"role": "TEACHER", "user_id": 1, "educational_status": "ACTIVE"}] + [
+        {"role": "STUDENT", "user_id": n, "educational_status": "ACTIVE"} for n in range(2, students + 2)
+    ]
+    return bc.database.create(
+        city=1,
+        country=1,
+        cohort=1,
+        user=students + 1,
+        cohort_user=cohort_users,
+        survey={"template_slug": "default", "lang": "en"},
+    )
+
+
+def test_students_are_surveyed_in_bulk(bc: Breathecode):
+    model = create(bc, students=3)
+
+    send_cohort_survey_batch.delay(model.survey.id, [2, 3, 4])
+
+    # cohort, teacher, academy and platform questions
+    assert Answer.objects.filter(survey=model.survey).count() == 12
+    assert sorted(set(Answer.objects.values_list("user_id", flat=True))) == [2, 3, 4]
+    assert Token.objects.filter(user__id__in=[2, 3, 4], token_type="temporal").count() == 3
+
+    assert notify_actions.send_email_batch.call_count == 1
+    args = notify_actions.send_email_batch.call_args
+    assert args.args[0] == "nps_survey"
+    assert [x[0] for x in args.args[1]] == [x.email for x in model.user[1:]]
+
+    tokens = {x.user_id: x.key for x in Token.objects.all()}
+    assert args.args[1][0][1] == {"LINK": f"https://nps.4geeks.com/survey/{model.survey.id}?token={tokens[2]}"}
+
+    survey = bc.database.get("feedback.Survey", model.survey.id, dict=False)
+    assert json.loads(survey.status_json)["progress"] == {"total": 3, "sent": 3, "failed": 0}
+    assert SurveyScoreAggregate.objects.get(survey=survey, scope="TOTAL").sent == 12
+
+
+def test_queries_do_not_grow_with_the_students(bc: Breathecode, django_assert_max_num_queries):
+    model = create(bc, students=30)
+
+    with django_assert_max_num_queries(35):
+        send_cohort_survey_batch.delay(model.survey.id, list(range(2, 32)))
+
+    assert Answer.objects.count() == 120
+
+
+def test_surveyed_students_are_not_asked_twice(bc: Breathecode):
+    model = create(bc, students=2)
+
+    send_cohort_survey_batch.delay(model.survey.id, [2, 3])
+    send_cohort_survey_batch.delay(model.survey.id, [2, 3])
+
+    assert Answer.objects.count() == 8
+    assert notify_actions.send_email_batch.call_count == 2
@@ -0,0 +1,57 @@
+"""
+Test send_survey_response_emails
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+import breathecode.notify.actions as notify_actions
+from breathecode.feedback import actions
+from breathecode.feedback.models import SurveyConfiguration, SurveyResponse, SurveyScoreAggregate, SurveyStudy
+from breathecode.feedback.tasks import send_survey_response_emails
+from breathecode.tests.mixins.breathecode_mixin.breathecode import Breathecode
+
+
+@pytest.fixture(autouse=True)
+def setup(db, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("API_URL", "https://api.com")
+    monkeypatch.setattr("breathecode.authenticate.actions.get_app_url", MagicMock(return_value="https://app.com"))
+    monkeypatch.setattr(
+        notify_actions,
+        "send_email_batch",
+        MagicMock(side_effect=lambda slug, recipients, *args, **kwargs: [x[0] for x in recipients[1:]]),
+    )
+    yield
+
+
+def test_study_responses_are_sent_in_batches(bc: Breathecode):
+    model = bc.database.create(user=3, academy=1, city=1, country=1)
+    survey_config = SurveyConfiguration.objects.create(
+        questions={"questions": []}, academy=model.academy, created_by=model.user[0]
+    )
+    survey_study = SurveyStudy.objects.create(slug="study", title="Study", academy=model.academy)
+
+    survey_responses = actions.create_survey_study_responses(
+        survey_study, [(user, survey_config) for user in model.user], {"source": "study_email", "callback": "/done"}
+    )
+
+    assert SurveyResponse.objects.filter(survey_study=survey_study, status="PENDING").count() == 3
+    assert len({x.token for x in survey_responses}) == 3
+    assert SurveyScoreAggregate.objects.get(survey_study=survey_study, scope="TOTAL").sent == 3
+
+    send_survey_response_emails.delay([x.id for x in survey_responses], survey_study_id=survey_study.id)
+
+    assert notify_actions.send_email_batch.call_count == 1
+    recipients = notify_actions.send_email_batch.call_args.args[1]
+    assert recipients[0] == (
+        model.user[0].email,
+        {
+            "LINK": f"https://app.com/survey/{survey_responses[0].token}?callback=%2Fdone",
+            "TRACKER_URL": f"https://api.com/v1/feedback/survey/response/{survey_responses[0].token}/tracker.png",
+        },
+    )
+
+    survey_study.refresh_from_db()
+    assert survey_study.stats["sent"] == 3
+    assert survey_study.stats["dispatch"] == {"total": 3, "sent": 2, "failed": 1, "skipped": 0}
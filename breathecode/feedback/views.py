@@ -1206,7 +1206,7 @@ class SurveyStudySendEmailsView(APIView):
     It will:
     - create SurveyResponse objects for users that don't have one in this study (one per user per study)
     - distribute users across the study SurveyConfigurations using round-robin (equitable split)
-    - enqueue `send_survey_response_email` Celery task for each created response
+    - create them in bulk and enqueue one `send_survey_response_emails` task that sends the emails in batches
     - store optional `callback` in trigger_context and append it to the email LINK as `?callback=...`
     """
 
@@ -1327,14 +1327,19 @@ class SurveyStudySendEmailsView(APIView):
 
         # fetch users in bulk
         existing_users = {u.id: u for u in User.objects.filter(id__in=user_ids)}
+        existing_responses = {
+            x.user_id: x for x in SurveyResponse.objects.filter(survey_study=study, user__id__in=existing_users.keys())
+        }
 
-        from breathecode.feedback.actions import create_survey_response
-        from breathecode.feedback.tasks import send_survey_response_email
+        from breathecode.feedback.actions import create_survey_study_responses
+        from breathecode.feedback.tasks import send_survey_response_emails
 
         created = []
         skipped_existing = []
         skipped_missing_user = []
         scheduled = 0
+        assignments = []
+        assigned = set()
 
         for i, raw_id in enumerate(user_ids):
             try:
@@ -1348,7 +1353,10 @@ class SurveyStudySendEmailsView(APIView):
                 skipped_missing_user.append({"user_id": uid, "reason": "not_found"})
                 continue
 
-            existing = SurveyResponse.objects.filter(survey_study=study, user=user).first()
+            if user.id in assigned:
+                continue
+
+            existing = existing_responses.get(user.id)
             if existing:
                 skipped_existing.append(
                     {
@@ -1360,10 +1368,6 @@ class SurveyStudySendEmailsView(APIView):
                 continue
 
             config = configs[i % len(configs)]
-            context = {"source": "study_email"}
-            if callback:
-                context["callback"] = callback
-
             if dry_run:
                 created.append(
                     {
@@ -1376,37 +1380,28 @@ class SurveyStudySendEmailsView(APIView):
                 )
                 continue
 
-            survey_response = create_survey_response(
-                config,
-                user,
-                context,
-                survey_study=study,
-                send_pusher=False,
-            )
-            if not survey_response:
+            assigned.add(user.id)
+            assignments.append((user, config))
+
+        if assignments:
+            context = {"source": "study_email"}
+            if callback:
+                context["callback"] = callback
+
+            survey_responses = create_survey_study_responses(study, assignments, context)
+            send_survey_response_emails.delay([x.id for x in survey_responses], survey_study_id=study.id)
+            scheduled = len(survey_responses)
+
+            for survey_response in survey_responses:
                 created.append(
                     {
-                        "user_id": user.id,
-                        "survey_config_id": config.id,
-                        "survey_response_id": None,
-                        "token": None,
-                        "scheduled": False,
+                        "user_id": survey_response.user.id,
+                        "survey_config_id": survey_response.survey_config.id,
+                        "survey_response_id": survey_response.id,
+                        "token": str(survey_response.token) if survey_response.token else None,
+                        "scheduled": True,
                     }
                 )
-                continue
-
-            send_survey_response_email.delay(survey_response.id)
-            scheduled += 1
-
-            created.append(
-                {
-                    "user_id": user.id,
-                    "survey_config_id": config.id,
-                    "survey_response_id": survey_response.id,
-                    "token": str(survey_response.token) if survey_response.token else None,
-                    "scheduled": True,
-                }
-            )
 
         return Response(
             {
@@ -1,23 +1,16 @@
 import json
 import os
 import re
-import socket
-from datetime import timedelta
 from itertools import chain
 from types import SimpleNamespace
 from typing import Optional
-
-try:
-    import dns.resolver  # type: ignore
-    import dns.exception  # type: ignore
-    DNS_AVAILABLE = True
-except ImportError:
-    DNS_AVAILABLE = False
+from urllib import parse
 
 import numpy as np
 import requests
 from capyc.core.i18n import translation
 from capyc.rest_framework.exceptions import ValidationException
+from django.core.cache import cache
 from django.db.models import Q
 from django.utils import timezone
 from rest_framework.exceptions import APIException
@@ -29,13 +22,14 @@ from breathecode.services.activecampaign import ACOldClient, ActiveCampaign, Act
 from breathecode.services.brevo import Brevo
 from breathecode.utils import getLogger
 
+from .email_domains import get_domain_report
 from .models import (
     AcademyAlias,
     ActiveCampaignAcademy,
     Automation,
     CrmLeadOverride,
-    EmailDomainValidation,
     FormEntry,
+    ShortLink,
     Tag,
 )
 from .utils.person_name import standardize_person_name
@@ -45,6 +39,9 @@ logger = getLogger(__name__)
 GOOGLE_CLOUD_KEY = os.getenv("GOOGLE_CLOUD_KEY")
 MAIL_ABSTRACT_KEY = os.getenv("MAIL_ABSTRACT_KEY")
 
+SHORT_LINK_CACHE_TTL = 60 * 60 * 24
+SHORT_LINK_NOT_FOUND_TTL = 60
+
 def _load_disposable_email_domains():
     """
     Carga la lista de dominios de emails desechables desde un archivo de texto.
@@ -195,179 +192,6 @@ def bind_formentry_with_webhook(webhook):
     return True
 
 
-def _check_mx_records(domain):
-    """
-    Verifica si el dominio tiene registros MX válidos y los retorna.
-    
-    Los resultados se almacenan en la base de datos con expiración
-    para evitar verificaciones repetidas del mismo dominio.
-    
-    Args:
-        domain: Dominio a verificar
-    
-    Returns:
-        tuple: (bool, list) - (has_mx, mx_records)
-            - has_mx: True si el dominio tiene registros MX válidos
-            - mx_records: Lista de servidores MX encontrados
-    """
-    try:
-        import dns.resolver  # type: ignore
-        dns_available = True
-    except ImportError:
-        dns_available = False
-    
-    try:
-        cached_result = EmailDomainValidation.get_valid_domain(domain)
-        if cached_result is not None:
-            if dns_available and (not cached_result.mx_records or len(cached_result.mx_records) == 0):
-                logger.debug(f"Cache tiene mx_records vacío pero dnspython está disponible, forzando nueva verificación para {domain}")
-            else:
-                return (cached_result.has_mx, cached_result.mx_records or [])
-    except Exception as e:
-        logger.debug(f"No se pudo acceder al cache de validaciones MX: {e}")
-    
-    mx_records = []
-    has_mx = False
-    
-    try:
-        if dns_available:
-            answers = dns.resolver.resolve(domain, "MX")
-            mx_records = [str(rdata.exchange).rstrip(".") for rdata in answers]
-            has_mx = len(mx_records) > 0
-        else:
-            try:
-                socket.gethostbyname(domain)
-                has_mx = True
-            except (socket.gaierror, socket.herror, Exception):
-                has_mx = False
-    except Exception as e:
-        logger.debug(f"Error verificando registros MX para {domain}: {e}")
-        has_mx = False
-    
-    try:
-        domain_obj, _ = EmailDomainValidation.get_or_create_domain(domain)
-        domain_obj.has_mx = has_mx
-        domain_obj.mx_records = mx_records
-        from django.utils import timezone
-        domain_obj.next_check_at = timezone.now() + timedelta(days=180)
-        domain_obj.save()
-    except Exception as e:
-        logger.debug(f"No se pudo guardar resultado de validación MX en BD: {e}")
-    
-    return (has_mx, mx_records)
-
-
-def _check_spf(domain):
-    """
-    Verifica y obtiene el registro SPF del dominio.
-    
-    Args:
-        domain: Dominio a verificar
-    
-    Returns:
-        str o None: Registro SPF encontrado o None si no existe
-    """
-    try:
-        import dns.resolver  # type: ignore
-        import dns.exception  # type: ignore
-        dns_available = True
-    except ImportError:
-        dns_available = False
-    
-    try:
-        cached_result = EmailDomainValidation.get_valid_domain(domain)
-        if cached_result is not None and cached_result.spf:
-            return cached_result.spf
-    except Exception as e:
-        logger.debug(f"No se pudo acceder al cache de validaciones SPF: {e}")
-    
-    spf_record = None
-    
-    try:
-        if dns_available:
-            try:
-                answers = dns.resolver.resolve(domain, "TXT")
-                for rdata in answers:
-                    txt_string = "".join([s.decode() if isinstance(s, bytes) else s for s in rdata.strings])
-                    if txt_string.startswith("v=spf1"):
-                        spf_record = txt_string
-                        break
-            except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN, dns.exception.DNSException):
-                pass
-    except Exception as e:
-        logger.debug(f"Error verificando registro SPF para {domain}: {e}")
-    
-    try:
-        domain_obj, created = EmailDomainValidation.get_or_create_domain(domain)
-        domain_obj.spf = spf_record
-        # Asegurar que next_check_at tenga un valor si es un registro nuevo
-        if created or domain_obj.next_check_at is None:
-            from django.utils import timezone
-            domain_obj.next_check_at = timezone.now() + timedelta(days=180)
-        domain_obj.save()
-        logger.info(f"EmailDomainValidation actualizado (SPF) para {domain}: {spf_record is not None}")
-    except Exception as e:
-        logger.error(f"No se pudo guardar resultado de validación SPF en BD para {domain}: {e}", exc_info=True)
-    
-    return spf_record
-
-
-def _check_dmarc(domain):
-    """
-    Verifica y obtiene el registro DMARC del dominio.
-    
-    Args:
-        domain: Dominio a verificar
-    
-    Returns:
-        str o None: Registro DMARC encontrado o None si no existe
-    """
-    try:
-        import dns.resolver  # type: ignore
-        import dns.exception  # type: ignore
-        dns_available = True
-    except ImportError:
-        dns_available = False
-    
-    try:
-        cached_result = EmailDomainValidation.get_valid_domain(domain)
-        if cached_result is not None and cached_result.dmarc:
-            return cached_result.dmarc
-    except Exception as e:
-        logger.debug(f"No se pudo acceder al cache de validaciones DMARC: {e}")
-    
-    dmarc_record = None
-    
-    try:
-        if dns_available:
-            try:
-                dmarc_domain = f"_dmarc.{domain}"
-                answers = dns.resolver.resolve(dmarc_domain, "TXT")
-                for rdata in answers:
-                    txt_string = "".join([s.decode() if isinstance(s, bytes) else s for s in rdata.strings])
-                    if txt_string.startswith("v=DMARC1"):
-                        dmarc_record = txt_string
-                        break
-            except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN, dns.exception.DNSException):
-                pass
-    except Exception as e:
-        logger.debug(f"Error verificando registro DMARC para {domain}: {e}")
-    
-    try:
-        domain_obj, created = EmailDomainValidation.get_or_create_domain(domain)
-        domain_obj.dmarc = dmarc_record
-        # Asegurar que next_check_at tenga un valor si es un registro nuevo
-        if created or domain_obj.next_check_at is None:
-            from django.utils import timezone
-            domain_obj.next_check_at = timezone.now() + timedelta(days=180)
-        domain_obj.save()
-        logger.info(f"EmailDomainValidation actualizado (DMARC) para {domain}: {dmarc_record is not None}")
-    except Exception as e:
-        logger.error(f"No se pudo guardar resultado de validación DMARC en BD para {domain}: {e}", exc_info=True)
-    
-    return dmarc_record
-
-
 def _calculate_quality_score(has_mx, has_spf, has_dmarc, is_role, is_free):
     """
     Calcula un score de calidad del email basado en múltiples factores.
@@ -457,17 +281,7 @@ def validate_email_local(email, lang):
     domain = split_email[1]
 
     is_disposable = domain in DISPOSABLE_EMAIL_DOMAINS
-
-    try:
-        domain_obj, created = EmailDomainValidation.get_or_create_domain(domain)
-        domain_obj.disposable = is_disposable
-        if created or domain_obj.next_check_at is None:
-            from django.utils import timezone
-            domain_obj.next_check_at = timezone.now() + timedelta(days=180)
-        domain_obj.save()
-        logger.info(f"EmailDomainValidation actualizado (disposable) para {domain}: {is_disposable}")
-    except Exception as e:
-        logger.error(f"No se pudo actualizar campo disposable en BD para {domain}: {e}", exc_info=True)
+    report = get_domain_report(domain, disposable=is_disposable)
 
     if is_disposable:
         raise ValidationException(
@@ -480,7 +294,8 @@ def validate_email_local(email, lang):
             slug="disposable-email",
         )
 
-    has_mx, mx_records = _check_mx_records(domain)
+    # a DNS server that did not answer within the time budget is not a reason to reject the email
+    has_mx = report.has_mx is not False
 
     if not has_mx:
         raise ValidationException(
@@ -493,8 +308,9 @@ def validate_email_local(email, lang):
             slug="invalid-email",
         )
 
-    spf_record = _check_spf(domain)
-    dmarc_record = _check_dmarc(domain)
+    mx_records = report.mx_records
+    spf_record = report.spf
+    dmarc_record = report.dmarc
 
     is_role = user_part in ROLE_EMAIL_PREFIXES
 
@@ -1432,3 +1248,55 @@ def convert_data_frame(item):
         if isinstance(item[key], np.ndarray):
             item[key] = item[key].tolist()
     return item
+
+
+def get_short_link_url(short_link: ShortLink) -> str:
+    """Build the redirect url of a short link, its utm params take precedence over the destination ones."""
+
+    params = {}
+    if short_link.utm_source is not None:
+        params["utm_source"] = short_link.utm_source
+    if short_link.utm_content is not None:
+        params["utm_content"] = short_link.utm_content
+    if short_link.utm_medium is not None:
+        params["utm_medium"] = short_link.utm_medium
+    if short_link.utm_campaign is not None:
+        params["utm_campaign"] = short_link.utm_campaign
+
+    destination_params = {}
+    url_parts = short_link.destination.split("?")
+    if len(url_parts) > 1:
+        destination_params = dict(parse.parse_qsl(url_parts[1]))
+
+    params = {**destination_params, **params}
+    return url_parts[0] + "?" + parse.urlencode(params)
+
+
+def get_short_link_cache_key(slug: str) -> str:
+    return f"short-link:{slug}"
+
+
+def resolve_short_link(slug: str) -> Optional[tuple[int, str]]:
+    """
+    Get the id and the redirect url of an active short link.
+
+    The result is cached, including the misses for a short time, so a click does not hit the database.
+    """
+
+    key = get_short_link_cache_key(slug)
+    if (cached := cache.get(key)) is not None:
+        return tuple(cached) if cached else None
+
+    short_link = ShortLink.objects.filter(slug=slug, active=True).first()
+    if short_link is None:
+        cache.set(key, [], SHORT_LINK_NOT_FOUND_TTL)
+        return None
+
+    result = (short_link.id, get_short_link_url(short_link))
+    cache.set(key, list(result), SHORT_LINK_CACHE_TTL)
+
+    return result
+
+
+def clear_short_link_cache(*slugs: str) -> None:
+    cache.delete_many([get_short_link_cache_key(slug) for slug in slugs if slug])
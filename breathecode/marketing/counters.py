@@ -0,0 +1,4 @@
+from breathecode.utils import Counter, Timestamp
+
+short_link_hits = Counter("marketing.ShortLink")
+short_link_lastclick = Timestamp("marketing.ShortLink", "lastclick_at")
@@ -0,0 +1,306 @@
+"""
+DNS intelligence of the email domains.
+
+The MX, SPF and DMARC records of a domain are resolved concurrently under a single time budget, the result is
+stored once per domain in `EmailDomainValidation` and kept in an in-process LRU, so the hottest domains like
+gmail.com never hit the database nor the DNS servers on a form submission.
+
+Domains without MX records are cached for a shorter time than the valid ones, so a domain that gets fixed is not
+rejected for months. Lookups that ran out of time are never stored, their records are unknown instead of missing.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from django.utils import timezone
+
+from .models import EmailDomainValidation
+
+try:
+    import dns.exception  # type: ignore
+    import dns.resolver  # type: ignore
+
+    DNS_AVAILABLE = True
+except ImportError:
+    DNS_AVAILABLE = False
+
+__all__ = ["DomainReport", "resolve_domain", "get_domain_report", "save_domain_reports", "clear_domain_cache"]
+
+logger = logging.getLogger(__name__)
+
+VALID_DAYS = 180
+NEGATIVE_DAYS = 1
+
+# how long a domain is kept in memory, the stored row is the source of truth
+LRU_SIZE = 1024
+LRU_TTL = 60 * 60
+UNKNOWN_TTL = 60
+
+
+def get_time_budget() -> float:
+    return float(os.getenv("EMAIL_DNS_TIMEOUT", "3"))
+
+
+@functools.lru_cache(maxsize=1)
+def get_executor() -> ThreadPoolExecutor:
+    workers = int(os.getenv("EMAIL_DNS_WORKERS", "12"))
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="email-dns")
+
+
+class UnknownRecord(Exception):
+    """The lookup failed or ran out of time, the record could exist."""
+
+
+@dataclass(frozen=True)
+class DomainReport:
+    domain: str
+    # None means that the lookup did not finish within the time budget
+    has_mx: Optional[bool]
+    mx_records: list[str] = field(default_factory=list)
+    spf: Optional[str] = None
+    dmarc: Optional[str] = None
+    disposable: bool = False
+    complete: bool = True
+
+    @property
+    def next_check_at(self) -> datetime:
+        days = VALID_DAYS if self.disposable or (self.has_mx and self.complete) else NEGATIVE_DAYS
+        return timezone.now() + timedelta(days=days)
+
+    @classmethod
+    def from_instance(cls, instance: EmailDomainValidation) -> DomainReport:
+        return cls(
+            domain=instance.domain,
+            has_mx=instance.has_mx,
+            mx_records=instance.mx_records or [],
+            spf=instance.spf,
+            dmarc=instance.dmarc,
+            disposable=instance.disposable,
+        )
+
+
+class _LRU:
+    def __init__(self, size: int):
+        self.size = size
+        self._data: OrderedDict[str, tuple[float, DomainReport]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[DomainReport]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+
+            if item[0] < time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key: str, value: DomainReport, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_lru = _LRU(LRU_SIZE)
+
+
+def clear_domain_cache(*domains: str) -> None:
+    if domains:
+        _lru.delete(*[x.lower() for x in domains])
+    else:
+        _lru.clear()
+
+
+def _get_txt(name: str, prefix: str, lifetime: float) -> Optional[str]:
+    try:
+        answers = dns.resolver.resolve(name, "TXT", lifetime=lifetime)
+
+    except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN):
+        return None
+
+    except dns.exception.DNSException as e:
+        raise UnknownRecord(str(e))
+
+    for rdata in answers:
+        txt = "".join([x.decode() if isinstance(x, bytes) else x for x in rdata.strings])
+        if txt.startswith(prefix):
+            return txt
+
+    return None
+
+
+def _get_mx(domain: str, lifetime: float) -> list[str]:
+    try:
+        answers = dns.resolver.resolve(domain, "MX", lifetime=lifetime)
+
+    except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN):
+        return []
+
+    except dns.exception.DNSException as e:
+        raise UnknownRecord(str(e))
+
+    return [str(rdata.exchange).rstrip(".") for rdata in answers]
+
+
+def resolve_domain(domain: str, budget: Optional[float] = None) -> DomainReport:
+    """Resolve the MX, SPF and DMARC records of a domain concurrently, it never takes longer than the budget."""
+
+    domain = domain.lower()
+    if budget is None:
+        budget = get_time_budget()
+
+    if not DNS_AVAILABLE:
+        try:
+            socket.gethostbyname(domain)
+            return DomainReport(domain=domain, has_mx=True)
+
+        except OSError:
+            return DomainReport(domain=domain, has_mx=False)
+
+    executor = get_executor()
+    mx = executor.submit(_get_mx, domain, budget)
+    spf = executor.submit(_get_txt, domain, "v=spf1", budget)
+    dmarc = executor.submit(_get_txt, f"_dmarc.{domain}", "v=DMARC1", budget)
+
+    wait([mx, spf, dmarc], timeout=budget)
+
+    complete = True
+    values = []
+    for name, future in [("MX", mx), ("SPF", spf), ("DMARC", dmarc)]:
+        if not future.done():
+            # the resolver lifetime will stop it soon, its result is discarded
+            future.cancel()
+            logger.debug(f"{name} lookup of {domain} ran out of time")
+            complete = False
+            values.append(None)
+            continue
+
+        try:
+            values.append(future.result())
+
+        except Exception as e:
+            logger.debug(f"{name} lookup of {domain} failed: {e}")
+            complete = False
+            values.append(None)
+
+    mx_records, spf_record, dmarc_record = values
+    return DomainReport(
+        domain=domain,
+        has_mx=None if mx_records is None else len(mx_records) > 0,
+        mx_records=mx_records or [],
+        spf=spf_record,
+        dmarc=dmarc_record,
+        complete=complete,
+    )
+
+
+def save_domain_reports(reports: Iterable[DomainReport]) -> int:
+    """Store the reports whose MX lookup finished, one row per domain, return how many were stored."""
+
+    instances = [
+        EmailDomainValidation(
+            domain=x.domain,
+            has_mx=x.has_mx,
+            mx_records=x.mx_records,
+            spf=x.spf,
+            dmarc=x.dmarc,
+            disposable=x.disposable,
+            next_check_at=x.next_check_at,
+        )
+        for x in reports
+        if x.has_mx is not None
+    ]
+
+    if not instances:
+        return 0
+
+    EmailDomainValidation.objects.bulk_create(
+        instances,
+        update_conflicts=True,
+        unique_fields=["domain"],
+        update_fields=[
+            "has_mx",
+            "mx_records",
+            "spf",
+            "dmarc",
+            "disposable",
+            "next_check_at",
+            "last_checked_at",
+            "updated_at",
+        ],
+    )
+
+    return len(instances)
+
+
+def _is_fresh(instance: EmailDomainValidation) -> bool:
+    # rows resolved without dnspython do not have the records
+    if DNS_AVAILABLE and instance.has_mx and not instance.mx_records:
+        return False
+
+    return True
+
+
+def get_domain_report(domain: str, disposable: bool = False) -> DomainReport:
+    """
+    Get the DNS intelligence of a domain from memory, from the database or resolving it, in that order.
+
+    Disposable domains are stored without being resolved.
+    """
+
+    domain = domain.lower()
+
+    if report := _lru.get(domain):
+        return report
+
+    instance = (
+        EmailDomainValidation.objects.filter(domain=domain, next_check_at__gt=timezone.now())
+        .only("domain", "has_mx", "mx_records", "spf", "dmarc", "disposable")
+        .first()
+    )
+
+    if instance and instance.disposable == disposable and _is_fresh(instance):
+        report = DomainReport.from_instance(instance)
+        _lru.set(domain, report, LRU_TTL)
+        return report
+
+    if disposable:
+        report = DomainReport(domain=domain, has_mx=False, disposable=True)
+
+    else:
+        report = resolve_domain(domain)
+
+    try:
+        save_domain_reports([report])
+
+    except Exception as e:
+        logger.error(f"Could not store the DNS intelligence of {domain}: {e}", exc_info=True)
+
+    _lru.set(domain, report, LRU_TTL if report.has_mx is not None else UNKNOWN_TTL)
+    return report
@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ...models import ShortLink
+from ...tasks import check_short_link_destination
+
+
+class Command(BaseCommand):
+    help = "Check the destination of the short links clicked since their last check"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=7,
+            help="Also check the active links whose last check is older than this number of days",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+
+        clicked = Q(lastclick_at__isnull=False) & (
+            Q(destination_checked_at__isnull=True) | Q(destination_checked_at__lt=F("lastclick_at"))
+        )
+        outdated = Q(destination_checked_at__lt=now - timedelta(days=options["days"]))
+
+        scheduled = 0
+        for short_link_id in ShortLink.objects.filter(clicked | outdated, active=True).values_list("id", flat=True):
+            # only one pending check per link even if the command runs again before the task
+            if cache.add(f"short-link-check:{short_link_id}", 1, 60 * 60):
+                check_short_link_destination.delay(short_link_id)
+                scheduled += 1
+
+        self.stdout.write(self.style.SUCCESS(f"{scheduled} short link checks scheduled"))
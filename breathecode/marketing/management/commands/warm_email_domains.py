@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ...actions import DISPOSABLE_EMAIL_DOMAINS
+from ...email_domains import resolve_domain, save_domain_reports
+from ...models import EmailDomainValidation, FormEntry
+
+
+class Command(BaseCommand):
+    help = "Resolve the email domains of the recent form entries whose DNS intelligence is missing or expired"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=7,
+            help="Look at the form entries created in the last number of days",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=1000,
+            help="Resolve at most this number of domains, the most used first",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="How many domains are resolved at the same time",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+
+        emails = (
+            FormEntry.objects.filter(created_at__gte=now - timedelta(days=options["days"]), email__contains="@")
+            .values_list("email", flat=True)
+            .iterator()
+        )
+
+        usage: dict[str, int] = {}
+        for email in emails:
+            domain = email.strip().lower().rsplit("@", 1)[1]
+            if domain and domain not in DISPOSABLE_EMAIL_DOMAINS:
+                usage[domain] = usage.get(domain, 0) + 1
+
+        fresh = set(
+            EmailDomainValidation.objects.filter(domain__in=usage.keys(), next_check_at__gt=now).values_list(
+                "domain", flat=True
+            )
+        )
+        domains = sorted(usage.keys() - fresh, key=lambda x: usage[x], reverse=True)[: options["limit"]]
+
+        if not domains:
+            self.stdout.write("There are no domains to resolve")
+            return
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            reports = list(executor.map(resolve_domain, domains))
+
+        stored = save_domain_reports(reports)
+        self.stdout.write(self.style.SUCCESS(f"{stored} of {len(domains)} domains resolved"))
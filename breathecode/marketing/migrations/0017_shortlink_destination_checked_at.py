@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("marketing", "0016_crmleadoverride"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shortlink",
+            name="destination_checked_at",
+            field=models.DateTimeField(
+                blank=True, default=None, help_text="Last time the destination status was checked", null=True
+            ),
+        ),
+    ]
@@ -856,10 +856,17 @@ class ShortLink(models.Model):
     lastclick_at = models.DateTimeField(
         blank=True, null=True, default=None, help_text="Last time a click was registered for this link"
     )
+    destination_checked_at = models.DateTimeField(
+        blank=True, null=True, default=None, help_text="Last time the destination status was checked"
+    )
 
     created_at = models.DateTimeField(auto_now_add=True, editable=False)
     updated_at = models.DateTimeField(auto_now=True, editable=False)
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._old_slug = self.slug
+
     def __str__(self):
         return f"{str(self.hits)} {self.slug}"
 
@@ -3,6 +3,7 @@ import re
 from typing import Any, Optional
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.utils import timezone
 from requests.exceptions import Timeout
 from task_manager.core.exceptions import AbortTask, RetryTask
@@ -79,29 +80,30 @@ def persist_single_lead(form_data, **_: Any):
 
 
 @task(priority=TaskPriority.MARKETING.value)
-def update_link_viewcount(slug, **_: Any):
-    logger.info("Starting update_link_viewcount")
+def check_short_link_destination(short_link_id: int, **_: Any):
+    logger.info(f"Starting check_short_link_destination for short link {short_link_id}")
 
-    sl = ShortLink.objects.filter(slug=slug).first()
+    sl = ShortLink.objects.filter(id=short_link_id).first()
     if sl is None:
-        raise RetryTask(f"ShortLink with slug {slug} not found")
-
-    sl.hits = sl.hits + 1
-    sl.lastclick_at = timezone.now()
-    sl.save()
+        raise AbortTask(f"ShortLink {short_link_id} not found")
 
     result = test_link(url=sl.destination)
+    destination_status = "ACTIVE"
     if result["status_code"] < 200 or result["status_code"] > 299:
-        sl.destination_status_text = result["status_text"]
-        sl.destination_status = "ERROR"
-        sl.save()
+        destination_status = "ERROR"
 
-        raise Exception(result["status_text"])
+    # the row is not saved to keep the buffered clicks and the cached redirect untouched
+    ShortLink.objects.filter(id=sl.id).update(
+        destination_status=destination_status,
+        destination_status_text=result["status_text"],
+        destination_checked_at=timezone.now(),
+    )
 
-    else:
-        sl.destination_status = "ACTIVE"
-        sl.destination_status_text = result["status_text"]
-        sl.save()
+    # allow the next check to be scheduled
+    cache.delete(f"short-link-check:{sl.id}")
+
+    if destination_status == "ERROR":
+        logger.warning(f"ShortLink {sl.slug} destination returned {result['status_text']}")
 
 
 @task(priority=TaskPriority.MARKETING.value)
@@ -0,0 +1,135 @@
+import time
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from breathecode.marketing import email_domains
+from breathecode.marketing.email_domains import get_domain_report, resolve_domain
+from breathecode.marketing.models import EmailDomainValidation
+from breathecode.tests.mixins.breathecode_mixin.breathecode import Breathecode
+
+MX = ["alt1.gmail-smtp-in.l.google.com"]
+SPF = "v=spf1 include:_spf.google.com ~all"
+DMARC = "v=DMARC1; p=none"
+
+
+@pytest.fixture(autouse=True)
+def setup(db, monkeypatch: pytest.MonkeyPatch):
+    calls = []
+
+    def get_mx(domain, lifetime):
+        calls.append(("MX", domain))
+        return [] if domain.startswith("no-mx") else MX
+
+    def get_txt(name, prefix, lifetime):
+        calls.append(("TXT", name))
+        return DMARC if name.startswith("_dmarc.") else SPF
+
+    monkeypatch.setattr(email_domains, "DNS_AVAILABLE", True)
+    monkeypatch.setattr(email_domains, "_get_mx", get_mx)
+    monkeypatch.setattr(email_domains, "_get_txt", get_txt)
+    email_domains.clear_domain_cache()
+
+    yield calls
+
+    email_domains.clear_domain_cache()
+
+
+def test_resolve__all_the_records(setup):
+    report = resolve_domain("Gmail.com")
+
+    assert report == email_domains.DomainReport(domain="gmail.com", has_mx=True, mx_records=MX, spf=SPF, dmarc=DMARC)
+    assert sorted(setup) == [("MX", "gmail.com"), ("TXT", "_dmarc.gmail.com"), ("TXT", "gmail.com")]
+
+
+def test_resolve__out_of_time(monkeypatch: pytest.MonkeyPatch):
+    def get_mx(domain, lifetime):
+        time.sleep(0.5)
+        return MX
+
+    monkeypatch.setattr(email_domains, "_get_mx", get_mx)
+
+    start = time.monotonic()
+    report = resolve_domain("slow.com", budget=0.1)
+
+    assert time.monotonic() - start < 0.4
+    assert report.has_mx is None
+    assert report.complete is False
+    assert report.spf == SPF
+
+
+def test_get__stores_a_single_row_and_keeps_it_in_memory(setup, django_assert_num_queries):
+    report = get_domain_report("gmail.com")
+
+    assert report.has_mx is True
+    assert EmailDomainValidation.objects.count() == 1
+
+    instance = EmailDomainValidation.objects.get()
+    assert instance.domain == "gmail.com"
+    assert instance.mx_records == MX
+    assert instance.spf == SPF
+    assert instance.dmarc == DMARC
+    assert instance.next_check_at > instance.last_checked_at + timedelta(days=179)
+
+    with django_assert_num_queries(0):
+        assert get_domain_report("gmail.com") == report
+
+    assert len(setup) == 3
+
+
+def test_get__from_the_database(setup, utc_now):
+    EmailDomainValidation.objects.create(
+        domain="gmail.com", has_mx=True, mx_records=MX, next_check_at=utc_now + timedelta(days=1)
+    )
+
+    report = get_domain_report("gmail.com")
+
+    assert report.has_mx is True
+    assert report.spf is None
+    assert setup == []
+
+
+def test_get__negative_cache(setup):
+    report = get_domain_report("no-mx.com")
+
+    assert report.has_mx is False
+
+    instance = EmailDomainValidation.objects.get()
+    assert instance.has_mx is False
+    assert instance.next_check_at < instance.last_checked_at + timedelta(days=2)
+
+
+def test_get__unknown_records_are_not_stored(monkeypatch: pytest.MonkeyPatch):
+    def get_mx(domain, lifetime):
+        raise email_domains.UnknownRecord("timeout")
+
+    monkeypatch.setattr(email_domains, "_get_mx", get_mx)
+
+    report = get_domain_report("gmail.com")
+
+    assert report.has_mx is None
+    assert EmailDomainValidation.objects.count() == 0
+
+
+def test_get__disposable_domains_are_not_resolved(setup):
+    report = get_domain_report("mailinator.com", disposable=True)
+
+    assert report.disposable is True
+    assert EmailDomainValidation.objects.get().disposable is True
+    assert setup == []
+
+
+def test_warm_command(setup, bc: Breathecode, utc_now):
+    bc.database.create(form_entry=[{"email": "a@gmail.com"}, {"email": "b@Gmail.com"}, {"email": "c@fresh.com"}])
+    EmailDomainValidation.objects.create(
+        domain="fresh.com", has_mx=True, mx_records=MX, next_check_at=utc_now + timedelta(days=1)
+    )
+
+    out = StringIO()
+    call_command("warm_email_domains", stdout=out)
+
+    assert "1 of 1 domains resolved" in out.getvalue()
+    assert sorted(EmailDomainValidation.objects.values_list("domain", flat=True)) == ["fresh.com", "gmail.com"]
+    assert sorted(setup) == [("MX", "gmail.com"), ("TXT", "_dmarc.gmail.com"), ("TXT", "gmail.com")]
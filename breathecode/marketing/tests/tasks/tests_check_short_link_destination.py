@@ -0,0 +1,47 @@
+from unittest.mock import MagicMock, call
+
+import pytest
+
+from breathecode.marketing.tasks import check_short_link_destination
+from breathecode.tests.mixins.breathecode_mixin.breathecode import Breathecode
+
+
+@pytest.fixture(autouse=True)
+def setup(db):
+    yield
+
+
+@pytest.mark.parametrize(
+    "status_code, destination_status",
+    [
+        (200, "ACTIVE"),
+        (404, "ERROR"),
+    ],
+)
+def test_check(bc: Breathecode, monkeypatch, utc_now, status_code, destination_status):
+    test_link = MagicMock(return_value={"status_code": status_code, "status_text": "xyz"})
+    monkeypatch.setattr("breathecode.marketing.tasks.test_link", test_link)
+
+    model = bc.database.create(short_link={"destination_status": "ACTIVE", "hits": 5})
+
+    check_short_link_destination.delay(model.short_link.id)
+
+    assert test_link.call_args_list == [call(url=model.short_link.destination)]
+    assert bc.database.list_of("marketing.ShortLink") == [
+        {
+            **bc.format.to_dict(model.short_link),
+            "destination_status": destination_status,
+            "destination_status_text": "xyz",
+            "destination_checked_at": utc_now,
+        }
+    ]
+
+
+def test_not_found(bc: Breathecode, monkeypatch):
+    test_link = MagicMock()
+    monkeypatch.setattr("breathecode.marketing.tasks.test_link", test_link)
+
+    check_short_link_destination.delay(1)
+
+    assert test_link.call_args_list == []
+    assert bc.database.list_of("marketing.ShortLink") == []
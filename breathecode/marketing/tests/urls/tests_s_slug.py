@@ -0,0 +1,83 @@
+"""
+Test /s/<slug>
+"""
+
+from unittest.mock import MagicMock, call
+
+import pytest
+from django.core.cache import cache
+from django.urls.base import reverse_lazy
+from rest_framework import status
+
+from breathecode.tests.mixins.breathecode_mixin.breathecode import Breathecode
+
+
+@pytest.fixture(autouse=True)
+def setup(db):
+    cache.clear()
+    yield
+
+
+def test_not_found(bc: Breathecode, client):
+    url = reverse_lazy("marketing_shortner:slug", kwargs={"link_slug": "nope"})
+    response = client.get(url)
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert bc.database.list_of("marketing.ShortLink") == []
+
+
+def test_inactive(bc: Breathecode, client):
+    model = bc.database.create(short_link={"active": False})
+
+    url = reverse_lazy("marketing_shortner:slug", kwargs={"link_slug": model.short_link.slug})
+    response = client.get(url)
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert bc.database.list_of("marketing.ShortLink") == [bc.format.to_dict(model.short_link)]
+
+
+def test_redirect__cached_and_counted(bc: Breathecode, client, django_assert_num_queries):
+    model = bc.database.create(
+        short_link={
+            "destination": "https://4geeks.com/landing?utm_source=old&ref=1",
+            "utm_source": "ig",
+            "utm_medium": None,
+            "utm_content": None,
+            "utm_campaign": "summer",
+            "hits": 0,
+        }
+    )
+
+    url = reverse_lazy("marketing_shortner:slug", kwargs={"link_slug": model.short_link.slug})
+    response = client.get(url)
+
+    assert response.status_code == status.HTTP_302_FOUND
+    assert response.url == "https://4geeks.com/landing?utm_source=ig&ref=1&utm_campaign=summer"
+
+    # only the click is written, without Redis it goes straight to the database
+    with django_assert_num_queries(2):
+        response = client.get(url)
+
+    assert response.status_code == status.HTTP_302_FOUND
+
+    short_links = bc.database.list_of("marketing.ShortLink")
+    assert short_links[0]["hits"] == 2
+    assert short_links[0]["lastclick_at"] is not None
+
+
+def test_redirect__cache_cleared_on_save(bc: Breathecode, monkeypatch, enable_signals):
+    enable_signals("django.db.models.signals.post_save")
+
+    model = bc.database.create(short_link={"slug": "old-slug"})
+
+    clear_short_link_cache = MagicMock()
+    monkeypatch.setattr("breathecode.marketing.receivers.clear_short_link_cache", clear_short_link_cache)
+
+    model.short_link.slug = "new-slug"
+    model.short_link.save()
+
+    assert clear_short_link_cache.call_args_list == [call("new-slug", "old-slug")]
+
+    model.short_link.save()
+
+    assert clear_short_link_cache.call_args_list == [call("new-slug", "old-slug"), call("new-slug", "new-slug")]
@@ -40,7 +40,8 @@ from breathecode.utils.api_view_extensions.api_view_extensions import APIViewExt
 from breathecode.utils.decorators import academy_has_feature, validate_captcha, validate_captcha_challenge
 from breathecode.utils.find_by_full_name import query_like_by_full_name
 
-from .actions import convert_data_frame, sync_automations, sync_tags, validate_email_local
+from .actions import convert_data_frame, resolve_short_link, sync_automations, sync_tags, validate_email_local
+from .counters import short_link_hits, short_link_lastclick
 from .models import (
     AcademyAlias,
     ActiveCampaignAcademy,
@@ -91,7 +92,7 @@ from .serializers import (
     UTMSmallSerializer,
     GetCourseTranslationSerializer,
 )
-from .tasks import async_activecampaign_webhook, persist_single_lead, update_link_viewcount
+from .tasks import async_activecampaign_webhook, persist_single_lead
 
 logger = logging.getLogger(__name__)
 MIME_ALLOW = "text/csv"
@@ -401,29 +402,16 @@ def sync_automations_with_active_campaign(request, academy_id):
 
 
 def redirect_link(request, link_slug):
-    short_link = ShortLink.objects.filter(slug=link_slug, active=True).first()
-    if short_link is None:
+    link = resolve_short_link(link_slug)
+    if link is None:
         return HttpResponseNotFound("URL not found")
 
-    update_link_viewcount.delay(short_link.slug)
-
-    params = {}
-    if short_link.utm_source is not None:
-        params["utm_source"] = short_link.utm_source
-    if short_link.utm_content is not None:
-        params["utm_content"] = short_link.utm_content
-    if short_link.utm_medium is not None:
-        params["utm_medium"] = short_link.utm_medium
-    if short_link.utm_campaign is not None:
-        params["utm_campaign"] = short_link.utm_campaign
-
-    destination_params = {}
-    url_parts = short_link.destination.split("?")
-    if len(url_parts) > 1:
-        destination_params = dict(parse.parse_qsl(url_parts[1]))
-
-    params = {**destination_params, **params}
-    return HttpResponseRedirect(redirect_to=url_parts[0] + "?" + parse.urlencode(params))
+    short_link_id, url = link
+
+    short_link_hits.incr(short_link_id)
+    short_link_lastclick.set(short_link_id)
+
+    return HttpResponseRedirect(redirect_to=url)
 
 
 @api_view(["GET"])
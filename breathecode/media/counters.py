@@ -0,0 +1,4 @@
+from breathecode.utils import Counter
+
+media_hits = Counter("media.Media")
+media_resolution_hits = Counter("media.MediaResolution")
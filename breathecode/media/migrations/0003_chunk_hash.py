@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media', '0002_add_category_is_manageable_by_academy_and_academy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chunk',
+            name='hash',
+            field=models.CharField(blank=True, default=None, help_text='MD5 of the chunk, computed while uploading it', max_length=32, null=True),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media', '0003_chunk_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediaresolution',
+            name='format',
+            field=models.CharField(blank=True, default='', help_text='Output format of the variant, empty keeps the original one', max_length=8),
+        ),
+        migrations.AddIndex(
+            model_name='mediaresolution',
+            index=models.Index(fields=['hash', 'width', 'format'], name='media_media_hash_c537ca_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediaresolution',
+            index=models.Index(fields=['hash', 'height', 'format'], name='media_media_hash_7109f1_idx'),
+        ),
+    ]
@@ -75,14 +75,28 @@ class MediaResolution(models.Model):
     hash = models.CharField(max_length=64)
     width = models.IntegerField()
     height = models.IntegerField()
+    format = models.CharField(
+        max_length=8, blank=True, default="", help_text="Output format of the variant, empty keeps the original one"
+    )
     hits = models.IntegerField(default=0)
 
     created_at = models.DateTimeField(auto_now_add=True, editable=False)
     updated_at = models.DateTimeField(auto_now=True, editable=False)
 
+    class Meta:
+        indexes = [models.Index(fields=["hash", "width", "format"]), models.Index(fields=["hash", "height", "format"])]
+
     def __str__(self):
         return f"{self.hash} ({self.width}x{self.height})"
 
+    @property
+    def suffix(self) -> str:
+        suffix = f"-{self.width}x{self.height}"
+        if self.format:
+            suffix += f".{self.format}"
+
+        return suffix
+
 
 class Chunk(models.Model):
 
@@ -105,6 +119,9 @@ class Chunk(models.Model):
     chunk_size = models.PositiveIntegerField(help_text="Size of each chunk in bytes")
     bucket = models.CharField(max_length=255)
     operation_type = models.CharField(max_length=60)
+    hash = models.CharField(
+        max_length=32, null=True, blank=True, default=None, help_text="MD5 of the chunk, computed while uploading it"
+    )
 
     created_at = models.DateTimeField(auto_now_add=True, editable=False)
     updated_at = models.DateTimeField(auto_now=True, editable=False)
@@ -2,18 +2,20 @@
 Test /answer
 """
 
-from unittest.mock import MagicMock, call, patch
+from concurrent.futures import Future
+from io import BytesIO
+from unittest.mock import ANY, MagicMock, call, patch
 
+import pytest
 from django.urls.base import reverse_lazy
+from PIL import Image
 from rest_framework import status
 
+from breathecode.services.google_cloud.file import File
 from breathecode.tests.mocks import REQUESTS_PATH, apply_requests_get_mock
-from breathecode.tests.mocks.requests import apply_requests_request_mock
 
 from ...mixins import MediaTestCase
 
-RESIZE_IMAGE_URL = "https://us-central1-labor-day-story.cloudfunctions.net/resize-image"
-
 
 def apply_get_env(configuration={}):
 
@@ -23,24 +25,34 @@ def apply_get_env(configuration={}):
     return get_env
 
 
-def bad_mime_response():
-    data = {"message": "File type not allowed", "status_code": 400}
-    return (400, RESIZE_IMAGE_URL, data)
+def png(width, height):
+    output = BytesIO()
+    Image.new("RGB", (width, height)).save(output, format="PNG")
+    return output.getvalue()
+
 
+def storage_mock(content):
+    storage = MagicMock()
+    storage.return_value.file.return_value.download.return_value = content
+    return storage
 
-def bad_size_response():
-    data = {"message": "Incorrect width or height", "status_code": 400}
-    return (400, RESIZE_IMAGE_URL, data)
 
+class SyncExecutor:
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
 
-def bad_server_response():
-    data = {"message": "They killed Kenny", "status_code": 400}
-    return (500, RESIZE_IMAGE_URL, data)
+        except Exception as e:
+            future.set_exception(e)
 
+        return future
 
-def resized_response(width=1000, height=1000):
-    data = {"message": "Ok", "status_code": 200, "width": width, "height": height}
-    return (200, RESIZE_IMAGE_URL, data)
+
+@pytest.fixture(autouse=True)
+def setup(monkeypatch):
+    monkeypatch.setattr("breathecode.media.variants.get_executor", MagicMock(return_value=SyncExecutor()))
+    yield
 
 
 # MEDIA_GALLERY_BUCKET
@@ -205,62 +217,83 @@ class MediaTestSuite(MediaTestCase):
             )
         ),
     )
-    def test_file_id__with_width_in_querystring(self):
+    def test_file_id__with_width_in_querystring__resolution_exist(self):
         """Test /answer without auth"""
         self.headers(academy=1)
         media_kwargs = {"url": "https://potato.io/harcoded", "mime": "image/png", "hash": "harcoded"}
-        model = self.generate_models(academy=True, media=True, media_kwargs=media_kwargs)
-
-        with patch("google.oauth2.id_token.fetch_id_token") as token_mock:
-            token_mock.return_value = "blablabla"
+        media_resolution_kwargs = {"width": 1000, "height": 1000, "hash": "harcoded"}
+        model = self.generate_models(
+            academy=True,
+            media=True,
+            media_resolution=True,
+            media_kwargs=media_kwargs,
+            media_resolution_kwargs=media_resolution_kwargs,
+        )
 
-            with patch(REQUESTS_PATH["request"], apply_requests_request_mock([resized_response()])) as mock:
-                url = reverse_lazy("media:file_id", kwargs={"media_id": 1}) + "?width=1000"
-                response = self.client.get(url)
+        with patch("breathecode.media.variants.Storage", MagicMock()) as mock:
+            url = reverse_lazy("media:file_id", kwargs={"media_id": 1}) + "?width=1000"
+            response = self.client.get(url)
 
         self.assertEqual(response.url, "https://potato.io/harcoded-1000x1000")
         self.assertEqual(response.status_code, status.HTTP_301_MOVED_PERMANENTLY)
 
+        self.assertEqual(mock.call_args_list, [])
         self.assertEqual(
-            mock.call_args_list,
+            self.all_media_dict(),
             [
-                call(
-                    "POST",
-                    "https://us-central1-labor-day-story.cloudfunctions.net/resize-image",
-                    data='{"width": "1000", "height": null, "filename": "harcoded", "bucket": "bucket-name"}',
-                    headers={
-                        "Authorization": "Bearer blablabla",
-                        "Content-Type": "application/json",
-                        "Accept": "application/json",
-                    },
-                    params={},
-                    timeout=2,
-                )
+                {
+                    **self.model_to_dict(model, "media"),
+                    "hits": model["media"].hits + 1,
+                }
             ],
         )
 
         self.assertEqual(
-            self.all_media_dict(),
+            self.all_media_resolution_dict(),
             [
                 {
-                    **self.model_to_dict(model, "media"),
-                    "hits": model["media"].hits + 1,
+                    **self.model_to_dict(model, "media_resolution"),
+                    "hits": model["media_resolution"].hits + 1,
                 }
             ],
         )
 
+    """
+    🔽🔽🔽 Height in querystring
+    """
+
+    @patch(
+        "os.getenv",
+        MagicMock(
+            side_effect=apply_get_env(
+                {
+                    "GOOGLE_PROJECT_ID": "labor-day-story",
+                    "MEDIA_GALLERY_BUCKET": "bucket-name",
+                }
+            )
+        ),
+    )
+    def test_file_id__with_height_in_querystring__bad_mime(self):
+        """Test /answer without auth"""
+        self.headers(academy=1)
+        media_kwargs = {"url": "https://potato.io", "mime": "application/json"}
+        model = self.generate_models(academy=True, media=True, media_kwargs=media_kwargs)
+        url = reverse_lazy("media:file_id", kwargs={"media_id": 1}) + "?height=1000"
+        response = self.client.get(url)
+        json = response.json()
+        expected = {"detail": "cannot-resize-media", "status_code": 400}
+
+        self.assertEqual(json, expected)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(
-            self.all_media_resolution_dict(),
+            self.all_media_dict(),
             [
                 {
-                    "hash": model.media.hash,
-                    "height": 1000,
-                    "hits": 1,
-                    "id": 1,
-                    "width": 1000,
+                    **self.model_to_dict(model, "media"),
                 }
             ],
         )
+        self.assertEqual(self.all_media_resolution_dict(), [])
 
     @patch(
         "os.getenv",
@@ -273,7 +306,7 @@ class MediaTestSuite(MediaTestCase):
             )
         ),
     )
-    def test_file_id__with_width_in_querystring__resolution_exist(self):
+    def test_file_id__with_height_in_querystring__resolution_exist(self):
         """Test /answer without auth"""
         self.headers(academy=1)
         media_kwargs = {"url": "https://potato.io/harcoded", "mime": "image/png", "hash": "harcoded"}
@@ -286,8 +319,8 @@ class MediaTestSuite(MediaTestCase):
             media_resolution_kwargs=media_resolution_kwargs,
         )
 
-        with patch(REQUESTS_PATH["request"], apply_requests_request_mock([resized_response()])) as mock:
-            url = reverse_lazy("media:file_id", kwargs={"media_id": 1}) + "?width=1000"
+        with patch("breathecode.media.variants.Storage", MagicMock()) as mock:
+            url = reverse_lazy("media:file_id", kwargs={"media_id": 1}) + "?height=1000"
             response = self.client.get(url)
 
         self.assertEqual(response.url, "https://potato.io/harcoded-1000x1000")
@@ -314,6 +347,10 @@ class MediaTestSuite(MediaTestCase):
             ],
         )
 
+    """
+    🔽🔽🔽 Resize
+    """
+
     @patch(
         "os.getenv",
         MagicMock(
@@ -325,44 +362,28 @@ class MediaTestSuite(MediaTestCase):
             )
         ),
     )
-    def test_file_id__with_width_in_querystring__bad_mime(self):
+    def test_file_id__with_width_in_querystring(self):
         """Test /answer without auth"""
         self.headers(academy=1)
         media_kwargs = {"url": "https://potato.io/harcoded", "mime": "image/png", "hash": "harcoded"}
         model = self.generate_models(academy=True, media=True, media_kwargs=media_kwargs)
 
-        with patch("google.oauth2.id_token.fetch_id_token") as token_mock:
-            token_mock.return_value = "blablabla"
-
-            with patch(REQUESTS_PATH["request"], apply_requests_request_mock([bad_size_response()])) as mock:
-                url = reverse_lazy("media:file_id", kwargs={"media_id": 1}) + "?width=1000"
-                response = self.client.get(url)
-                json = response.json()
-
-        expected = {
-            "detail": "cloud-function-bad-input",
-            "status_code": 500,
-        }
+        storage = storage_mock(png(2000, 1000))
+        with patch("breathecode.media.variants.Storage", storage):
+            url = reverse_lazy("media:file_id", kwargs={"media_id": 1}) + "?width=1000"
+            response = self.client.get(url)
 
-        self.assertEqual(json, expected)
-        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertEqual(response.url, "https://potato.io/harcoded-1000x500")
+        self.assertEqual(response.status_code, status.HTTP_301_MOVED_PERMANENTLY)
+        self.assertIn("Accept", response["Vary"])
 
         self.assertEqual(
-            mock.call_args_list,
-            [
-                call(
-                    "POST",
-                    "https://us-central1-labor-day-story.cloudfunctions.net/resize-image",
-                    data='{"width": "1000", "height": null, "filename": "harcoded", "bucket": "bucket-name"}',
-                    headers={
-                        "Authorization": "Bearer blablabla",
-                        "Content-Type": "application/json",
-                        "Accept": "application/json",
-                    },
-                    params={},
-                    timeout=2,
-                )
-            ],
+            storage.return_value.file.call_args_list,
+            [call("bucket-name", "harcoded"), call("bucket-name", "harcoded-1000x500")],
+        )
+        self.assertEqual(
+            storage.return_value.file.return_value.upload.call_args_list,
+            [call(ANY, public=True, content_type="image/png")],
         )
 
         self.assertEqual(
@@ -375,7 +396,19 @@ class MediaTestSuite(MediaTestCase):
             ],
         )
 
-        self.assertEqual(self.all_media_resolution_dict(), [])
+        self.assertEqual(
+            self.all_media_resolution_dict(),
+            [
+                {
+                    "hash": model.media.hash,
+                    "height": 500,
+                    "hits": 1,
+                    "id": 1,
+                    "width": 1000,
+                    "format": "",
+                }
+            ],
+        )
 
     @patch(
         "os.getenv",
@@ -388,94 +421,43 @@ class MediaTestSuite(MediaTestCase):
             )
         ),
     )
-    def test_file_id__with_width_in_querystring__cloud_function_error(self):
+    def test_file_id__with_width_in_querystring__google_cloud_file(self):
         """Test /answer without auth"""
         self.headers(academy=1)
         media_kwargs = {"url": "https://potato.io/harcoded", "mime": "image/png", "hash": "harcoded"}
         model = self.generate_models(academy=True, media=True, media_kwargs=media_kwargs)
 
-        with patch("google.oauth2.id_token.fetch_id_token") as token_mock:
-            token_mock.return_value = "blablabla"
+        bucket = MagicMock()
+        bucket.get_blob.return_value.download_as_string.return_value = png(2000, 1000)
+        storage = MagicMock()
+        storage.return_value.file.side_effect = lambda bucket_name, file_name: File(bucket, file_name)
 
-            with patch(REQUESTS_PATH["request"], apply_requests_request_mock([bad_server_response()])) as mock:
-                url = reverse_lazy("media:file_id", kwargs={"media_id": 1}) + "?width=1000"
-                response = self.client.get(url)
-                json = response.json()
-
-        expected = {
-            "detail": "cloud-function-bad-input",
-            "status_code": 500,
-        }
-
-        self.assertEqual(json, expected)
-        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        with patch("breathecode.media.variants.Storage", storage):
+            url = reverse_lazy("media:file_id", kwargs={"media_id": 1}) + "?width=1000"
+            response = self.client.get(url)
 
-        self.assertEqual(
-            mock.call_args_list,
-            [
-                call(
-                    "POST",
-                    "https://us-central1-labor-day-story.cloudfunctions.net/resize-image",
-                    data='{"width": "1000", "height": null, "filename": "harcoded", "bucket": "bucket-name"}',
-                    headers={
-                        "Authorization": "Bearer blablabla",
-                        "Content-Type": "application/json",
-                        "Accept": "application/json",
-                    },
-                    params={},
-                    timeout=2,
-                )
-            ],
-        )
+        self.assertEqual(response.url, "https://potato.io/harcoded-1000x500")
+        self.assertEqual(response.status_code, status.HTTP_301_MOVED_PERMANENTLY)
 
+        self.assertEqual(bucket.get_blob.return_value.download_as_string.call_args_list, [call()])
+        self.assertEqual(bucket.blob.call_args_list, [call("harcoded-1000x500")])
         self.assertEqual(
-            self.all_media_dict(),
-            [
-                {
-                    **self.model_to_dict(model, "media"),
-                    "hits": model["media"].hits + 1,
-                }
-            ],
+            bucket.blob.return_value.upload_from_string.call_args_list, [call(ANY, content_type="image/png")]
         )
 
-        self.assertEqual(self.all_media_resolution_dict(), [])
-
-    """
-    🔽🔽🔽 Height in querystring
-    """
-
-    @patch(
-        "os.getenv",
-        MagicMock(
-            side_effect=apply_get_env(
-                {
-                    "GOOGLE_PROJECT_ID": "labor-day-story",
-                    "MEDIA_GALLERY_BUCKET": "bucket-name",
-                }
-            )
-        ),
-    )
-    def test_file_id__with_height_in_querystring__bad_mime(self):
-        """Test /answer without auth"""
-        self.headers(academy=1)
-        media_kwargs = {"url": "https://potato.io", "mime": "application/json"}
-        model = self.generate_models(academy=True, media=True, media_kwargs=media_kwargs)
-        url = reverse_lazy("media:file_id", kwargs={"media_id": 1}) + "?height=1000"
-        response = self.client.get(url)
-        json = response.json()
-        expected = {"detail": "cannot-resize-media", "status_code": 400}
-
-        self.assertEqual(json, expected)
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(
-            self.all_media_dict(),
+            self.all_media_resolution_dict(),
             [
                 {
-                    **self.model_to_dict(model, "media"),
+                    "hash": model.media.hash,
+                    "height": 500,
+                    "hits": 1,
+                    "id": 1,
+                    "width": 1000,
+                    "format": "",
                 }
             ],
         )
-        self.assertEqual(self.all_media_resolution_dict(), [])
 
     @patch(
         "os.getenv",
@@ -494,32 +476,22 @@ class MediaTestSuite(MediaTestCase):
         media_kwargs = {"url": "https://potato.io/harcoded", "mime": "image/png", "hash": "harcoded"}
         model = self.generate_models(academy=True, media=True, media_kwargs=media_kwargs)
 
-        with patch("google.oauth2.id_token.fetch_id_token") as token_mock:
-            token_mock.return_value = "blablabla"
-
-            with patch(REQUESTS_PATH["request"], apply_requests_request_mock([resized_response()])) as mock:
-                url = reverse_lazy("media:file_id", kwargs={"media_id": 1}) + "?height=1000"
-                response = self.client.get(url)
+        storage = storage_mock(png(2000, 1000))
+        with patch("breathecode.media.variants.Storage", storage):
+            url = reverse_lazy("media:file_id", kwargs={"media_id": 1}) + "?height=1000"
+            response = self.client.get(url)
 
-        self.assertEqual(response.url, "https://potato.io/harcoded-1000x1000")
+        self.assertEqual(response.url, "https://potato.io/harcoded-2000x1000")
         self.assertEqual(response.status_code, status.HTTP_301_MOVED_PERMANENTLY)
+        self.assertIn("Accept", response["Vary"])
 
         self.assertEqual(
-            mock.call_args_list,
-            [
-                call(
-                    "POST",
-                    "https://us-central1-labor-day-story.cloudfunctions.net/resize-image",
-                    data='{"width": null, "height": "1000", "filename": "harcoded", "bucket": "bucket-name"}',
-                    headers={
-                        "Authorization": "Bearer blablabla",
-                        "Content-Type": "application/json",
-                        "Accept": "application/json",
-                    },
-                    params={},
-                    timeout=2,
-                )
-            ],
+            storage.return_value.file.call_args_list,
+            [call("bucket-name", "harcoded"), call("bucket-name", "harcoded-2000x1000")],
+        )
+        self.assertEqual(
+            storage.return_value.file.return_value.upload.call_args_list,
+            [call(ANY, public=True, content_type="image/png")],
         )
 
         self.assertEqual(
@@ -540,7 +512,8 @@ class MediaTestSuite(MediaTestCase):
                     "height": 1000,
                     "hits": 1,
                     "id": 1,
-                    "width": 1000,
+                    "width": 2000,
+                    "format": "",
                 }
             ],
         )
@@ -556,43 +529,34 @@ class MediaTestSuite(MediaTestCase):
             )
         ),
     )
-    def test_file_id__with_height_in_querystring__resolution_exist(self):
+    def test_file_id__with_height_in_querystring__accept_webp(self):
         """Test /answer without auth"""
         self.headers(academy=1)
         media_kwargs = {"url": "https://potato.io/harcoded", "mime": "image/png", "hash": "harcoded"}
-        media_resolution_kwargs = {"width": 1000, "height": 1000, "hash": "harcoded"}
-        model = self.generate_models(
-            academy=True,
-            media=True,
-            media_resolution=True,
-            media_kwargs=media_kwargs,
-            media_resolution_kwargs=media_resolution_kwargs,
-        )
+        model = self.generate_models(academy=True, media=True, media_kwargs=media_kwargs)
 
-        with patch(REQUESTS_PATH["request"], apply_requests_request_mock([resized_response()])) as mock:
-            url = reverse_lazy("media:file_id", kwargs={"media_id": 1}) + "?height=1000"
-            response = self.client.get(url)
+        storage = storage_mock(png(2000, 1000))
+        with patch("breathecode.media.variants.Storage", storage):
+            url = reverse_lazy("media:file_id", kwargs={"media_id": 1}) + "?height=100"
+            response = self.client.get(url, HTTP_ACCEPT="image/webp,*/*")
 
-        self.assertEqual(response.url, "https://potato.io/harcoded-1000x1000")
+        self.assertEqual(response.url, "https://potato.io/harcoded-200x100.webp")
         self.assertEqual(response.status_code, status.HTTP_301_MOVED_PERMANENTLY)
-
-        self.assertEqual(mock.call_args_list, [])
         self.assertEqual(
-            self.all_media_dict(),
-            [
-                {
-                    **self.model_to_dict(model, "media"),
-                    "hits": model["media"].hits + 1,
-                }
-            ],
+            storage.return_value.file.return_value.upload.call_args_list,
+            [call(ANY, public=True, content_type="image/webp")],
         )
 
         self.assertEqual(
             self.all_media_resolution_dict(),
             [
                 {
-                    **self.model_to_dict(model, "media_resolution"),
-                    "hits": model["media_resolution"].hits + 1,
+                    "hash": model.media.hash,
+                    "height": 100,
+                    "hits": 1,
+                    "id": 1,
+                    "width": 200,
+                    "format": "webp",
                 }
             ],
         )
@@ -608,45 +572,21 @@ class MediaTestSuite(MediaTestCase):
             )
         ),
     )
-    def test_file_id__with_height_in_querystring__bad_mime(self):
+    def test_file_id__with_width_in_querystring__bad_mime_in_bucket(self):
         """Test /answer without auth"""
         self.headers(academy=1)
         media_kwargs = {"url": "https://potato.io/harcoded", "mime": "image/png", "hash": "harcoded"}
         model = self.generate_models(academy=True, media=True, media_kwargs=media_kwargs)
 
-        with patch("google.oauth2.id_token.fetch_id_token") as token_mock:
-            token_mock.return_value = "blablabla"
-
-            with patch(REQUESTS_PATH["request"], apply_requests_request_mock([bad_size_response()])) as mock:
-                url = reverse_lazy("media:file_id", kwargs={"media_id": 1}) + "?height=1000"
-                response = self.client.get(url)
-                json = response.json()
-
-        expected = {
-            "detail": "cloud-function-bad-input",
-            "status_code": 500,
-        }
+        storage = storage_mock(b'{"detail": "not-found"}')
+        with patch("breathecode.media.variants.Storage", storage):
+            url = reverse_lazy("media:file_id", kwargs={"media_id": 1}) + "?width=1000"
+            response = self.client.get(url)
+            json = response.json()
 
-        self.assertEqual(json, expected)
+        self.assertEqual(json["detail"], "resize-image-error")
         self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-        self.assertEqual(
-            mock.call_args_list,
-            [
-                call(
-                    "POST",
-                    "https://us-central1-labor-day-story.cloudfunctions.net/resize-image",
-                    data='{"width": null, "height": "1000", "filename": "harcoded", "bucket": "bucket-name"}',
-                    headers={
-                        "Authorization": "Bearer blablabla",
-                        "Content-Type": "application/json",
-                        "Accept": "application/json",
-                    },
-                    params={},
-                    timeout=2,
-                )
-            ],
-        )
+        self.assertEqual(storage.return_value.file.return_value.upload.call_args_list, [])
 
         self.assertEqual(
             self.all_media_dict(),
@@ -657,7 +597,6 @@ class MediaTestSuite(MediaTestCase):
                 }
             ],
         )
-
         self.assertEqual(self.all_media_resolution_dict(), [])
 
     @patch(
@@ -671,45 +610,21 @@ class MediaTestSuite(MediaTestCase):
             )
         ),
     )
-    def test_file_id__with_height_in_querystring__cloud_function_error(self):
+    def test_file_id__with_height_in_querystring__bad_mime_in_bucket(self):
         """Test /answer without auth"""
         self.headers(academy=1)
         media_kwargs = {"url": "https://potato.io/harcoded", "mime": "image/png", "hash": "harcoded"}
         model = self.generate_models(academy=True, media=True, media_kwargs=media_kwargs)
 
-        with patch("google.oauth2.id_token.fetch_id_token") as token_mock:
-            token_mock.return_value = "blablabla"
-
-            with patch(REQUESTS_PATH["request"], apply_requests_request_mock([bad_server_response()])) as mock:
-                url = reverse_lazy("media:file_id", kwargs={"media_id": 1}) + "?height=1000"
-                response = self.client.get(url)
-                json = response.json()
-
-        expected = {
-            "detail": "cloud-function-bad-input",
-            "status_code": 500,
-        }
+        storage = storage_mock(b'{"detail": "not-found"}')
+        with patch("breathecode.media.variants.Storage", storage):
+            url = reverse_lazy("media:file_id", kwargs={"media_id": 1}) + "?height=1000"
+            response = self.client.get(url)
+            json = response.json()
 
-        self.assertEqual(json, expected)
+        self.assertEqual(json["detail"], "resize-image-error")
         self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-        self.assertEqual(
-            mock.call_args_list,
-            [
-                call(
-                    "POST",
-                    "https://us-central1-labor-day-story.cloudfunctions.net/resize-image",
-                    data='{"width": null, "height": "1000", "filename": "harcoded", "bucket": "bucket-name"}',
-                    headers={
-                        "Authorization": "Bearer blablabla",
-                        "Content-Type": "application/json",
-                        "Accept": "application/json",
-                    },
-                    params={},
-                    timeout=2,
-                )
-            ],
-        )
+        self.assertEqual(storage.return_value.file.return_value.upload.call_args_list, [])
 
         self.assertEqual(
             self.all_media_dict(),
@@ -720,5 +635,4 @@ class MediaTestSuite(MediaTestCase):
                 }
             ],
         )
-
         self.assertEqual(self.all_media_resolution_dict(), [])
@@ -15,6 +15,7 @@ from rest_framework import status
 
 from breathecode.media.signals import schedule_deletion
 from breathecode.media.tasks import process_file
+from breathecode.media.utils import HashingWriter
 from breathecode.services.google_cloud import File, Storage
 
 
@@ -52,7 +53,8 @@ def get_chunk(fake: capy.Fake):
 
 
 def mock_download(x: BytesIO) -> None:
-    x.write(b"my_line\n")
+    # the chunks composed in the bucket
+    x.write(b"my_line\nmy_line\nmy_line\n")
 
 
 @pytest.fixture(autouse=True)
@@ -61,6 +63,9 @@ def setup(db, monkeypatch: pytest.MonkeyPatch):
     monkeypatch.setattr("breathecode.services.google_cloud.Storage.client", PropertyMock(), raising=False)
     monkeypatch.setattr("breathecode.services.google_cloud.File.download", MagicMock(side_effect=mock_download))
     monkeypatch.setattr("breathecode.services.google_cloud.File.upload", MagicMock())
+    monkeypatch.setattr("breathecode.services.google_cloud.File.compose", MagicMock())
+    monkeypatch.setattr("breathecode.services.google_cloud.File.exists", MagicMock(return_value=False))
+    monkeypatch.setattr("breathecode.services.google_cloud.File.rename", MagicMock())
     monkeypatch.setattr("breathecode.media.signals.schedule_deletion.adelay", AsyncMock())
     monkeypatch.setattr("breathecode.media.tasks.process_file.delay", AsyncMock())
 
@@ -394,26 +399,24 @@ class TestNoSchema:
         ]
 
         assert Storage.__init__.call_args_list == [call()]
-        assert len(File.download.call_args_list) == 3
+        assert len(File.download.call_args_list) == 1
 
-        for n in range(3):
-            args, kwargs = File.download.call_args_list[0]
-            assert len(args) == 1
-            assert isinstance(args[0], BytesIO)
-            assert kwargs == {}
+        args, kwargs = File.download.call_args_list[0]
+        assert len(args) == 1
+        assert isinstance(args[0], HashingWriter)
+        assert kwargs == {}
 
-        # assert File.upload.call_args_list == []
-        assert len(File.upload.call_args_list) == 1
+        assert File.upload.call_args_list == []
+        assert len(File.compose.call_args_list) == 1
 
-        args, kwargs = File.upload.call_args_list[0]
+        args, kwargs = File.compose.call_args_list[0]
 
         assert len(args) == 1
-        assert isinstance(args[0], BytesIO)
-        file: BytesIO = args[0]
-        assert file.getvalue() == b"my_line\nmy_line\nmy_line\n"
-
+        assert len(args[0]) == 3
         assert kwargs == {"content_type": "text/plain"}
 
+        assert File.rename.call_args_list == [call("a291e39ac495b2effd38d508417cd731")]
+
         assert schedule_deletion.adelay.call_args_list == [
             call(instance=chunk, sender=chunk.__class__) for chunk in model.chunk
         ]
@@ -645,26 +648,24 @@ class TestMediaSchema:
         ]
 
         assert Storage.__init__.call_args_list == [call()]
-        assert len(File.download.call_args_list) == 3
+        assert len(File.download.call_args_list) == 1
 
-        for n in range(3):
-            args, kwargs = File.download.call_args_list[0]
-            assert len(args) == 1
-            assert isinstance(args[0], BytesIO)
-            assert kwargs == {}
+        args, kwargs = File.download.call_args_list[0]
+        assert len(args) == 1
+        assert isinstance(args[0], HashingWriter)
+        assert kwargs == {}
 
-        # assert File.upload.call_args_list == []
-        assert len(File.upload.call_args_list) == 1
+        assert File.upload.call_args_list == []
+        assert len(File.compose.call_args_list) == 1
 
-        args, kwargs = File.upload.call_args_list[0]
+        args, kwargs = File.compose.call_args_list[0]
 
         assert len(args) == 1
-        assert isinstance(args[0], BytesIO)
-        file: BytesIO = args[0]
-        assert file.getvalue() == b"my_line\nmy_line\nmy_line\n"
-
+        assert len(args[0]) == 3
         assert kwargs == {"content_type": "text/plain"}
 
+        assert File.rename.call_args_list == [call("a291e39ac495b2effd38d508417cd731")]
+
         assert schedule_deletion.adelay.call_args_list == [
             call(instance=chunk, sender=chunk.__class__) for chunk in model.chunk
         ]
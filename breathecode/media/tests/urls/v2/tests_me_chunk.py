@@ -313,6 +313,7 @@ async def test_chunk_uploaded(
             "bucket": "upload-bucket",
             "chunk_index": 0,
             "chunk_size": 9712,
+            "hash": "2071cb3b6331de2502de150d393f88ff",
             "id": 1,
             "mime": "image/png",
             "name": "chunk.png",
@@ -0,0 +1,32 @@
+import hashlib
+from unittest.mock import MagicMock
+
+from breathecode.media.utils import hash_file, stream_copy
+
+CHUNKS = [b"first chunk\n", b"second chunk\n", b"third chunk\n"]
+
+
+def stored_file(content: bytes):
+    f = MagicMock()
+    f.download.side_effect = lambda writer: writer.write(content)
+    return f
+
+
+def test_hash_file__is_the_md5_of_the_content():
+    result = hash_file(stored_file(b"".join(CHUNKS)))
+
+    # the same hash of a file uploaded at once
+    assert result.hexdigest() == hashlib.md5(b"".join(CHUNKS)).hexdigest()
+    assert result.size == len(b"".join(CHUNKS))
+
+
+def test_stream_copy__uploads_the_content_and_hashes_it():
+    uploaded = []
+    target = MagicMock()
+    target.upload.side_effect = lambda f, content_type: f.seek(0) or uploaded.append(f.read())
+
+    result = stream_copy(target, [stored_file(x) for x in CHUNKS], content_type="text/plain")
+
+    assert uploaded == [b"".join(CHUNKS)]
+    assert result.hexdigest() == hashlib.md5(b"".join(CHUNKS)).hexdigest()
+    assert result.size == len(b"".join(CHUNKS))
@@ -1,11 +1,13 @@
 import hashlib
 import os
+import tempfile
 import traceback
+import uuid
 from copy import copy
-from io import BytesIO
 from typing import Any, Optional, Tuple, overload
 
 from adrf.views import APIView
+from asgiref.sync import sync_to_async
 from capyc.core.i18n import translation
 from capyc.rest_framework.exceptions import ValidationException
 from rest_framework import status
@@ -15,6 +17,7 @@ from breathecode.admissions.models import Academy
 from breathecode.authenticate.actions import aget_user_language
 from breathecode.media.models import Chunk, File
 from breathecode.media.signals import schedule_deletion
+from breathecode.services.google_cloud.file import File as GoogleCloudFile
 from breathecode.services.google_cloud.storage import Storage
 
 from .settings import MEDIA_MIME_ALLOWED, MEDIA_SETTINGS, MediaSettings, Schema
@@ -23,6 +26,7 @@ __all__ = ["ChunkedUploadMixin", "ChunkUploadMixin", "media_settings"]
 
 
 MEDIA_OPERATION_TYPES = tuple(", ".join(MEDIA_SETTINGS.keys()))
+STREAM_COPY_MAX_MEMORY = 10 * 1024 * 1024
 
 
 @overload
@@ -40,6 +44,51 @@ def media_settings(operation_type: Optional[str] = None) -> MediaSettings | Tupl
     return copy(MEDIA_SETTINGS.get(operation_type))
 
 
+class HashingWriter:
+    """File-like object that computes the MD5 and the size of what is written, optionally forwarding it."""
+
+    def __init__(self, target=None):
+        self.target = target
+        self.md5 = hashlib.md5()
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.md5.update(data)
+        self.size += len(data)
+
+        if self.target is not None:
+            self.target.write(data)
+
+        return len(data)
+
+    def hexdigest(self) -> str:
+        return self.md5.hexdigest()
+
+
+def hash_file(f: GoogleCloudFile) -> HashingWriter:
+    """Get the MD5 of a stored file streaming it, it is never kept in memory."""
+
+    writer = HashingWriter()
+    f.download(writer)
+    return writer
+
+
+def stream_copy(target: GoogleCloudFile, sources: list[GoogleCloudFile], content_type: str) -> HashingWriter:
+    """
+    Concatenate files from different buckets spilling to disk instead of keeping them in memory, it returns
+    the MD5 of the content.
+    """
+
+    with tempfile.SpooledTemporaryFile(max_size=STREAM_COPY_MAX_MEMORY) as f:
+        writer = HashingWriter(f)
+        for source in sources:
+            source.download(writer)
+
+        target.upload(f, content_type=content_type)
+
+    return writer
+
+
 class UploadMixin(APIView):
     async def upload(self, academy_id: Optional[int] = None, format: str = "multipart"):
         request = self.request
@@ -238,6 +287,11 @@ class ChunkedUploadMixin(UploadMixin):
                 code=400,
             )
 
+        # kept to verify the integrity of the chunk
+        chunk_hash = hashlib.md5()
+        for piece in chunk.chunks():
+            chunk_hash.update(piece)
+
         bucket = os.getenv("UPLOAD_BUCKET", "upload-bucket")
         instance = await Chunk.objects.acreate(
             academy=academy,
@@ -249,12 +303,13 @@ class ChunkedUploadMixin(UploadMixin):
             total_chunks=self.total_chunks,
             bucket=bucket,
             chunk_size=chunk.size,
+            hash=chunk_hash.hexdigest(),
         )
 
         try:
-            storage = Storage()
-            f = storage.file(bucket, instance.file_name)
-            f.upload(chunk, content_type=chunk.content_type)
+            storage = await sync_to_async(Storage)()
+            f = await sync_to_async(storage.file)(bucket, instance.file_name)
+            await sync_to_async(f.upload)(chunk, content_type=chunk.content_type)
 
         except Exception:
             traceback.print_exc()
@@ -355,30 +410,38 @@ class ChunkUploadMixin(UploadMixin):
                 ),
                 code=400,
             )
-        res = BytesIO()
 
-        storage = Storage()
+        bucket = os.getenv("UPLOAD_BUCKET", "upload-bucket")
+        storage = await sync_to_async(Storage)()
 
-        # separate it to a cloud function to avoid memory issues
+        sources = []
         async for chunk in chunks:
-            f = BytesIO()
+            uploaded_chunk = await sync_to_async(storage.file)(chunk.bucket, chunk.file_name)
+            sources.append((chunk, uploaded_chunk))
 
-            uploaded_chunk = storage.file(chunk.bucket, chunk.file_name)
-            uploaded_chunk.download(f)
+        # the file is named by the MD5 of its content, so the same file uploaded in chunks or at once is the same
+        # object, the content is assembled with a temporary name and read once to get its MD5
+        tmp_file = await sync_to_async(storage.file)(bucket, f"compose-{uuid.uuid4().hex}")
 
-            res.write(f.getvalue())
+        if all(chunk.bucket == bucket for chunk, _ in sources):
+            await tmp_file.acompose([x for _, x in sources], content_type=mime)
+            content = await sync_to_async(hash_file)(tmp_file)
 
-            await schedule_deletion.adelay(instance=chunk, sender=chunk.__class__)
+        else:
+            content = await sync_to_async(stream_copy)(tmp_file, [x for _, x in sources], content_type=mime)
 
-        bucket = os.getenv("UPLOAD_BUCKET", "upload-bucket")
-        size = res.tell()
-        res.seek(0)
+        hash = content.hexdigest()
+        size = content.size
 
-        hash = hashlib.md5(res.getvalue()).hexdigest()
-        res.seek(0)
+        new_file = await sync_to_async(storage.file)(bucket, hash)
+        if await sync_to_async(new_file.exists)():
+            await sync_to_async(tmp_file.delete)()
 
-        new_file = storage.file(bucket, hash)
-        new_file.upload(res, content_type=mime)
+        else:
+            await sync_to_async(tmp_file.rename)(hash)
+
+        for chunk, _ in sources:
+            await schedule_deletion.adelay(instance=chunk, sender=chunk.__class__)
 
         if file is None:
             file = await File.objects.acreate(
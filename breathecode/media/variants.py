@@ -0,0 +1,166 @@
+"""
+In-process generation of resized image variants.
+
+A variant is identified by the hash of the original image, the requested width or height and the output format,
+it is generated once with Pillow, stored next to the original in the media bucket and indexed in `MediaResolution`.
+Concurrent requests for the same variant wait for the first one instead of resizing the image again, inside the
+process through a shared future and across processes through a Redis lock.
+"""
+
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Optional
+
+from django.core.cache import cache
+from django.db import close_old_connections
+from django_redis import get_redis_connection
+from PIL import Image, features
+
+from breathecode.services.google_cloud import Storage
+from breathecode.utils.redis import Lock
+
+from .models import Media, MediaResolution
+
+__all__ = ["VariantKey", "VariantError", "negotiate_format", "get_or_create_variant"]
+
+IS_DJANGO_REDIS = hasattr(cache, "fake") is False
+
+logger = logging.getLogger(__name__)
+
+# preferred first
+FORMATS = {
+    "avif": ("image/avif", "AVIF"),
+    "webp": ("image/webp", "WEBP"),
+}
+
+_inflight: dict["VariantKey", Future] = {}
+_inflight_lock = threading.Lock()
+
+
+class VariantError(Exception):
+    pass
+
+
+def media_gallery_bucket():
+    return os.getenv("MEDIA_GALLERY_BUCKET")
+
+
+@functools.lru_cache(maxsize=1)
+def get_executor() -> ThreadPoolExecutor:
+    workers = int(os.getenv("MEDIA_RESIZE_WORKERS", "2"))
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="media-variant")
+
+
+def get_resize_timeout() -> int:
+    return int(os.getenv("MEDIA_RESIZE_TIMEOUT", "30"))
+
+
+@dataclass(frozen=True)
+class VariantKey:
+    hash: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+    format: str = ""
+
+    def __str__(self) -> str:
+        return f"{self.hash}:{self.width or 0}:{self.height or 0}:{self.format or 'original'}"
+
+
+def negotiate_format(accept: Optional[str]) -> str:
+    """Pick the smallest output format supported by the client, an empty string keeps the original format."""
+
+    if not accept:
+        return ""
+
+    for format, (mime, _) in FORMATS.items():
+        if mime in accept and features.check(format):
+            return format
+
+    return ""
+
+
+def get_resolution(key: VariantKey) -> Optional[MediaResolution]:
+    lookups = {"hash": key.hash, "format": key.format}
+    if key.width:
+        lookups["width"] = key.width
+
+    if key.height:
+        lookups["height"] = key.height
+
+    return MediaResolution.objects.filter(**lookups).first()
+
+
+def resize(content: bytes, key: VariantKey) -> tuple[bytes, int, int, str]:
+    """Resize the image to the requested width or height keeping its aspect ratio."""
+
+    with Image.open(BytesIO(content)) as image:
+        original_width, original_height = image.size
+
+        if key.width:
+            width = key.width
+            height = max(1, round(original_height * width / original_width))
+
+        else:
+            height = key.height
+            width = max(1, round(original_width * height / original_height))
+
+        pil_format = FORMATS[key.format][1] if key.format else image.format
+        mime = FORMATS[key.format][0] if key.format else Image.MIME.get(image.format, "application/octet-stream")
+
+        resized = image.resize((width, height), Image.LANCZOS)
+        if pil_format == "JPEG" and resized.mode not in ("RGB", "L"):
+            resized = resized.convert("RGB")
+
+        output = BytesIO()
+        resized.save(output, format=pil_format, optimize=True)
+
+    return output.getvalue(), width, height, mime
+
+
+def generate_variant(media: Media, key: VariantKey) -> MediaResolution:
+    # this runs in the worker pool, the threads keep their own connections
+    close_old_connections()
+
+    client = get_redis_connection("default") if IS_DJANGO_REDIS else None
+
+    with Lock(client, f"lock:media:variant:{key}", timeout=get_resize_timeout() * 2, blocking_timeout=60):
+        # another process could have generated it while this one was waiting
+        if resolution := get_resolution(key):
+            return resolution
+
+        storage = Storage()
+        original = storage.file(media_gallery_bucket(), media.hash)
+        content = original.download()
+        if content is None:
+            raise VariantError(f"Original image {media.hash} not found")
+
+        data, width, height, mime = resize(content, key)
+
+        resolution = MediaResolution(hash=key.hash, width=width, height=height, format=key.format)
+        variant = storage.file(media_gallery_bucket(), media.hash + resolution.suffix)
+        variant.upload(data, public=True, content_type=mime)
+        resolution.save()
+        return resolution
+
+
+def get_or_create_variant(
+    media: Media, width: Optional[int] = None, height: Optional[int] = None, format: str = ""
+) -> MediaResolution:
+    key = VariantKey(hash=media.hash, width=width, height=height, format=format)
+
+    if resolution := get_resolution(key):
+        return resolution
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is None:
+            future = get_executor().submit(generate_variant, media, key)
+            _inflight[key] = future
+            future.add_done_callback(lambda _: _inflight.pop(key, None))
+
+    return future.result(timeout=get_resize_timeout())
@@ -3,6 +3,7 @@ import datetime
 import hashlib
 import logging
 import os
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 
 import requests
 from adrf.views import APIView
@@ -13,6 +14,8 @@ from circuitbreaker import CircuitBreakerError
 from django.db.models import Q
 from django.http import StreamingHttpResponse
 from django.shortcuts import redirect
+from django.utils.cache import patch_vary_headers
+from PIL import UnidentifiedImageError
 from rest_framework import status
 from rest_framework.parsers import FileUploadParser, MultiPartParser
 from rest_framework.permissions import AllowAny
@@ -20,6 +23,7 @@ from rest_framework.response import Response
 from slugify import slugify
 
 from breathecode.authenticate.actions import get_user_language
+from breathecode.media.counters import media_hits, media_resolution_hits
 from breathecode.media.models import Category, Media, MediaResolution
 from breathecode.media.schemas import FileSchema, MediaSchema
 from breathecode.media.serializers import (
@@ -31,7 +35,7 @@ from breathecode.media.serializers import (
     MediaSerializer,
 )
 from breathecode.media.utils import ChunkedUploadMixin, ChunkUploadMixin, media_settings
-from breathecode.services.google_cloud import FunctionV1
+from breathecode.media.variants import VariantError, get_or_create_variant, negotiate_format
 from breathecode.utils import GenerateLookupsMixin, capable_of, num_to_roman
 from breathecode.utils.api_view_extensions.api_view_extensions import APIViewExtensions
 from breathecode.utils.decorators import has_permission
@@ -61,10 +65,6 @@ def media_gallery_bucket():
     return os.getenv("MEDIA_GALLERY_BUCKET")
 
 
-def google_project_id():
-    return os.getenv("GOOGLE_PROJECT_ID", "")
-
-
 class MediaView(ViewSet, GenerateLookupsMixin):
     """
     get:
@@ -782,48 +782,36 @@ class MaskingUrlView(APIView):
             raise ValidationException("cannot resize this resource", code=400, slug="cannot-resize-media")
 
         # register click
-        media.hits = media.hits + 1
-        media.save()
-
-        resolution = MediaResolution.objects.filter(Q(width=width) | Q(height=height), hash=media.hash).first()
-
-        if (width or height) and not resolution:
-            func = FunctionV1(region="us-central1", project_id=google_project_id(), name="resize-image")
-
-            func_request = func.call(
-                {
-                    "width": width,
-                    "height": height,
-                    "filename": media.hash,
-                    "bucket": media_gallery_bucket(),
-                }
-            )
+        media_hits.incr(media.id)
 
-            res = func_request.json()
+        vary = False
+        if width or height:
+            try:
+                width = int(width) if width else None
+                height = int(height) if height else None
 
-            if not res["status_code"] == 200 or not res["message"] == "Ok":
-                if "message" in res:
-                    raise ValidationException(res["message"], code=500, slug="cloud-function-bad-input")
+            except ValueError:
+                raise ValidationException("width and height must be integers", code=400, slug="invalid-resolution")
 
-                raise ValidationException(
-                    "Unhandled request from cloud functions", code=500, slug="unhandled-cloud-function"
-                )
+            format = negotiate_format(request.headers.get("Accept"))
+            vary = True
 
-            width = res["width"]
-            height = res["height"]
-            resolution = MediaResolution(width=width, height=height, hash=media.hash)
-            resolution.save()
+            try:
+                resolution = get_or_create_variant(media, width=width, height=height, format=format)
 
-        if width or height:
-            width = resolution.width
-            height = resolution.height
+            except (VariantError, UnidentifiedImageError, FuturesTimeoutError) as e:
+                logger.exception(f"Error generating the variant of {media.hash}")
+                raise ValidationException(str(e) or "Error resizing the image", code=500, slug="resize-image-error")
 
-            url = f"{url}-{width}x{height}"
-            resolution.hits = resolution.hits + 1
-            resolution.save()
+            url = f"{url}{resolution.suffix}"
+            media_resolution_hits.incr(resolution.id)
 
         if request.GET.get("mask") != "true":
-            return redirect(url, permanent=True)
+            response = redirect(url, permanent=True)
+            if vary:
+                patch_vary_headers(response, ["Accept"])
+
+            return response
 
         response = requests.get(url, stream=True)
         resource = StreamingHttpResponse(
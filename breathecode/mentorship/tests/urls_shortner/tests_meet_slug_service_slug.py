@@ -22,6 +22,7 @@ from rest_framework import status
 from breathecode.mentorship.exceptions import ExtendSessionException
 from breathecode.mentorship.models import MentorshipSession
 from breathecode.payments import tasks
+from breathecode.payments.models import ConsumptionSession
 from breathecode.tests.mixins.breathecode_mixin.breathecode import Breathecode
 from breathecode.tests.mocks.requests import apply_requests_request_mock
 
@@ -85,6 +86,15 @@ def format_consumable(data={}):
 
 
 def format_consumption_session(mentorship_service, mentor_profile, mentorship_service_set, user, consumable, data={}):
+    request = {
+        "args": [],
+        "headers": {"academy": None},
+        "kwargs": {
+            "mentor_slug": mentor_profile.slug,
+            "service_slug": mentorship_service.slug,
+        },
+        "user": user.id,
+    }
     return {
         "consumable_id": consumable.id,
         "duration": timedelta(),
@@ -95,15 +105,8 @@ def format_consumption_session(mentorship_service, mentor_profile, mentorship_se
         "path": "payments.MentorshipServiceSet",
         "related_id": mentorship_service_set.id,
         "related_slug": mentorship_service_set.slug,
-        "request": {
-            "args": [],
-            "headers": {"academy": None},
-            "kwargs": {
-                "mentor_slug": mentor_profile.slug,
-                "service_slug": mentorship_service.slug,
-            },
-            "user": user.id,
-        },
+        "request": request,
+        "request_hash": ConsumptionSession.hash_request(request),
         "status": "PENDING",
         "user_id": user.id,
         "was_discounted": False,
@@ -2,11 +2,12 @@ import functools
 import gzip
 import os
 import sys
+import time
 import zlib
 
 import brotli
 import zstandard
-from asgiref.sync import iscoroutinefunction, sync_to_async
+from asgiref.sync import iscoroutinefunction
 from django.http import HttpRequest, HttpResponseRedirect
 from django.utils.decorators import sync_and_async_middleware
 from django.utils.deprecation import MiddlewareMixin
@@ -150,47 +151,90 @@ def set_service_header_middleware(get_response):
     return middleware
 
 
-NO_PAGINATED = set()
+PAGINATION_QUERY_PARAMS = ("limit", "offset", "cursor")
+PAGINATION_HEADERS = ("X-Total-Count", "Link")
 
 
-@sync_and_async_middleware
-def detect_pagination_issues_middleware(get_response):
-    from breathecode.monitoring.models import NoPagination
+def _record_request_telemetry(request: HttpRequest, response, latency: float, profile=None) -> None:
+    from breathecode.monitoring.telemetry import get_collector
+
+    if profile is not None:
+        response["Server-Timing"] = profile.server_timing(latency * 1000)
+
+    match = getattr(request, "resolver_match", None)
 
-    def instrument_no_pagination(request: HttpRequest) -> None:
-        if request.method not in ["GET"]:
-            return
+    # the unresolved paths are not grouped by route, they would fill the memory with every 404
+    if match is None:
+        return
 
-        path = request.path
-        method = request.method
+    paginated = any(x in request.GET for x in PAGINATION_QUERY_PARAMS) or any(
+        response.has_header(x) for x in PAGINATION_HEADERS
+    )
 
-        if (path, method) in NO_PAGINATED:
-            return
+    get_collector().record(
+        route=match.route or request.path,
+        method=request.method,
+        status=response.status_code,
+        latency=latency * 1000,
+        response_bytes=None if response.streaming else len(response.content),
+        profile=profile,
+        paginated=paginated,
+        unpaginated_list=request.method == "GET"
+        and not paginated
+        and isinstance(getattr(response, "data", None), list),
+    )
+
+
+@sync_and_async_middleware
+def request_telemetry_middleware(get_response):
+    """
+    Collect the latency, size, queries and pagination of the responses per route, it only touches the memory of
+    the process, the collector flushes the stats in background.
 
-        is_paginated = request.GET.get("limit") and request.GET.get("offset")
+    The queries of a sample of the requests are profiled, or of every request with `QUERY_PROFILER=1`, and those
+    responses include a `Server-Timing` header.
+    """
 
-        if is_paginated is False and NoPagination.objects.filter(path=path, method=method).exists() is False:
-            NO_PAGINATED.add((path, method))
-            NoPagination.objects.create(path=path, method=method)
+    from django.db import connection
 
-    @sync_to_async
-    def ainstrument_no_pagination(request: HttpRequest) -> None:
-        instrument_no_pagination(request)
+    from breathecode.monitoring.query_profiler import install_query_profiler, is_profiler_forced, profile_queries
+    from breathecode.monitoring.telemetry import get_collector
+
+    def must_profile() -> bool:
+        return is_profiler_forced() or get_collector().should_sample()
 
     if iscoroutinefunction(get_response):
 
         async def middleware(request: HttpRequest):
-            await ainstrument_no_pagination(request)
-
-            response = await get_response(request)
+            if not must_profile():
+                started = time.perf_counter()
+                response = await get_response(request)
+                _record_request_telemetry(request, response, time.perf_counter() - started)
+                return response
+
+            # the profile follows the request to the threads where the queries run
+            with profile_queries() as profile:
+                started = time.perf_counter()
+                response = await get_response(request)
+
+            _record_request_telemetry(request, response, time.perf_counter() - started, profile)
             return response
 
     else:
 
         def middleware(request: HttpRequest):
-            instrument_no_pagination(request)
-
-            response = get_response(request)
+            if not must_profile():
+                started = time.perf_counter()
+                response = get_response(request)
+                _record_request_telemetry(request, response, time.perf_counter() - started)
+                return response
+
+            install_query_profiler(connection=connection)
+            with profile_queries() as profile:
+                started = time.perf_counter()
+                response = get_response(request)
+
+            _record_request_telemetry(request, response, time.perf_counter() - started, profile)
             return response
 
     return middleware
@@ -16,6 +16,7 @@ from .models import (
     CSVDownload,
     CSVUpload,
     Endpoint,
+    EndpointStats,
     MonitorScript,
     MonitoringError,
     NoPagination,
@@ -336,6 +337,13 @@ class NoPaginationAdmin(admin.ModelAdmin):
     actions = [delete_all]
 
 
+@admin.register(EndpointStats)
+class EndpointStatsAdmin(admin.ModelAdmin):
+    list_display = ("route", "method", "count", "latency_p50", "latency_p95", "unpaginated_lists", "started_at")
+    list_filter = ["method"]
+    search_fields = ["route"]
+
+
 @admin.register(StripeEvent)
 class StripeEventAdmin(admin.ModelAdmin):
     list_display = ("stripe_id", "type", "status", "updated_at", "created_at")
@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from breathecode.monitoring.telemetry import REPORT_SORTS, get_endpoint_report
+
+
+class Command(BaseCommand):
+    help = "Report the endpoints with more queries, database time or duplicated queries collected by the telemetry"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=float, default=24, help="Number of hours to look back")
+        parser.add_argument("--sort", type=str, default="db_time", choices=REPORT_SORTS)
+        parser.add_argument("--limit", type=int, default=20, help="How many routes to show")
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(hours=options["hours"])
+        rows = get_endpoint_report(since, sort=options["sort"], limit=options["limit"])
+
+        if not rows:
+            self.stdout.write(self.style.WARNING("There are no endpoint stats in this period"))
+            return
+
+        for row in rows:
+            profile = "not profiled"
+            if row["sampled"]:
+                profile = (
+                    f"{row['queries_per_request']:.1f} queries, {row['db_time_per_request']:.1f}ms in db, "
+                    f"{row['duplicated_queries_per_request']:.1f} duplicated per request"
+                )
+
+            self.stdout.write(
+                f"{row['method']} {row['route']}: {row['count']} requests, p95 {row['latency_p95']:.0f}ms, "
+                f"{row['errors']} errors, {profile}"
+            )
+
+            for duplicate in row["top_duplicates"]:
+                self.stdout.write(f"    {duplicate['times']}x {duplicate['caller'] or 'unknown'}: {duplicate['query']}")
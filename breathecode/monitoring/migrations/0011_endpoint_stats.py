@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0010_rename_monitoring__parent_i_7c8a1e_idx_monitoring__parent__832e87_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EndpointStats",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "route",
+                    models.CharField(
+                        help_text="Route pattern of the endpoint, like v1/admissions/cohort/<int:id>", max_length=255
+                    ),
+                ),
+                ("method", models.CharField(max_length=9)),
+                ("started_at", models.DateTimeField(help_text="Start of the window")),
+                ("ended_at", models.DateTimeField(help_text="End of the window, when the stats were flushed")),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("errors", models.PositiveIntegerField(default=0, help_text="Responses with a 5xx status")),
+                ("paginated", models.PositiveIntegerField(default=0, help_text="Responses that were paginated")),
+                (
+                    "unpaginated_lists",
+                    models.PositiveIntegerField(default=0, help_text="Lists that were returned without pagination"),
+                ),
+                ("latency_p50", models.FloatField(default=0, help_text="Milliseconds")),
+                ("latency_p95", models.FloatField(default=0, help_text="Milliseconds")),
+                ("latency_max", models.FloatField(default=0, help_text="Milliseconds")),
+                ("response_bytes", models.BigIntegerField(default=0, help_text="Bytes sent in the window")),
+                ("sampled", models.PositiveIntegerField(default=0, help_text="Requests whose queries were counted")),
+                ("queries", models.PositiveIntegerField(default=0, help_text="Queries of the sampled requests")),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["route", "method", "started_at"], name="monitoring__route_d95307_idx")
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0011_endpoint_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="endpointstats",
+            name="db_time",
+            field=models.FloatField(default=0, help_text="Milliseconds spent in the database by the sampled requests"),
+        ),
+        migrations.AddField(
+            model_name="endpointstats",
+            name="duplicated_queries",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Queries of the sampled requests that repeated a previous query of the same request",
+            ),
+        ),
+        migrations.AddField(
+            model_name="endpointstats",
+            name="top_duplicates",
+            field=models.JSONField(
+                blank=True,
+                default=list,
+                help_text="Most repeated queries of the window with the code that executed them",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="endpointstats",
+            name="sampled",
+            field=models.PositiveIntegerField(default=0, help_text="Requests whose queries were profiled"),
+        ),
+    ]
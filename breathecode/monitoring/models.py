@@ -440,6 +440,43 @@ class NoPagination(models.Model):
     method = models.CharField(max_length=9)
 
 
+class EndpointStats(models.Model):
+    """Stats of the requests that a worker served for a route during a flush window of the telemetry."""
+
+    route = models.CharField(
+        max_length=255, help_text="Route pattern of the endpoint, like v1/admissions/cohort/<int:id>"
+    )
+    method = models.CharField(max_length=9)
+    started_at = models.DateTimeField(help_text="Start of the window")
+    ended_at = models.DateTimeField(help_text="End of the window, when the stats were flushed")
+
+    count = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0, help_text="Responses with a 5xx status")
+    paginated = models.PositiveIntegerField(default=0, help_text="Responses that were paginated")
+    unpaginated_lists = models.PositiveIntegerField(default=0, help_text="Lists that were returned without pagination")
+
+    latency_p50 = models.FloatField(default=0, help_text="Milliseconds")
+    latency_p95 = models.FloatField(default=0, help_text="Milliseconds")
+    latency_max = models.FloatField(default=0, help_text="Milliseconds")
+    response_bytes = models.BigIntegerField(default=0, help_text="Bytes sent in the window")
+
+    sampled = models.PositiveIntegerField(default=0, help_text="Requests whose queries were profiled")
+    queries = models.PositiveIntegerField(default=0, help_text="Queries of the sampled requests")
+    db_time = models.FloatField(default=0, help_text="Milliseconds spent in the database by the sampled requests")
+    duplicated_queries = models.PositiveIntegerField(
+        default=0, help_text="Queries of the sampled requests that repeated a previous query of the same request"
+    )
+    top_duplicates = models.JSONField(
+        default=list, blank=True, help_text="Most repeated queries of the window with the code that executed them"
+    )
+
+    class Meta:
+        indexes = [models.Index(fields=["route", "method", "started_at"])]
+
+    def __str__(self):
+        return f"{self.method} {self.route} ({self.count})"
+
+
 class MonitoringError(models.Model):
     """Represents errors detected by monitoring scripts without interrupting execution."""
 
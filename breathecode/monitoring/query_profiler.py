@@ -0,0 +1,131 @@
+"""
+Per-request SQL profiler.
+
+A database execute wrapper is installed on every connection and it only acts when the request being served is
+profiled, the profile lives in a context variable, so it follows the request into the threads where the
+async views run their queries. It records the number of queries, the time spent in the database and the
+fingerprint of each query, the queries repeated within the same request are the N+1 candidates, the caller
+in the codebase is only resolved when a fingerprint repeats to keep the overhead low.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+__all__ = ["QueryProfile", "fingerprint", "profile_queries", "install_query_profiler", "is_profiler_forced"]
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IGNORED_CALLERS = (os.path.abspath(__file__), os.path.join(BASE_DIR, "middlewares.py"))
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+IN_PATTERN = re.compile(r"\bIN \((?:%s, )*%s\)", re.I)
+STRING_PATTERN = re.compile(r"'(?:[^']|'')*'")
+NUMBER_PATTERN = re.compile(r"\b\d+\b")
+
+current_profile: ContextVar[Optional[QueryProfile]] = ContextVar("current_profile", default=None)
+
+
+def fingerprint(sql: str) -> str:
+    """Normalize a query, so the same query with other values has the same fingerprint."""
+
+    sql = WHITESPACE_PATTERN.sub(" ", sql).strip()
+    sql = STRING_PATTERN.sub("?", sql)
+    sql = NUMBER_PATTERN.sub("?", sql)
+    return IN_PATTERN.sub("IN (...)", sql)
+
+
+def get_caller() -> Optional[str]:
+    """Get the first frame of the codebase that executed the query."""
+
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(BASE_DIR) and filename not in IGNORED_CALLERS:
+            return f"{os.path.relpath(filename, os.path.dirname(BASE_DIR))}:{frame.f_lineno} {frame.f_code.co_name}"
+
+        frame = frame.f_back
+
+    return None
+
+
+class QueryProfile:
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+        self.fingerprints: Counter[str] = Counter()
+        self.callers: dict[str, Optional[str]] = {}
+
+    def add(self, sql: str, duration: float) -> None:
+        key = fingerprint(sql)
+
+        self.count += 1
+        self.time += duration
+        self.fingerprints[key] += 1
+
+        if self.fingerprints[key] == 2:
+            self.callers[key] = get_caller()
+
+    @property
+    def duplicates(self) -> list[tuple[str, int, Optional[str]]]:
+        """Get the `(fingerprint, times, caller)` of the queries executed more than once."""
+
+        return [(key, times, self.callers.get(key)) for key, times in self.fingerprints.most_common() if times > 1]
+
+    @property
+    def duplicated_queries(self) -> int:
+        return sum(times - 1 for times in self.fingerprints.values() if times > 1)
+
+    def server_timing(self, total: Optional[float] = None) -> str:
+        """Get the `Server-Timing` header, the times are in milliseconds."""
+
+        timing = f'db;dur={self.time:.1f};desc="{self.count} queries, {self.duplicated_queries} duplicated"'
+        if total is not None:
+            timing = f"app;dur={total:.1f}, {timing}"
+
+        return timing
+
+
+def profile_wrapper(execute, sql, params, many, context):
+    profile = current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+
+    finally:
+        profile.add(sql, (time.perf_counter() - started) * 1000)
+
+
+def install_query_profiler(sender=None, connection=None, **kwargs) -> None:
+    """Add the profiler to a connection, it is connected to `connection_created`."""
+
+    if connection is not None and profile_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(profile_wrapper)
+
+
+@contextmanager
+def profile_queries():
+    """Profile the queries executed within the block, including the ones of the threads that it spawns."""
+
+    profile = QueryProfile()
+    token = current_profile.set(profile)
+
+    try:
+        yield profile
+
+    finally:
+        current_profile.reset(token)
+
+
+def is_profiler_forced() -> bool:
+    return os.getenv("QUERY_PROFILER", "0").lower() in ["true", "1", "yes", "y"]
@@ -1,6 +1,7 @@
 import logging
 from datetime import timedelta
 
+from django.db.backends.signals import connection_created
 from django.dispatch import receiver
 
 from breathecode.admissions.models import Academy
@@ -8,6 +9,7 @@ from breathecode.admissions.signals import academy_reseller_changed
 from breathecode.admissions.utils.academy_features import has_feature_flag
 from breathecode.monitoring import signals
 from breathecode.monitoring.models import Application, MonitorScript
+from breathecode.monitoring.query_profiler import install_query_profiler
 
 logger = logging.getLogger(__name__)
 
@@ -42,3 +44,8 @@ def on_academy_reseller_changed(sender, instance, value, **kwargs):
     else:
         if monitor_script:
             monitor_script.delete()
+
+
+@receiver(connection_created, dispatch_uid="monitoring-query-profiler")
+def add_query_profiler(sender, connection, **kwargs):
+    install_query_profiler(connection=connection)
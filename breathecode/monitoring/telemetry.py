@@ -0,0 +1,298 @@
+"""
+In-process telemetry of the endpoints.
+
+Each worker aggregates the requests that it serves per route in memory, the request path only updates a few
+counters, and a background thread flushes the aggregates to `EndpointStats` every `TELEMETRY_FLUSH_INTERVAL`
+seconds with one insert. The lists returned without pagination are registered in `NoPagination` by the flush.
+
+The latencies are kept in a bounded reservoir per route to estimate the percentiles, and the queries are only
+profiled in a sample of `TELEMETRY_SAMPLE_RATE` of the requests, see `query_profiler`.
+"""
+
+from __future__ import annotations
+
+import atexit
+import functools
+import logging
+import math
+import os
+import random
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .query_profiler import QueryProfile
+
+__all__ = ["RouteStats", "TelemetryCollector", "get_collector", "get_endpoint_report"]
+
+logger = logging.getLogger(__name__)
+
+RESERVOIR_SIZE = 256
+MAX_DUPLICATES = 50
+TOP_DUPLICATES = 10
+
+
+@dataclass
+class RouteStats:
+    count: int = 0
+    errors: int = 0
+    paginated: int = 0
+    unpaginated_lists: int = 0
+    response_bytes: int = 0
+    sampled: int = 0
+    queries: int = 0
+    db_time: float = 0.0
+    duplicated_queries: int = 0
+    latency_max: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+    duplicates: dict[str, list] = field(default_factory=dict)
+
+    def add_profile(self, profile: QueryProfile) -> None:
+        self.sampled += 1
+        self.queries += profile.count
+        self.db_time += profile.time
+        self.duplicated_queries += profile.duplicated_queries
+
+        for key, times, caller in profile.duplicates:
+            duplicate = self.duplicates.get(key)
+            if duplicate is not None:
+                duplicate[0] += times
+                duplicate[1] = duplicate[1] or caller
+
+            elif len(self.duplicates) < MAX_DUPLICATES:
+                self.duplicates[key] = [times, caller]
+
+    def top_duplicates(self) -> list[dict]:
+        duplicates = sorted(self.duplicates.items(), key=lambda x: x[1][0], reverse=True)[:TOP_DUPLICATES]
+        return [{"query": key, "times": times, "caller": caller} for key, (times, caller) in duplicates]
+
+    def add_latency(self, latency: float, rand: random.Random) -> None:
+        self.latency_max = max(self.latency_max, latency)
+
+        # reservoir sampling, every latency of the window has the same chance to be kept
+        if len(self.latencies) < RESERVOIR_SIZE:
+            self.latencies.append(latency)
+            return
+
+        i = rand.randrange(self.count)
+        if i < RESERVOIR_SIZE:
+            self.latencies[i] = latency
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies:
+            return 0.0
+
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, math.ceil(q * len(latencies)) - 1)]
+
+
+class TelemetryCollector:
+
+    def __init__(self, sample_rate: float = 0.1, flush_interval: float = 60.0, autostart: bool = True):
+        self.sample_rate = sample_rate
+        self.flush_interval = flush_interval
+        self.autostart = autostart
+
+        self._lock = threading.Lock()
+        self._rand = random.Random()
+        self._stats: dict[tuple[str, str], RouteStats] = {}
+        self._started_at = timezone.now()
+        self._pid: Optional[int] = None
+        self._stop = threading.Event()
+
+    def should_sample(self) -> bool:
+        return self._rand.random() < self.sample_rate
+
+    def record(
+        self,
+        route: str,
+        method: str,
+        status: int,
+        latency: float,
+        response_bytes: Optional[int] = None,
+        profile: Optional[QueryProfile] = None,
+        paginated: bool = False,
+        unpaginated_list: bool = False,
+    ) -> None:
+        """Add a request to the stats of its route, `latency` is in milliseconds."""
+
+        if self.autostart and self._pid != os.getpid():
+            self.start()
+
+        with self._lock:
+            stats = self._stats.get((route, method))
+            if stats is None:
+                stats = self._stats[(route, method)] = RouteStats()
+
+            stats.count += 1
+            stats.errors += status >= 500
+            stats.paginated += paginated
+            stats.unpaginated_lists += unpaginated_list
+            stats.response_bytes += response_bytes or 0
+            stats.add_latency(latency, self._rand)
+
+            if profile is not None:
+                stats.add_profile(profile)
+
+    def drain(self) -> tuple[datetime, datetime, dict[tuple[str, str], RouteStats]]:
+        """Take the stats of the current window and start a new one."""
+
+        now = timezone.now()
+        with self._lock:
+            stats, self._stats = self._stats, {}
+            started_at, self._started_at = self._started_at, now
+
+        return started_at, now, stats
+
+    def flush(self) -> None:
+        started_at, ended_at, stats = self.drain()
+        if not stats:
+            return
+
+        try:
+            save_endpoint_stats(started_at, ended_at, stats)
+
+        except Exception as e:
+            logger.exception(f"The telemetry of {len(stats)} routes could not be saved: {e}")
+
+    def start(self) -> None:
+        """Start the flush thread of this process, a forked worker starts its own."""
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            # the stats inherited from the parent process were already counted there
+            self._pid = os.getpid()
+            self._stats = {}
+            self._started_at = timezone.now()
+            self._stop = threading.Event()
+
+        if self.flush_interval <= 0:
+            return
+
+        thread = threading.Thread(target=self._run, args=(self._stop,), name="request-telemetry", daemon=True)
+        thread.start()
+        atexit.register(self.flush)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self, stop: threading.Event) -> None:
+        while not stop.wait(self.flush_interval):
+            self.flush()
+            close_old_connections()
+
+
+def save_endpoint_stats(started_at: datetime, ended_at: datetime, stats: dict[tuple[str, str], RouteStats]) -> None:
+    from .models import EndpointStats, NoPagination
+
+    EndpointStats.objects.bulk_create(
+        [
+            EndpointStats(
+                route=route[:255],
+                method=method,
+                started_at=started_at,
+                ended_at=ended_at,
+                count=x.count,
+                errors=x.errors,
+                paginated=x.paginated,
+                unpaginated_lists=x.unpaginated_lists,
+                latency_p50=x.percentile(0.5),
+                latency_p95=x.percentile(0.95),
+                latency_max=x.latency_max,
+                response_bytes=x.response_bytes,
+                sampled=x.sampled,
+                queries=x.queries,
+                db_time=x.db_time,
+                duplicated_queries=x.duplicated_queries,
+                top_duplicates=x.top_duplicates(),
+            )
+            for (route, method), x in stats.items()
+        ]
+    )
+
+    unpaginated = {(route[:255], method) for (route, method), x in stats.items() if x.unpaginated_lists}
+    if not unpaginated:
+        return
+
+    registered = set(
+        NoPagination.objects.filter(path__in=[route for route, _ in unpaginated]).values_list("path", "method")
+    )
+    NoPagination.objects.bulk_create(
+        [NoPagination(path=route, method=method) for route, method in sorted(unpaginated - registered)]
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def get_collector() -> TelemetryCollector:
+    env = os.getenv("ENV", "")
+
+    return TelemetryCollector(
+        sample_rate=float(os.getenv("TELEMETRY_SAMPLE_RATE", "0.1")),
+        flush_interval=float(os.getenv("TELEMETRY_FLUSH_INTERVAL", "60")),
+        # the tests flush the collector by themselves
+        autostart=env in ["production", "staging", "development"],
+    )
+
+
+REPORT_SORTS = ["count", "errors", "queries", "db_time", "duplicated_queries", "latency_p95", "response_bytes"]
+
+
+def get_endpoint_report(since: datetime, sort: str = "db_time", limit: int = 20) -> list[dict]:
+    """
+    Aggregate the stats of every worker since a date per route, the averages of the queries are per profiled
+    request and the most repeated queries are merged from every window.
+    """
+
+    from django.db.models import Max, Sum
+
+    from .models import EndpointStats
+
+    if sort not in REPORT_SORTS:
+        sort = "db_time"
+
+    stats = EndpointStats.objects.filter(started_at__gte=since)
+    rows = list(
+        stats.values("route", "method")
+        .annotate(
+            count=Sum("count"),
+            errors=Sum("errors"),
+            paginated=Sum("paginated"),
+            unpaginated_lists=Sum("unpaginated_lists"),
+            latency_p95=Max("latency_p95"),
+            latency_max=Max("latency_max"),
+            response_bytes=Sum("response_bytes"),
+            sampled=Sum("sampled"),
+            queries=Sum("queries"),
+            db_time=Sum("db_time"),
+            duplicated_queries=Sum("duplicated_queries"),
+        )
+        .order_by(f"-{sort}", "route", "method")[:limit]
+    )
+
+    duplicates: dict[tuple[str, str], dict[str, list]] = {}
+    windows = stats.filter(route__in={x["route"] for x in rows}).exclude(top_duplicates=[])
+    for route, method, top_duplicates in windows.values_list("route", "method", "top_duplicates"):
+        merged = duplicates.setdefault((route, method), {})
+        for duplicate in top_duplicates:
+            current = merged.setdefault(duplicate["query"], [0, duplicate["caller"]])
+            current[0] += duplicate["times"]
+
+    for row in rows:
+        sampled = row["sampled"] or 0
+        row["queries_per_request"] = row["queries"] / sampled if sampled else None
+        row["db_time_per_request"] = row["db_time"] / sampled if sampled else None
+        row["duplicated_queries_per_request"] = row["duplicated_queries"] / sampled if sampled else None
+
+        merged = duplicates.get((row["route"], row["method"]), {})
+        row["top_duplicates"] = [
+            {"query": query, "times": times, "caller": caller}
+            for query, (times, caller) in sorted(merged.items(), key=lambda x: x[1][0], reverse=True)[:TOP_DUPLICATES]
+        ]
+
+    return rows
@@ -0,0 +1,76 @@
+import pytest
+from django.db import connection
+from django.urls import reverse_lazy
+
+from breathecode.admissions.models import Academy
+from breathecode.monitoring import telemetry
+from breathecode.monitoring.query_profiler import fingerprint, install_query_profiler, profile_queries
+from breathecode.monitoring.telemetry import TelemetryCollector
+from breathecode.tests.mixins.breathecode_mixin.breathecode import Breathecode
+
+
+@pytest.fixture
+def collector(db, monkeypatch: pytest.MonkeyPatch):
+    collector = TelemetryCollector(sample_rate=0, autostart=False)
+    monkeypatch.setattr(telemetry, "get_collector", lambda: collector)
+    yield collector
+
+
+def test_the_values_are_removed_from_the_fingerprint():
+    assert fingerprint("SELECT *\n  FROM academy WHERE id = 1 AND slug = 'it''s'") == (
+        "SELECT * FROM academy WHERE id = ? AND slug = ?"
+    )
+    assert fingerprint("SELECT * FROM academy WHERE id IN (%s, %s, %s)") == fingerprint(
+        "SELECT * FROM academy WHERE id IN (%s)"
+    )
+
+
+def test_the_repeated_queries_are_reported_with_its_caller(bc: Breathecode, db):
+    model = bc.database.create(academy=3, city=1, country=1)
+    install_query_profiler(connection=connection)
+
+    with profile_queries() as profile:
+        for academy in model.academy:
+            Academy.objects.filter(id=academy.id).first()
+
+        Academy.objects.count()
+
+    assert profile.count == 4
+    assert profile.time > 0
+    assert profile.duplicated_queries == 2
+
+    [(query, times, caller)] = profile.duplicates
+    assert times == 3
+    assert "academy" in query
+    assert caller.startswith("breathecode/monitoring/tests/test_query_profiler.py:")
+
+
+def test_the_queries_out_of_the_profile_are_ignored(db):
+    install_query_profiler(connection=connection)
+
+    with profile_queries() as profile:
+        pass
+
+    Academy.objects.count()
+
+    assert profile.count == 0
+
+
+def test_the_middleware_sends_the_server_timing(
+    bc: Breathecode, client, collector: TelemetryCollector, monkeypatch: pytest.MonkeyPatch
+):
+    bc.database.create(academy=2, city=1, country=1)
+    url = reverse_lazy("admissions:academy")
+
+    response = client.get(url)
+    assert "Server-Timing" not in response.headers
+
+    monkeypatch.setenv("QUERY_PROFILER", "1")
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert response.headers["Server-Timing"].startswith("app;dur=")
+    assert 'desc="1 queries, 0 duplicated"' in response.headers["Server-Timing"]
+
+    stats = collector.drain()[2][("v1/admissions/academy", "GET")]
+    assert (stats.count, stats.sampled, stats.queries) == (2, 1, 1)
@@ -0,0 +1,89 @@
+import pytest
+from django.urls import reverse_lazy
+
+from breathecode.monitoring import telemetry
+from breathecode.monitoring.models import EndpointStats, NoPagination
+from breathecode.monitoring.query_profiler import QueryProfile
+from breathecode.monitoring.telemetry import TelemetryCollector
+from breathecode.tests.mixins.breathecode_mixin.breathecode import Breathecode
+
+
+def profile(*queries):
+    result = QueryProfile()
+    for sql in queries:
+        result.add(sql, 1.5)
+
+    return result
+
+
+@pytest.fixture
+def collector(db, monkeypatch: pytest.MonkeyPatch):
+    collector = TelemetryCollector(sample_rate=1, autostart=False)
+    monkeypatch.setattr(telemetry, "get_collector", lambda: collector)
+    yield collector
+
+
+def test_the_stats_are_flushed_per_route(collector: TelemetryCollector):
+    for latency in range(1, 101):
+        collector.record("v1/admissions/academy", "GET", 200, latency, response_bytes=10, unpaginated_list=True)
+
+    collector.record("v1/admissions/academy", "POST", 500, 30, profile=profile("SELECT 1", "SELECT 2", "SELECT 3"))
+    collector.record("v1/admissions/cohort", "GET", 200, 5, paginated=True, profile=profile("SELECT 1", "SELECT 2"))
+
+    collector.flush()
+
+    stats = {(x.route, x.method): x for x in EndpointStats.objects.all()}
+    assert len(stats) == 3
+
+    academies = stats[("v1/admissions/academy", "GET")]
+    assert (academies.count, academies.response_bytes, academies.unpaginated_lists) == (100, 1000, 100)
+    assert (academies.latency_p50, academies.latency_p95, academies.latency_max) == (50, 95, 100)
+
+    assert stats[("v1/admissions/academy", "POST")].errors == 1
+
+    cohorts = stats[("v1/admissions/cohort", "GET")]
+    assert (cohorts.sampled, cohorts.queries, cohorts.db_time, cohorts.duplicated_queries) == (1, 2, 3.0, 1)
+    assert [(x["query"], x["times"]) for x in cohorts.top_duplicates] == [("SELECT ?", 2)]
+
+    assert list(NoPagination.objects.values_list("path", "method")) == [("v1/admissions/academy", "GET")]
+
+    # the window was reset and the routes are not registered twice
+    collector.record("v1/admissions/academy", "GET", 200, 1, unpaginated_list=True)
+    collector.flush()
+    collector.flush()
+
+    assert EndpointStats.objects.count() == 4
+    assert NoPagination.objects.count() == 1
+
+
+def test_the_latencies_are_kept_in_a_bounded_reservoir(collector: TelemetryCollector):
+    for latency in range(10000):
+        collector.record("v1/admissions/academy", "GET", 200, latency)
+
+    stats = collector.drain()[2][("v1/admissions/academy", "GET")]
+    assert stats.count == 10000
+    assert len(stats.latencies) == telemetry.RESERVOIR_SIZE
+    assert stats.latency_max == 9999
+
+
+def test_the_middleware_does_not_write_on_the_request_path(
+    bc: Breathecode, client, collector: TelemetryCollector, django_assert_num_queries
+):
+    bc.database.create(academy=2, city=1, country=1)
+    url = reverse_lazy("admissions:academy")
+
+    with django_assert_num_queries(1):
+        response = client.get(url)
+
+    assert response.status_code == 200
+
+    client.get(f"{url}?limit=1&offset=0")
+    client.get("/v1/this-route-does-not-exist")
+
+    stats = collector.drain()[2]
+    assert list(stats) == [("v1/admissions/academy", "GET")]
+
+    academies = stats[("v1/admissions/academy", "GET")]
+    assert (academies.count, academies.paginated, academies.unpaginated_lists) == (2, 1, 1)
+    assert (academies.sampled, academies.queries) == (2, 2)
+    assert academies.response_bytes > 0
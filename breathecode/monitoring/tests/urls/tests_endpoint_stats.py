@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+import pytest
+from capyc import pytest as capy
+from django.urls import reverse_lazy
+from django.utils import timezone
+from rest_framework import status
+
+from breathecode.monitoring.models import EndpointStats
+
+
+def endpoint_stats(route, method="GET", **kwargs):
+    now = timezone.now()
+    return EndpointStats(
+        route=route,
+        method=method,
+        started_at=kwargs.pop("started_at", now - timedelta(minutes=1)),
+        ended_at=now,
+        count=kwargs.pop("count", 10),
+        latency_p50=10,
+        latency_p95=20,
+        latency_max=30,
+        **kwargs,
+    )
+
+
+def tests_no_admin(client: capy.Client, database: capy.Database):
+    model = database.create(user={"is_staff": False})
+
+    client.force_authenticate(model.user)
+
+    url = reverse_lazy("monitoring:endpoint_stats")
+    response = client.get(url)
+
+    json = response.json()
+    expected = {"detail": "You do not have permission to perform this action.", "status_code": 403}
+
+    assert json == expected
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.parametrize(
+    "querystring",
+    [
+        "hours=yesterday",
+        "limit=many",
+        "limit=-1",
+        "limit=0",
+        "limit=1001",
+        "hours=-1",
+        "hours=0",
+        "hours=inf",
+        "hours=-inf",
+        "hours=nan",
+        "hours=1e10",
+    ],
+)
+def tests_invalid_params(client: capy.Client, database: capy.Database, querystring: str):
+    model = database.create(user={"is_staff": True})
+
+    client.force_authenticate(model.user)
+
+    url = reverse_lazy("monitoring:endpoint_stats") + "?" + querystring
+    response = client.get(url)
+
+    json = response.json()
+    expected = {"detail": "invalid-report-params", "status_code": 400}
+
+    assert json == expected
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def tests_get(client: capy.Client, database: capy.Database):
+    model = database.create(user={"is_staff": True})
+    duplicate = {"query": "SELECT * FROM cohort WHERE id = ?", "caller": "breathecode/views.py:10 get"}
+
+    EndpointStats.objects.bulk_create(
+        [
+            endpoint_stats(
+                "v1/admissions/cohort",
+                sampled=2,
+                queries=40,
+                db_time=80,
+                duplicated_queries=30,
+                top_duplicates=[{**duplicate, "times": 16}],
+            ),
+            endpoint_stats(
+                "v1/admissions/cohort",
+                sampled=1,
+                queries=20,
+                db_time=40,
+                duplicated_queries=15,
+                top_duplicates=[{**duplicate, "times": 16}],
+            ),
+            endpoint_stats("v1/admissions/academy", sampled=1, queries=2, db_time=1),
+            endpoint_stats("v1/admissions/syllabus", started_at=timezone.now() - timedelta(days=2), db_time=1000),
+        ]
+    )
+
+    client.force_authenticate(model.user)
+
+    url = reverse_lazy("monitoring:endpoint_stats")
+    response = client.get(url)
+
+    json = response.json()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [(x["route"], x["count"], x["db_time"]) for x in json] == [
+        ("v1/admissions/cohort", 20, 120),
+        ("v1/admissions/academy", 10, 1),
+    ]
+
+    assert (json[0]["queries_per_request"], json[0]["db_time_per_request"]) == (20, 40)
+    assert json[0]["duplicated_queries_per_request"] == 15
+    assert json[0]["top_duplicates"] == [{**duplicate, "times": 32}]
+    assert json[1]["top_duplicates"] == []
@@ -57,6 +57,7 @@ from .views import (
     AcademyDownloadView,
     AcademyScriptView,
     DjangoAdminView,
+    EndpointStatsView,
     MonitoringReportDetailView,
     MonitoringReportGenerationDetailView,
     MonitoringReportGenerationListView,
@@ -77,6 +78,7 @@ urlpatterns = [
     path("admin/actions", DjangoAdminView.as_view(), name="admin_actions"),
     path("application", get_apps),
     path("endpoint", get_endpoints),
+    path("endpoint-stats", EndpointStatsView.as_view(), name="endpoint_stats"),
     path("download", get_download),
     path("download/<int:download_id>", get_download),
     path("academy/download", AcademyDownloadView.as_view(), name="academy_download"),
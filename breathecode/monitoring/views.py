@@ -2,7 +2,7 @@ import logging
 import os
 from hashlib import sha256
 import json
-from datetime import date
+from datetime import date, timedelta
 from uuid import uuid4
 
 import stripe
@@ -41,6 +41,7 @@ from .serializers import (
 )
 from .signals import github_webhook
 from .tasks import async_unsubscribe_repo, generate_report_job
+from .telemetry import get_endpoint_report
 
 logger = logging.getLogger(__name__)
 
@@ -315,6 +316,34 @@ class DjangoAdminView(APIView):
         return Response({"success": True})
 
 
+MAX_REPORT_HOURS = 24 * 90
+MAX_REPORT_LIMIT = 1000
+
+
+class EndpointStatsView(APIView):
+    """Report of the endpoint telemetry, with the query profile of each route."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request: HttpRequest):
+        try:
+            hours = float(request.GET.get("hours", "24"))
+            limit = int(request.GET.get("limit", "20"))
+
+        except ValueError:
+            raise ValidationException("hours and limit must be numbers", slug="invalid-report-params")
+
+        # nan fails every comparison, so it is rejected along with inf and the out of range values
+        if not 0 < hours <= MAX_REPORT_HOURS or not 0 < limit <= MAX_REPORT_LIMIT:
+            raise ValidationException(
+                f"hours must be between 0 and {MAX_REPORT_HOURS} and limit between 1 and {MAX_REPORT_LIMIT}",
+                slug="invalid-report-params",
+            )
+
+        since = timezone.now() - timedelta(hours=hours)
+        return Response(get_endpoint_report(since, sort=request.GET.get("sort", "db_time"), limit=limit))
+
+
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def get_endpoints(request):
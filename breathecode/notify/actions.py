@@ -4,9 +4,7 @@ import os
 
 import requests
 from capyc.rest_framework.exceptions import ValidationException
-from django.template.loader import get_template
 from django.utils import timezone
-from premailer import transform
 from pyfcm import FCMNotification
 from rest_framework.exceptions import APIException
 from twilio.rest import Client
@@ -15,6 +13,7 @@ from breathecode.admissions.models import Cohort, CohortUser
 from breathecode.services.slack import client
 
 from .models import Device, SlackChannel, SlackTeam, SlackUser, SlackUserTeam
+from .utils.template_cache import TemplateCache
 
 push_service = None
 FIREBASE_KEY = os.getenv("FIREBASE_KEY", None)
@@ -74,16 +73,8 @@ def apply_verify_email_variant(data: dict) -> dict:
     return data
 
 
-def send_email_message(template_slug, to, data=None, force=False, inline_css=False, academy=None):
-
-    if data is None:
-        data = {}
-
-    if to is None or to == "" or (isinstance(to, list) and len(to) == 0):
-        raise ValidationException(f"Invalid email to send notification to {str(to)}")
-
-    if isinstance(to, list) == False:
-        to = [to]
+def _prepare_email_data(template_slug, data, academy=None):
+    """Apply the academy overrides to the email data, it returns None when the template is disabled."""
 
     # Check if template is disabled for this academy
     if academy and hasattr(academy, 'notify_settings'):
@@ -91,7 +82,7 @@ def send_email_message(template_slug, to, data=None, force=False, inline_css=Fal
             settings = academy.notify_settings
             if not settings.is_template_enabled(template_slug):
                 logger.info(f"Template '{template_slug}' is disabled for academy {academy.id}")
-                return True  # Silently skip sending
+                return None
         except Exception as e:
             logger.warning(f"Failed to check if template is disabled for {template_slug}: {e}")
 
@@ -112,6 +103,35 @@ def send_email_message(template_slug, to, data=None, force=False, inline_css=Fal
     if template_slug == "verify_email":
         apply_verify_email_variant(data)
 
+    return data
+
+
+def _get_sender_name(academy=None):
+    sender_name = os.environ.get("COMPANY_NAME", "4Geeks")
+    if academy is not None and getattr(academy, "white_labeled", False):
+        try:
+            sender_name = academy.name or sender_name
+        except Exception:
+            sender_name = sender_name
+
+    return sender_name
+
+
+def send_email_message(template_slug, to, data=None, force=False, inline_css=False, academy=None):
+
+    if data is None:
+        data = {}
+
+    if to is None or to == "" or (isinstance(to, list) and len(to) == 0):
+        raise ValidationException(f"Invalid email to send notification to {str(to)}")
+
+    if isinstance(to, list) == False:
+        to = [to]
+
+    data = _prepare_email_data(template_slug, data, academy=academy)
+    if data is None:
+        return True  # Silently skip sending
+
     # Optional: Log if template is not in registry (helps with future migration)
     if EmailManager is not None:
         if not EmailManager.validate_notification(template_slug):
@@ -120,12 +140,7 @@ def send_email_message(template_slug, to, data=None, force=False, inline_css=Fal
     if os.getenv("EMAIL_NOTIFICATIONS_ENABLED", False) == "TRUE" or force:
         template = get_template_content(template_slug, data, ["email"], inline_css=inline_css, academy=academy)
 
-        sender_name = os.environ.get("COMPANY_NAME", "4Geeks")
-        if academy is not None and getattr(academy, "white_labeled", False):
-            try:
-                sender_name = academy.name or sender_name
-            except Exception:
-                sender_name = sender_name
+        sender_name = _get_sender_name(academy)
 
         result = requests.post(
             f"https://api.mailgun.net/v3/{os.environ.get('MAILGUN_DOMAIN')}/messages",
@@ -152,6 +167,79 @@ def send_email_message(template_slug, to, data=None, force=False, inline_css=Fal
         return True
 
 
+# Mailgun accepts up to 1000 recipients per batch sending
+EMAIL_BATCH_SIZE = 1000
+
+
+def send_email_batch(template_slug, recipients, data=None, force=False, inline_css=False, academy=None):
+    """
+    Send one email to many recipients rendering the template a single time.
+
+    `recipients` is a list of `(email, variables)`, the variables are placeholders that Mailgun replaces for
+    each recipient of a batch sending, like the link with its token. Each recipient receives its own message.
+    It returns the emails accepted by the provider.
+    """
+
+    if data is None:
+        data = {}
+
+    recipients = [(email, variables or {}) for email, variables in recipients if email]
+    if not recipients:
+        return []
+
+    data = _prepare_email_data(template_slug, data, academy=academy)
+    if data is None:
+        return [email for email, _ in recipients]
+
+    if not (os.getenv("EMAIL_NOTIFICATIONS_ENABLED", False) == "TRUE" or force):
+        logger.warning(f"Email to {len(recipients)} recipients not sent because EMAIL_NOTIFICATIONS_ENABLED != TRUE")
+        return [email for email, _ in recipients]
+
+    keys = {key for _, variables in recipients for key in variables}
+    template = get_template_content(
+        template_slug,
+        {**data, **{key: f"%recipient.{key}%" for key in keys}},
+        ["email"],
+        inline_css=inline_css,
+        academy=academy,
+    )
+
+    sender_name = _get_sender_name(academy)
+    accepted = []
+
+    for i in range(0, len(recipients), EMAIL_BATCH_SIZE):
+        batch = recipients[i : i + EMAIL_BATCH_SIZE]
+
+        try:
+            result = requests.post(
+                f"https://api.mailgun.net/v3/{os.environ.get('MAILGUN_DOMAIN')}/messages",
+                auth=("api", os.environ.get("MAILGUN_API_KEY", "")),
+                data={
+                    "from": f"{sender_name} <mailgun@{os.environ.get('MAILGUN_DOMAIN')}>",
+                    "to": [email for email, _ in batch],
+                    "subject": template["subject"],
+                    "text": template["text"],
+                    "html": template["html"],
+                    "recipient-variables": json.dumps({email: variables for email, variables in batch}),
+                },
+                timeout=10,
+            )
+
+        except requests.RequestException as e:
+            logger.error(f"Error sending a batch of {len(batch)} emails: {e}")
+            continue
+
+        if result.status_code != 200:
+            logger.error(f"Error sending a batch of {len(batch)} emails, mailgun status code: {result.status_code}")
+            logger.error(result.text)
+            continue
+
+        accepted += [email for email, _ in batch]
+
+    logger.debug(f"Email notification {template_slug} sent to {len(accepted)} of {len(recipients)} recipients")
+    return accepted
+
+
 def send_sms(slug, phone_number, data=None, academy=None):
 
     if data is None:
@@ -293,7 +381,8 @@ def send_fcm_notification(slug, user_id, data=None):
     send_fcm(slug, registration_ids, data)
 
 
-def get_template_content(slug, data=None, formats=None, inline_css=False, academy=None):
+def get_template_context(data=None, academy=None):
+    """Get the variables available to every notification template, with the academy branding."""
 
     if data is None:
         data = {}
@@ -315,8 +404,6 @@ def get_template_content(slug, data=None, formats=None, inline_css=False, academ
     z = con.copy()  # start with x's keys and values
     z.update(data)
 
-    templates = {}
-
     if academy:
         # Use setdefault to only set if not already in context
         # This preserves academy template_variables overrides (global.* and template.*)
@@ -330,6 +417,13 @@ def get_template_content(slug, data=None, formats=None, inline_css=False, academ
         if "heading" not in z:
             z["heading"] = academy.name
 
+    return z
+
+
+def get_template_content(slug, data=None, formats=None, inline_css=False, academy=None):
+    z = get_template_context(data, academy=academy)
+    templates = {}
+
     if formats is None or "email" in formats:
         if "SUBJECT" in z:
             templates["SUBJECT"] = z["SUBJECT"]
@@ -341,29 +435,20 @@ def get_template_content(slug, data=None, formats=None, inline_css=False, academ
             templates["SUBJECT"] = ("No subject specified",)
             templates["subject"] = "No subject specified"
 
-        plaintext = get_template(slug + ".txt")
-        html = get_template(slug + ".html")
-        templates["text"] = plaintext.render(z)
-        templates["html"] = html.render(z)
+        templates["text"] = TemplateCache.render(slug + ".txt", z)
+        templates["html"] = TemplateCache.render(slug + ".html", z, inline_css=inline_css)
 
     if formats is not None and "html" in formats:
-        html = get_template(slug + ".html")
-        templates["html"] = html.render(z)
-
-    if "html" in templates and inline_css:
-        templates["html"] = transform(templates["html"])
+        templates["html"] = TemplateCache.render(slug + ".html", z, inline_css=inline_css)
 
     if formats is not None and "slack" in formats:
-        fms = get_template(slug + ".slack")
-        templates["slack"] = fms.render(z)
+        templates["slack"] = TemplateCache.render(slug + ".slack", z)
 
     if formats is not None and "fms" in formats:
-        fms = get_template(slug + ".fms")
-        templates["fms"] = fms.render(z)
+        templates["fms"] = TemplateCache.render(slug + ".fms", z)
 
     if formats is not None and "sms" in formats:
-        sms = get_template(slug + ".sms")
-        templates["sms"] = sms.render(z)
+        templates["sms"] = TemplateCache.render(slug + ".sms", z)
 
     return templates
 
@@ -176,13 +176,28 @@ class HookForm(forms.ModelForm):
         return [(x, x) for x in HookManager.HOOK_EVENTS.keys()]
 
 
+@admin.display(description="Re-enable hook deliveries")
+def enable_hooks(modeladmin, request, queryset):
+    queryset.update(disabled_at=None, consecutive_failures=0)
+
+
 class HookAdmin(admin.ModelAdmin):
-    list_display = ["user", "target", "event", "service_id", "total_calls", "last_response_code", "last_call_at"]
+    list_display = [
+        "user",
+        "target",
+        "event",
+        "service_id",
+        "total_calls",
+        "last_response_code",
+        "last_call_at",
+        "disabled_at",
+    ]
     search_fields = ["user__username", "event", "target", "service_id"]
-    list_filter = ["event", "last_response_code"]
+    list_filter = ["event", "last_response_code", ("disabled_at", admin.EmptyFieldListFilter)]
     raw_id_fields = [
         "user",
     ]
+    actions = [enable_hooks]
     form = HookForm
 
 
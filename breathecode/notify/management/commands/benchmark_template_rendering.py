@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.template.loader import get_template
+from premailer import transform
+
+from breathecode.notify.actions import get_template_content, get_template_context
+from breathecode.notify.utils.template_cache import TemplateCache
+
+
+class Command(BaseCommand):
+    help = "Benchmark the rendering of an email template with and without the compiled template cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--slug", type=str, default="nps_survey", help="Email template to render")
+        parser.add_argument("--emails", type=int, default=10000, help="How many emails to render")
+        parser.add_argument("--inline-css", action="store_true", help="Inline the CSS of each email")
+
+    def handle(self, *args, **options):
+        slug, inline_css = options["slug"], options["inline_css"]
+        contexts = [
+            {
+                "SUBJECT": "We need your feedback",
+                "MESSAGE": f"Hi student {n}, please answer the survey",
+                "LINK": f"https://nps.4geeks.com/survey/1?token={n}",
+            }
+            for n in range(options["emails"])
+        ]
+
+        started = time.perf_counter()
+        for context in contexts:
+            context = get_template_context(context)
+            get_template(slug + ".txt").render(context)
+            html = get_template(slug + ".html").render(context)
+            if inline_css:
+                transform(html)
+
+        uncached = time.perf_counter() - started
+
+        TemplateCache.clear()
+        started = time.perf_counter()
+        for context in contexts:
+            get_template_content(slug, context, ["email"], inline_css=inline_css)
+
+        cached = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{len(contexts)} {slug} emails rendered in {uncached:.2f}s without the cache and {cached:.2f}s with it "
+            f"({uncached / cached:.1f}x), {len(TemplateCache._skeletons)} skeleton(s) compiled"
+        )
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notify', '0004_alter_academynotifysettings_template_variables'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hook',
+            name='consecutive_failures',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='hook',
+            name='delivery_stats',
+            field=models.JSONField(blank=True, default=None, help_text='Latency and status code histograms of the deliveries', null=True),
+        ),
+        migrations.AddField(
+            model_name='hook',
+            name='disabled_at',
+            field=models.DateTimeField(blank=True, default=None, help_text='Set automatically when the target keeps failing, the hook will not be fired while it is set', null=True),
+        ),
+    ]
@@ -175,6 +175,17 @@ class AbstractHook(models.Model):
     last_call_at = models.DateTimeField(null=True, blank=True, default=None)
     last_response_code = models.IntegerField(null=True, blank=True, default=None)
 
+    consecutive_failures = models.IntegerField(default=0)
+    disabled_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        default=None,
+        help_text="Set automatically when the target keeps failing, the hook will not be fired while it is set",
+    )
+    delivery_stats = models.JSONField(
+        null=True, blank=True, default=None, help_text="Latency and status code histograms of the deliveries"
+    )
+
     class Meta:
         abstract = True
 
@@ -13,8 +13,10 @@ See breathecode/notify/utils/auto_register_hooks.py for auto-registration logic.
 import logging
 from typing import Type
 
+from django.core.signals import setting_changed
 from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
+from django.utils.autoreload import file_changed
 from django.utils import timezone
 
 from breathecode.admissions.models import CohortUser
@@ -33,6 +35,7 @@ from breathecode.payments.signals import planfinancing_created, revoke_plan_perm
 
 from .tasks import send_mentorship_starting_notification
 from .utils.hook_manager import HookManager
+from .utils.template_cache import TemplateCache
 
 logger = logging.getLogger(__name__)
 
@@ -245,3 +248,17 @@ def update_updated_at(sender, instance, **kwargs):
     """Update the updated_at field when hooks are added to HookError."""
     instance.updated_at = timezone.now()
     instance.save()
+
+
+@receiver(file_changed, dispatch_uid="notify-template-cache-file-changed")
+def template_file_changed(sender, file_path, **kwargs):
+    """Discard the compiled notification templates when a template changes in development."""
+    if file_path.suffix in (".html", ".txt", ".slack", ".fms", ".sms"):
+        TemplateCache.clear()
+
+
+@receiver(setting_changed, dispatch_uid="notify-template-cache-setting-changed")
+def template_setting_changed(sender, setting, **kwargs):
+    """Discard the compiled notification templates when the template settings are overridden."""
+    if setting == "TEMPLATES":
+        TemplateCache.clear()
@@ -1,13 +1,10 @@
-import json
 import logging
 import os
-from datetime import datetime
-from decimal import Decimal
+import time
 
 import requests
 from celery import shared_task
-from django.core.serializers.json import DjangoJSONEncoder
-from django.utils import timezone
+from redis.exceptions import LockError
 from task_manager.core.exceptions import AbortTask
 from task_manager.django.decorators import task
 
@@ -18,7 +15,18 @@ from breathecode.services.slack.client import Slack
 from breathecode.utils.decorators import TaskPriority
 
 from .actions import sync_slack_team_channel, sync_slack_team_cohort, sync_slack_team_user, sync_slack_team_users
-from .utils.obfuscation import obfuscate_sensitive_data
+from .utils.hook_delivery import (
+    HookDelivery,
+    HookDeliveryResult,
+    ack_deliveries,
+    apply_delivery_result,
+    deliver_hooks,
+    encode_payload,
+    get_flush_delay,
+    pop_deliveries,
+    requeue_deliveries,
+    save_delivery_results,
+)
 
 
 def get_api_url():
@@ -27,6 +35,9 @@ def get_api_url():
 
 logger = logging.getLogger(__name__)
 
+FLUSH_HOOK_DELIVERIES_LOCK = "notify:hook-deliveries:lock"
+FLUSH_HOOK_DELIVERIES_TIMEOUT = 15 * 60
+
 
 @shared_task(priority=TaskPriority.REALTIME.value)
 def async_slack_team_channel(team_id):
@@ -127,46 +138,14 @@ def async_deliver_hook(target, payload, hook_id=None, **_):
 
     from .utils.hook_manager import HookManager
 
-    def parse_payload(payload: dict):
-        if not isinstance(payload, dict):
-            return payload
-
-        for key in payload.keys():
-            # TypeError("string indices must be integers, not 'str'")
-            if isinstance(payload[key], datetime):
-                payload[key] = payload[key].isoformat().replace("+00:00", "Z")
-
-            elif isinstance(payload[key], Decimal):
-                payload[key] = str(payload[key])
-
-            elif isinstance(payload[key], list) or isinstance(payload[key], tuple) or isinstance(payload[key], set):
-                l = []
-                for item in payload[key]:
-                    l.append(parse_payload(item))
-
-                payload[key] = l
-
-            elif isinstance(payload[key], dict):
-                payload[key] = parse_payload(payload[key])
-
-        return payload
-
     logger.info("Starting async_deliver_hook")
 
     has_response = False
 
     try:
-        if isinstance(payload, dict):
-            payload = parse_payload(payload)
-
-        elif isinstance(payload, list):
-            l = []
-            for item in payload:
-                l.append(parse_payload(item))
+        encoded_payload = encode_payload(payload)
 
-            payload = l
-
-        encoded_payload = json.dumps(payload, cls=DjangoJSONEncoder)
+        start = time.perf_counter()
         response = requests.post(
             url=target, data=encoded_payload, headers={"Content-Type": "application/json"}, timeout=60
         )
@@ -179,34 +158,13 @@ def async_deliver_hook(target, payload, hook_id=None, **_):
                 hook.delete()
 
             else:
-
-                data = hook.sample_data
-                if not isinstance(data, list):
-                    data = []
-
-                # Extract the payload to store as sample data
-                new_payload = None
-                if isinstance(payload, dict):
-                    if "data" in payload and isinstance(payload["data"], dict):
-                        new_payload = payload["data"]
-                    else:
-                        new_payload = payload
-                elif isinstance(payload, list) and len(payload) > 0:
-                    # For list payloads, take the first item as sample
-                    new_payload = payload[0] if isinstance(payload[0], dict) else None
-
-                if new_payload:
-                    # Obfuscate sensitive data before storing
-                    obfuscated_payload = obfuscate_sensitive_data(new_payload)
-                    data.append(obfuscated_payload)
-
-                if len(data) > 10:
-                    data = data[1:10]
-
-                hook.last_response_code = response.status_code
-                hook.last_call_at = timezone.now()
-                hook.sample_data = data
-                hook.total_calls = hook.total_calls + 1
+                result = HookDeliveryResult(
+                    delivery=HookDelivery(target=target, body=encoded_payload, hook_id=hook_id),
+                    status_code=response.status_code,
+                    latency=(time.perf_counter() - start) * 1000,
+                    attempts=1,
+                )
+                apply_delivery_result(hook, result)
                 hook.save()
 
     except Exception as e:
@@ -215,3 +173,43 @@ def async_deliver_hook(target, payload, hook_id=None, **_):
             raise AbortTask(f"Error while trying to save hook call with status code {response.status_code}. {payload}")
 
         raise e
+
+
+@task(priority=TaskPriority.DEFAULT.value)
+def flush_hook_deliveries(**_):
+    """Deliver the pending hooks grouped by host over a pooled connection."""
+
+    from django_redis import get_redis_connection
+
+    logger.info("Starting flush_hook_deliveries")
+
+    lock = get_redis_connection("default").lock(FLUSH_HOOK_DELIVERIES_LOCK, timeout=FLUSH_HOOK_DELIVERIES_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        # the running flush keeps popping until the queue is empty, but it could be finishing
+        flush_hook_deliveries.apply_async(countdown=get_flush_delay())
+        logger.info("Another flush_hook_deliveries is running, it was rescheduled")
+        return
+
+    delivered = 0
+    try:
+        if requeued := requeue_deliveries():
+            logger.warning(f"{requeued} hook deliveries left by a previous flush were requeued")
+
+        while deliveries := pop_deliveries():
+            results = deliver_hooks(deliveries)
+            save_delivery_results(results)
+            ack_deliveries(deliveries)
+
+            delivered += len(deliveries)
+            failed = len([x for x in results if not x.ok])
+            if failed:
+                logger.warning(f"{failed} of {len(results)} hook deliveries failed")
+
+    finally:
+        try:
+            lock.release()
+
+        except LockError:
+            logger.warning("The lock of flush_hook_deliveries expired before the flush ended")
+
+    logger.info(f"{delivered} hooks delivered")
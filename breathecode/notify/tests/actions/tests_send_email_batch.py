@@ -0,0 +1,62 @@
+"""
+Test send_email_batch
+"""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from breathecode.notify import actions
+from breathecode.notify.actions import send_email_batch
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.text = ""
+
+
+@pytest.fixture(autouse=True)
+def setup(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("EMAIL_NOTIFICATIONS_ENABLED", "TRUE")
+    monkeypatch.setattr(
+        actions,
+        "get_template_content",
+        MagicMock(
+            side_effect=lambda slug, data, *args, **kwargs: {"subject": "Hi", "text": data.get("LINK", ""), "html": ""}
+        ),
+    )
+    monkeypatch.setattr("requests.post", MagicMock(return_value=Response(200)))
+    yield
+
+
+def test_without_recipients():
+    assert send_email_batch("nps_survey", [("", {"LINK": "x"})]) == []
+    assert actions.requests.post.call_count == 0
+
+
+def test_the_template_is_rendered_once(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(actions, "EMAIL_BATCH_SIZE", 2)
+    recipients = [(f"{n}@example.com", {"LINK": f"https://example.com/{n}"}) for n in range(3)]
+
+    assert send_email_batch("nps_survey", recipients, {"SUBJECT": "Hi"}) == [x[0] for x in recipients]
+
+    assert actions.get_template_content.call_count == 1
+    assert actions.get_template_content.call_args.args[1]["LINK"] == "%recipient.LINK%"
+
+    assert actions.requests.post.call_count == 2
+    first = actions.requests.post.call_args_list[0].kwargs["data"]
+    assert first["to"] == ["0@example.com", "1@example.com"]
+    assert first["text"] == "%recipient.LINK%"
+    assert json.loads(first["recipient-variables"]) == {
+        "0@example.com": {"LINK": "https://example.com/0"},
+        "1@example.com": {"LINK": "https://example.com/1"},
+    }
+
+
+def test_rejected_batches_are_not_accepted(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(actions, "EMAIL_BATCH_SIZE", 1)
+    monkeypatch.setattr("requests.post", MagicMock(side_effect=[Response(200), Response(500)]))
+
+    assert send_email_batch("nps_survey", [("a@example.com", {}), ("b@example.com", {})]) == ["a@example.com"]
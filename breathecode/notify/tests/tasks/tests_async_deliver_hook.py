@@ -87,6 +87,7 @@ class TestAsyncDeliverHook(LegacyAPITestCase):
                 "total_calls": model.hook.total_calls + 1,
                 "last_call_at": UTC_NOW,
                 "last_response_code": 201,
+                "delivery_stats": {"latency": {"100": 1}, "status": {"201": 1}},
                 "sample_data": [
                     {
                         **data,
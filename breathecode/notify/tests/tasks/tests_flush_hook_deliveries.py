@@ -0,0 +1,148 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from breathecode.notify import tasks
+from breathecode.notify.utils import hook_delivery
+from breathecode.notify.utils.hook_delivery import HookDeliveryResult
+
+
+class FakeLock:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    def acquire(self, blocking=True):
+        if self.name in self.client.locks:
+            return False
+
+        self.client.locks.add(self.name)
+        return True
+
+    def release(self):
+        self.client.locks.discard(self.name)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, args))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args) for name, args in self.calls]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.lists = {}
+        self.locks = set()
+
+    def rpush(self, key, item):
+        self.lists.setdefault(key, []).append(item.encode())
+
+    def llen(self, key):
+        return len(self.lists.get(key, []))
+
+    def lmove(self, src, dst, wherefrom, whereto):
+        if not self.lists.get(src):
+            return None
+
+        item = self.lists[src].pop(0 if wherefrom == "LEFT" else -1)
+        target = self.lists.setdefault(dst, [])
+        target.insert(0 if whereto == "LEFT" else len(target), item)
+        return item
+
+    def lrem(self, key, count, item):
+        self.lists.get(key, []).remove(item)
+
+    def set(self, *args, **kwargs):
+        return True
+
+    def delete(self, key):
+        pass
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def lock(self, name, timeout=None):
+        return FakeLock(self, name)
+
+
+def item(target):
+    return json.dumps({"target": target, "body": "{}", "hook_id": None})
+
+
+@pytest.fixture
+def redis(db, monkeypatch: pytest.MonkeyPatch):
+    client = FakeRedis()
+    monkeypatch.setattr("django_redis.get_redis_connection", lambda alias: client)
+    monkeypatch.setattr(tasks, "save_delivery_results", MagicMock())
+    yield client
+
+
+def ok(deliveries):
+    return [HookDeliveryResult(delivery=x, status_code=200) for x in deliveries]
+
+
+def test_the_deliveries_are_acknowledged_after_being_sent(redis: FakeRedis, monkeypatch: pytest.MonkeyPatch):
+    sent = []
+    monkeypatch.setattr(tasks, "deliver_hooks", lambda deliveries: sent.extend(deliveries) or ok(deliveries))
+
+    for target in ["https://a.com/1", "https://b.com/2"]:
+        redis.rpush(hook_delivery.QUEUE_KEY, item(target))
+
+    tasks.flush_hook_deliveries.delay()
+
+    assert [x.target for x in sent] == ["https://a.com/1", "https://b.com/2"]
+    assert redis.lists == {hook_delivery.QUEUE_KEY: [], hook_delivery.PROCESSING_KEY: []}
+    assert redis.locks == set()
+
+
+def test_the_deliveries_of_a_failed_flush_are_sent_by_the_next_one(redis: FakeRedis, monkeypatch: pytest.MonkeyPatch):
+    redis.rpush(hook_delivery.QUEUE_KEY, item("https://a.com/1"))
+    monkeypatch.setattr(tasks, "deliver_hooks", MagicMock(side_effect=Exception("worker died")))
+
+    tasks.flush_hook_deliveries.delay()
+
+    assert redis.lists[hook_delivery.PROCESSING_KEY] == [item("https://a.com/1").encode()]
+
+    sent = []
+    monkeypatch.setattr(tasks, "deliver_hooks", lambda deliveries: sent.extend(deliveries) or ok(deliveries))
+    redis.rpush(hook_delivery.QUEUE_KEY, item("https://b.com/2"))
+
+    tasks.flush_hook_deliveries.delay()
+
+    assert [x.target for x in sent] == ["https://a.com/1", "https://b.com/2"]
+    assert redis.lists == {hook_delivery.QUEUE_KEY: [], hook_delivery.PROCESSING_KEY: []}
+
+
+def test_only_one_flush_runs_at_a_time(redis: FakeRedis, monkeypatch: pytest.MonkeyPatch):
+    deliver_hooks = MagicMock()
+    monkeypatch.setattr(tasks, "deliver_hooks", deliver_hooks)
+
+    rescheduled = []
+    apply_async = tasks.flush_hook_deliveries.apply_async
+
+    def schedule(*args, **kwargs):
+        if "countdown" in kwargs:
+            rescheduled.append(kwargs)
+            return
+
+        return apply_async(*args, **kwargs)
+
+    monkeypatch.setattr(tasks.flush_hook_deliveries, "apply_async", schedule)
+
+    redis.locks.add(tasks.FLUSH_HOOK_DELIVERIES_LOCK)
+    redis.rpush(hook_delivery.PROCESSING_KEY, item("https://a.com/1"))
+    redis.rpush(hook_delivery.QUEUE_KEY, item("https://b.com/2"))
+
+    tasks.flush_hook_deliveries.delay()
+
+    # the deliveries of the running flush are not taken
+    assert deliver_hooks.call_count == 0
+    assert redis.lists[hook_delivery.PROCESSING_KEY] == [item("https://a.com/1").encode()]
+    assert rescheduled == [{"countdown": hook_delivery.get_flush_delay()}]
@@ -0,0 +1,102 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from breathecode.notify.utils import hook_delivery
+from breathecode.notify.utils.hook_delivery import (
+    HookDelivery,
+    HookDeliveryResult,
+    adeliver_hooks,
+    encode_payload,
+    save_delivery_results,
+)
+from breathecode.tests.mixins.breathecode_mixin.breathecode import Breathecode
+
+
+@pytest.fixture(autouse=True)
+def setup(monkeypatch):
+    monkeypatch.setattr(hook_delivery, "get_backoff", MagicMock(return_value=0))
+    yield
+
+
+def test_encode_payload():
+    payload = {
+        "date": datetime(2024, 1, 1, 10, 30, 15, 123456, tzinfo=timezone.utc),
+        "children": [{"price": Decimal("10.50")}],
+        "tags": {"a"},
+    }
+
+    assert json.loads(encode_payload(payload)) == {
+        "date": "2024-01-01T10:30:15.123456Z",
+        "children": [{"price": "10.50"}],
+        "tags": ["a"],
+    }
+
+
+@pytest.mark.asyncio
+async def test_deliver__retries_and_keeps_order():
+    calls = {"flaky": 0}
+
+    async def ok(request):
+        return web.json_response({}, status=201)
+
+    async def flaky(request):
+        calls["flaky"] += 1
+        if calls["flaky"] < 3:
+            return web.json_response({}, status=503)
+
+        return web.json_response({}, status=200)
+
+    async def gone(request):
+        return web.json_response({}, status=410)
+
+    app = web.Application()
+    app.router.add_post("/ok", ok)
+    app.router.add_post("/flaky", flaky)
+    app.router.add_post("/gone", gone)
+
+    async with TestServer(app) as server:
+        deliveries = [
+            HookDelivery(target=str(server.make_url("/ok")), body="{}", hook_id=1),
+            HookDelivery(target=str(server.make_url("/flaky")), body="{}", hook_id=2),
+            HookDelivery(target=str(server.make_url("/gone")), body="{}", hook_id=3),
+        ]
+        results = await adeliver_hooks(deliveries, max_per_host=2, max_attempts=3)
+
+    assert [(x.delivery.hook_id, x.status_code, x.attempts) for x in results] == [
+        (1, 201, 1),
+        (2, 200, 3),
+        (3, 410, 1),
+    ]
+
+
+def test_save_delivery_results(db, bc: Breathecode, enable_hook_manager, monkeypatch):
+    enable_hook_manager()
+    monkeypatch.setenv("HOOK_DISABLE_AFTER_FAILURES", "2")
+
+    model = bc.database.create(hook=[{"consecutive_failures": 1}, {}, {}])
+
+    def result(hook_id, status_code, latency):
+        delivery = HookDelivery(target=model.hook[hook_id - 1].target, body='{"data": {"x": 1}}', hook_id=hook_id)
+        return HookDeliveryResult(delivery=delivery, status_code=status_code, latency=latency, attempts=1)
+
+    save_delivery_results([result(1, 500, 300), result(2, 201, 50), result(2, 201, 20000), result(3, 410, 10)])
+
+    hooks = bc.database.list_of("notify.Hook")
+    assert len(hooks) == 2
+
+    assert hooks[0]["consecutive_failures"] == 2
+    assert hooks[0]["disabled_at"] is not None
+    assert hooks[0]["last_response_code"] == 500
+    assert hooks[0]["delivery_stats"] == {"latency": {"500": 1}, "status": {"500": 1}}
+
+    assert hooks[1]["consecutive_failures"] == 0
+    assert hooks[1]["disabled_at"] is None
+    assert hooks[1]["total_calls"] == 2
+    assert hooks[1]["sample_data"] == [{"x": 1}, {"x": 1}]
+    assert hooks[1]["delivery_stats"] == {"latency": {"100": 1, "inf": 1}, "status": {"201": 2}}
@@ -0,0 +1,100 @@
+from unittest.mock import MagicMock
+
+import pytest
+from django.template import engines
+from premailer import transform
+
+from breathecode.notify import receivers
+from breathecode.notify.utils import template_cache
+from breathecode.notify.utils.template_cache import TemplateCacheClass
+
+SOURCES = {
+    "base.html": "<html><head><style>p { color: red; }</style></head><body>{% block content %}{% endblock %}</body></html>",
+    "invite.html": (
+        '{% extends "base.html" %}{% block content %}<p>{{ SUBJECT }}</p><a href="{{ LINK }}">{{ LINK }}</a>'
+        "{% if BUTTON %}<p>{{ BUTTON }}</p>{% endif %}{% endblock %}"
+    ),
+    "invite.txt": "{{ SUBJECT }}: {{ LINK|upper }}",
+    "dynamic.html": "{{ SUBJECT }}{% include TEMPLATE %}",
+    "part.html": "!",
+}
+
+
+@pytest.fixture
+def cache(monkeypatch: pytest.MonkeyPatch):
+    get_template = MagicMock(side_effect=lambda name: engines["django"].from_string(SOURCES[name]))
+    monkeypatch.setattr(template_cache, "get_template", get_template)
+    monkeypatch.setattr(template_cache, "transform", MagicMock(side_effect=transform))
+
+    # the extends tag loads the parent with the engine
+    monkeypatch.setattr(
+        engines["django"].engine,
+        "find_template",
+        lambda name, *args, **kwargs: (engines["django"].from_string(SOURCES[name]).template, None),
+    )
+
+    yield TemplateCacheClass()
+
+
+def render(name, context):
+    return engines["django"].from_string(SOURCES[name]).render(context)
+
+
+def test_printed_variables_are_substituted_in_the_skeleton(cache: TemplateCacheClass):
+    contexts = [
+        {"SUBJECT": "Hi John", "LINK": "https://4geeks.com/?token=1", "BUTTON": "Go"},
+        {"SUBJECT": "Hi <Jane> & 'Joe'", "LINK": "https://4geeks.com/?a=1&b=2", "BUTTON": "Go"},
+        {"SUBJECT": 2, "LINK": None, "BUTTON": "Go"},
+    ]
+
+    for context in contexts:
+        assert cache.render("invite.html", context) == render("invite.html", context)
+
+    assert len(cache._skeletons) == 1
+    assert template_cache.get_template.call_count == 2
+
+
+def test_variables_used_in_tags_or_filters_are_part_of_the_key(cache: TemplateCacheClass):
+    for context in [
+        {"SUBJECT": "Hi", "LINK": "a", "BUTTON": "Go"},
+        {"SUBJECT": "Hi", "LINK": "a", "BUTTON": ""},
+        {"SUBJECT": "Hi", "LINK": "a", "BUTTON": "Go"},
+    ]:
+        assert cache.render("invite.html", context) == render("invite.html", context)
+
+    assert len(cache._skeletons) == 2
+
+    for link in ["a", "b"]:
+        assert cache.render("invite.txt", {"SUBJECT": "Hi", "LINK": link}) == f"Hi: {link.upper()}"
+
+    assert len(cache._skeletons) == 4
+
+
+def test_css_is_inlined_once(cache: TemplateCacheClass):
+    for token in range(3):
+        context = {"SUBJECT": "Hi", "LINK": f"https://4geeks.com/?token={token}"}
+        assert cache.render("invite.html", context, inline_css=True) == transform(render("invite.html", context))
+
+    assert template_cache.transform.call_count == 1
+
+
+def test_templates_that_cannot_be_analyzed_are_rendered(cache: TemplateCacheClass):
+    assert cache.render("dynamic.html", {"SUBJECT": "Hi", "TEMPLATE": "part.html"}) == "Hi!"
+    assert cache.render("invite.html", {"SUBJECT": lambda: "Hi"}) == render("invite.html", {"SUBJECT": lambda: "Hi"})
+    assert cache.render("invite.html", {"SUBJECT": "Hi", "BUTTON": ["Go"]}) == render(
+        "invite.html", {"SUBJECT": "Hi", "BUTTON": ["Go"]}
+    )
+
+    assert len(cache._skeletons) == 0
+
+
+def test_cache_is_cleared_when_the_templates_change(cache: TemplateCacheClass, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(receivers, "TemplateCache", cache)
+    cache.render("invite.html", {"SUBJECT": "Hi"})
+
+    receivers.template_setting_changed(sender=None, setting="DEBUG")
+    assert len(cache._skeletons) == 1
+
+    receivers.template_setting_changed(sender=None, setting="TEMPLATES")
+    assert len(cache._skeletons) == 0
+    assert len(cache._templates) == 0
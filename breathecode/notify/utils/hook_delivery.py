@@ -0,0 +1,393 @@
+"""
+Pooled delivery of REST hooks.
+
+Deliveries are grouped by target host and sent over a shared keep-alive connection pool, each host has its
+own bounded set of workers so a slow subscriber cannot starve the others. Failed deliveries are retried with
+exponential backoff and full jitter, and the hook gets disabled after too many consecutive failures.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .obfuscation import obfuscate_sensitive_data
+
+__all__ = [
+    "HookDelivery",
+    "HookDeliveryResult",
+    "HookJSONEncoder",
+    "encode_payload",
+    "get_sample",
+    "deliver_hooks",
+    "adeliver_hooks",
+    "apply_delivery_result",
+    "save_delivery_results",
+    "enqueue_delivery",
+    "pop_deliveries",
+    "ack_deliveries",
+    "requeue_deliveries",
+    "is_batch_delivery_enabled",
+]
+
+IS_DJANGO_REDIS = hasattr(cache, "fake") is False
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = "notify:hook-deliveries"
+PROCESSING_KEY = "notify:hook-deliveries:processing"
+SCHEDULED_KEY = "notify:hook-deliveries:scheduled"
+
+# upper bounds in milliseconds, the last bucket catches everything else
+LATENCY_BUCKETS = (100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def get_max_connections_per_host() -> int:
+    return int(os.getenv("HOOK_DELIVERY_MAX_PER_HOST", "4"))
+
+
+def get_max_attempts() -> int:
+    return int(os.getenv("HOOK_DELIVERY_MAX_ATTEMPTS", "3"))
+
+
+def get_failures_before_disable() -> int:
+    return int(os.getenv("HOOK_DISABLE_AFTER_FAILURES", "20"))
+
+
+def get_flush_delay() -> int:
+    return int(os.getenv("HOOK_DELIVERY_FLUSH_DELAY", "5"))
+
+
+def get_batch_size() -> int:
+    return int(os.getenv("HOOK_DELIVERY_BATCH_SIZE", "500"))
+
+
+def is_batch_delivery_enabled() -> bool:
+    return IS_DJANGO_REDIS and os.getenv("HOOK_DELIVERY_MODE", "batch") == "batch"
+
+
+class HookJSONEncoder(DjangoJSONEncoder):
+    """Encode the payload in a single pass, keeping the format historically sent to the subscribers."""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat().replace("+00:00", "Z")
+
+        if isinstance(o, Decimal):
+            return str(o)
+
+        if isinstance(o, (set, frozenset)):
+            return list(o)
+
+        return super().default(o)
+
+
+def encode_payload(payload: Any) -> str:
+    return json.dumps(payload, cls=HookJSONEncoder)
+
+
+def get_sample(payload: Any) -> Optional[dict]:
+    """Extract the part of the payload that will be stored as sample data."""
+
+    if isinstance(payload, dict):
+        if "data" in payload and isinstance(payload["data"], dict):
+            return payload["data"]
+
+        return payload
+
+    if isinstance(payload, list) and len(payload) > 0 and isinstance(payload[0], dict):
+        return payload[0]
+
+    return None
+
+
+@dataclass
+class HookDelivery:
+    target: str
+    body: str
+    hook_id: Optional[int] = None
+
+    # the item as it was stored in the queue, it is used to acknowledge it
+    raw: Optional[bytes] = field(default=None, repr=False, compare=False)
+
+    @property
+    def host(self) -> str:
+        return urlsplit(self.target).netloc.lower()
+
+
+@dataclass
+class HookDeliveryResult:
+    delivery: HookDelivery
+    status_code: Optional[int] = None
+    latency: float = 0.0
+    attempts: int = 0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code is not None and 200 <= self.status_code < 400
+
+
+def is_retryable(status_code: Optional[int]) -> bool:
+    return status_code is None or status_code == 429 or status_code >= 500
+
+
+def get_backoff(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """Exponential backoff with full jitter."""
+
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+async def _send(session: aiohttp.ClientSession, delivery: HookDelivery, max_attempts: int) -> HookDeliveryResult:
+    result = HookDeliveryResult(delivery=delivery)
+
+    for attempt in range(max_attempts):
+        if attempt:
+            await asyncio.sleep(get_backoff(attempt))
+
+        result.attempts = attempt + 1
+        start = time.perf_counter()
+
+        try:
+            async with session.post(
+                delivery.target, data=delivery.body, headers={"Content-Type": "application/json"}
+            ) as response:
+                await response.read()
+                result.status_code = response.status
+                result.error = None
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            result.status_code = None
+            result.error = str(e) or e.__class__.__name__
+
+        result.latency = (time.perf_counter() - start) * 1000
+
+        if not is_retryable(result.status_code):
+            break
+
+    return result
+
+
+async def adeliver_hooks(
+    deliveries: list[HookDelivery],
+    max_per_host: Optional[int] = None,
+    max_attempts: Optional[int] = None,
+    timeout: int = 60,
+) -> list[HookDeliveryResult]:
+    """Deliver the hooks grouped by host, the results keep the order of the deliveries."""
+
+    if max_per_host is None:
+        max_per_host = get_max_connections_per_host()
+
+    if max_attempts is None:
+        max_attempts = get_max_attempts()
+
+    groups: dict[str, deque[tuple[int, HookDelivery]]] = defaultdict(deque)
+    for index, delivery in enumerate(deliveries):
+        groups[delivery.host].append((index, delivery))
+
+    results: list[Optional[HookDeliveryResult]] = [None] * len(deliveries)
+
+    async def worker(session: aiohttp.ClientSession, queue: deque[tuple[int, HookDelivery]]):
+        while queue:
+            index, delivery = queue.popleft()
+            results[index] = await _send(session, delivery, max_attempts)
+
+    connector = aiohttp.TCPConnector(limit=0, limit_per_host=max_per_host, keepalive_timeout=30)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        workers = []
+        for queue in groups.values():
+            for _ in range(min(max_per_host, len(queue))):
+                workers.append(worker(session, queue))
+
+        await asyncio.gather(*workers)
+
+    return results
+
+
+def deliver_hooks(deliveries: list[HookDelivery], **kwargs) -> list[HookDeliveryResult]:
+    return asyncio.run(adeliver_hooks(deliveries, **kwargs))
+
+
+def _add_to_histograms(hook, result: HookDeliveryResult) -> None:
+    stats = hook.delivery_stats if isinstance(hook.delivery_stats, dict) else {}
+    latency = stats.setdefault("latency", {})
+    status = stats.setdefault("status", {})
+
+    bucket = "inf"
+    for bound in LATENCY_BUCKETS:
+        if result.latency <= bound:
+            bucket = str(bound)
+            break
+
+    latency[bucket] = latency.get(bucket, 0) + 1
+
+    status_key = str(result.status_code) if result.status_code is not None else "error"
+    status[status_key] = status.get(status_key, 0) + 1
+
+    hook.delivery_stats = stats
+
+
+def apply_delivery_result(hook, result: HookDeliveryResult, payload: Any = None) -> None:
+    """Update the hook in memory with the delivery result, it does not save it."""
+
+    utc_now = timezone.now()
+
+    if payload is None:
+        payload = json.loads(result.delivery.body)
+
+    data = hook.sample_data
+    if not isinstance(data, list):
+        data = []
+
+    if new_payload := get_sample(payload):
+        data.append(obfuscate_sensitive_data(new_payload))
+
+    if len(data) > 10:
+        data = data[1:10]
+
+    if result.status_code is not None:
+        hook.last_response_code = result.status_code
+
+    hook.last_call_at = utc_now
+    hook.sample_data = data
+    hook.total_calls = hook.total_calls + 1
+    _add_to_histograms(hook, result)
+
+    if result.ok:
+        hook.consecutive_failures = 0
+        return
+
+    hook.consecutive_failures = hook.consecutive_failures + 1
+    if hook.disabled_at is None and hook.consecutive_failures >= get_failures_before_disable():
+        hook.disabled_at = utc_now
+        logger.warning(f"Hook {hook.id} disabled after {hook.consecutive_failures} consecutive failures")
+
+
+def save_delivery_results(results: list[HookDeliveryResult]) -> None:
+    """Persist the results of a batch, one query to read the hooks and one to write them."""
+
+    from .hook_manager import HookManager
+
+    hook_model_cls = HookManager.get_hook_model()
+
+    results_by_hook = defaultdict(list)
+    for result in results:
+        if result.delivery.hook_id:
+            results_by_hook[result.delivery.hook_id].append(result)
+
+    if not results_by_hook:
+        return
+
+    hooks = hook_model_cls.objects.filter(id__in=results_by_hook.keys())
+
+    to_update = []
+    to_delete = []
+    for hook in hooks:
+        for result in results_by_hook[hook.id]:
+            if result.status_code == 410:
+                to_delete.append(hook.id)
+                break
+
+            apply_delivery_result(hook, result)
+
+        else:
+            to_update.append(hook)
+
+    if to_update:
+        hook_model_cls.objects.bulk_update(
+            to_update,
+            [
+                "last_response_code",
+                "last_call_at",
+                "sample_data",
+                "total_calls",
+                "consecutive_failures",
+                "disabled_at",
+                "delivery_stats",
+            ],
+        )
+
+    if to_delete:
+        hook_model_cls.objects.filter(id__in=to_delete).delete()
+
+
+def enqueue_delivery(target: str, payload: Any, hook_id: Optional[int] = None) -> bool:
+    """
+    Push a delivery to the pending queue.
+
+    Return True when a new flush needs to be scheduled.
+    """
+
+    from django_redis import get_redis_connection
+
+    client = get_redis_connection("default")
+    item = json.dumps({"target": target, "body": encode_payload(payload), "hook_id": hook_id})
+    client.rpush(QUEUE_KEY, item)
+
+    return bool(client.set(SCHEDULED_KEY, 1, nx=True, ex=get_flush_delay() * 10))
+
+
+def pop_deliveries() -> list[HookDelivery]:
+    """
+    Move a batch of deliveries to the processing list, they stay there until `ack_deliveries` is called, so
+    the deliveries of a flush that died are sent by the next one.
+    """
+
+    from django_redis import get_redis_connection
+
+    client = get_redis_connection("default")
+
+    # deliveries pushed after this point will schedule a new flush
+    client.delete(SCHEDULED_KEY)
+
+    pipeline = client.pipeline(transaction=False)
+    for _ in range(min(get_batch_size(), client.llen(QUEUE_KEY))):
+        pipeline.lmove(QUEUE_KEY, PROCESSING_KEY, "LEFT", "RIGHT")
+
+    items = [item for item in pipeline.execute() if item is not None]
+    return [HookDelivery(**json.loads(item), raw=item) for item in items]
+
+
+def ack_deliveries(deliveries: list[HookDelivery]) -> None:
+    """Remove the deliveries already sent from the processing list."""
+
+    from django_redis import get_redis_connection
+
+    client = get_redis_connection("default")
+
+    pipeline = client.pipeline(transaction=False)
+    for delivery in deliveries:
+        pipeline.lrem(PROCESSING_KEY, 1, delivery.raw)
+
+    pipeline.execute()
+
+
+def requeue_deliveries() -> int:
+    """
+    Move back to the front of the queue the deliveries left in the processing list by a flush that died, it
+    must only be called while no other flush is running.
+    """
+
+    from django_redis import get_redis_connection
+
+    client = get_redis_connection("default")
+
+    requeued = 0
+    while client.lmove(PROCESSING_KEY, QUEUE_KEY, "RIGHT", "LEFT") is not None:
+        requeued += 1
+
+    return requeued
@@ -7,7 +7,8 @@ from django.core.exceptions import ImproperlyConfigured
 
 from breathecode.notify.models import HookError
 
-from ..tasks import async_deliver_hook
+from ..tasks import async_deliver_hook, flush_hook_deliveries
+from .hook_delivery import enqueue_delivery, get_flush_delay, is_batch_delivery_enabled
 
 logger = logging.getLogger(__name__)
 
@@ -111,7 +112,7 @@ class HookManagerClass(object):
         if event_name not in self.HOOK_EVENTS.keys():
             raise Exception('"{}" does not exist in `settings.HOOK_EVENTS`.'.format(event_name))
 
-        filters = {"event": event_name}
+        filters = {"event": event_name, "disabled_at__isnull": True}
 
         # only process hooks from instances from the same academy
         if academy_override is not None:
@@ -252,7 +253,12 @@ class HookManagerClass(object):
 
             self.serialize(payload)
 
-            async_deliver_hook.delay(hook.target, payload, hook_id=hook.id)
+            if is_batch_delivery_enabled():
+                if enqueue_delivery(hook.target, payload, hook_id=hook.id):
+                    flush_hook_deliveries.apply_async(countdown=get_flush_delay())
+
+            else:
+                async_deliver_hook.delay(hook.target, payload, hook_id=hook.id)
 
             return None
         except Exception as e:
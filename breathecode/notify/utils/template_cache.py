@@ -0,0 +1,182 @@
+import logging
+import re
+import secrets
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+from django.template import Context
+from django.template.base import render_value_in_context
+from django.template.loader import get_template
+from premailer import transform
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["TemplateCache", "TemplateCacheClass"]
+
+TAG_PATTERN = re.compile(r"\{\{.*?\}\}|\{%.*?%\}", re.S)
+REFERENCE_PATTERN = re.compile(r"\{%\s*(?:extends|include)\s+(\S+)")
+PRIMITIVE_TYPES = (str, int, float, bool, type(None))
+
+
+class TemplateCacheClass:
+    """
+    Cache of the compiled notification templates.
+
+    It keeps the loaded templates and, for each combination of template and context, a skeleton with the
+    variables that the template only prints replaced by markers (with the CSS already inlined when requested),
+    so rendering a template again just substitutes the escaped values in the skeleton. The variables used in
+    tags, filters or lookups are part of the cache key, so the result is always the same than a full render.
+
+    The cache lives in the process, so it is discarded on each deploy, and it can be cleared with `clear`
+    when the templates change.
+    """
+
+    max_skeletons = 1024
+
+    def __init__(self):
+        self._nonce = secrets.token_hex(4)
+        self._marker_pattern = re.compile(rf"tplvar{self._nonce}x(\d+)x")
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Discard every compiled template and skeleton."""
+
+        with self._lock:
+            self._templates = {}
+            self._variables = {}
+            self._skeletons = OrderedDict()
+
+    def get_template(self, name: str):
+        """Get a compiled template, it is loaded once per process."""
+
+        template = self._templates.get(name)
+        if template is None:
+            template = get_template(name)
+            self._templates[name] = template
+
+        return template
+
+    def render(self, name: str, context: dict[str, Any], inline_css: bool = False) -> str:
+        """Render a template, reusing the skeleton of a previous render when possible."""
+
+        key, plain = self._get_skeleton_key(name, context, inline_css)
+        if key is None:
+            return self._render(name, context, inline_css)
+
+        parts = self._skeletons.get(key)
+        if parts is None:
+            parts = self._build_skeleton(name, context, plain, inline_css)
+
+            with self._lock:
+                self._skeletons[key] = parts
+                if len(self._skeletons) > self.max_skeletons:
+                    self._skeletons.popitem(last=False)
+
+        values = Context(autoescape=True)
+        return "".join(
+            part if i % 2 == 0 else render_value_in_context(context[part], values) for i, part in enumerate(parts)
+        )
+
+    def _render(self, name: str, context: dict[str, Any], inline_css: bool) -> str:
+        html = self.get_template(name).render(context)
+        if inline_css:
+            html = transform(html)
+
+        return html
+
+    def _build_skeleton(
+        self, name: str, context: dict[str, Any], plain: tuple[str, ...], inline_css: bool
+    ) -> list[str]:
+        markers = {key: f"tplvar{self._nonce}x{i}x" for i, key in enumerate(plain)}
+        skeleton = self._render(name, {**context, **markers}, inline_css)
+
+        # even positions are text, odd positions are the names of the variables
+        parts = self._marker_pattern.split(skeleton)
+        for i in range(1, len(parts), 2):
+            parts[i] = plain[int(parts[i])]
+
+        return parts
+
+    def _get_skeleton_key(self, name: str, context: dict[str, Any], inline_css: bool) -> tuple[Optional[tuple], tuple]:
+        variables = self._get_variables(name)
+        if variables is None:
+            return None, ()
+
+        plain, fixed = [], []
+        for key, value in context.items():
+            usage = variables.get(key)
+            if usage is None:
+                continue
+
+            # django calls the callables while rendering
+            if callable(value):
+                return None, ()
+
+            if usage == "plain":
+                plain.append(key)
+                continue
+
+            if not isinstance(value, PRIMITIVE_TYPES):
+                return None, ()
+
+            fixed.append((key, type(value).__name__, value))
+
+        plain = tuple(sorted(plain))
+        return (name, inline_css, plain, tuple(sorted(fixed))), plain
+
+    def _get_variables(self, name: str) -> Optional[dict[str, str]]:
+        """
+        Get how the template uses each identifier, `plain` when it is just printed like `{{ NAME }}` and
+        `logic` otherwise. It returns None when the template cannot be analyzed.
+        """
+
+        if name not in self._variables:
+            sources = self._get_sources(name, set())
+            if sources is None or any("autoescape" in source for source in sources):
+                self._variables[name] = None
+
+            else:
+                variables = {}
+                for source in sources:
+                    for tag in TAG_PATTERN.findall(source):
+                        match = re.fullmatch(r"\{\{\s*(\w+)\s*\}\}", tag)
+                        for identifier in re.findall(r"\w+", tag):
+                            if match and identifier == match.group(1):
+                                variables.setdefault(identifier, "plain")
+                            else:
+                                variables[identifier] = "logic"
+
+                self._variables[name] = variables
+
+        return self._variables[name]
+
+    def _get_sources(self, name: str, seen: set[str]) -> Optional[list[str]]:
+        if name in seen:
+            return []
+
+        seen.add(name)
+        template = getattr(self.get_template(name), "template", None)
+        source = getattr(template, "source", None)
+        if source is None:
+            return None
+
+        sources = [source]
+        for reference in REFERENCE_PATTERN.findall(source):
+            # the parents or included templates resolved from variables are unknown until rendering
+            if reference[0] not in "\"'" or reference[-1] != reference[0]:
+                logger.debug(f"Template {name} references a template from a variable, it will not be cached")
+                return None
+
+            referenced = self._get_sources(reference[1:-1], seen)
+            if referenced is None:
+                return None
+
+            sources += referenced
+
+        return sources
+
+
+# Singleton instance
+TemplateCache = TemplateCacheClass()
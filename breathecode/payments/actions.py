@@ -1,4 +1,5 @@
 import json
+import math
 import os
 import re
 import uuid
@@ -18,7 +19,7 @@ from dateutil.relativedelta import relativedelta
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.core.handlers.wsgi import WSGIRequest
-from django.db import transaction
+from django.db import connection, transaction
 from django.db.models import F, Q, QuerySet, Sum
 from django.http import HttpRequest
 from django.utils import timezone
@@ -37,7 +38,7 @@ from breathecode.media.models import File
 from breathecode.monitoring.models import StripeEvent
 from breathecode.notify import actions as notify_actions
 from breathecode.payments import tasks
-from breathecode.payments.signals import consume_service, deprovision_service
+from breathecode.payments.signals import consume_service, deprovision_service, lose_service_permissions
 from breathecode.utils import getLogger
 from breathecode.utils.decorators.service_deprovisioner import get_service_deprovisioner
 from breathecode.utils.validate_conversion_info import validate_conversion_info
@@ -59,6 +60,8 @@ from .models import (
     CohortSet,
     CohortSetCohort,
     Consumable,
+    ConsumableBeneficiary,
+    ConsumptionEvent,
     Coupon,
     CreditLedgerEntry,
     CreditNote,
@@ -758,6 +761,231 @@ def align_llm_member_budget_with_consumables(consumable: Consumable) -> None:
         )
 
 
+def _discount_consumable_units(consumable_id: int, units: int) -> Optional[int]:
+    """
+    Discount units of a consumable in one conditional update, it never goes below zero, so the units that exceed
+    the balance are not discounted.
+
+    Returns the new balance, or None if the consumable is unlimited or it was already exhausted, so a balance of
+    zero means that this update exhausted it.
+    """
+
+    table = connection.ops.quote_name(Consumable._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET how_many = CASE WHEN how_many >= %s THEN how_many - %s ELSE 0 END "
+            "WHERE id = %s AND how_many > 0 RETURNING how_many",
+            [units, units, consumable_id],
+        )
+        row = cursor.fetchone()
+
+    return None if row is None else row[0]
+
+
+def consume_consumable_units(consumable: Consumable, how_many: float) -> Optional[int]:
+    """
+    Discount units of a consumable and register it in the ledger, concurrent consumers cannot overdraw it.
+
+    The units are integers, a fraction is discounted as a whole unit. Returns the new balance, see
+    `_discount_consumable_units`.
+    """
+
+    with transaction.atomic():
+        balance = _discount_consumable_units(consumable.id, math.ceil(how_many))
+        ConsumptionEvent.objects.create(
+            consumable=consumable, how_many=how_many, balance=balance, settled_at=timezone.now()
+        )
+
+    if balance is not None:
+        consumable.how_many = balance
+
+    return balance
+
+
+def reimburse_consumable_units(consumable: Consumable, how_many: float) -> Optional[int]:
+    """
+    Give back units to a consumable and register it in the ledger.
+
+    Returns the new balance, or None if the consumable is unlimited.
+    """
+
+    table = connection.ops.quote_name(Consumable._meta.db_table)
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET how_many = how_many + %s WHERE id = %s AND how_many >= 0 RETURNING how_many",
+                [int(how_many), consumable.id],
+            )
+            row = cursor.fetchone()
+
+        balance = None if row is None else row[0]
+        ConsumptionEvent.objects.create(
+            consumable=consumable,
+            kind=ConsumptionEvent.Kind.REIMBURSE,
+            how_many=how_many,
+            balance=balance,
+            settled_at=timezone.now(),
+        )
+
+    if balance is not None:
+        consumable.how_many = balance
+
+    return balance
+
+
+def record_consumption(consumable: Consumable, how_many: float) -> ConsumptionEvent:
+    """
+    Register a consumption to be discounted later by `settle_consumption_events`, it's meant for the services that
+    are consumed in many small amounts, like the LLM usage, it does not touch the consumable row.
+    """
+
+    return ConsumptionEvent.objects.create(
+        consumable=consumable, how_many=how_many, status=ConsumptionEvent.Status.PENDING
+    )
+
+
+def settle_consumption_events(consumable_ids: Optional[Iterable[int]] = None) -> list[int]:
+    """
+    Fold the pending consumptions of each consumable into one decrement.
+
+    Returns the ids of the consumables exhausted by the settlement, their permissions are revoked.
+    """
+
+    pending = ConsumptionEvent.objects.filter(status=ConsumptionEvent.Status.PENDING)
+    if consumable_ids is not None:
+        pending = pending.filter(consumable_id__in=consumable_ids)
+
+    exhausted = []
+    for consumable_id in pending.order_by().values_list("consumable_id", flat=True).distinct():
+        with transaction.atomic():
+            # another worker could be settling this consumable
+            events = list(
+                pending.filter(consumable_id=consumable_id)
+                .select_for_update(skip_locked=True)
+                .values_list("id", "how_many")
+            )
+            if not events:
+                continue
+
+            balance = _discount_consumable_units(consumable_id, math.ceil(sum(x for _, x in events)))
+            ConsumptionEvent.objects.filter(id__in=[x for x, _ in events]).update(
+                status=ConsumptionEvent.Status.SETTLED, balance=balance, settled_at=timezone.now()
+            )
+
+        if balance == 0:
+            exhausted.append(consumable_id)
+
+    for consumable in Consumable.objects.filter(id__in=exhausted):
+        lose_service_permissions.send_robust(instance=consumable, sender=Consumable)
+
+    return exhausted
+
+
+def get_consumable_beneficiaries(consumable: Consumable) -> dict[int, bool]:
+    """
+    Resolve the users of a consumable through the same paths that `Consumable.list` follows.
+
+    Returns if the access of each user is active, a seat that was deactivated keeps its row as inactive.
+    """
+
+    beneficiaries: dict[int, bool] = {}
+
+    def add(user_id: Optional[int], active: bool) -> None:
+        if user_id:
+            beneficiaries[user_id] = beneficiaries.get(user_id, False) or active
+
+    add(consumable.user_id, True)
+
+    if consumable.subscription_seat:
+        add(consumable.subscription_seat.user_id, consumable.subscription_seat.is_active)
+
+    if consumable.plan_financing_seat:
+        add(consumable.plan_financing_seat.user_id, consumable.plan_financing_seat.is_active)
+
+    # the consumables of a PER_TEAM team are shared by every seat
+    team = consumable.subscription_billing_team
+    if (
+        consumable.user_id is None
+        and team
+        and team.consumption_strategy == SubscriptionBillingTeam.ConsumptionStrategy.PER_TEAM
+    ):
+        for seat in team.seats.all():
+            add(seat.user_id, seat.is_active)
+
+    team = consumable.plan_financing_team
+    if (
+        consumable.user_id is None
+        and team
+        and team.consumption_strategy == PlanFinancingTeam.ConsumptionStrategy.PER_TEAM
+    ):
+        for seat in team.seats.all():
+            add(seat.user_id, seat.is_active)
+
+    return beneficiaries
+
+
+def sync_consumable_beneficiaries(consumables: QuerySet[Consumable] | Iterable[int], force: bool = False) -> int:
+    """
+    Rebuild the `ConsumableBeneficiary` rows of the consumables, returns the number of rows written.
+
+    It does nothing while the table is disabled through `CONSUMABLE_BENEFICIARIES`, unless it is forced.
+    """
+
+    if not force and not ConsumableBeneficiary.is_sync_enabled():
+        return 0
+
+    if isinstance(consumables, QuerySet):
+        consumable_ids = list(consumables.values_list("id", flat=True))
+    else:
+        consumable_ids = list(consumables)
+
+    if not consumable_ids:
+        return 0
+
+    items = (
+        Consumable.objects.filter(id__in=consumable_ids)
+        .select_related(
+            "service_item",
+            "subscription_seat",
+            "plan_financing_seat",
+            "subscription_billing_team",
+            "plan_financing_team",
+        )
+        .prefetch_related("subscription_billing_team__seats", "plan_financing_team__seats")
+    )
+
+    rows: list[ConsumableBeneficiary] = []
+    for consumable in items:
+        for user_id, active in get_consumable_beneficiaries(consumable).items():
+            rows.append(
+                ConsumableBeneficiary(
+                    user_id=user_id,
+                    consumable_id=consumable.id,
+                    service_id=consumable.service_item.service_id,
+                    active=active,
+                )
+            )
+
+    expected = {(x.consumable_id, x.user_id) for x in rows}
+
+    with transaction.atomic():
+        existing = ConsumableBeneficiary.objects.filter(consumable_id__in=consumable_ids).values_list(
+            "id", "consumable_id", "user_id"
+        )
+        stale = [pk for pk, consumable_id, user_id in existing if (consumable_id, user_id) not in expected]
+        if stale:
+            ConsumableBeneficiary.objects.filter(id__in=stale).delete()
+
+        ConsumableBeneficiary.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["consumable", "user"],
+            update_fields=["service", "active"],
+        )
+
+    return len(rows)
+
+
 def reschedule_billing_tasks(
     *, subscription_id: int | None = None, plan_financing_id: int | None = None
 ) -> None:
@@ -6894,7 +7122,9 @@ def replace_seat(
     # if strategy is not per team, reassign consumables from the seat to the new user (or None if pending invite)
     if strategy != SubscriptionBillingTeam.ConsumptionStrategy.PER_TEAM:
         # Set user to the new user if exists, otherwise None (waiting for invitation acceptance)
-        Consumable.objects.filter(subscription_seat=seat).update(user=to_user)
+        consumables = Consumable.objects.filter(subscription_seat=seat)
+        consumables.update(user=to_user)
+        sync_consumable_beneficiaries(consumables)
 
     return seat
 
@@ -6953,7 +7183,9 @@ def replace_plan_financing_seat(
         )
 
     if seat.team.consumption_strategy != PlanFinancingTeam.ConsumptionStrategy.PER_TEAM:
-        Consumable.objects.filter(plan_financing_seat=seat).update(user=to_user)
+        consumables = Consumable.objects.filter(plan_financing_seat=seat)
+        consumables.update(user=to_user)
+        sync_consumable_beneficiaries(consumables)
 
     tasks.build_service_stock_scheduler_from_plan_financing.delay(seat.team.financing.id, seat_id=seat.id)
 
@@ -6966,7 +7198,9 @@ def deactivate_plan_financing_seat(financing_seat: PlanFinancingSeat):
     financing_seat.seat_log.append(create_seat_log_entry(financing_seat, "REMOVED"))
     financing_seat.save(update_fields=["is_active", "user", "seat_log"])
 
-    Consumable.objects.filter(plan_financing_seat_id=financing_seat.id).update(user=None)
+    consumables = Consumable.objects.filter(plan_financing_seat_id=financing_seat.id)
+    consumables.update(user=None)
+    sync_consumable_beneficiaries(consumables)
     tasks.build_service_stock_scheduler_from_plan_financing.delay(financing_seat.team.financing.id)
 
 
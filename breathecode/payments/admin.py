@@ -17,6 +17,8 @@ from breathecode.payments.models import (
     CohortSetCohort,
     CohortSetTranslation,
     Consumable,
+    ConsumableBeneficiary,
+    ConsumptionEvent,
     ConsumptionSession,
     Coupon,
     CreditLedgerEntry,
@@ -403,6 +405,16 @@ class ConsumableAdmin(admin.ModelAdmin):
     actions = [grant_service_permissions]
 
 
+@admin.register(ConsumableBeneficiary)
+class ConsumableBeneficiaryAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "consumable", "service", "active")
+    list_filter = ["active", "service"]
+    search_fields = ["user__email", "service__slug"]
+    raw_id_fields = ["user", "consumable", "service"]
+    list_select_related = ("user", "consumable", "service")
+    show_full_result_count = False
+
+
 class CreditNoteInline(admin.TabularInline):
     model = CreditNote
     extra = 0
@@ -1153,6 +1165,14 @@ class ConsumptionSessionAdmin(admin.ModelAdmin):
     raw_id_fields = ["user", "consumable"]
 
 
+@admin.register(ConsumptionEvent)
+class ConsumptionEventAdmin(admin.ModelAdmin):
+    list_display = ("id", "consumable", "kind", "how_many", "status", "balance", "settled_at", "created_at")
+    list_filter = ["kind", "status"]
+    search_fields = ["consumable__user__email", "consumable__service_item__service__slug"]
+    raw_id_fields = ["consumable"]
+
+
 @admin.register(Seller)
 class SellerAdmin(admin.ModelAdmin):
     list_display = ("id", "name", "user", "is_active")
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from ... import actions
+
+
+# settle the consumptions registered in batch every 5 minutes
+class Command(BaseCommand):
+    help = "Discount the pending consumptions from its consumables"
+
+    def handle(self, *args, **options):
+        exhausted = actions.settle_consumption_events()
+        self.stdout.write(self.style.SUCCESS(f"Consumptions settled, {len(exhausted)} consumables were exhausted"))
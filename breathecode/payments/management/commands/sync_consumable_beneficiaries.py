@@ -0,0 +1,90 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ... import actions
+from ...models import Consumable, ConsumableBeneficiary
+
+
+class Command(BaseCommand):
+    help = "Backfill the ConsumableBeneficiary index of the consumables, or verify it with --verify"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of consumables to process per batch (default: 1000)",
+        )
+        parser.add_argument(
+            "--include-expired",
+            action="store_true",
+            help="Include consumables with expired valid_until dates",
+        )
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Compare the index with the consumables without making changes",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        verify = options["verify"]
+
+        consumables = Consumable.objects.all()
+        if not options["include_expired"]:
+            consumables = consumables.exclude(valid_until__lt=timezone.now())
+
+        consumable_ids = list(consumables.order_by("id").values_list("id", flat=True))
+        total_count = len(consumable_ids)
+
+        if total_count == 0:
+            self.stdout.write(self.style.SUCCESS("No consumables found"))
+            return
+
+        written = 0
+        mismatches = []
+
+        for i in range(0, total_count, batch_size):
+            batch = consumable_ids[i : i + batch_size]
+
+            if verify:
+                mismatches += self.verify_batch(batch)
+
+            else:
+                written += actions.sync_consumable_beneficiaries(batch, force=True)
+
+            processed = min(i + batch_size, total_count)
+            self.stdout.write(f"Processed {processed}/{total_count} consumables...")
+
+        if not verify:
+            self.stdout.write(self.style.SUCCESS(f"Synced {written} beneficiaries of {total_count} consumables"))
+            return
+
+        if mismatches:
+            ids_str = ", ".join(str(x) for x in mismatches)
+            self.stdout.write(self.style.ERROR(f"Found {len(mismatches)} consumables out of sync: [{ids_str}]"))
+            return
+
+        self.stdout.write(self.style.SUCCESS(f"All {total_count} consumables are in sync"))
+
+    def verify_batch(self, consumable_ids: list[int]) -> list[int]:
+        stored: dict[int, dict[int, bool]] = {}
+        for consumable_id, user_id, active in ConsumableBeneficiary.objects.filter(
+            consumable_id__in=consumable_ids
+        ).values_list("consumable_id", "user_id", "active"):
+            stored.setdefault(consumable_id, {})[user_id] = active
+
+        items = (
+            Consumable.objects.filter(id__in=consumable_ids)
+            .select_related(
+                "subscription_seat", "plan_financing_seat", "subscription_billing_team", "plan_financing_team"
+            )
+            .prefetch_related("subscription_billing_team__seats", "plan_financing_team__seats")
+            .order_by("id")
+        )
+
+        return [
+            consumable.id
+            for consumable in items
+            if actions.get_consumable_beneficiaries(consumable) != stored.get(consumable.id, {})
+        ]
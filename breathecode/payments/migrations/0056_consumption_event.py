@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0055_active_users_bill_and_internal_billing"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ConsumptionEvent",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("CONSUME", "Consume"), ("REIMBURSE", "Reimburse")],
+                        default="CONSUME",
+                        help_text="Kind of the movement",
+                        max_length=10,
+                    ),
+                ),
+                ("how_many", models.FloatField(help_text="How many units were requested")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("PENDING", "Pending"), ("SETTLED", "Settled")],
+                        default="SETTLED",
+                        help_text="Pending events were recorded in batch mode and they are not discounted from the consumable yet",
+                        max_length=8,
+                    ),
+                ),
+                (
+                    "balance",
+                    models.IntegerField(
+                        blank=True,
+                        default=None,
+                        help_text="Units of the consumable after settling this event, null if the consumable was not modified",
+                        null=True,
+                    ),
+                ),
+                ("settled_at", models.DateTimeField(blank=True, default=None, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "consumable",
+                    models.ForeignKey(
+                        help_text="Consumable", on_delete=django.db.models.deletion.CASCADE, to="payments.consumable"
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [models.Index(fields=["status", "consumable"], name="payments_consumption_pending")],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:13
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def hash_unexpired_sessions(apps, schema_editor):
+    # the expired sessions are never looked up again
+    ConsumptionSession = apps.get_model("payments", "ConsumptionSession")
+    sessions = ConsumptionSession.objects.filter(eta__gte=timezone.now(), request_hash="").only("id", "request")
+
+    to_update = []
+    for session in sessions.iterator(chunk_size=1000):
+        encoded = json.dumps(session.request, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+        session.request_hash = hashlib.sha256(encoded).hexdigest()
+        to_update.append(session)
+
+    ConsumptionSession.objects.bulk_update(to_update, ["request_hash"], batch_size=1000)
+
+
+def noop_reverse(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0056_consumption_event"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="consumptionsession",
+            name="request_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="SHA-256 of the canonical request, it's used to look up the session of a request",
+                max_length=64,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="consumptionsession",
+            index=models.Index(fields=["user", "request_hash", "eta"], name="payments_session_request_hash"),
+        ),
+        migrations.RunPython(hash_unexpired_sessions, noop_reverse),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0057_consumption_session_request_hash"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ConsumableBeneficiary",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "active",
+                    models.BooleanField(
+                        default=True, help_text="False while the seat that grants the access is inactive"
+                    ),
+                ),
+                (
+                    "consumable",
+                    models.ForeignKey(
+                        help_text="Consumable",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="beneficiaries",
+                        to="payments.consumable",
+                    ),
+                ),
+                (
+                    "service",
+                    models.ForeignKey(
+                        help_text="Service of the consumable",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="payments.service",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        help_text="User that can use the consumable",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [models.Index(fields=["user", "service", "active"], name="payments_beneficiary_lookup")],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("consumable", "user"), name="payments_unique_consumable_beneficiary"
+                    )
+                ],
+            },
+        ),
+    ]
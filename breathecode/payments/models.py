@@ -15,6 +15,7 @@ from capyc.rest_framework.exceptions import ValidationException
 from currencies import Currency as CurrencyFormatter
 from django import forms
 from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache
 from django.core.handlers.wsgi import WSGIRequest
 from django.core.validators import MaxValueValidator
 from django.db import models
@@ -3403,7 +3404,12 @@ class Consumable(AbstractServiceItem):
                 )
             )
 
-        if isinstance(user, str):
+        use_beneficiaries = ConsumableBeneficiary.is_lookup_enabled()
+        if use_beneficiaries:
+            user_id = user.id if isinstance(user, User) else int(user)
+            args.append(Q(beneficiaries__user_id=user_id, beneficiaries__active=True))
+
+        elif isinstance(user, str):
             args.append(
                 Q(user__id=int(user))
                 | Q(subscription_seat__user__id=int(user), subscription_seat__is_active=True)
@@ -3521,6 +3527,13 @@ class Consumable(AbstractServiceItem):
             Subscription.Status.ERROR,
         ]
 
+        # the beneficiary row carries the service, so the lookup is served by its index
+        if use_beneficiaries and "service_item__service__id" in param:
+            param["beneficiaries__service_id"] = param.pop("service_item__service__id")
+
+        elif use_beneficiaries and "service_item__service" in param:
+            param["beneficiaries__service"] = param.pop("service_item__service")
+
         queryset = cls.objects.filter(*args, Q(valid_until__gte=utc_now) | Q(valid_until=None), **{**param, **extra})
 
         if not include_zero_balance:
@@ -3730,6 +3743,48 @@ class Consumable(AbstractServiceItem):
         return f"{owner}: {service_slug} ({self.how_many})"
 
 
+class ConsumableBeneficiary(models.Model):
+    """
+    Denormalized index of the users that can use a consumable.
+
+    `Consumable.list` resolves the owner of a consumable through the user, the seats and the PER_TEAM billing teams,
+    this table keeps the result of those paths per user to look it up with a single index, it's maintained by
+    `actions.sync_consumable_beneficiaries`.
+    """
+
+    if TYPE_CHECKING:
+        objects: TypedManager["ConsumableBeneficiary"]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, help_text="User that can use the consumable")
+    consumable = models.ForeignKey(
+        Consumable, on_delete=models.CASCADE, related_name="beneficiaries", help_text="Consumable"
+    )
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, help_text="Service of the consumable")
+    active = models.BooleanField(default=True, help_text="False while the seat that grants the access is inactive")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["consumable", "user"], name="payments_unique_consumable_beneficiary"),
+        ]
+        indexes = [
+            models.Index(fields=["user", "service", "active"], name="payments_beneficiary_lookup"),
+        ]
+
+    @staticmethod
+    def get_mode() -> str:
+        """`off` by default, `sync` keeps the table updated and `on` also serves `Consumable.list` from it."""
+
+        return os.getenv("CONSUMABLE_BENEFICIARIES", "off").lower()
+
+    @classmethod
+    def is_sync_enabled(cls) -> bool:
+        return cls.get_mode() in ["sync", "on"]
+
+    @classmethod
+    def is_lookup_enabled(cls) -> bool:
+        return cls.get_mode() == "on"
+
+
 class ConsumptionSession(models.Model):
     class Status(models.TextChoices):
         PENDING = "PENDING", "Pending"
@@ -3755,6 +3810,12 @@ class ConsumptionSession(models.Model):
         blank=True,
         help_text="Request parameters, it's used to remind and recover and consumption session",
     )
+    request_hash = models.CharField(
+        max_length=64,
+        default="",
+        blank=True,
+        help_text="SHA-256 of the canonical request, it's used to look up the session of a request",
+    )
 
     # this should be used to get
     path = models.CharField(max_length=200, blank=True, help_text="Path of the request")
@@ -3768,8 +3829,14 @@ class ConsumptionSession(models.Model):
         "letters, numbers and hyphens",
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "request_hash", "eta"], name="payments_session_request_hash"),
+        ]
+
     def clean(self):
         self.request = self.sort_dict(self.request or {})
+        self.request_hash = self.hash_request(self.request)
 
     def save(self, *args, **kwargs):
         self.full_clean()
@@ -3781,11 +3848,57 @@ class ConsumptionSession(models.Model):
         if isinstance(d, dict):
             return {k: cls.sort_dict(v) for k, v in sorted(d.items())}
 
-        elif isinstance(d, list):
+        elif isinstance(d, (list, tuple)):
             return [cls.sort_dict(x) for x in d]
 
         return d
 
+    @classmethod
+    def hash_request(cls, data: dict) -> str:
+        """Stable digest of a request, the same request always produces the same hash."""
+
+        encoded = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    @classmethod
+    def request_data(cls, request: WSGIRequest, user: User) -> dict:
+        if hasattr(request, "parser_context"):
+            args = request.parser_context["args"]
+            kwargs = request.parser_context["kwargs"]
+        else:
+            args = request.resolver_match.args
+            kwargs = request.resolver_match.kwargs
+
+        return cls.sort_dict(
+            {
+                "args": list(args),
+                "kwargs": kwargs,
+                "headers": {"academy": request.META.get("HTTP_ACADEMY")},
+                "user": user.id,
+            }
+        )
+
+    @staticmethod
+    def is_cache_enabled() -> bool:
+        return os.getenv("CONSUMPTION_SESSION_CACHE", "0").lower() in ["true", "1", "yes", "y"]
+
+    @staticmethod
+    def get_cache_key(user_id: int, request_hash: str) -> str:
+        return f"payments:consumption_session:{user_id}:{request_hash}"
+
+    def get_cache_timeout(self) -> int:
+        return int((self.eta - timezone.now()).total_seconds())
+
+    def cache_session(self) -> None:
+        """Keep the session in the front cache until its eta."""
+
+        if self.is_cache_enabled() and (timeout := self.get_cache_timeout()) > 0:
+            cache.set(self.get_cache_key(self.user_id, self.request_hash), self, timeout)
+
+    async def acache_session(self) -> None:
+        if self.is_cache_enabled() and (timeout := self.get_cache_timeout()) > 0:
+            await cache.aset(self.get_cache_key(self.user_id, self.request_hash), self, timeout)
+
     @classmethod
     def build_session(
         cls,
@@ -3817,19 +3930,8 @@ class ConsumptionSession(models.Model):
         path = resource.__class__._meta.app_label + "." + resource.__class__.__name__ if resource else ""
         user = user or request.user
 
-        if hasattr(request, "parser_context"):
-            args = request.parser_context["args"]
-            kwargs = request.parser_context["kwargs"]
-        else:
-            args = request.resolver_match.args
-            kwargs = request.resolver_match.kwargs
-
-        data = {
-            "args": args,
-            "kwargs": kwargs,
-            "headers": {"academy": request.META.get("HTTP_ACADEMY")},
-            "user": user.id,
-        }
+        data = cls.request_data(request, user)
+        request_hash = cls.hash_request(data)
 
         # assert path, 'You must provide a path'
         assert delta, "You must provide a delta"
@@ -3839,7 +3941,7 @@ class ConsumptionSession(models.Model):
             session = (
                 cls.objects.filter(
                     eta__gte=utc_now,
-                    request=data,
+                    request_hash=request_hash,
                     path=path,
                     duration=delta,
                     related_id=id,
@@ -3854,7 +3956,7 @@ class ConsumptionSession(models.Model):
         if session:
             return session
 
-        return cls.objects.create(
+        session = cls.objects.create(
             request=data,
             consumable=consumable,
             eta=utc_now + delta,
@@ -3865,6 +3967,8 @@ class ConsumptionSession(models.Model):
             operation_code=operation_code,
             user=user,
         )
+        session.cache_session()
+        return session
 
     @classmethod
     @sync_to_async
@@ -3883,28 +3987,34 @@ class ConsumptionSession(models.Model):
         if not request.user.id:
             return None
 
-        utc_now = timezone.now()
-        if hasattr(request, "parser_context"):
-            args = request.parser_context["args"]
-            kwargs = request.parser_context["kwargs"]
-        else:
-            args = request.resolver_match.args
-            kwargs = request.resolver_match.kwargs
+        request_hash = cls.hash_request(cls.request_data(request, request.user))
+        cache_enabled = cls.is_cache_enabled()
+        if cache_enabled and (session := cache.get(cls.get_cache_key(request.user.id, request_hash))):
+            return session
 
-        data = {
-            "args": list(args),
-            "kwargs": kwargs,
-            "headers": {"academy": request.META.get("HTTP_ACADEMY")},
-            "user": request.user.id,
-        }
+        utc_now = timezone.now()
+        session = cls.objects.filter(user=request.user, request_hash=request_hash, eta__gte=utc_now).first()
+        if cache_enabled and session:
+            session.cache_session()
 
-        data = cls.sort_dict(data)
-        return cls.objects.filter(eta__gte=utc_now, request=data, user=request.user).first()
+        return session
 
     @classmethod
-    @sync_to_async
-    def aget_session(cls, request: WSGIRequest) -> "ConsumptionSession":
-        return cls.get_session(request)
+    async def aget_session(cls, request: WSGIRequest) -> "ConsumptionSession":
+        if not request.user.id:
+            return None
+
+        request_hash = cls.hash_request(cls.request_data(request, request.user))
+        cache_enabled = cls.is_cache_enabled()
+        if cache_enabled and (session := await cache.aget(cls.get_cache_key(request.user.id, request_hash))):
+            return session
+
+        utc_now = timezone.now()
+        session = await cls.objects.filter(user=request.user, request_hash=request_hash, eta__gte=utc_now).afirst()
+        if cache_enabled and session:
+            await session.acache_session()
+
+        return session
 
     def will_consume(self, how_many: float = 1.0) -> None:
         # avoid dependency circle
@@ -3920,6 +4030,48 @@ class ConsumptionSession(models.Model):
         return self.will_consume(how_many)
 
 
+class ConsumptionEvent(models.Model):
+    """Append-only ledger of the units consumed and reimbursed of a consumable."""
+
+    class Kind(models.TextChoices):
+        CONSUME = "CONSUME", "Consume"
+        REIMBURSE = "REIMBURSE", "Reimburse"
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Pending"
+        SETTLED = "SETTLED", "Settled"
+
+    if TYPE_CHECKING:
+        objects: TypedManager["ConsumptionEvent"]
+
+    consumable = models.ForeignKey(Consumable, on_delete=models.CASCADE, help_text="Consumable")
+    kind = models.CharField(max_length=10, choices=Kind, default=Kind.CONSUME, help_text="Kind of the movement")
+    how_many = models.FloatField(help_text="How many units were requested")
+    status = models.CharField(
+        max_length=8,
+        choices=Status,
+        default=Status.SETTLED,
+        help_text="Pending events were recorded in batch mode and they are not discounted from the consumable yet",
+    )
+    balance = models.IntegerField(
+        null=True,
+        blank=True,
+        default=None,
+        help_text="Units of the consumable after settling this event, null if the consumable was not modified",
+    )
+
+    settled_at = models.DateTimeField(null=True, blank=True, default=None)
+    created_at = models.DateTimeField(auto_now_add=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "consumable"], name="payments_consumption_pending"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.how_many} of {self.consumable_id} ({self.status})"
+
+
 class PlanServiceItem(models.Model):
     """M2M between plan and ServiceItem."""
 
@@ -4,7 +4,7 @@ from typing import Type
 from django.contrib.auth.models import Group, User
 from django.db import transaction
 from django.db.models import Q
-from django.db.models.signals import m2m_changed, post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.utils import timezone
 from task_manager.django.actions import schedule_task
@@ -25,10 +25,12 @@ from .actions import validate_auto_recharge_service_units
 from .models import (
     Bag,
     Consumable,
+    ConsumableBeneficiary,
     Invoice,
     PaymentMethod,
     Plan,
     PlanFinancing,
+    PlanFinancingSeat,
     PlanFinancingTeam,
     Subscription,
     SubscriptionBillingTeam,
@@ -48,18 +50,19 @@ logger = logging.getLogger(__name__)
 
 
 @receiver(consume_service, sender=Consumable)
-def consume_service_receiver(sender: Type[Consumable], instance: Consumable, how_many: float, **kwargs):
-    if instance.how_many == 0:
-        lose_service_permissions.send_robust(instance=instance, sender=sender)
-        return
-
+def consume_service_receiver(
+    sender: Type[Consumable], instance: Consumable, how_many: float, batch: bool = False, **kwargs
+):
     if instance.how_many == -1:
         return
 
-    instance.how_many -= how_many
-    instance.save()
+    # the consumptions in batch are discounted by the settle_consumption_events command
+    if batch:
+        actions.record_consumption(instance, how_many)
+        return
 
-    if instance.how_many == 0:
+    # only the consumer that exhausts the consumable revokes the permissions
+    if actions.consume_consumable_units(instance, how_many) == 0:
         lose_service_permissions.send_robust(instance=instance, sender=sender)
 
 
@@ -68,12 +71,10 @@ def reimburse_service_units_receiver(sender: Type[Consumable], instance: Consuma
     if instance.how_many == -1:
         return
 
-    grant_permissions = not instance.how_many and how_many
+    balance = actions.reimburse_consumable_units(instance, how_many)
 
-    instance.how_many += how_many
-    instance.save()
-
-    if grant_permissions:
+    # the permissions are granted again only if the consumable was exhausted
+    if balance is not None and how_many and balance == int(how_many):
         grant_service_permissions.send_robust(instance=instance, sender=sender)
 
 
@@ -440,6 +441,81 @@ def check_consumable_balance_for_auto_recharge(sender: Type[Consumable], instanc
 post_save.connect(check_consumable_balance_for_auto_recharge, sender=Consumable)
 
 
+BENEFICIARY_FIELDS = {
+    "user",
+    "service_item",
+    "subscription_seat",
+    "plan_financing_seat",
+    "subscription_billing_team",
+    "plan_financing_team",
+}
+
+
+@receiver(post_save, sender=Consumable)
+def sync_beneficiaries_of_consumable(sender: Type[Consumable], instance: Consumable, update_fields=None, **kwargs):
+    if update_fields is not None and not BENEFICIARY_FIELDS.intersection(update_fields):
+        return
+
+    actions.sync_consumable_beneficiaries([instance.id])
+
+
+def get_consumables_of_subscription_seat(instance: SubscriptionSeat):
+    return Consumable.objects.filter(
+        Q(subscription_seat_id=instance.id) | Q(subscription_billing_team_id=instance.billing_team_id, user=None)
+    )
+
+
+def get_consumables_of_plan_financing_seat(instance: PlanFinancingSeat):
+    return Consumable.objects.filter(
+        Q(plan_financing_seat_id=instance.id) | Q(plan_financing_team_id=instance.team_id, user=None)
+    )
+
+
+@receiver(post_save, sender=SubscriptionSeat)
+def sync_beneficiaries_of_subscription_seat(sender: Type[SubscriptionSeat], instance: SubscriptionSeat, **kwargs):
+    actions.sync_consumable_beneficiaries(get_consumables_of_subscription_seat(instance))
+
+
+@receiver(post_save, sender=PlanFinancingSeat)
+def sync_beneficiaries_of_plan_financing_seat(sender: Type[PlanFinancingSeat], instance: PlanFinancingSeat, **kwargs):
+    actions.sync_consumable_beneficiaries(get_consumables_of_plan_financing_seat(instance))
+
+
+# the seat is detached from its consumables by SET_NULL, so they are collected before the deletion
+@receiver(pre_delete, sender=SubscriptionSeat)
+@receiver(pre_delete, sender=PlanFinancingSeat)
+def collect_beneficiaries_of_deleted_seat(sender, instance: SubscriptionSeat | PlanFinancingSeat, **kwargs):
+    if not ConsumableBeneficiary.is_sync_enabled():
+        return
+
+    if sender is SubscriptionSeat:
+        consumables = get_consumables_of_subscription_seat(instance)
+
+    else:
+        consumables = get_consumables_of_plan_financing_seat(instance)
+
+    instance._beneficiary_consumable_ids = list(consumables.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=SubscriptionSeat)
+@receiver(post_delete, sender=PlanFinancingSeat)
+def sync_beneficiaries_of_deleted_seat(sender, instance: SubscriptionSeat | PlanFinancingSeat, **kwargs):
+    consumable_ids = getattr(instance, "_beneficiary_consumable_ids", [])
+    actions.sync_consumable_beneficiaries(consumable_ids)
+
+
+@receiver(post_save, sender=SubscriptionBillingTeam)
+def sync_beneficiaries_of_subscription_billing_team(
+    sender: Type[SubscriptionBillingTeam], instance: SubscriptionBillingTeam, **kwargs
+):
+    actions.sync_consumable_beneficiaries(Consumable.objects.filter(subscription_billing_team_id=instance.id))
+
+
+@receiver(post_save, sender=PlanFinancingTeam)
+def sync_beneficiaries_of_plan_financing_team(sender: Type[PlanFinancingTeam], instance: PlanFinancingTeam, **kwargs):
+    actions.sync_consumable_beneficiaries(Consumable.objects.filter(plan_financing_team_id=instance.id))
+
+
 def _load_stripe_checkout_fulfillment_context(
     session: dict, *, require_subscription: bool = False, require_plan_financing: bool = False
 ) -> tuple[dict | None, str | None]:
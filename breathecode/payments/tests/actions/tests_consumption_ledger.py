@@ -0,0 +1,132 @@
+"""Tests for the consumption ledger of the consumables."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, call
+
+import pytest
+from django.db import OperationalError, connection
+
+from breathecode.payments import actions, signals
+from breathecode.payments.models import Consumable, ConsumptionEvent
+from breathecode.payments.receivers import consume_service_receiver, reimburse_service_units_receiver
+from breathecode.tests.mixins.breathecode_mixin.breathecode import Breathecode
+
+
+@pytest.fixture(autouse=True)
+def setup(db, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(signals.lose_service_permissions, "send_robust", MagicMock())
+    monkeypatch.setattr(signals.grant_service_permissions, "send_robust", MagicMock())
+
+
+def get_events():
+    return list(ConsumptionEvent.objects.order_by("id").values_list("kind", "how_many", "status", "balance"))
+
+
+def test_consume_with_a_conditional_update(bc: Breathecode):
+    model = bc.database.create(consumable={"how_many": 3})
+    stale = Consumable.objects.get(id=model.consumable.id)
+
+    assert actions.consume_consumable_units(model.consumable, 2) == 1
+    assert model.consumable.how_many == 1
+
+    # the balance is read from the database, not from the instance
+    assert actions.consume_consumable_units(stale, 0.5) == 0
+    assert actions.consume_consumable_units(stale, 1) is None
+
+    assert Consumable.objects.get(id=model.consumable.id).how_many == 0
+    assert get_events() == [
+        ("CONSUME", 2, "SETTLED", 1),
+        ("CONSUME", 0.5, "SETTLED", 0),
+        ("CONSUME", 1, "SETTLED", None),
+    ]
+
+
+def test_consume_more_than_the_balance(bc: Breathecode):
+    model = bc.database.create(consumable={"how_many": 3})
+
+    assert actions.consume_consumable_units(model.consumable, 5) == 0
+    assert Consumable.objects.get(id=model.consumable.id).how_many == 0
+
+
+def test_the_permissions_are_lost_and_granted_only_on_the_transition(bc: Breathecode):
+    model = bc.database.create(consumable={"how_many": 2})
+    consumable = model.consumable
+
+    # the permissions granted on creation
+    signals.grant_service_permissions.send_robust.reset_mock()
+
+    consume_service_receiver(Consumable, instance=consumable, how_many=1)
+    assert signals.lose_service_permissions.send_robust.call_args_list == []
+
+    consume_service_receiver(Consumable, instance=consumable, how_many=1)
+    consume_service_receiver(Consumable, instance=consumable, how_many=1)
+    assert signals.lose_service_permissions.send_robust.call_args_list == [
+        call(instance=consumable, sender=Consumable),
+    ]
+
+    reimburse_service_units_receiver(Consumable, instance=consumable, how_many=2)
+    reimburse_service_units_receiver(Consumable, instance=consumable, how_many=1)
+
+    assert Consumable.objects.get(id=consumable.id).how_many == 3
+    assert signals.grant_service_permissions.send_robust.call_args_list == [
+        call(instance=consumable, sender=Consumable),
+    ]
+
+
+def test_the_consumptions_in_batch_are_settled_in_one_decrement(bc: Breathecode):
+    model = bc.database.create(consumable=[{"how_many": 10}, {"how_many": 2}])
+
+    for _ in range(4):
+        consume_service_receiver(Consumable, instance=model.consumable[0], how_many=0.5, batch=True)
+        consume_service_receiver(Consumable, instance=model.consumable[1], how_many=1, batch=True)
+
+    assert list(Consumable.objects.order_by("id").values_list("how_many", flat=True)) == [10, 2]
+    assert ConsumptionEvent.objects.filter(status=ConsumptionEvent.Status.PENDING).count() == 8
+
+    assert actions.settle_consumption_events() == [model.consumable[1].id]
+
+    assert list(Consumable.objects.order_by("id").values_list("how_many", flat=True)) == [8, 0]
+    assert ConsumptionEvent.objects.filter(status=ConsumptionEvent.Status.PENDING).count() == 0
+    assert signals.lose_service_permissions.send_robust.call_args_list == [
+        call(instance=model.consumable[1], sender=Consumable),
+    ]
+
+    # nothing to settle
+    assert actions.settle_consumption_events() == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_100_parallel_consumers(bc: Breathecode):
+    model = bc.database.create(consumable={"how_many": 60})
+    start = threading.Barrier(100)
+
+    def consume():
+        # every consumer has its own copy, like the ones loaded by the consume decorator
+        consumable = Consumable.objects.get(id=model.consumable.id)
+        start.wait()
+
+        try:
+            for _ in range(100):
+                try:
+                    return consume_service_receiver(Consumable, instance=consumable, how_many=1)
+
+                # the sqlite test database does not wait for the locks of the other connections
+                except OperationalError:
+                    time.sleep(0.01)
+
+            raise AssertionError("The database was locked for too long")
+
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=100) as executor:
+        for future in [executor.submit(consume) for _ in range(100)]:
+            future.result()
+
+    assert Consumable.objects.get(id=model.consumable.id).how_many == 0
+    assert ConsumptionEvent.objects.count() == 100
+    assert ConsumptionEvent.objects.filter(balance__isnull=False).count() == 60
+    assert ConsumptionEvent.objects.filter(balance=0).count() == 1
+    assert signals.lose_service_permissions.send_robust.call_count == 1
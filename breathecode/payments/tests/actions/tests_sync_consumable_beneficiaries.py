@@ -0,0 +1,184 @@
+"""
+Tests for actions.sync_consumable_beneficiaries and the `Consumable.list` lookup that it serves.
+"""
+
+from io import StringIO
+from types import SimpleNamespace
+
+import pytest
+
+from breathecode.payments import actions
+from breathecode.payments.management.commands.sync_consumable_beneficiaries import Command
+from breathecode.payments.models import Consumable, ConsumableBeneficiary, SubscriptionBillingTeam, SubscriptionSeat
+from breathecode.tests.mixins.breathecode_mixin.breathecode import Breathecode
+
+
+@pytest.fixture(autouse=True)
+def setup(db, monkeypatch: pytest.MonkeyPatch, enable_signals):
+    enable_signals(
+        "django.db.models.signals.post_save",
+        "django.db.models.signals.pre_delete",
+        "django.db.models.signals.post_delete",
+    )
+    monkeypatch.setattr("breathecode.payments.tasks.process_auto_recharge.delay", lambda *args, **kwargs: None)
+    monkeypatch.setattr(
+        "breathecode.payments.tasks.build_service_stock_scheduler_from_subscription.delay",
+        lambda *args, **kwargs: None,
+    )
+    yield
+
+
+def get_rows():
+    return sorted(
+        ConsumableBeneficiary.objects.values_list("consumable_id", "user_id", "service_id", "active"),
+    )
+
+
+def create_team(bc: Breathecode, strategy: str, seats: list[dict], consumable: dict):
+    model = bc.database.create(user=len(seats) + 1, subscription={"user_id": 1}, service_item={"is_team_allowed": True})
+
+    team = SubscriptionBillingTeam.objects.create(
+        subscription=model.subscription, name="Team", consumption_strategy=strategy
+    )
+    seats = [
+        SubscriptionSeat.objects.create(billing_team=team, user=model.user[n + 1], email=model.user[n + 1].email, **x)
+        for n, x in enumerate(seats)
+    ]
+    consumable = Consumable.objects.create(
+        subscription=model.subscription,
+        subscription_billing_team=team,
+        service_item=model.service_item,
+        how_many=1,
+        **consumable,
+    )
+
+    return SimpleNamespace(
+        user=model.user,
+        service=model.service,
+        subscription_billing_team=team,
+        subscription_seat=seats,
+        consumable=consumable,
+    )
+
+
+def test_disabled(bc: Breathecode, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv("CONSUMABLE_BENEFICIARIES", raising=False)
+    model = bc.database.create(user=1, consumable={"user_id": 1})
+
+    assert actions.sync_consumable_beneficiaries([model.consumable.id]) == 0
+    assert get_rows() == []
+
+
+def test_forced_while_disabled(bc: Breathecode, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv("CONSUMABLE_BENEFICIARIES", raising=False)
+    model = bc.database.create(user=1, consumable={"user_id": 1})
+
+    assert actions.sync_consumable_beneficiaries([model.consumable.id], force=True) == 1
+    assert get_rows() == [(1, 1, model.service.id, True)]
+
+
+def test_synced_on_save(bc: Breathecode, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("CONSUMABLE_BENEFICIARIES", "sync")
+    model = bc.database.create(user=2, consumable={"user_id": 1})
+
+    assert get_rows() == [(1, 1, model.service.id, True)]
+
+    model.consumable.user = model.user[1]
+    model.consumable.save()
+
+    assert get_rows() == [(1, 2, model.service.id, True)]
+
+
+@pytest.mark.parametrize("strategy", ["PER_SEAT", "PER_TEAM"])
+def test_per_team_consumable_is_shared_by_the_seats(bc: Breathecode, monkeypatch: pytest.MonkeyPatch, strategy):
+    monkeypatch.setenv("CONSUMABLE_BENEFICIARIES", "sync")
+    model = create_team(
+        bc,
+        strategy,
+        seats=[{"is_active": True}, {"is_active": False}],
+        consumable={"user": None},
+    )
+
+    actions.sync_consumable_beneficiaries([model.consumable.id])
+
+    if strategy == "PER_TEAM":
+        assert get_rows() == [(1, 2, model.service.id, True), (1, 3, model.service.id, False)]
+
+    else:
+        assert get_rows() == []
+
+
+def test_seat_deactivation(bc: Breathecode, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("CONSUMABLE_BENEFICIARIES", "sync")
+    model = create_team(
+        bc,
+        "PER_SEAT",
+        seats=[{"is_active": True}],
+        consumable={},
+    )
+    model.consumable.user = model.user[1]
+    model.consumable.subscription_seat = model.subscription_seat[0]
+    model.consumable.save()
+
+    assert get_rows() == [(1, 2, model.service.id, True)]
+
+    seat = model.subscription_seat[0]
+    seat.is_active = False
+    seat.user = None
+    seat.save()
+
+    consumables = Consumable.objects.filter(subscription_seat=seat)
+    consumables.update(user=None)
+    actions.sync_consumable_beneficiaries(consumables)
+
+    assert get_rows() == []
+
+
+def test_seat_deletion(bc: Breathecode, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("CONSUMABLE_BENEFICIARIES", "sync")
+    model = create_team(
+        bc,
+        "PER_TEAM",
+        seats=[{"is_active": True}, {"is_active": True}],
+        consumable={"user": None},
+    )
+
+    assert get_rows() == [(1, 2, model.service.id, True), (1, 3, model.service.id, True)]
+
+    model.subscription_seat[0].delete()
+
+    assert get_rows() == [(1, 3, model.service.id, True)]
+
+
+@pytest.mark.parametrize("mode", ["off", "on"])
+def test_list_is_the_same_with_the_beneficiaries(bc: Breathecode, monkeypatch: pytest.MonkeyPatch, mode):
+    monkeypatch.setenv("CONSUMABLE_BENEFICIARIES", "sync")
+    model = create_team(
+        bc,
+        "PER_TEAM",
+        seats=[{"is_active": True}, {"is_active": False}],
+        consumable={"user": None},
+    )
+
+    monkeypatch.setenv("CONSUMABLE_BENEFICIARIES", mode)
+
+    assert list(Consumable.list(user=model.user[1], service=model.service.id)) == [model.consumable]
+    assert list(Consumable.list(user=str(model.user[2].id), service=model.service.slug)) == []
+    assert list(Consumable.list(user=model.user[0])) == []
+
+
+def test_command__backfill_and_verify(bc: Breathecode, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv("CONSUMABLE_BENEFICIARIES", raising=False)
+    model = bc.database.create(user=2, consumable=[{"user_id": 1}, {"user_id": 2}])
+
+    out = StringIO()
+    command = Command(stdout=out)
+
+    command.handle(batch_size=1, include_expired=False, verify=True)
+    assert "Found 2 consumables out of sync: [1, 2]" in out.getvalue()
+
+    command.handle(batch_size=1, include_expired=False, verify=False)
+    assert get_rows() == [(1, 1, model.service.id, True), (2, 2, model.service.id, True)]
+
+    command.handle(batch_size=1, include_expired=False, verify=True)
+    assert "All 2 consumables are in sync" in out.getvalue()
@@ -0,0 +1,111 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+
+from breathecode.payments.models import ConsumptionSession
+from breathecode.tests.mixins.breathecode_mixin.breathecode import Breathecode
+
+
+def build_request(user, kwargs={}, academy=None):
+    return SimpleNamespace(
+        user=user,
+        parser_context={"args": (), "kwargs": kwargs},
+        META={"HTTP_ACADEMY": academy},
+    )
+
+
+def session_request(user, kwargs={}):
+    return {"args": [], "headers": {"academy": None}, "kwargs": kwargs, "user": user.id}
+
+
+@pytest.fixture(autouse=True)
+def setup(db, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv("CONSUMPTION_SESSION_CACHE", raising=False)
+    yield
+
+
+def test_hash_request__stable():
+    a = {"user": 1, "kwargs": {"b": 2, "a": 1}, "args": (1, "x")}
+    b = {"args": [1, "x"], "kwargs": {"a": 1, "b": 2}, "user": 1}
+
+    assert ConsumptionSession.hash_request(a) == ConsumptionSession.hash_request(b)
+    assert ConsumptionSession.hash_request(a) != ConsumptionSession.hash_request({**b, "user": 2})
+    assert len(ConsumptionSession.hash_request(a)) == 64
+
+
+def test_request_hash__set_on_save(bc: Breathecode):
+    model = bc.database.create(user=1, consumable=1, consumption_session={"request": {"user": 1, "args": []}})
+
+    assert model.consumption_session.request_hash == ConsumptionSession.hash_request({"args": [], "user": 1})
+
+
+def test_get_session(bc: Breathecode, django_assert_num_queries):
+    utc_now = timezone.now()
+    user = bc.database.create(user=1).user
+    model = bc.database.create(
+        consumable=1,
+        user=user,
+        consumption_session=[
+            {"request": session_request(user, {"slug": "a"}), "eta": utc_now - timedelta(minutes=1)},
+            {"request": session_request(user, {"slug": "a"}), "eta": utc_now + timedelta(minutes=1)},
+            {"request": session_request(user, {"slug": "b"}), "eta": utc_now + timedelta(minutes=1)},
+        ],
+    )
+
+    with django_assert_num_queries(1):
+        session = ConsumptionSession.get_session(build_request(user, {"slug": "a"}))
+
+    assert session == model.consumption_session[1]
+    assert ConsumptionSession.get_session(build_request(user, {"slug": "c"})) is None
+
+
+def test_get_session__expired(bc: Breathecode):
+    user = bc.database.create(user=1).user
+    bc.database.create(
+        consumable=1,
+        user=user,
+        consumption_session={"request": session_request(user), "eta": timezone.now() - timedelta(minutes=1)},
+    )
+
+    assert ConsumptionSession.get_session(build_request(user)) is None
+
+
+def test_get_session__front_cache(bc: Breathecode, monkeypatch: pytest.MonkeyPatch, django_assert_num_queries):
+    monkeypatch.setenv("CONSUMPTION_SESSION_CACHE", "1")
+
+    user = bc.database.create(user=1).user
+    model = bc.database.create(
+        consumable=1,
+        user=user,
+        consumption_session={"request": session_request(user), "eta": timezone.now() + timedelta(minutes=1)},
+    )
+
+    assert ConsumptionSession.get_session(build_request(user)) == model.consumption_session
+
+    with django_assert_num_queries(0):
+        session = ConsumptionSession.get_session(build_request(user))
+
+    assert session == model.consumption_session
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(reset_sequences=True)
+async def test_aget_session(bc: Breathecode):
+    model = await bc.database.acreate(user=1, consumable=1)
+
+    @sync_to_async
+    def create_session():
+        return ConsumptionSession.objects.create(
+            consumable=model.consumable,
+            user=model.user,
+            request=session_request(model.user),
+            eta=timezone.now() + timedelta(minutes=1),
+        )
+
+    expected = await create_session()
+
+    assert await ConsumptionSession.aget_session(build_request(model.user)) == expected
+    assert await ConsumptionSession.aget_session(build_request(model.user, {"slug": "a"})) is None
@@ -1,5 +1,5 @@
 import random
-from unittest.mock import MagicMock, call, patch
+from unittest.mock import MagicMock, patch
 
 from breathecode.payments import signals
 from breathecode.tests.mixins.legacy import LegacyAPITestCase
@@ -55,12 +55,8 @@ class TestSignal(LegacyAPITestCase):
                 },
             ],
         )
-        self.assertEqual(
-            signals.lose_service_permissions.send_robust.call_args_list,
-            [
-                call(sender=model.consumable.__class__, instance=model.consumable),
-            ],
-        )
+        # the permissions were lost by the consumption that exhausted it
+        self.assertEqual(signals.lose_service_permissions.send_robust.call_args_list, [])
 
     @patch("breathecode.payments.signals.lose_service_permissions.send_robust", MagicMock())
     def test__consumable_how_many_gte_1__consume_gte_1(self, enable_signals):
@@ -6,6 +6,7 @@ import pytest
 from django.urls import reverse_lazy
 from rest_framework import status
 
+from breathecode.payments.models import ConsumptionSession
 from breathecode.tests.mixins.breathecode_mixin.breathecode import Breathecode
 
 
@@ -18,6 +19,16 @@ def setup(db, monkeypatch: pytest.MonkeyPatch):
 
 
 def db_item(service, data={}):
+    request = {
+        "args": [],
+        "headers": {
+            "academy": None,
+        },
+        "kwargs": {
+            "service_slug": service.slug,
+        },
+        "user": 1,
+    }
     return {
         "consumable_id": 1,
         "duration": None,
@@ -28,16 +39,8 @@ def db_item(service, data={}):
         "path": "",
         "related_id": 0,
         "related_slug": "",
-        "request": {
-            "args": [],
-            "headers": {
-                "academy": None,
-            },
-            "kwargs": {
-                "service_slug": service.slug,
-            },
-            "user": 1,
-        },
+        "request": request,
+        "request_hash": ConsumptionSession.hash_request(request),
         "status": "PENDING",
         "user_id": 1,
         "was_discounted": False,
@@ -5297,6 +5297,8 @@ class ConsumableCheckoutView(APIView):
                             service_item__is_team_allowed=True,
                         )
 
+                        # the user is cleared by the PER_TEAM update, so the ids are taken before it
+                        existing_ids = list(existing_consumables.values_list("id", flat=True))
                         if plan.consumption_strategy == Plan.ConsumptionStrategy.PER_TEAM:
                             existing_consumables.update(
                                 user=None,
@@ -5309,6 +5311,8 @@ class ConsumableCheckoutView(APIView):
                                 subscription_billing_team=team,
                             )
 
+                        actions.sync_consumable_beneficiaries(existing_ids)
+
                     else:
                         # update seats limit and log
                         try:
@@ -8271,7 +8275,9 @@ class SubscriptionSeatView(APIView):
         seat.is_active = False
         seat.save(update_fields=["is_active", "user"])
 
-        Consumable.objects.filter(subscription_seat_id=seat.id).update(user=None)
+        consumables = Consumable.objects.filter(subscription_seat_id=seat.id)
+        consumables.update(user=None)
+        actions.sync_consumable_beneficiaries(consumables)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
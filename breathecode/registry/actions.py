@@ -15,6 +15,7 @@ from github import Github
 
 from breathecode.assessment.actions import create_from_asset
 from breathecode.authenticate.models import CredentialsGithub
+from breathecode.media.counters import media_hits, media_resolution_hits
 from breathecode.media.models import Media, MediaResolution
 from breathecode.services.cloudflare import BrowserRun
 from breathecode.services.google_cloud.storage import Storage
@@ -955,8 +956,7 @@ class AssetThumbnailGenerator:
 
         if not self._the_client_want_resize():
             # register click
-            media.hits += 1
-            media.save()
+            media_hits.incr(media.id)
 
             if self.asset.preview is None or self.asset.preview == "":
                 self.asset.preview = media.url
@@ -967,14 +967,12 @@ class AssetThumbnailGenerator:
         media_resolution = self._get_media_resolution(media.hash)
         if not media_resolution:
             # register click
-            media.hits += 1
-            media.save()
+            media_hits.incr(media.id)
             tasks.async_resize_asset_thumbnail.delay(media.id, width=self.width, height=self.height)
             return (media.url, False)
 
         # register click
-        media_resolution.hits += 1
-        media_resolution.save()
+        media_resolution_hits.incr(media_resolution.id)
 
         if self.asset.preview is None or self.asset.preview == "":
             self.asset.preview = media.url
@@ -150,6 +150,7 @@ class RegistryTestSuite(RegistryTestCase):
                 self.bc.database.list_of("media.MediaResolution"),
                 [
                     {
+                        "format": "",
                         "hash": model.media.hash,
                         "height": HEIGHT,
                         "hits": 0,
@@ -10,6 +10,9 @@ logger = logging.getLogger(__name__)
 
 __all__ = ["File"]
 
+# Google Cloud Storage accepts up to 32 components per compose request
+MAX_COMPOSE_COMPONENTS = 32
+
 
 class File:
     """Google Cloud Storage"""
@@ -56,6 +59,37 @@ class File:
         """Async version of upload - Upload Blob from Bucket"""
         self.upload(content, public, content_type)
 
+    @circuit
+    def compose(self, sources: list["File"], content_type: str = "application/octet-stream") -> None:
+        """Build this Blob concatenating other Blobs of the same Bucket, the bytes never leave Google Cloud"""
+
+        blobs = [source.blob or self.bucket.blob(source.file_name) for source in sources]
+        intermediates = []
+
+        while len(blobs) > MAX_COMPOSE_COMPONENTS:
+            parts = []
+            for i in range(0, len(blobs), MAX_COMPOSE_COMPONENTS):
+                part = self.bucket.blob(f"{self.file_name}.part-{len(intermediates)}")
+                part.content_type = content_type
+                part.compose(blobs[i : i + MAX_COMPOSE_COMPONENTS])
+
+                parts.append(part)
+                intermediates.append(part)
+
+            blobs = parts
+
+        self.blob = self.bucket.blob(self.file_name)
+        self.blob.content_type = content_type
+        self.blob.compose(blobs)
+
+        for part in intermediates:
+            part.delete()
+
+    @sync_to_async
+    def acompose(self, sources: list["File"], content_type: str = "application/octet-stream") -> None:
+        """Async version of compose"""
+        self.compose(sources, content_type=content_type)
+
     @circuit
     def exists(self) -> bool:
         """Check if Blob exists in Bucket"""
@@ -98,7 +132,7 @@ class File:
     def download(self) -> bytes: ...
 
     @circuit
-    def download(self, file: Optional[BytesIO | StringIO]) -> bytes | None:
+    def download(self, file: Optional[BytesIO | StringIO] = None) -> bytes | None:
         """Delete Blob from Bucket"""
         if self.blob and file:
             return self.blob.download_to_file(file)
@@ -0,0 +1,41 @@
+from io import BytesIO
+from unittest import TestCase
+from unittest.mock import MagicMock, call
+
+from breathecode.services.google_cloud.file import File
+
+
+def bucket_mock(blob):
+    bucket = MagicMock()
+    bucket.get_blob.return_value = blob
+    return bucket
+
+
+class FileTestCase(TestCase):
+
+    def test_download__without_file(self):
+        blob = MagicMock()
+        blob.download_as_string.return_value = b"potato"
+        file = File(bucket_mock(blob), "harcoded")
+
+        result = file.download()
+
+        self.assertEqual(result, b"potato")
+        self.assertEqual(blob.download_as_string.call_args_list, [call()])
+        self.assertEqual(blob.download_to_file.call_args_list, [])
+
+    def test_download__with_file(self):
+        blob = MagicMock()
+        file = File(bucket_mock(blob), "harcoded")
+        buffer = BytesIO()
+
+        result = file.download(buffer)
+
+        self.assertEqual(result, blob.download_to_file.return_value)
+        self.assertEqual(blob.download_to_file.call_args_list, [call(buffer)])
+        self.assertEqual(blob.download_as_string.call_args_list, [])
+
+    def test_download__blob_not_found(self):
+        file = File(bucket_mock(None), "harcoded")
+
+        self.assertEqual(file.download(), None)
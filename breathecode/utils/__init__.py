@@ -4,6 +4,7 @@ from .admin_export_csv_mixin import *  # noqa: F401
 from .api_view_extensions import *  # noqa: F401
 from .attr_dict import *  # noqa: F401
 from .cache import *  # noqa: F401
+from .counter import *  # noqa: F401
 from .datetime_integer import *  # noqa: F401
 from .decorators import *  # noqa: F401
 from .gcl_manifest_static_files_storage import *  # noqa: F401
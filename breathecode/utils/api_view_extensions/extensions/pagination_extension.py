@@ -8,6 +8,12 @@ from rest_framework.utils.urls import remove_query_param, replace_query_param
 from breathecode.utils.api_view_extensions.extension_base import ExtensionBase
 from breathecode.utils.api_view_extensions.priorities.mutator_order import MutatorOrder
 from breathecode.utils.api_view_extensions.priorities.response_order import ResponseOrder
+from breathecode.utils.keyset_pagination import (
+    COUNT_QUERY_PARAM,
+    CURSOR_QUERY_PARAM,
+    get_keyset_count,
+    paginate_by_keyset,
+)
 
 __all__ = ["PaginationExtension"]
 
@@ -35,15 +41,23 @@ def _positive_int(integer_string, strict=False, cutoff=None):
 
 
 class PaginationExtension(ExtensionBase):
+    """
+    Paginate the list with `limit` and `offset`, or with `cursor` to seek the rows after the last one of the
+    previous page, in that case the count is estimated unless `count=exact` is provided.
+    """
 
-    _count: int
+    _count: Optional[int]
     _offset: int
+    _cursor: Optional[str]
+    _next_cursor: Optional[str]
     _use_envelope: bool
     _paginate: bool
 
     def __init__(self, paginate: bool, **kwargs) -> None:
         self._paginate = paginate
         self._is_list = False
+        self._cursor = None
+        self._next_cursor = None
 
     def _can_modify_queryset(self) -> bool:
         return self._paginate
@@ -58,7 +72,11 @@ class PaginationExtension(ExtensionBase):
         return int(ResponseOrder.PAGINATION)
 
     def _is_paginate(self):
-        return bool(self._request.GET.get(LIMIT_QUERY_PARAM) or self._request.GET.get(OFFSET_QUERY_PARAM))
+        return bool(
+            self._request.GET.get(LIMIT_QUERY_PARAM)
+            or self._request.GET.get(OFFSET_QUERY_PARAM)
+            or CURSOR_QUERY_PARAM in self._request.GET
+        )
 
     def _apply_queryset_mutation(self, queryset: QuerySet[Any]):
 
@@ -77,9 +95,17 @@ class PaginationExtension(ExtensionBase):
             self._use_envelope = self._is_paginate()
 
         self._is_list = True
+        self._offset = 0
+        self._limit = self._get_limit()
+
+        if CURSOR_QUERY_PARAM in self._request.GET and isinstance(queryset, QuerySet):
+            self._cursor = self._request.GET.get(CURSOR_QUERY_PARAM)
+            self._count = get_keyset_count(queryset, self._request.GET.get(COUNT_QUERY_PARAM))
+            self._queryset, self._next_cursor = paginate_by_keyset(queryset, self._cursor, self._limit)
+            return self._queryset
+
         self._count = self._get_count(queryset)
         self._offset = self._get_offset()
-        self._limit = self._get_limit()
 
         self._queryset = queryset[self._offset : self._offset + self._limit]
         return self._queryset
@@ -109,9 +135,12 @@ class PaginationExtension(ExtensionBase):
                 links.append('<{}>; rel="{}"'.format(url, label))
 
         headers = {**headers, "Link": ", ".join(links)} if links else {**headers}
-        headers["X-Total-Count"] = self._count
+        if self._count is not None:
+            headers["X-Total-Count"] = self._count
+
         headers["X-Per-Page"] = self._limit
-        headers["X-Page"] = int(self._offset / self._limit) + 1
+        if self._cursor is None:
+            headers["X-Page"] = int(self._offset / self._limit) + 1
 
         if self._use_envelope:
             data = OrderedDict(
@@ -158,6 +187,13 @@ class PaginationExtension(ExtensionBase):
             return 0
 
     def _get_first_link(self):
+        if self._cursor is not None:
+            if not self._cursor:
+                return None
+
+            url = self._request.build_absolute_uri()
+            return replace_query_param(url, CURSOR_QUERY_PARAM, "")
+
         if self._offset <= 0:
             return None
 
@@ -165,7 +201,8 @@ class PaginationExtension(ExtensionBase):
         return remove_query_param(url, OFFSET_QUERY_PARAM)
 
     def _get_last_link(self):
-        if self._offset + self._limit >= self._count:
+        # the last page of a cursor is unknown until the previous pages are read
+        if self._cursor is not None or self._offset + self._limit >= self._count:
             return None
 
         url = self._request.build_absolute_uri()
@@ -174,6 +211,14 @@ class PaginationExtension(ExtensionBase):
         return replace_query_param(url, OFFSET_QUERY_PARAM, offset)
 
     def _get_next_link(self):
+        if self._cursor is not None:
+            if self._next_cursor is None:
+                return None
+
+            url = self._request.build_absolute_uri()
+            url = replace_query_param(url, LIMIT_QUERY_PARAM, self._limit)
+            return replace_query_param(url, CURSOR_QUERY_PARAM, self._next_cursor)
+
         if self._offset + self._limit >= self._count:
             return None
 
@@ -184,7 +229,7 @@ class PaginationExtension(ExtensionBase):
         return replace_query_param(url, OFFSET_QUERY_PARAM, offset)
 
     def _get_previous_link(self):
-        if self._offset <= 0:
+        if self._cursor is not None or self._offset <= 0:
             return None
 
         url = self._request.build_absolute_uri()
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import logging
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import F
+
+__all__ = ["Counter", "Timestamp", "COUNTERS"]
+
+COUNTERS: dict[str, BufferedField] = {}
+IS_DJANGO_REDIS = hasattr(cache, "fake") is False
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedField(ABC):
+    """Field whose writes are buffered in a Redis hash keyed by the primary key and flushed periodically."""
+
+    prefix = "buffered"
+
+    def __init__(self, model: str, field: str):
+        self.model_label = model
+        self.field = field
+        self.key = f"{self.prefix}:{model}:{field}"
+
+        if self.key in COUNTERS:
+            raise ValueError(f"{self.__class__.__name__} {self.key} is already registered")
+
+        COUNTERS[self.key] = self
+
+    @property
+    def model(self) -> type[models.Model]:
+        return apps.get_model(self.model_label)
+
+    def _get_client(self):
+        from django_redis import get_redis_connection
+
+        return get_redis_connection("default")
+
+    @abstractmethod
+    def _write(self, values: dict[bytes, bytes]) -> int:
+        """Write the flushed values keyed by primary key, return the number of rows updated."""
+
+    def flush(self) -> int:
+        """Write the pending values to the database, return the number of rows updated."""
+
+        if IS_DJANGO_REDIS is False:
+            return 0
+
+        client = self._get_client()
+        flushing_key = f"{self.key}:flushing"
+
+        # a previous flush could have failed after taking the values
+        if not client.exists(flushing_key):
+            try:
+                client.rename(self.key, flushing_key)
+
+            except Exception:
+                # there is nothing to flush
+                return 0
+
+        # the values are written all or nothing, and they are discarded only once they were committed, so a
+        # retry never applies them twice
+        with transaction.atomic():
+            updated = self._write(client.hgetall(flushing_key))
+            transaction.on_commit(lambda: client.delete(flushing_key))
+
+        logger.debug(f"{updated} rows flushed from {self.key}")
+
+        return updated
+
+    @classmethod
+    def find(cls, key: str) -> Optional[BufferedField]:
+        return COUNTERS.get(key)
+
+
+class Counter(BufferedField):
+    """
+    Integer field incremented through Redis and flushed periodically to the database.
+
+    Each increment is a `HINCRBY` over a Redis hash keyed by the primary key, the flush moves the hash out of the
+    way and applies the pending values with `UPDATE ... SET field = field + n`, grouping the rows that share the
+    same amount. The model signals are never fired, and the stored value is eventually consistent.
+
+    Without Redis the increment is written to the database immediately, still with an `F()` expression.
+    """
+
+    prefix = "counter"
+
+    def __init__(self, model: str, field: str = "hits"):
+        super().__init__(model, field)
+
+    def incr(self, pk: int, amount: int = 1) -> None:
+        if IS_DJANGO_REDIS is False:
+            self.model.objects.filter(pk=pk).update(**{self.field: F(self.field) + amount})
+            return
+
+        self._get_client().hincrby(self.key, pk, amount)
+
+    def pending(self, *pks: int) -> dict[int, int]:
+        """Get the increments that were not flushed yet."""
+
+        if IS_DJANGO_REDIS is False or not pks:
+            return {pk: 0 for pk in pks}
+
+        values = self._get_client().hmget(self.key, pks)
+        return {pk: int(value or 0) for pk, value in zip(pks, values)}
+
+    def get(self, instance: models.Model) -> int:
+        """Get the eventually consistent total of an instance."""
+
+        return getattr(instance, self.field) + self.pending(instance.pk)[instance.pk]
+
+    def _write(self, values: dict[bytes, bytes]) -> int:
+        by_amount: dict[int, list[int]] = defaultdict(list)
+        for pk, amount in values.items():
+            by_amount[int(amount)].append(int(pk))
+
+        updated = 0
+        for amount, pks in by_amount.items():
+            updated += self.model.objects.filter(pk__in=pks).update(**{self.field: F(self.field) + amount})
+
+        return updated
+
+
+class Timestamp(BufferedField):
+    """
+    Datetime field set through Redis and flushed periodically to the database, the last value wins.
+
+    Each write is a `HSET` of the epoch over a Redis hash keyed by the primary key, the flush writes all the
+    pending values with a single `bulk_update`.
+
+    Without Redis the value is written to the database immediately.
+    """
+
+    prefix = "timestamp"
+
+    def set(self, pk: int, value: Optional[datetime] = None) -> None:
+        if value is None:
+            value = datetime.now(timezone.utc)
+
+        if IS_DJANGO_REDIS is False:
+            self.model.objects.filter(pk=pk).update(**{self.field: value})
+            return
+
+        self._get_client().hset(self.key, pk, value.timestamp())
+
+    def _write(self, values: dict[bytes, bytes]) -> int:
+        model = self.model
+        pks = {int(pk): datetime.fromtimestamp(float(value), timezone.utc) for pk, value in values.items()}
+
+        # the rows could have been deleted in the meantime
+        existing = model.objects.filter(pk__in=pks.keys()).values_list("pk", flat=True)
+        instances = [model(pk=pk, **{self.field: pks[pk]}) for pk in existing]
+
+        return model.objects.bulk_update(instances, [self.field], batch_size=500)
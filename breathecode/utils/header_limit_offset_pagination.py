@@ -4,10 +4,14 @@ from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
 from rest_framework.utils.urls import remove_query_param, replace_query_param
 
+from .keyset_pagination import COUNT_QUERY_PARAM, CURSOR_QUERY_PARAM, get_keyset_count, paginate_by_keyset
+
 __all__ = ["HeaderLimitOffsetPagination"]
 
 
 class HeaderLimitOffsetPagination(LimitOffsetPagination):
+    cursor = None
+    next_cursor = None
 
     def paginate_queryset(self, queryset, request, view=None):
         self.use_envelope = True
@@ -23,9 +27,16 @@ class HeaderLimitOffsetPagination(LimitOffsetPagination):
         if self.limit is None:
             return None
 
+        self.request = request
+        if CURSOR_QUERY_PARAM in request.GET and hasattr(queryset, "filter"):
+            self.offset = 0
+            self.cursor = request.GET.get(CURSOR_QUERY_PARAM)
+            self.count = get_keyset_count(queryset, request.GET.get(COUNT_QUERY_PARAM))
+            page, self.next_cursor = paginate_by_keyset(queryset, self.cursor, self.limit)
+            return page
+
         self.count = self.get_count(queryset)
         self.offset = self.get_offset(request)
-        self.request = request
         if self.count > self.limit and self.template is not None:
             self.display_page_controls = True
 
@@ -62,7 +73,8 @@ class HeaderLimitOffsetPagination(LimitOffsetPagination):
                 links.append('<{}>; rel="{}"'.format(url, label))
 
         headers = {"Link": ", ".join(links)} if links else {}
-        headers["x-total-count"] = self.count
+        if self.count is not None:
+            headers["x-total-count"] = self.count
 
         if self.use_envelope:
             data = OrderedDict(
@@ -82,13 +94,38 @@ class HeaderLimitOffsetPagination(LimitOffsetPagination):
         return Response(data, headers=headers)
 
     def get_first_link(self):
+        if self.cursor is not None:
+            if not self.cursor:
+                return None
+
+            url = self.request.build_absolute_uri()
+            return replace_query_param(url, CURSOR_QUERY_PARAM, "")
+
         if self.offset <= 0:
             return None
         url = self.request.build_absolute_uri()
         return remove_query_param(url, self.offset_query_param)
 
+    def get_next_link(self):
+        if self.cursor is None:
+            return super().get_next_link()
+
+        if self.next_cursor is None:
+            return None
+
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(url, CURSOR_QUERY_PARAM, self.next_cursor)
+
+    def get_previous_link(self):
+        if self.cursor is not None:
+            return None
+
+        return super().get_previous_link()
+
     def get_last_link(self):
-        if self.offset + self.limit >= self.count:
+        # the last page of a cursor is unknown until the previous pages are read
+        if self.cursor is not None or self.offset + self.limit >= self.count:
             return None
 
         url = self.request.build_absolute_uri()
@@ -97,7 +134,11 @@ class HeaderLimitOffsetPagination(LimitOffsetPagination):
         return replace_query_param(url, self.offset_query_param, offset)
 
     def is_paginate(self, request):
-        return request.GET.get(self.limit_query_param) or request.GET.get(self.offset_query_param)
+        return (
+            request.GET.get(self.limit_query_param)
+            or request.GET.get(self.offset_query_param)
+            or CURSOR_QUERY_PARAM in request.GET
+        )
 
     def pagination_params(self, request):
         return {
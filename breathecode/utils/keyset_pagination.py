@@ -0,0 +1,185 @@
+"""
+Keyset pagination shared by `PaginationExtension` and `HeaderLimitOffsetPagination`.
+
+The cursor is an opaque token with the sort keys and the pk of the last row of the page, the next page is
+fetched with a seek over those values, the equivalent of `WHERE (sort, id) > (...)`, instead of an OFFSET, so
+the deep pages cost the same than the first one when the sort keys are indexed.
+"""
+
+import base64
+import datetime
+import json
+import logging
+import operator
+from functools import reduce
+from typing import Any, Optional
+
+from capyc.rest_framework.exceptions import ValidationException
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import F, Q, QuerySet
+
+__all__ = ["CURSOR_QUERY_PARAM", "COUNT_QUERY_PARAM", "paginate_by_keyset", "get_keyset_count"]
+
+logger = logging.getLogger(__name__)
+
+CURSOR_QUERY_PARAM = "cursor"
+COUNT_QUERY_PARAM = "count"
+
+
+def get_keyset_ordering(queryset: QuerySet[Any]) -> list[tuple[str, bool]]:
+    """Get the `(field, descending)` sort keys of the queryset, ending with the pk to make them unique."""
+
+    ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+    result = []
+
+    for field in ordering:
+        if not isinstance(field, str) or field == "?":
+            raise ValidationException(
+                "This sort is not supported by the cursor pagination", code=400, slug="cursor-unsupported-sort"
+            )
+
+        descending = field.startswith("-")
+        name = field.lstrip("-+")
+        if name in ("pk", "id"):
+            result.append(("pk", descending))
+            return result
+
+        result.append((name, descending))
+
+    result.append(("pk", False))
+    return result
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Keep the microseconds of the dates, DjangoJSONEncoder truncates them to milliseconds."""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+
+        return super().default(o)
+
+
+def encode_cursor(ordering: list[tuple[str, bool]], values: tuple) -> str:
+    payload = json.dumps(
+        {"o": [("-" if descending else "") + name for name, descending in ordering], "v": list(values)},
+        cls=CursorEncoder,
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("utf-8").rstrip("=")
+
+
+def decode_cursor(cursor: str, ordering: list[tuple[str, bool]]) -> Optional[list]:
+    if not cursor:
+        return None
+
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        fields = [("-" if descending else "") + name for name, descending in ordering]
+
+        if payload["o"] != fields or len(payload["v"]) != len(fields):
+            raise ValueError("the cursor belongs to another sort")
+
+        return payload["v"]
+
+    except (ValueError, TypeError, KeyError) as e:
+        logger.debug(f"Invalid cursor {cursor}: {e}")
+        raise ValidationException("Invalid cursor", code=400, slug="invalid-cursor")
+
+
+def _get_seek(ordering: list[tuple[str, bool]], values: list) -> Q:
+    """
+    Build the condition of the rows after the cursor, the ascending keys sort the nulls last and the descending
+    ones first, like the default btree indexes of PostgreSQL.
+    """
+
+    seek = []
+    equal = Q()
+
+    for (name, descending), value in zip(ordering, values):
+        if value is None:
+            after = Q(**{f"{name}__isnull": False}) if descending else None
+            same = Q(**{f"{name}__isnull": True})
+
+        else:
+            after = (
+                Q(**{f"{name}__lt": value})
+                if descending
+                else Q(**{f"{name}__gt": value}) | Q(**{f"{name}__isnull": True})
+            )
+            same = Q(**{name: value})
+
+        if after is not None:
+            seek.append(equal & after)
+
+        equal &= same
+
+    return reduce(operator.or_, seek)
+
+
+def paginate_by_keyset(queryset: QuerySet[Any], cursor: str, limit: int) -> tuple[QuerySet[Any], Optional[str]]:
+    """Get the page after the cursor, an empty cursor is the first page, and the cursor of the next page."""
+
+    ordering = get_keyset_ordering(queryset)
+    values = decode_cursor(cursor, ordering)
+
+    queryset = queryset.order_by(
+        *[
+            F(name).desc(nulls_first=True) if descending else F(name).asc(nulls_last=True)
+            for name, descending in ordering
+        ]
+    )
+
+    if values is not None:
+        queryset = queryset.filter(_get_seek(ordering, values))
+
+    # the keys of one extra row tell if there is a next page
+    keys = list(queryset.values_list(*[name for name, _ in ordering])[: limit + 1])
+    next_cursor = encode_cursor(ordering, keys[limit - 1]) if len(keys) > limit else None
+
+    return queryset[:limit], next_cursor
+
+
+def _estimate_count(queryset: QuerySet[Any]) -> Optional[int]:
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+            if row and row[0] >= 0:
+                return row[0]
+
+        sql, params = queryset.order_by().query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def get_keyset_count(queryset: QuerySet[Any], mode: Optional[str] = None) -> Optional[int]:
+    """
+    Get the total of rows of a keyset pagination, `exact` counts them, `none` skips the count and by default it
+    is estimated by the planner of PostgreSQL, or None when it cannot be estimated.
+    """
+
+    mode = (mode or "").lower()
+    if mode in ("none", "false", "0", "no"):
+        return None
+
+    if mode == "exact":
+        return queryset.order_by().count()
+
+    try:
+        return _estimate_count(queryset)
+
+    except Exception as e:
+        logger.warning(f"The count of {queryset.model.__name__} could not be estimated: {e}")
+        return None
@@ -709,6 +709,57 @@ class ApiViewExtensionsGetTestSuite(UtilsTestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         assert_pagination(response.headers, limit=5, offset=10, lenght=10)
 
+    def test_pagination__get__activate__with_10_cohorts__cursor(self):
+        cache.clear()
+
+        model = self.bc.database.create(cohort=10)
+        cohorts = sorted(model.cohort, key=lambda x: (x.name, x.id))
+
+        request = APIRequestFactory()
+        request = request.get("/the-beans-should-not-have-sugar?limit=5&cursor=")
+
+        view = CustomTestView.as_view()
+
+        response = view(request)
+        json_response = json.loads(response.content.decode("utf-8"))
+        next_url = json_response["next"]
+
+        self.assertEqual(
+            json_response,
+            {
+                "count": None,
+                "first": None,
+                "last": None,
+                "next": next_url,
+                "previous": None,
+                "results": GetCohortSerializer(cohorts[:5], many=True).data,
+            },
+        )
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(next_url).query)
+        self.assertEqual(query["limit"], ["5"])
+        self.assertEqual(len(query["cursor"]), 1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.headers["Link"], f'<{next_url}>; rel="next"')
+        self.assertEqual(response.headers["X-Per-Page"], "5")
+        self.assertNotIn("X-Total-Count", response.headers)
+
+        request = APIRequestFactory()
+        request = request.get(next_url + "&count=exact")
+
+        response = view(request)
+        expected = {
+            "count": 10,
+            "first": "http://testserver/the-beans-should-not-have-sugar?count=exact&cursor=&limit=5",
+            "last": None,
+            "next": None,
+            "previous": None,
+            "results": GetCohortSerializer(cohorts[5:], many=True).data,
+        }
+
+        self.assertEqual(json.loads(response.content.decode("utf-8")), expected)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.headers["X-Total-Count"], "10")
+
     """
     🔽🔽🔽 Pagination False
     """
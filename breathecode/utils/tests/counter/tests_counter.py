@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from django.db.models import QuerySet
+
+from breathecode.marketing.counters import short_link_lastclick
+from breathecode.media.counters import media_hits
+from breathecode.tests.mixins.breathecode_mixin.breathecode import Breathecode
+from breathecode.utils import counter as counter_module
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def hincrby(self, key, field, amount):
+        h = self.data.setdefault(key, {})
+        h[str(field).encode()] = str(int(h.get(str(field).encode(), 0)) + amount).encode()
+
+    def hset(self, key, field, value):
+        self.data.setdefault(key, {})[str(field).encode()] = str(value).encode()
+
+    def hmget(self, key, fields):
+        h = self.data.get(key, {})
+        return [h.get(str(x).encode()) for x in fields]
+
+    def hgetall(self, key):
+        return self.data.get(key, {})
+
+    def exists(self, key):
+        return key in self.data
+
+    def rename(self, src, dst):
+        if src not in self.data:
+            raise Exception("no such key")
+
+        self.data[dst] = self.data.pop(src)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(counter_module, "IS_DJANGO_REDIS", True)
+    monkeypatch.setattr(counter_module.BufferedField, "_get_client", lambda self: client)
+    yield client
+
+
+def test_incr__without_redis(db, bc: Breathecode):
+    model = bc.database.create(media={"hits": 3})
+
+    media_hits.incr(model.media.id)
+
+    assert bc.database.list_of("media.Media") == [{**bc.format.to_dict(model.media), "hits": 4}]
+
+
+def test_incr__buffered_and_flushed(db, bc: Breathecode, redis: FakeRedis, django_capture_on_commit_callbacks):
+    model = bc.database.create(media=[{"hits": 1}, {"hits": 5}, {"hits": 0}])
+
+    for _ in range(3):
+        media_hits.incr(model.media[0].id)
+
+    media_hits.incr(model.media[1].id, 3)
+    media_hits.incr(model.media[2].id)
+
+    assert media_hits.get(model.media[0]) == 4
+    assert bc.database.list_of("media.Media") == [bc.format.to_dict(x) for x in model.media]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert media_hits.flush() == 3
+
+    assert [x["hits"] for x in bc.database.list_of("media.Media")] == [4, 8, 1]
+    assert redis.data == {}
+    assert media_hits.flush() == 0
+
+
+def test_incr__a_failed_flush_is_not_applied_twice(
+    db, bc: Breathecode, redis: FakeRedis, monkeypatch, django_capture_on_commit_callbacks
+):
+    model = bc.database.create(media=[{"hits": 1}, {"hits": 5}])
+
+    media_hits.incr(model.media[0].id)
+    media_hits.incr(model.media[1].id, 3)
+
+    update = QuerySet.update
+    calls = []
+
+    def fail_on_the_second_update(self, **kwargs):
+        calls.append(kwargs)
+        if len(calls) == 2:
+            raise Exception("connection lost")
+
+        return update(self, **kwargs)
+
+    monkeypatch.setattr(QuerySet, "update", fail_on_the_second_update)
+
+    with pytest.raises(Exception, match="connection lost"):
+        media_hits.flush()
+
+    # the first update was rolled back and the values are kept to be retried
+    assert [x["hits"] for x in bc.database.list_of("media.Media")] == [1, 5]
+    assert redis.data == {"counter:media.Media:hits:flushing": {b"1": b"1", b"2": b"3"}}
+
+    monkeypatch.setattr(QuerySet, "update", update)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert media_hits.flush() == 2
+
+    assert [x["hits"] for x in bc.database.list_of("media.Media")] == [2, 8]
+    assert redis.data == {}
+
+
+def test_timestamp__buffered_and_flushed(db, bc: Breathecode, redis: FakeRedis, django_capture_on_commit_callbacks):
+    model = bc.database.create(short_link=[{"lastclick_at": None}, {"lastclick_at": None}])
+    first = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    short_link_lastclick.set(model.short_link[0].id, first)
+    short_link_lastclick.set(model.short_link[0].id, first + timedelta(minutes=5))
+    short_link_lastclick.set(model.short_link[1].id, first)
+
+    assert [x["lastclick_at"] for x in bc.database.list_of("marketing.ShortLink")] == [None, None]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert short_link_lastclick.flush() == 2
+
+    assert [x["lastclick_at"] for x in bc.database.list_of("marketing.ShortLink")] == [
+        first + timedelta(minutes=5),
+        first,
+    ]
+    assert redis.data == {}
+
+
+def test_buffered_field__write_is_abstract():
+    with pytest.raises(TypeError):
+        counter_module.BufferedField("media.Media", "hits")
+
+    assert "buffered:media.Media:hits" not in counter_module.COUNTERS
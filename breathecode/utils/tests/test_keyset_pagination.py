@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+import pytest
+from capyc.rest_framework.exceptions import ValidationException
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from breathecode.admissions.models import Cohort
+from breathecode.tests.mixins.breathecode_mixin.breathecode import Breathecode
+from breathecode.utils import HeaderLimitOffsetPagination
+from breathecode.utils.keyset_pagination import get_keyset_count, paginate_by_keyset
+
+
+@pytest.fixture(autouse=True)
+def setup(db):
+    yield
+
+
+def create_cohorts(bc: Breathecode):
+    now = timezone.now()
+    ending_dates = [None, now, now, None, now + timedelta(microseconds=1), now - timedelta(days=1), None]
+    cohorts = [{"name": "A" if i % 2 else "B", "ending_date": x} for i, x in enumerate(ending_dates)]
+    return bc.database.create(cohort=cohorts, city=1, country=1).cohort
+
+
+def read_all_pages(queryset, limit):
+    result, cursor = [], ""
+    while cursor is not None:
+        page, cursor = paginate_by_keyset(queryset, cursor, limit)
+        result += list(page.values_list("id", flat=True))
+
+    return result
+
+
+@pytest.mark.parametrize("sort", [["-ending_date", "name"], ["ending_date", "-name"], ["name"], ["-id"]])
+@pytest.mark.parametrize("limit", [1, 2, 3, 10])
+def test_pages_read_every_row_once_in_order(bc: Breathecode, sort, limit):
+    create_cohorts(bc)
+    queryset = Cohort.objects.order_by(*sort)
+
+    expected, _ = paginate_by_keyset(queryset, "", 100)
+    assert read_all_pages(queryset, limit) == list(expected.values_list("id", flat=True))
+
+
+def test_the_cursor_belongs_to_its_sort(bc: Breathecode):
+    create_cohorts(bc)
+
+    _, cursor = paginate_by_keyset(Cohort.objects.order_by("name"), "", 2)
+
+    with pytest.raises(ValidationException, match="invalid-cursor"):
+        paginate_by_keyset(Cohort.objects.order_by("-name"), cursor, 2)
+
+    with pytest.raises(ValidationException, match="invalid-cursor"):
+        paginate_by_keyset(Cohort.objects.order_by("name"), "not-a-cursor", 2)
+
+    with pytest.raises(ValidationException, match="cursor-unsupported-sort"):
+        paginate_by_keyset(Cohort.objects.order_by("?"), "", 2)
+
+
+def test_the_count_is_optional(bc: Breathecode):
+    create_cohorts(bc)
+
+    assert get_keyset_count(Cohort.objects.all(), "exact") == 7
+    assert get_keyset_count(Cohort.objects.all(), "none") is None
+
+    # the count is estimated by postgres only
+    assert get_keyset_count(Cohort.objects.all()) is None
+
+
+def test_header_limit_offset_pagination(bc: Breathecode, django_assert_num_queries):
+    cohorts = create_cohorts(bc)
+    ids = [x.id for x in sorted(cohorts, key=lambda x: x.id)]
+
+    paginator = HeaderLimitOffsetPagination()
+    request = Request(APIRequestFactory().get("/v1/cohorts?cursor=&limit=3"))
+
+    with django_assert_num_queries(2):
+        page = list(paginator.paginate_queryset(Cohort.objects.order_by("id"), request))
+
+    assert [x.id for x in page] == ids[:3]
+
+    response = paginator.get_paginated_response([x.id for x in page])
+    assert "x-total-count" not in response.headers
+    assert response.data["previous"] is None
+    assert response.data["last"] is None
+    assert response.data["first"] is None
+    assert response["Link"] == f'<{response.data["next"]}>; rel="next"'
+
+    request = Request(APIRequestFactory().get(response.data["next"] + "&count=exact"))
+    page = list(paginator.paginate_queryset(Cohort.objects.order_by("id"), request))
+    assert [x.id for x in page] == ids[3:6]
+
+    response = paginator.get_paginated_response([x.id for x in page])
+    assert response.data["count"] == 7
+    assert response.data["first"] == "http://testserver/v1/cohorts?count=exact&cursor=&limit=3"